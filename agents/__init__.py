@@ -1,12 +1,16 @@
 """
 LangGraph Agents Package for B2B Sales Conversation Generator
 """
+import importlib
 
-
-from .document_analysis_agent import DocumentAnalysisAgent
-from .message_composer_agent_pure import MessageComposerAgentPure
-from .strategy_agent_pure import StrategyAgentPure
-from .personality_classifier_agent_pure import PersonalityClassifierAgentPure
+# Agents are imported on first attribute access (PEP 562) so that importing the
+# package does not pull in langgraph, langchain and the Groq client
+_AGENT_MODULES = {
+    'DocumentAnalysisAgent': '.document_analysis_agent',
+    'MessageComposerAgentPure': '.message_composer_agent_pure',
+    'StrategyAgentPure': '.strategy_agent_pure',
+    'PersonalityClassifierAgentPure': '.personality_classifier_agent_pure'
+}
 
 __all__ = [
     'DocumentAnalysisAgent',
@@ -14,3 +18,15 @@ __all__ = [
     'StrategyAgentPure',
     'PersonalityClassifierAgentPure'
 ]
+
+
+def __getattr__(name):
+    if name in _AGENT_MODULES:
+        value = getattr(importlib.import_module(_AGENT_MODULES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + __all__)
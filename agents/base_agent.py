@@ -6,11 +6,15 @@ import logging
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, Type
 from langgraph.graph import StateGraph
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_groq import ChatGroq
 
 from config.settings import Config
 from utils.models import WorkflowState
+from utils.log_pipeline import log_payload
+from utils.delta_checkpoint import create_checkpoint_saver
+from utils.llm_scheduler import get_llm_scheduler
+from utils.llm_router import create_llm, route_backends
+from utils.step_resume import (RESUME_COMPLETE, RESUME_MISSING, find_resume_point, resume_config,
+                               state_from_values)
 
 logger = logging.getLogger(__name__)
 
@@ -21,21 +25,25 @@ class BaseAgent(ABC):
         self.agent_name = agent_name
         self.enable_checkpointing = enable_checkpointing
         
-        # Initialize LLM with standard configuration
-        self.llm = ChatGroq(
-            model=Config.MODEL_NAME,
-            groq_api_key=Config.GROQ_API_KEY,
-            temperature=Config.TEMPERATURE
-        )
+        # Initialize LLM on the agent's route (Groq by default); calls share the process-wide rate limit
+        self.llm = get_llm_scheduler().wrap(create_llm(route_backends(agent_name)))
+        self._node_llms: Dict[str, Any] = {}
         
         # Initialize checkpoint saver if enabled
-        self.checkpoint_saver = MemorySaver() if enable_checkpointing else None
+        self.checkpoint_saver = create_checkpoint_saver(agent_name) if enable_checkpointing else None
         
         # Build agent workflow
         self.workflow = self._build_workflow()
         
         logger.info(f"Initialized {agent_name} with checkpointing={'enabled' if enable_checkpointing else 'disabled'}")
     
+    def llm_for(self, node: str):
+        """LLM client of a node: its own ``Config.LLM_ROUTES`` entry ("agent_name.node") or the agent's"""
+        if node not in self._node_llms:
+            backends = route_backends(self.agent_name, node)
+            self._node_llms[node] = get_llm_scheduler().wrap(create_llm(backends)) if backends else None
+        return self._node_llms[node] or self.llm
+    
     @abstractmethod
     def _build_workflow(self):
         """Build the LangGraph workflow for this agent. Must be implemented by subclasses."""
@@ -81,24 +89,16 @@ class BaseAgent(ABC):
                             if key in valid_fields:
                                 state_dict[key] = value
                         
-                        # Add debug logging for customer_analysis
+                        # Payload dumps go through the sampled payload logger
                         if 'customer_analysis' in result:
-                            logger.info(f"DEBUG: customer_analysis found in result: {result['customer_analysis']}")
-                            logger.info(f"DEBUG: customer_analysis type in result: {type(result['customer_analysis'])}")
+                            log_payload(logger, "customer_analysis in result:", result['customer_analysis'], logging.DEBUG)
                         else:
-                            logger.warning("DEBUG: customer_analysis NOT found in result")
-                        
-                        # Debug: log all available keys
-                        logger.info(f"DEBUG: Available keys in result: {list(result.keys())}")
-                        logger.info(f"DEBUG: Valid WorkflowState fields: {list(valid_fields)}")
-                        logger.info(f"DEBUG: Filtered state_dict keys: {list(state_dict.keys())}")
-                        
+                            logger.warning("customer_analysis NOT found in result")
+
+                        logger.debug("Result keys: %s, filtered state keys: %s", list(result.keys()), list(state_dict.keys()))
+
                         # Create new WorkflowState with the filtered data
                         final_result = WorkflowState(**state_dict)
-                        
-                        # Verify customer_analysis was preserved
-                        logger.info(f"DEBUG: Final result customer_analysis: {final_result.customer_analysis}")
-                        logger.info(f"DEBUG: Final result customer_analysis type: {type(final_result.customer_analysis)}")
                     else:
                         final_result = state
                 except Exception as conv_error:
@@ -192,16 +192,31 @@ class BaseAgent(ABC):
             return None
     
     def resume_from_checkpoint(self, thread_id: str, state: WorkflowState) -> WorkflowState:
-        """Resume execution from a checkpoint"""
-        if not self.enable_checkpointing:
+        """
+        Resume execution from the last successful step checkpointed on ``thread_id``
+        
+        Nodes that completed in the previous run are not executed again: a finished run returns
+        its checkpointed result and a failed or interrupted one reruns from the failed node.
+        Without a checkpoint for the thread the agent is executed normally.
+        """
+        if not self.enable_checkpointing or not self.checkpoint_saver:
             logger.warning(f"Checkpointing not enabled for {self.agent_name}")
             return self.execute(state)
         
         try:
             config = {"configurable": {"thread_id": thread_id}}
-            result = self.workflow.invoke(state, config=config)
+            point = find_resume_point(self.workflow, config)
+            if point.action == RESUME_MISSING:
+                logger.info(f"No checkpoint for {self.agent_name} on {thread_id}, executing from start")
+                return self.execute(state, config)
+            if point.action == RESUME_COMPLETE:
+                logger.info(f"{self.agent_name} already completed on {thread_id}, reusing checkpointed result")
+                return state_from_values(point.values)
+            
+            logger.info(f"Resuming {self.agent_name} at {point.failed} (skipping {point.completed})")
+            result = self.workflow.invoke(None, config=resume_config(point))
             logger.info(f"Successfully resumed {self.agent_name} from checkpoint {thread_id}")
-            return result
+            return state_from_values(result)
         except Exception as e:
             logger.error(f"Error resuming {self.agent_name} from checkpoint: {str(e)}")
             state.errors.append(f"{self.agent_name} resume: {str(e)}")
@@ -14,8 +14,9 @@ from langchain.schema import SystemMessage, HumanMessage
 from agents.base_agent import BaseAgent
 from config.settings import Config
 from config.prompts import SystemPrompts
-from utils.helpers import FileProcessor, DataValidator
+from utils.helpers import FileProcessor, DataValidator, load_customer_json, validate_customer_profile
 from utils.models import WorkflowState, CustomerAnalysis
+from utils.log_pipeline import log_payload
 
 logger = logging.getLogger(__name__)
 
@@ -70,12 +71,15 @@ class DocumentAnalysisAgent(BaseAgent):
             if not self._validate_state(state):
                 raise ValueError("Invalid workflow state")
             
-            if not state.customer_json_path:
-                raise ValueError("Customer JSON path is required")
-            
-            # Validate customer JSON file
-            if not self.file_processor.validate_file(state.customer_json_path, allowed_extensions=['.json']):
-                raise ValueError(f"Invalid customer JSON file: {state.customer_json_path}")
+            # Ingest the customer profile once: read, parse and validate in a single pass
+            customer_data = state.intermediate_results.get("raw_customer_data")
+            if customer_data is not None:
+                # Handed over already parsed (upload or API payload)
+                validate_customer_profile(customer_data)
+            elif state.customer_json_path:
+                state.intermediate_results["raw_customer_data"] = load_customer_json(state.customer_json_path)
+            else:
+                raise ValueError("Customer JSON path or customer data is required")
             
             # Update state
             state.current_step = "extract_customer_info"
@@ -94,8 +98,10 @@ class DocumentAnalysisAgent(BaseAgent):
         try:
             logger.info("Starting customer information extraction")
             
-            # Read and parse customer JSON
-            customer_data = self.file_processor.read_json_file(state.customer_json_path)
+            # Parsed during input validation; read the file only if that step was skipped
+            customer_data = state.intermediate_results.get("raw_customer_data")
+            if customer_data is None:
+                customer_data = self.file_processor.read_json_file(state.customer_json_path)
             
             if not customer_data:
                 raise ValueError("Empty or invalid customer JSON data")
@@ -176,11 +182,9 @@ class DocumentAnalysisAgent(BaseAgent):
                 HumanMessage(content=human_prompt)
             ]
             
-            response = self.llm.invoke(messages)
+            response = self.llm_for("structure_analysis").invoke(messages)
             
-            # Debug: Log the LLM response
-            logger.info(f"LLM response content: '{response.content[:200]}...'")
-            logger.info(f"LLM response type: {type(response.content)}")
+            log_payload(logger, "LLM response content:", response.content)
             
             # Parse LLM response with improved JSON extraction
             try:
@@ -191,7 +195,7 @@ class DocumentAnalysisAgent(BaseAgent):
                 # Use improved JSON cleaning function
                 cleaned_content = self._clean_llm_json_response(response.content)
                 
-                logger.info(f"Cleaned LLM response: '{cleaned_content[:200]}...'")
+                log_payload(logger, "Cleaned LLM response:", cleaned_content, logging.DEBUG)
                 
                 analysis_data = json.loads(cleaned_content)
                 
@@ -210,7 +214,7 @@ class DocumentAnalysisAgent(BaseAgent):
                 
             except (json.JSONDecodeError, ValueError, TypeError) as e:
                 logger.warning(f"Failed to parse LLM response as JSON: {e}")
-                logger.debug(f"Raw LLM response: {response.content}")
+                log_payload(logger, "Raw LLM response:", response.content, logging.DEBUG)
                 # Fallback: create analysis from raw data
                 logger.info("CREATING FALLBACK ANALYSIS - This should fix the None issue")
                 customer_analysis = self._create_fallback_analysis(raw_data)
@@ -6,7 +6,8 @@ import json
 import logging
 import uuid
 import time
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from langgraph.graph import StateGraph
 from langchain.schema import SystemMessage, HumanMessage
@@ -16,6 +17,11 @@ from config.settings import Config
 from config.prompts import SystemPrompts
 from config.talan_config import TALAN_COMPANY_INFO, MESSAGE_FORMATS, MESSAGE_TYPES
 from utils.models import WorkflowState, Conversation, Message, ConversationParams, ConversationTone, ConversationChannel
+from utils.llm_scheduler import ScheduledLLM
+from utils.message_scorer import MessageScorer, channel_key
+from utils.outcome_detector import detect_outcome
+from utils.service_matcher import DEFAULT_SERVICE, get_service_matcher
+from utils.similarity_cache import get_similarity_index, text_agreement
 
 logger = logging.getLogger(__name__)
 
@@ -200,23 +206,31 @@ class MessageComposerAgentPure(BaseAgent):
             message_type = state.intermediate_results.get("current_message_type", "follow_up")
             
             # Get relevant Talan services for this client
-            relevant_services = self._get_talan_services_for_client(state.customer_analysis)
-            
-            # Build context-aware prompt
-            prompt = self._build_talan_message_prompt(state, message_type, relevant_services)
-            
-            # Generate message
-            messages = [
-                SystemMessage(content=SystemPrompts.TALAN_MESSAGE_GENERATOR),
-                HumanMessage(content=prompt)
-            ]
-            
-            response = self.llm.invoke(messages)
+            relevant_services = self._get_talan_services_for_client(state.customer_analysis, state)
+            
+            candidate_count = int(state.config.get("talan_candidates", Config.TALAN_MESSAGE_CANDIDATES) or 1)
+            if candidate_count > 1:
+                # Several drafts in parallel, ranked locally; the best one continues the conversation
+                candidates = self.generate_talan_candidates(state, message_type, relevant_services, candidate_count)
+                state.intermediate_results["talan_candidates"] = candidates
+                content = candidates[0]["content"]
+            else:
+                # Build context-aware prompt
+                prompt = self._build_talan_message_prompt(state, message_type, relevant_services)
+                
+                # Generate message
+                messages = [
+                    SystemMessage(content=SystemPrompts.TALAN_MESSAGE_GENERATOR),
+                    HumanMessage(content=prompt)
+                ]
+                
+                response = self.llm_for("generate_talan_message").invoke(messages)
+                content = response.content.strip()
             
             # Create message object
             message = Message(
                 sender="company",
-                content=response.content.strip(),
+                content=content,
                 timestamp=datetime.now(),
                 message_type=message_type
             )
@@ -233,6 +247,51 @@ class MessageComposerAgentPure(BaseAgent):
         except Exception as e:
             return self._handle_error(state, e, "Talan message generation")
     
+    def generate_talan_candidates(self, state: WorkflowState, message_type: str, services: List[str],
+                                  count: int) -> List[Dict[str, Any]]:
+        """
+        Generate ``count`` Talan drafts concurrently and rank them with the local MessageScorer
+        
+        Drafts differ by sampling temperature (cycled from Config.CANDIDATE_TEMPERATURES). Drafts
+        that fail are dropped; the call only fails when none succeeded. Returns candidate dicts
+        sorted best first, each with ``content``, ``message_type``, ``temperature`` and a ``score``
+        breakdown.
+        """
+        temperatures = Config.CANDIDATE_TEMPERATURES
+        variants = [{"message_type": message_type, "temperature": temperatures[i % len(temperatures)]}
+                    for i in range(count)]
+        
+        def generate(variant: Dict[str, Any]) -> Dict[str, Any]:
+            prompt = self._build_talan_message_prompt(state, variant["message_type"], services)
+            messages = [
+                SystemMessage(content=SystemPrompts.TALAN_MESSAGE_GENERATOR),
+                HumanMessage(content=prompt)
+            ]
+            llm = self.llm_for("generate_talan_message").bind(temperature=variant["temperature"])
+            if isinstance(llm, ScheduledLLM):
+                # Drafts are meant to be distinct samples, even when their prompt and temperature repeat
+                llm = llm.without_coalescing()
+            response = llm.invoke(messages)
+            return {**variant, "content": response.content.strip()}
+        
+        candidates, error = [], None
+        with ThreadPoolExecutor(max_workers=count, thread_name_prefix="talan-candidate") as executor:
+            futures = [executor.submit(generate, variant) for variant in variants]
+            for variant, future in zip(variants, futures):
+                try:
+                    candidates.append(future.result())
+                except Exception as e:
+                    error = e
+                    logger.warning(f"Talan candidate at temperature {variant['temperature']} failed: {e}")
+        if not candidates:
+            raise error
+        
+        # Score against the same channel format the prompt asked for
+        channel = state.conversation_params.channel
+        ranked = MessageScorer().rank(candidates, state.customer_analysis, channel, services)
+        logger.info(f"Ranked {len(ranked)} Talan candidates, best score {ranked[0]['score']['total']}")
+        return ranked
+    
     def _generate_customer_response(self, state: WorkflowState) -> WorkflowState:
         """Generate customer response"""
         start_time = time.time()
@@ -249,7 +308,7 @@ class MessageComposerAgentPure(BaseAgent):
                 HumanMessage(content=prompt)
             ]
             
-            response = self.llm.invoke(messages)
+            response = self.llm_for("generate_customer_response").invoke(messages)
             
             # Create message object
             message = Message(
@@ -286,10 +345,18 @@ class MessageComposerAgentPure(BaseAgent):
             iteration_count = state.intermediate_results.get("iteration_count", 0) + 1
             state.intermediate_results["iteration_count"] = iteration_count
             logger.info(f"Iteration: {iteration_count}, Messages: {current_messages}/{target_messages}")
-            # Stop if message count or iteration count exceeds limits
-            if current_messages >= target_messages or iteration_count >= getattr(state, 'max_iterations', 30):
+            # Stop if message count or iteration count exceeds limits, or once the customer booked a meeting or declined
+            if current_messages >= target_messages:
+                completion_reason = "target_exchanges"
+            elif iteration_count >= getattr(state, 'max_iterations', 30):
+                completion_reason = "max_iterations"
+            else:
+                completion_reason = self._detect_outcome(state)
+            if completion_reason:
                 state.intermediate_results["conversation_complete"] = True
-                logger.info(f"Conversation complete: {current_messages}/{target_messages} messages or {iteration_count}/{getattr(state, 'max_iterations', 30)} iterations")
+                state.intermediate_results["completion_reason"] = completion_reason
+                state.conversation.metadata["completion_reason"] = completion_reason
+                logger.info(f"Conversation complete ({completion_reason}): {current_messages}/{target_messages} messages, {iteration_count}/{getattr(state, 'max_iterations', 30)} iterations")
             else:
                 state.intermediate_results["conversation_complete"] = False
                 logger.info(f"Conversation continuing: {current_messages}/{target_messages} messages, {iteration_count}/{getattr(state, 'max_iterations', 30)} iterations")
@@ -299,6 +366,21 @@ class MessageComposerAgentPure(BaseAgent):
         except Exception as e:
             return self._handle_error(state, e, "completion check")
     
+    def _detect_outcome(self, state: WorkflowState) -> Optional[str]:
+        """Outcome label when the latest customer message ends the conversation early, else None"""
+        if not state.config.get("early_termination", Config.EARLY_TERMINATION):
+            return None
+        messages = state.conversation.messages if state.conversation else []
+        if not messages or messages[-1].sender != "customer":
+            return None
+        outcome = detect_outcome(messages[-1].content, llm=self.llm_for("check_completion") if Config.OUTCOME_LLM_CHECK else None)
+        if not outcome.terminal:
+            return None
+        state.intermediate_results["conversation_outcome"] = {**outcome._asdict(), "message_index": len(messages) - 1}
+        state.conversation.metadata["outcome"] = outcome.label
+        logger.info(f"Customer outcome {outcome.label} ({outcome.source}, confidence {outcome.confidence}): {outcome.reason}")
+        return outcome.label
+    
     def _should_continue_conversation(self, state: WorkflowState) -> str:
         """Conditional edge function"""
         is_complete = state.intermediate_results.get("conversation_complete", False)
@@ -327,37 +409,24 @@ class MessageComposerAgentPure(BaseAgent):
         except Exception as e:
             return self._handle_error(state, e, "conversation finalization")
     
-    def _get_talan_services_for_client(self, customer_analysis) -> List[str]:
-        """Get relevant Talan services for client"""
+    def _get_talan_services_for_client(self, customer_analysis, state: Optional[WorkflowState] = None) -> List[str]:
+        """Get relevant Talan services for client, ranked by weighted keyword relevance"""
         try:
-            # Extract text from pain points and needs
-            pain_points_text = " ".join([
-                str(pp.get('issue', pp)) if isinstance(pp, dict) else str(pp) 
-                for pp in customer_analysis.pain_points
-            ]).lower()
-            
-            needs_text = " ".join([
-                str(need.get('requirement', need)) if isinstance(need, dict) else str(need) 
-                for need in customer_analysis.needs
-            ]).lower()
-            
-            all_text = f"{pain_points_text} {needs_text} {customer_analysis.industry}".lower()
-            
-            # Service mapping
-            service_keywords = {
-                "transformation_digitale": ["digital", "transformation", "modernisation", "innovation"],
-                "cloud": ["cloud", "infrastructure", "aws", "azure", "migration"],
-                "data_ai": ["data", "analytics", "intelligence", "ai", "machine learning", "bi"],
-                "erp": ["erp", "sap", "oracle", "gestion", "processus"],
-                "cybersecurity": ["sécurité", "cyber", "protection", "conformité", "gdpr"]
-            }
-            
-            relevant_services = []
-            for service, keywords in service_keywords.items():
-                if any(keyword in all_text for keyword in keywords):
-                    relevant_services.append(service)
-            
-            return relevant_services or ["transformation_digitale"]
+            # Precompiled matcher; results are memoised per customer analysis
+            services = get_service_matcher().match_services(customer_analysis)
+            index = get_similarity_index()
+            if services != [DEFAULT_SERVICE]:
+                index.add("talan_services", "", customer_analysis, services)
+                return services
+            
+            # Nothing specific matched: warm-start from the services of a similar customer
+            hit = index.lookup("talan_services", "", customer_analysis)
+            if hit is None:
+                return services
+            if index.verifying(state):
+                index.record_verification("talan_services", text_agreement(hit.payload, services))
+                return services
+            return list(hit.payload)
             
         except Exception as e:
             logger.warning(f"Error determining services: {e}")
@@ -384,7 +453,7 @@ class MessageComposerAgentPure(BaseAgent):
         
         # Get message type info
         message_info = MESSAGE_TYPES.get(message_type, {"objective": "Développer la relation commerciale"})
-        channel = str(state.conversation_params.channel).lower()
+        channel = channel_key(state.conversation_params.channel)
         channel_format = MESSAGE_FORMATS.get(channel, {"tone": "professionnel", "length": "moyen"})
         
         return f"""
@@ -13,6 +13,8 @@ from agents.base_agent import BaseAgent
 from config.settings import Config
 from config.prompts import SystemPrompts
 from utils.models import WorkflowState, PersonalityAnalysis
+from utils.log_pipeline import log_payload
+from utils.incremental_analysis import blend_score, merge_list
 
 logger = logging.getLogger(__name__)
 
@@ -132,7 +134,7 @@ class PersonalityClassifierAgentPure(BaseAgent):
                 HumanMessage(content=decision_prompt)
             ]
             
-            response = self.llm.invoke(messages)
+            response = self.llm_for("assess_decision_patterns").invoke(messages)
             decision_analysis = self._parse_json_response(
                 response.content,
                 fallback={
@@ -151,7 +153,7 @@ class PersonalityClassifierAgentPure(BaseAgent):
             )
             
             state.personality_components['decision_patterns'] = decision_analysis
-            logger.info(f"[DEBUG] Set personality_components['decision_patterns']: {decision_analysis}")
+            log_payload(logger, "[DEBUG] Set personality_components['decision_patterns']:", decision_analysis, logging.DEBUG)
             state.status = "decision_assessment_complete"
             
             logger.info(f"[{state.execution_id}] Decision pattern assessment completed")
@@ -214,7 +216,7 @@ class PersonalityClassifierAgentPure(BaseAgent):
                 HumanMessage(content=profile_prompt)
             ]
             
-            response = self.llm.invoke(messages)
+            response = self.llm_for("determine_personality_profile").invoke(messages)
             profile_analysis = self._parse_json_response(
                 response.content,
                 fallback={
@@ -229,7 +231,7 @@ class PersonalityClassifierAgentPure(BaseAgent):
             )
             
             state.personality_components['profile_classification'] = profile_analysis
-            logger.info(f"[DEBUG] Set personality_components['profile_classification']: {profile_analysis}")
+            log_payload(logger, "[DEBUG] Set personality_components['profile_classification']:", profile_analysis, logging.DEBUG)
             state.status = "profile_determination_complete"
             
             logger.info(f"[{state.execution_id}] Personality profile determination completed")
@@ -322,7 +324,7 @@ class PersonalityClassifierAgentPure(BaseAgent):
                 HumanMessage(content=recommendations_prompt)
             ]
             
-            response = self.llm.invoke(messages)
+            response = self.llm_for("generate_recommendations").invoke(messages)
             recommendations = self._parse_json_response(
                 response.content,
                 fallback={
@@ -360,7 +362,7 @@ class PersonalityClassifierAgentPure(BaseAgent):
             )
             
             state.personality_recommendations = recommendations
-            logger.info(f"[DEBUG] Set personality_recommendations: {recommendations}")
+            log_payload(logger, "[DEBUG] Set personality_recommendations:", recommendations, logging.DEBUG)
             state.status = "recommendations_generated"
             
             logger.info(f"[{state.execution_id}] Personality-based recommendations generated")
@@ -375,8 +377,8 @@ class PersonalityClassifierAgentPure(BaseAgent):
             logger.info(f"[{state.execution_id}] Finalizing personality analysis")
             components = getattr(state, 'personality_components', {})
             recommendations = getattr(state, 'personality_recommendations', {})
-            logger.info(f"[DEBUG FINALIZE] personality_components: {components}")
-            logger.info(f"[DEBUG FINALIZE] personality_recommendations: {recommendations}")
+            log_payload(logger, "[DEBUG FINALIZE] personality_components:", components, logging.DEBUG)
+            log_payload(logger, "[DEBUG FINALIZE] personality_recommendations:", recommendations, logging.DEBUG)
 
             # Helper to recursively search for a key in nested dicts
             def find_in_dicts(dicts, keys):
@@ -546,7 +548,7 @@ class PersonalityClassifierAgentPure(BaseAgent):
                 'classification_notes': classification_notes,
                 'recommendations_notes': recommendations_notes
             }
-            logger.info(f"[FINAL PersonalityAnalysis for UI] {pa_dict}")
+            log_payload(logger, "[FINAL PersonalityAnalysis for UI]", pa_dict)
             state.personality_analysis = PersonalityAnalysis(**pa_dict)
             state.status = "personality_analysis_complete"
             for attr in ['personality_components', 'personality_recommendations', '_analysis_mode']:
@@ -557,14 +559,101 @@ class PersonalityClassifierAgentPure(BaseAgent):
         except Exception as e:
             return self._handle_error(state, e, "Personality finalization error")
     
+    def update_analysis(self, previous: PersonalityAnalysis, customer_analysis, new_messages,
+                        features: Dict[str, Any], analyzed_messages: int) -> Optional[PersonalityAnalysis]:
+        """
+        Fold new customer messages into a previous PersonalityAnalysis with a single LLM call
+        
+        The LLM sees the prior profile and only the new messages; the DISC evidence of those
+        messages is blended with the previous profile weighted by customer message count.
+        Returns None when the reply cannot be parsed, so the messages are not marked as analysed.
+        """
+        customer_messages = [msg.content for msg in new_messages if msg.sender == "customer"]
+        if not customer_messages:
+            return previous
+        
+        previous_summary = {
+            "communication_style": previous.communication_style,
+            "disc_profile": previous.disc_profile,
+            "decision_making_style": previous.decision_making_style,
+            "relationship_orientation": previous.relationship_orientation,
+            "risk_tolerance": previous.risk_tolerance,
+            "information_processing": previous.information_processing,
+            "motivational_drivers": previous.motivational_drivers[:4],
+        }
+        update_prompt = f"""
+        Update a B2B customer personality analysis with the customer's latest messages.
+        
+        PREVIOUS PROFILE ({analyzed_messages} customer messages analyzed):
+        {json.dumps(previous_summary, ensure_ascii=False)}
+        
+        CUSTOMER CONTEXT:
+        - Industry: {getattr(customer_analysis, 'industry', 'Unknown')}
+        - Company Size: {getattr(customer_analysis, 'company_size', 'Unknown')}
+        
+        NEW CUSTOMER MESSAGES:
+        {chr(10).join(customer_messages)}
+        
+        SIGNALS IN THE NEW TURNS:
+        {json.dumps(features, ensure_ascii=False)}
+        
+        Return JSON with these exact keys. "disc_profile" reflects the NEW MESSAGES only (D/I/S/C summing to 100);
+        the other fields describe the customer overall and may keep the previous values:
+        {{
+            "disc_profile": {{"D": float, "I": float, "S": float, "C": float}},
+            "communication_style": "string",
+            "decision_making_style": "string",
+            "relationship_orientation": "string",
+            "risk_tolerance": "string",
+            "information_processing": "string",
+            "motivational_drivers": ["driver1"],
+            "personality_based_recommendations": ["recommendation1"],
+            "objection_handling_style": "string"
+        }}
+        """
+        messages = [
+            SystemMessage(content=SystemPrompts.PERSONALITY_CLASSIFIER_AGENT),
+            HumanMessage(content=update_prompt)
+        ]
+        response = self.llm_for("update_analysis").invoke(messages)
+        update = self._parse_json_response(response.content, fallback={})
+        if not isinstance(update, dict) or not update:
+            logger.warning("Unparseable personality update, keeping the previous analysis")
+            return None
+        
+        delta_disc = update.get("disc_profile") if isinstance(update.get("disc_profile"), dict) else {}
+        disc_profile = {
+            key: blend_score(previous.disc_profile.get(key), analyzed_messages, delta_disc.get(key),
+                             len(customer_messages), high=100.0)
+            for key in ("D", "I", "S", "C")
+        }
+        disc_profile = {key: value if value is not None else 25.0 for key, value in disc_profile.items()}
+        
+        def text_field(key):
+            value = update.get(key)
+            return value if isinstance(value, str) and value.strip() else getattr(previous, key)
+        
+        return previous.model_copy(update={
+            "disc_profile": disc_profile,
+            "communication_style": text_field("communication_style"),
+            "decision_making_style": text_field("decision_making_style"),
+            "relationship_orientation": text_field("relationship_orientation"),
+            "risk_tolerance": text_field("risk_tolerance"),
+            "information_processing": text_field("information_processing"),
+            "objection_handling_style": text_field("objection_handling_style"),
+            "motivational_drivers": merge_list(update.get("motivational_drivers"), previous.motivational_drivers),
+            "personality_based_recommendations": merge_list(update.get("personality_based_recommendations"),
+                                                            previous.personality_based_recommendations),
+        })
+    
     def _parse_json_response(self, response_text: str, fallback: Dict[str, Any]) -> Dict[str, Any]:
         import re, json
-        logger.info(f"[LLM RAW RESPONSE] {response_text}")
+        log_payload(logger, "[LLM RAW RESPONSE]", response_text)
 
         # 1. Try parsing the whole response as JSON first
         try:
             parsed = json.loads(response_text)
-            logger.info(f"[LLM PARSED DICT] {parsed}")
+            log_payload(logger, "[LLM PARSED DICT]", parsed, logging.DEBUG)
             return parsed
         except Exception as e:
             logger.warning(f"Whole response JSON parsing failed: {e}")
@@ -582,7 +671,7 @@ class PersonalityClassifierAgentPure(BaseAgent):
         for js in sorted(json_candidates, key=len, reverse=True):
             try:
                 parsed = json.loads(js)
-                logger.info(f"[LLM PARSED DICT] {parsed}")
+                log_payload(logger, "[LLM PARSED DICT]", parsed, logging.DEBUG)
                 return parsed
             except Exception as e:
                 logger.warning(f"JSON parsing failed for block: {e}")
@@ -590,14 +679,14 @@ class PersonalityClassifierAgentPure(BaseAgent):
         return fallback
         """Parse LLM response into structured JSON with fallback. Collect and merge all valid JSON blocks."""
         try:
-            logger.info(f"[LLM RAW RESPONSE] {response_text}")
+            log_payload(logger, "[LLM RAW RESPONSE]", response_text)
             import re
             json_blocks = re.findall(r'\{[\s\S]*?\}', response_text)
             parsed_blocks = []
             for json_str in json_blocks:
                 try:
                     parsed = json.loads(json_str)
-                    logger.info(f"[LLM PARSED DICT] {parsed}")
+                    log_payload(logger, "[LLM PARSED DICT]", parsed, logging.DEBUG)
                     parsed_blocks.append(parsed)
                 except Exception as e:
                     logger.warning(f"JSON parsing failed for block: {e}")
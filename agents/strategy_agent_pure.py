@@ -13,12 +13,19 @@ from agents.base_agent import BaseAgent
 from config.settings import Config
 from config.prompts import SystemPrompts
 from utils.models import WorkflowState, StrategyAnalysis
+from utils.log_pipeline import log_payload
+from utils.incremental_analysis import blend_score, merge_list
+from utils.service_matcher import normalize_text
+from utils.similarity_cache import get_similarity_index, text_agreement
 
 logger = logging.getLogger(__name__)
 
 class StrategyAgentPure(BaseAgent):
     """Pure LangGraph agent for strategic conversation analysis"""
     
+    # Recommendation parts shared with similar customers; scores, strengths and gaps stay per conversation
+    REUSABLE_RECOMMENDATIONS = ("strategic_recommendations", "next_steps", "alternative_approaches")
+    
     def __init__(self):
         """Initialize the pure LangGraph Strategy Agent"""
         super().__init__("StrategyAgent")
@@ -177,7 +184,7 @@ class StrategyAgentPure(BaseAgent):
                 HumanMessage(content=methodology_prompt + "\n" + strict_json_instruction)
             ]
             
-            response = self.llm.invoke(messages)
+            response = self.llm_for("analyze_methodology").invoke(messages)
             methodology_analysis = self._parse_json_response(
                 response.content, 
                 fallback={
@@ -277,7 +284,7 @@ class StrategyAgentPure(BaseAgent):
                 HumanMessage(content=positioning_prompt + "\n" + strict_json_instruction)
             ]
             
-            response = self.llm.invoke(messages)
+            response = self.llm_for("evaluate_positioning").invoke(messages)
             positioning_analysis = self._parse_json_response(
                 response.content,
                 fallback={
@@ -379,7 +386,7 @@ class StrategyAgentPure(BaseAgent):
                 HumanMessage(content=objection_prompt + "\n" + strict_json_instruction)
             ]
             
-            response = self.llm.invoke(messages)
+            response = self.llm_for("assess_objection_handling").invoke(messages)
             objection_analysis = self._parse_json_response(
                 response.content,
                 fallback={
@@ -478,7 +485,7 @@ class StrategyAgentPure(BaseAgent):
                 HumanMessage(content=value_prompt + "\n" + strict_json_instruction)
             ]
             
-            response = self.llm.invoke(messages)
+            response = self.llm_for("evaluate_value_delivery").invoke(messages)
             value_analysis = self._parse_json_response(
                 response.content,
                 fallback={
@@ -512,6 +519,19 @@ class StrategyAgentPure(BaseAgent):
             
             goal = state.conversation.goal if state.conversation else "Business development"
             
+            # Customers with nearly the same analysis, in a conversation with the same goal, channel and
+            # sequence of message types, get nearly the same recommendations
+            index = get_similarity_index()
+            partition = self._recommendation_partition(state)
+            hit = index.lookup("strategy_recommendations", partition, state.customer_analysis)
+            verify = index.verifying(state)
+            if hit is not None and not verify:
+                state._strategy_recommendations = self._reuse_recommendations(hit, all_components)
+                state.status = "recommendations_generated"
+                logger.info(f"[{state.execution_id}] Strategic recommendations reused from a similar customer "
+                            f"(similarity {hit.similarity})")
+                return state
+            
             recommendations_prompt = f"""
             Based on comprehensive strategic analysis, generate actionable recommendations:
             
@@ -571,27 +591,32 @@ class StrategyAgentPure(BaseAgent):
                 HumanMessage(content=recommendations_prompt + "\n" + strict_json_instruction)
             ]
             
-            response = self.llm.invoke(messages)
-            recommendations = self._parse_json_response(
-                response.content,
-                fallback={
-                    "overall_effectiveness": 7.0,
-                    "key_strengths": ["Professional communication", "Clear value proposition", "Good customer understanding"],
-                    "improvement_areas": ["More specific examples needed", "Better objection handling", "Stronger competitive positioning"],
-                    "strategic_recommendations": [
-                        {"recommendation": "Provide detailed case studies", "priority": "high", "impact": "high"},
-                        {"recommendation": "Improve discovery questions", "priority": "medium", "impact": "medium"}
-                    ],
-                    "next_steps": [
-                        {"action": "Send follow-up proposal", "timeline": "48 hours", "success_metric": "Customer response rate"},
-                        {"action": "Schedule stakeholder meeting", "timeline": "1 week", "success_metric": "Meeting completion"}
-                    ],
-                    "alternative_approaches": [
-                        {"approach": "Consultative selling", "pros": ["Trust building"], "cons": ["Longer cycle"], "best_for": "Complex sales"}
-                    ],
-                    "recommendations_notes": "Strategic recommendations generated successfully"
-                }
-            )
+            response = self.llm_for("generate_recommendations").invoke(messages)
+            fallback = {
+                "overall_effectiveness": 7.0,
+                "key_strengths": ["Professional communication", "Clear value proposition", "Good customer understanding"],
+                "improvement_areas": ["More specific examples needed", "Better objection handling", "Stronger competitive positioning"],
+                "strategic_recommendations": [
+                    {"recommendation": "Provide detailed case studies", "priority": "high", "impact": "high"},
+                    {"recommendation": "Improve discovery questions", "priority": "medium", "impact": "medium"}
+                ],
+                "next_steps": [
+                    {"action": "Send follow-up proposal", "timeline": "48 hours", "success_metric": "Customer response rate"},
+                    {"action": "Schedule stakeholder meeting", "timeline": "1 week", "success_metric": "Meeting completion"}
+                ],
+                "alternative_approaches": [
+                    {"approach": "Consultative selling", "pros": ["Trust building"], "cons": ["Longer cycle"], "best_for": "Complex sales"}
+                ],
+                "recommendations_notes": "Strategic recommendations generated successfully"
+            }
+            recommendations = self._parse_json_response(response.content, fallback=fallback)
+            
+            if recommendations is not fallback:
+                if hit is not None:
+                    index.record_verification("strategy_recommendations", text_agreement(
+                        hit.payload["strategic_recommendations"], recommendations.get("strategic_recommendations", [])))
+                index.add("strategy_recommendations", partition, state.customer_analysis, {
+                    key: recommendations.get(key, []) for key in self.REUSABLE_RECOMMENDATIONS})
             
             state._strategy_recommendations = recommendations
             state.status = "recommendations_generated"
@@ -602,6 +627,31 @@ class StrategyAgentPure(BaseAgent):
         except Exception as e:
             return self._handle_error(state, e, "Recommendations generation error")
     
+    @staticmethod
+    def _recommendation_partition(state: WorkflowState) -> str:
+        """Similarity cache partition: conversation goal, channel and company message types in order"""
+        conversation = state.conversation
+        goal = conversation.goal if conversation and conversation.goal else "Business development"
+        channel = getattr(conversation.channel, "value", conversation.channel) if conversation else ""
+        message_types = [message.message_type for message in (conversation.messages if conversation else [])
+                         if message.sender == "company"]
+        return "|".join([" ".join(normalize_text(goal).split()), str(channel).lower(), ",".join(message_types)])
+    
+    @staticmethod
+    def _reuse_recommendations(hit, components: Dict[str, Any]) -> Dict[str, Any]:
+        """Recommendations of a similar customer, scored with this conversation's components"""
+        scores = [score for score in (
+            components.get('methodology', {}).get('effectiveness_score'),
+            components.get('positioning', {}).get('positioning_effectiveness'),
+            components.get('value_delivery', {}).get('overall_delivery_score'),
+        ) if isinstance(score, (int, float))]
+        recommendations = {key: list(hit.payload.get(key, [])) for key in StrategyAgentPure.REUSABLE_RECOMMENDATIONS}
+        # No key_strengths / improvement_areas: finalization takes them from the components
+        recommendations["overall_effectiveness"] = round(sum(scores) / len(scores), 1) if scores else 7.0
+        recommendations["reused_from_similar_customer"] = {"similarity": hit.similarity}
+        recommendations["recommendations_notes"] = "Recommendations reused from a similar customer analysis"
+        return recommendations
+    
     def _finalize_analysis(self, state: WorkflowState) -> WorkflowState:
         """Finalize strategy analysis and create StrategyAnalysis object with robust field extraction for UI"""
         try:
@@ -717,6 +767,99 @@ class StrategyAgentPure(BaseAgent):
         except Exception as e:
             return self._handle_error(state, e, "Strategy finalization error")
     
+    def update_analysis(self, previous: StrategyAnalysis, customer_analysis, new_messages,
+                        features: Dict[str, Any], analyzed_turns: int) -> Optional[StrategyAnalysis]:
+        """
+        Fold new conversation turns into a previous StrategyAnalysis with a single LLM call
+        
+        The LLM sees the prior summary and only the new turns; its scores for those turns are
+        blended with the previous ones weighted by turn count, lists are merged newest first.
+        Returns None when the reply cannot be parsed, so the turns are not marked as analysed.
+        """
+        previous_scores = {
+            "methodology_score": previous.methodology_assessment.get("effectiveness_score"),
+            "positioning_score": previous.competitive_positioning.get("positioning_effectiveness"),
+            "value_prop_score": previous.value_proposition_delivery.get("overall_delivery_score"),
+        }
+        previous_summary = {
+            "overall_effectiveness": previous.overall_effectiveness,
+            **previous_scores,
+            "strengths": previous.strengths[:4],
+            "improvement_areas": previous.improvement_areas[:4],
+            "recommendations": previous.recommendations[:4],
+        }
+        new_turns = "\n\n".join(
+            f"{'Company Representative' if msg.sender == 'company' else 'Customer'}: {msg.content}"
+            for msg in new_messages
+        )
+        update_prompt = f"""
+        Update a B2B sales conversation strategy analysis with the latest turns.
+        
+        PREVIOUS ANALYSIS ({analyzed_turns} turns analyzed):
+        {json.dumps(previous_summary, ensure_ascii=False)}
+        
+        CUSTOMER PROFILE:
+        - Company: {customer_analysis.customer_name}
+        - Industry: {customer_analysis.industry}
+        - Pain Points: {self._format_pain_points(customer_analysis)}
+        
+        NEW TURNS:
+        {new_turns}
+        
+        SIGNALS IN THE NEW TURNS:
+        {json.dumps(features, ensure_ascii=False)}
+        
+        Score only the NEW TURNS (1-10), in the context of the previous analysis, and return JSON with these exact keys:
+        {{
+            "overall_effectiveness": float,
+            "methodology_score": float,
+            "positioning_score": float,
+            "value_prop_score": float,
+            "strengths": ["strength1"],
+            "improvement_areas": ["area1"],
+            "recommendations": ["recommendation1"],
+            "next_steps": ["step1"],
+            "update_notes": "what changed"
+        }}
+        """
+        strict_json_instruction = "IMPORTANT : Réponds uniquement avec un objet JSON valide, sans texte ou explication supplémentaire."
+        messages = [
+            SystemMessage(content=SystemPrompts.STRATEGY_AGENT),
+            HumanMessage(content=update_prompt + "\n" + strict_json_instruction)
+        ]
+        response = self.llm_for("update_analysis").invoke(messages)
+        update = self._parse_json_response(response.content, fallback={})
+        if not isinstance(update, dict) or not update:
+            logger.warning("Unparseable strategy update, keeping the previous analysis")
+            return None
+        
+        delta_turns = len(new_messages)
+        
+        def blend(key, previous_score):
+            if not isinstance(previous_score, (int, float)):
+                previous_score = None
+            return blend_score(previous_score, analyzed_turns, update.get(key), delta_turns)
+        
+        scores = {key: blend(key, value) for key, value in previous_scores.items()}
+        raw_details = dict(previous.raw_details)
+        raw_details["incremental_updates"] = (raw_details.get("incremental_updates", []) + [{
+            "turns": delta_turns, "signals": features, "notes": update.get("update_notes", "")
+        }])[-Config.INCREMENTAL_ANALYSIS_MAX_UPDATES:]
+        
+        return previous.model_copy(update={
+            "overall_effectiveness": blend("overall_effectiveness", previous.overall_effectiveness),
+            "methodology_assessment": {**previous.methodology_assessment, "effectiveness_score": scores["methodology_score"]},
+            "competitive_positioning": {**previous.competitive_positioning,
+                                        "positioning_effectiveness": scores["positioning_score"]},
+            "value_proposition_delivery": {**previous.value_proposition_delivery,
+                                           "overall_delivery_score": scores["value_prop_score"]},
+            "strengths": merge_list(update.get("strengths"), previous.strengths),
+            "improvement_areas": merge_list(update.get("improvement_areas"), previous.improvement_areas),
+            "recommendations": merge_list(update.get("recommendations"), previous.recommendations),
+            "next_steps": merge_list(update.get("next_steps"), previous.next_steps),
+            "raw_details": raw_details
+        })
+    
     def _format_conversation(self, conversation) -> str:
         """Format conversation for analysis"""
         if not conversation or not conversation.messages:
@@ -760,8 +903,7 @@ class StrategyAgentPure(BaseAgent):
     def _parse_json_response(self, response_text: str, fallback: Dict[str, Any]) -> Dict[str, Any]:
         """Parse LLM response into structured JSON with fallback"""
         try:
-            # Log the raw LLM response for debugging
-            logger.info(f"Raw LLM response: {response_text}")
+            log_payload(logger, "Raw LLM response:", response_text)
             # Try to extract JSON from response
             start_idx = response_text.find('{')
             end_idx = response_text.rfind('}') + 1
@@ -0,0 +1,272 @@
+"""
+HTTP API server for the B2B Sales Workflow
+Exposes document analysis, conversation generation and the complete workflow as queued jobs
+
+Endpoints:
+    POST   /jobs                   submit {"operation": ..., ...} -> 202 with the job, 429 when saturated
+    GET    /jobs/<id>[?wait=s]     poll status (long-poll with ``wait``), includes the result when done
+    GET    /jobs/<id>/events       stream job events as NDJSON until the job finishes
+    DELETE /jobs/<id>              cancel a queued job
+    GET    /health                 worker pool and queue statistics
+
+Customers are sent inline as ``customer_data`` (validated before the job is queued) or named by
+``customer_json_path``, a file that must resolve inside ``Config.API_CUSTOMER_DIR``.
+
+Usage: python api_server.py [--host HOST] [--port PORT] [--workers N] [--queue-size N] [--overflow reject|queue]
+                            [--processes N]
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from config.settings import Config
+from utils.helpers import validate_customer_profile
+from utils.jobs import JobManager, QueueFullError, current_job
+from utils.llm_router import backend_stats
+from utils.models import ConversationParams, WorkflowState
+from utils.similarity_cache import get_similarity_index
+from utils.state_codec import ensure_state
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("document_analysis", "conversation", "complete")
+
+
+def state_to_dict(result: Any) -> Any:
+    """JSON-ready representation of a workflow result (WorkflowState or LangGraph dict output)"""
+    if isinstance(result, (WorkflowState, dict)):
+        try:
+            return ensure_state(result).model_dump(mode="json")
+        except Exception:
+            return json.loads(json.dumps(result, default=str))
+    return result
+
+
+class WorkflowService:
+    """Runs workflow operations on a shared workflow instance through a JobManager"""
+
+    def __init__(self, workflow=None, job_manager: Optional[JobManager] = None):
+        self._workflow = workflow
+        self._workflow_lock = threading.Lock()
+        self.jobs = job_manager or JobManager(name="api")
+
+    @property
+    def workflow(self):
+        if self._workflow is None:
+            with self._workflow_lock:
+                # Concurrent first requests must share one workflow (and its agents)
+                if self._workflow is None:
+                    from pure_langgraph_workflow import PureLangGraphB2BWorkflow
+                    self._workflow = PureLangGraphB2BWorkflow()
+        return self._workflow
+
+    def submit(self, payload: Dict[str, Any], key: Optional[str] = None):
+        """Validate a request payload and queue the matching operation"""
+        operation = payload.get("operation")
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}', expected one of {', '.join(OPERATIONS)}")
+        if operation in ("document_analysis", "complete") and not (
+                payload.get("customer_json_path") or payload.get("customer_data")):
+            raise ValueError("customer_json_path or customer_data is required")
+        if payload.get("customer_json_path"):
+            payload = {**payload, "customer_json_path": self._resolve_customer_path(payload["customer_json_path"])}
+        elif payload.get("customer_data"):
+            # Inline profiles were parsed with the request body; reject bad ones before queueing
+            validate_customer_profile(payload["customer_data"])
+        if operation == "conversation" and not payload.get("state"):
+            raise ValueError("state is required for the conversation operation")
+
+        return self.jobs.submit(self._run, operation, payload, kind=operation, key=key)
+
+    def _run(self, operation: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        job = current_job()
+        params = payload.get("conversation_params")
+        conversation_params = ConversationParams(**params) if params else None
+
+        if operation == "conversation":
+            state = WorkflowState.model_validate(payload["state"])
+            if conversation_params is None:
+                conversation_params = state.conversation_params
+            result = self.workflow.run_conversation_generation(state, conversation_params)
+            return state_to_dict(result)
+
+        customer_path, customer_data = self._customer_source(payload)
+        if job:
+            job.emit("progress", {"step": operation, "customer_json_path": customer_path})
+        if operation == "document_analysis":
+            result = self.workflow.run_document_analysis_only(customer_path, customer_data=customer_data)
+        else:
+            result = self.workflow.execute_complete_workflow(
+                customer_path, conversation_params, payload.get("config"), customer_data=customer_data
+            )
+        return state_to_dict(result)
+
+    @staticmethod
+    def _resolve_customer_path(path: Any) -> str:
+        """Real path of a requested customer file, which must lie inside Config.API_CUSTOMER_DIR"""
+        if not Config.API_CUSTOMER_DIR:
+            raise ValueError("customer_json_path is not accepted, send customer_data")
+        if not isinstance(path, str):
+            raise ValueError("customer_json_path must be a string")
+        root = os.path.realpath(Config.API_CUSTOMER_DIR)
+        resolved = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, resolved]) != root:
+            raise ValueError("customer_json_path must be inside the customer data directory")
+        if not os.path.isfile(resolved):
+            raise ValueError(f"Customer file not found: {path}")
+        return resolved
+
+    @staticmethod
+    def _customer_source(payload: Dict[str, Any]):
+        """(path, None) for a customer file, (None, profile) for inline customer data"""
+        if payload.get("customer_json_path"):
+            return payload["customer_json_path"], None
+        return None, payload["customer_data"]
+
+
+class WorkflowRequestHandler(BaseHTTPRequestHandler):
+    """JSON request handler; ``self.server.service`` is the WorkflowService"""
+
+    server_version = "B2BWorkflowAPI/1.0"
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self):
+        parsed = urlparse(self.path)
+        parts = [part for part in parsed.path.split("/") if part]
+        return parts, parse_qs(parsed.query)
+
+    def do_GET(self):
+        service = self.server.service
+        parts, query = self._route()
+
+        if parts == ["health"]:
+            return self._send_json(200, {"status": "ok", **service.jobs.stats(),
+                                         "similarity_cache": get_similarity_index().stats(),
+                                         "llm_backends": backend_stats()})
+
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = service.jobs.get(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": "Job not found"})
+
+            try:
+                since = int(query.get("since", ["0"])[0])
+                wait = float(query.get("wait", ["0"])[0])
+            except ValueError:
+                return self._send_json(400, {"error": "since must be an integer and wait a number of seconds"})
+
+            if len(parts) == 3 and parts[2] == "events":
+                return self._stream_events(job, since)
+
+            if len(parts) == 2:
+                if wait > 0:
+                    job.wait(min(wait, 60.0))
+                return self._send_json(200, job.to_dict(include_result=job.done))
+
+        self._send_json(404, {"error": "Not found"})
+
+    def _stream_events(self, job, since: int):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            for event in job.iter_events(since=since):
+                self.wfile.write(json.dumps(event, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info(f"Event stream for job {job.job_id} closed by client")
+        self.close_connection = True
+
+    def do_POST(self):
+        service = self.server.service
+        parts, _ = self._route()
+        if parts != ["jobs"]:
+            return self._send_json(404, {"error": "Not found"})
+
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Request body must be a JSON object")
+            key = self.headers.get("Idempotency-Key") or payload.get("idempotency_key")
+            job = service.submit(payload, key=key)
+        except QueueFullError as e:
+            return self._send_json(429, {"error": str(e)}, headers={"Retry-After": "5"})
+        except (ValueError, TypeError) as e:
+            return self._send_json(400, {"error": str(e)})
+
+        self._send_json(202, job.to_dict(), headers={"Location": f"/jobs/{job.job_id}"})
+
+    def do_DELETE(self):
+        service = self.server.service
+        parts, _ = self._route()
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = service.jobs.get(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": "Job not found"})
+            return self._send_json(200, {"cancelled": job.cancel(), **job.to_dict()})
+        self._send_json(404, {"error": "Not found"})
+
+
+def create_server(host: Optional[str] = None, port: Optional[int] = None,
+                  service: Optional[WorkflowService] = None) -> ThreadingHTTPServer:
+    """Build a threading HTTP server bound to ``host:port`` (port 0 picks a free port)"""
+    server = ThreadingHTTPServer((host or Config.API_HOST, Config.API_PORT if port is None else port),
+                                 WorkflowRequestHandler)
+    server.daemon_threads = True
+    server.service = service or WorkflowService()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="B2B Sales Workflow HTTP API")
+    parser.add_argument("--host", default=Config.API_HOST)
+    parser.add_argument("--port", type=int, default=Config.API_PORT)
+    parser.add_argument("--workers", type=int, default=Config.JOB_MAX_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=Config.JOB_QUEUE_SIZE)
+    parser.add_argument("--overflow", choices=["reject", "queue"], default=Config.JOB_OVERFLOW_POLICY)
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Run workflows in a pool of N warm worker processes (0 = one per core)")
+    args = parser.parse_args()
+
+    workflow = None
+    if args.processes is not None:
+        from workflow_pool import WorkflowProcessPool
+        workflow = WorkflowProcessPool(max_workers=args.processes or None)
+        workflow.warmup()
+
+    jobs = JobManager(max_workers=args.workers, max_queue=args.queue_size,
+                      overflow_policy=args.overflow, name="api")
+    server = create_server(args.host, args.port, WorkflowService(workflow=workflow, job_manager=jobs))
+    logger.info(f"B2B Sales Workflow API listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        jobs.shutdown(wait=False)
+        if workflow is not None:
+            workflow.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,14 @@ Configuration Package for B2B Sales Conversation Generator
 """
 
 from .settings import Config
-from .prompts import SystemPrompts
 
 __all__ = ['Config', 'SystemPrompts']
+
+
+def __getattr__(name):
+    # Prompt templates are only loaded when an agent actually needs them
+    if name == 'SystemPrompts':
+        from .prompts import SystemPrompts
+        globals()[name] = SystemPrompts
+        return SystemPrompts
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,12 +2,26 @@
 Configuration settings for the B2B Sales Conversation Generator
 Pure LangGraph Implementation with Checkpointing Support
 """
+import json
+import logging
 import os
 from dotenv import load_dotenv
 from typing import Dict, Any, Optional
 
 load_dotenv()
 
+
+def _json_env(name: str) -> Dict[str, Any]:
+    """JSON object from an environment variable, {} when unset or not a JSON object"""
+    try:
+        value = json.loads(os.getenv(name) or "{}")
+    except ValueError:
+        value = None
+    if not isinstance(value, dict):
+        logging.getLogger(__name__).warning(f"Ignoring {name}: expected a JSON object")
+        return {}
+    return value
+
 class Config:
     # API Configuration
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
@@ -21,20 +35,124 @@ class Config:
     MAX_FILE_SIZE_MB = 10
     ALLOWED_PDF_EXTENSIONS = ['.pdf']
     ALLOWED_JSON_EXTENSIONS = ['.json']
+    JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")  # "auto" (orjson when installed), "orjson" or "json"
+    EXPORT_CHUNK_BYTES = 1 << 20  # read size when streaming large customer exports
+    EXPORT_CHECKPOINT_EVERY = 100  # processed export records between checkpoint writes
+    
+    # Batch deduplication of customer profiles
+    BATCH_DEDUPLICATION = os.getenv("BATCH_DEDUPLICATION", "true").lower() == "true"
+    DEDUP_SIMILARITY_THRESHOLD = 0.8  # estimated Jaccard similarity of pain point/needs shingles
+    DEDUP_NUM_PERM = 64  # MinHash permutations
+    DEDUP_LSH_BANDS = 16  # LSH bands (DEDUP_NUM_PERM / bands rows each)
+    DEDUP_MAX_ANALYSES = 1024  # analyses of recent groups a streamed batch keeps for their duplicates
+    
+    # Similarity cache (recommendations/services reused across similar customers)
+    SIMILARITY_CACHE = os.getenv("SIMILARITY_CACHE", "true").lower() == "true"
+    SIMILARITY_THRESHOLD = 0.9  # cosine similarity of TF-IDF pain point/needs vectors (same industry only)
+    SIMILARITY_CACHE_MAX_ENTRIES = 512  # customers kept per cache partition (least recently used dropped)
+    SIMILARITY_CACHE_VERIFY = os.getenv("SIMILARITY_CACHE_VERIFY", "false").lower() == "true"  # recompute hits and record agreement
     
     # Conversation Settings
     DEFAULT_EXCHANGES = 6
     MIN_EXCHANGES = 3
     MAX_EXCHANGES = 15
+    EARLY_TERMINATION = os.getenv("EARLY_TERMINATION", "true").lower() == "true"  # stop once a meeting is booked or declined
+    OUTCOME_MIN_CONFIDENCE = 0.8  # lexical confidence needed to end a conversation early
+    OUTCOME_LLM_CHECK = os.getenv("OUTCOME_LLM_CHECK", "false").lower() == "true"  # settle weak outcome signals with one LLM call
+    SCENARIO_MAX_WORKERS = int(os.getenv("SCENARIO_MAX_WORKERS", "4"))  # scenarios of a matrix generated concurrently
+    
+    # LLM call scheduling (shared by every agent in the process)
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))  # 0 disables the rate limit
+    LLM_RATE_BURST = 5  # calls allowed back to back before the rate applies
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # LLM calls in flight at once
+    LLM_COALESCING = os.getenv("LLM_COALESCING", "true").lower() == "true"  # identical concurrent prompts share one call
+    
+    # LLM backends and routes (utils.llm_router)
+    LLM_BACKENDS = {
+        "groq": {"provider": "groq", "model": MODEL_NAME},
+        # "openai": {"provider": "openai", "model": "gpt-4o-mini", "base_url": "https://api.openai.com/v1", "api_key_env": "OPENAI_API_KEY"},
+        # "local": {"provider": "openai", "model": "llama3.1:8b", "base_url": "http://localhost:11434/v1"},
+    }
+    LLM_BACKENDS.update(_json_env("LLM_BACKENDS"))  # extra backends as JSON, same shape
+    LLM_ROUTES = {"default": ["groq"]}  # backend names per agent name or "agent_name.node"
+    LLM_ROUTES.update(_json_env("LLM_ROUTES"))
+    LLM_BACKEND_TIMEOUT = 60.0  # seconds per request on routed backends
+    LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))  # 0 hedges after the primary's p95
+    LLM_HEDGE_MIN_SECONDS = 0.5  # lower bound of the p95 hedge delay
+    LLM_HEDGE_INITIAL_SECONDS = 5.0  # hedge delay until the primary has enough latency samples
+    LLM_MAX_HEDGES = 1  # hedged duplicates per call
+    LLM_HEDGE_WORKERS = int(os.getenv("LLM_HEDGE_WORKERS", "4"))  # threads sending hedged duplicates, apart from the callers
+    LLM_HEDGE_TIMEOUT = 15.0  # seconds per hedged request, shorter than LLM_BACKEND_TIMEOUT
+    LLM_LATENCY_WINDOW = 200  # recent latencies kept per backend
+    LLM_LATENCY_MIN_SAMPLES = 5  # samples before a backend is ranked by its latency
+    LLM_BACKEND_MAX_FAILURES = 3  # consecutive failures before a backend is ranked last
     
     # Output Directories
     OUTPUT_DIR = "data/outputs"
     TEMP_DIR = "data/temp"
+    API_CUSTOMER_DIR = os.getenv("API_CUSTOMER_DIR", "data/inputs")  # customer_json_path of API requests must resolve here ("" accepts customer_data only)
     LOGS_DIR = "logs"
     
+    # Results Store Configuration
+    RESULTS_STORE_DIR = os.path.join(OUTPUT_DIR, "results_store")
+    RESULTS_BUFFER_SIZE = 200  # Records held in memory before an automatic flush
+    
+    # Conversation history (Streamlit sessions)
+    HISTORY_STORE_DIR = os.path.join(RESULTS_STORE_DIR, "history")  # spilled exchanges, kept out of analytics
+    HISTORY_WINDOW = 5  # exchanges kept in full in session memory
+    HISTORY_PAGE_SIZE = 10  # exchange summaries per history page
+    
+    # Logging Configuration
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FILE = os.path.join(LOGS_DIR, "app.log")
+    LOG_JSON = True  # Structured JSON records in the log file
+    LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotate the log file at 10MB
+    LOG_BACKUP_COUNT = 5
+    LOG_QUEUE_SIZE = 10000  # Records beyond this are dropped instead of blocking workers
+    LOG_PAYLOADS = os.getenv("LOG_PAYLOADS", "sampled")  # "off", "sampled" or "full"
+    LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.05"))
+    
+    # Job Queue Configuration
+    JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "4"))
+    JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "32"))
+    JOB_OVERFLOW_POLICY = os.getenv("JOB_OVERFLOW_POLICY", "reject")  # "reject" or "queue"
+    JOB_SUBMIT_TIMEOUT = 5.0  # seconds to wait for a queue slot with the "queue" policy
+    JOB_RETENTION = 500  # finished jobs kept for polling
+    
+    # Streamlit background jobs
+    UI_JOB_WORKERS = int(os.getenv("UI_JOB_WORKERS", "4"))
+    UI_JOB_POLL_INTERVAL = 1.0  # seconds between status polls of running jobs
+    SPECULATIVE_CUSTOMER_REPLY = True  # pre-generate the customer reply while a draft is reviewed
+    
+    # Talan message candidates
+    TALAN_MESSAGE_CANDIDATES = int(os.getenv("TALAN_MESSAGE_CANDIDATES", "1"))  # drafts per turn in the workflow
+    UI_TALAN_MESSAGE_CANDIDATES = int(os.getenv("UI_TALAN_MESSAGE_CANDIDATES", "3"))  # drafts offered for review
+    CANDIDATE_TEMPERATURES = [0.7, 0.9, 0.5, 1.0]  # cycled across candidates
+    CANDIDATE_SCORE_WEIGHTS = {"length": 0.3, "services": 0.35, "pain_points": 0.35}
+    
+    # Incremental conversation analysis
+    INCREMENTAL_ANALYSIS = os.getenv("INCREMENTAL_ANALYSIS", "true").lower() == "true"
+    INCREMENTAL_ANALYSIS_MAX_UPDATES = 8  # full re-analysis after this many incremental updates in a row
+    
+    # Workflow stage memoization
+    STAGE_MEMOIZATION = os.getenv("STAGE_MEMOIZATION", "true").lower() == "true"
+    STAGE_MEMO_MAX_ENTRIES = 128  # stage outputs kept per process
+    
+    # Workflow Process Pool
+    WORKFLOW_POOL_WORKERS = int(os.getenv("WORKFLOW_POOL_WORKERS", "0"))  # 0 uses every available core
+    WORKFLOW_POOL_START_METHOD = "spawn"  # fresh interpreters, no inherited threads or locks
+    WORKFLOW_POOL_MAX_TASKS_PER_CHILD = None  # recycle workers after N tasks when set
+    
+    # API Server Configuration
+    API_HOST = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT = int(os.getenv("API_PORT", "8765"))
+    
     # LangGraph Configuration
     ENABLE_CHECKPOINTING = True
     CHECKPOINT_NAMESPACE = "b2b_sales_workflow"
+    CHECKPOINT_FORMAT = os.getenv("CHECKPOINT_FORMAT", "delta")  # "delta" (shared values) or "full" (plain MemorySaver)
+    CHECKPOINT_FULL_SNAPSHOT_EVERY = 10  # every Nth checkpoint of a thread re-serializes every value
+    CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "")  # journal checkpoints here so runs resume after a restart ("" keeps them in memory)
     PARALLEL_EXECUTION = True
     MAX_RETRIES = 3
     RETRY_DELAY = 1.0  # seconds
@@ -113,3 +113,30 @@ MESSAGE_TYPES = {
         "key_elements": ["Récapitulatif des bénéfices", "Urgence", "Action concrète"]
     }
 }
+
+# Catalogue de mots-clés par service avec leur poids de pertinence
+# (utilisé par utils.service_matcher, en plus des titres de TALAN_COMPANY_INFO)
+SERVICE_KEYWORDS = {
+    "transformation_digitale": {
+        "digital": 1.0, "digitalisation": 1.5, "transformation": 1.0,
+        "transformation digitale": 2.0, "modernisation": 1.0, "innovation": 0.5
+    },
+    "cloud": {
+        "cloud": 2.0, "infrastructure": 1.0, "aws": 2.0, "azure": 2.0,
+        "google cloud": 2.0, "migration": 1.0, "scalabilité": 1.0, "scalability": 1.0
+    },
+    "data_ai": {
+        "data": 1.0, "données": 1.0, "analytics": 1.5, "intelligence artificielle": 2.0,
+        "artificial intelligence": 2.0, "ai": 1.5, "ia": 1.5, "machine learning": 2.0,
+        "bi": 1.5, "business intelligence": 2.0, "reporting": 1.0, "dashboard": 1.0
+    },
+    "erp": {
+        "erp": 2.0, "sap": 2.0, "oracle": 1.5, "microsoft dynamics": 2.0,
+        "gestion": 0.5, "processus": 0.5, "process": 0.5, "invoice": 1.0, "facturation": 1.0
+    },
+    "cybersecurity": {
+        "sécurité": 1.5, "security": 1.5, "cyber": 2.0, "cybersécurité": 2.0,
+        "cybersecurity": 2.0, "protection": 1.0, "conformité": 1.5, "compliance": 1.5,
+        "gdpr": 2.0, "rgpd": 2.0
+    }
+}
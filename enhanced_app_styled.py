@@ -3,14 +3,27 @@ Enhanced B2B Sales Conversation Generator with Modern UI Design
 Following LeadX template styling with blue theme
 """
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import json
-import tempfile
+import logging
 import os
+import uuid
 from datetime import datetime
 from pure_langgraph_workflow import PureLangGraphB2BWorkflow
 from utils.models import ConversationParams, WorkflowState, MessageType, ConversationChannel, ConversationTone
+from utils.jobs import JobManager, JobStatus, QueueFullError
+from utils.compact_state import CompactMessage, branch_copy
+from utils.conversation_tasks import (
+    task_key, resolve_speculation, run_talan_message_task, run_talan_candidates_task, run_customer_response_task,
+    update_personality_task, update_strategy_task
+)
+from utils.helpers import load_customer_json
+from utils.history_store import ConversationHistory
+from utils.view_models import conversation_html, message_views, personality_view, strategy_view
 from config.settings import Config
 
+logger = logging.getLogger(__name__)
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="LeadX - B2B Sales Conversation Generator",
@@ -300,8 +313,11 @@ def load_custom_css():
 
 # Initialize session state
 def init_session_state():
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = str(uuid.uuid4())
     if 'conversation_history' not in st.session_state:
-        st.session_state.conversation_history = []
+        # Bounded window of full exchanges; older ones spill to the history store
+        st.session_state.conversation_history = ConversationHistory(st.session_state.session_id)
     if 'conversation_messages' not in st.session_state:
         st.session_state.conversation_messages = []
     if 'customer_info' not in st.session_state:
@@ -320,6 +336,16 @@ def init_session_state():
         st.session_state.pending_talan_message = None
     if 'pending_message_config' not in st.session_state:
         st.session_state.pending_message_config = None
+    if 'active_jobs' not in st.session_state:
+        st.session_state.active_jobs = {}
+    if 'job_errors' not in st.session_state:
+        st.session_state.job_errors = {}
+    if 'speculative_reply' not in st.session_state:
+        st.session_state.speculative_reply = None
+    if 'talan_candidates' not in st.session_state:
+        st.session_state.talan_candidates = []
+    if 'analysis_snapshots' not in st.session_state:
+        st.session_state.analysis_snapshots = {}
 
 def display_sidebar():
     """Display the styled sidebar"""
@@ -469,57 +495,84 @@ def display_metrics_row():
             </div>
             """.format(status), unsafe_allow_html=True)
 
+def select_history_entry(index):
+    """Button callback: render exchange ``index`` in full (None collapses it)"""
+    st.session_state.history_selected = index
+
+@st.fragment
 def display_conversation_history():
-    """Display conversation history with enhanced styling"""
-    if st.session_state.conversation_history:
-        st.markdown("### 💬 Conversation History")
+    """Paginated exchange summaries; only the selected exchange is rendered in full"""
+    history = st.session_state.conversation_history
+    if not history:
+        return
+    st.markdown("### 💬 Conversation History")
+    
+    page = 1
+    if history.page_count > 1:
+        page = st.number_input("Page", min_value=1, max_value=history.page_count, value=1, step=1,
+                               key="history_page", help="Newest exchanges first")
+    # The latest exchange is open until the user picks another one or collapses it
+    selected = st.session_state.get('history_selected', len(history))
+    
+    for summary in history.page(page):
+        is_selected = summary.index == selected
+        title_prefix = "🆕 " if summary.index == len(history) else ""
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(f"**{title_prefix}Exchange {summary.index} - {summary.message_type} via {summary.channel}**")
+            st.caption(f"🏢 {summary.company_excerpt}")
+        with col2:
+            st.button("Hide" if is_selected else "View", key=f"history_view_{summary.index}",
+                      use_container_width=True, on_click=select_history_entry,
+                      args=(None if is_selected else summary.index,))
+        if is_selected:
+            entry = history.get(summary.index)
+            if entry is None:
+                st.warning("This exchange is no longer available")
+            else:
+                display_history_entry(entry)
+
+def display_history_entry(entry):
+    """Full view of one exchange with its analyses"""
+    with st.container(border=True):
+        # Company message
+        st.markdown("**🏢 Your Message:**")
+        st.markdown(f"""
+        <div class="company-message">
+            {entry.get('company_message', '')}
+        </div>
+        """, unsafe_allow_html=True)
         
-        for i, entry in enumerate(st.session_state.conversation_history, 1):
-            is_latest = (i == len(st.session_state.conversation_history))
-            title_prefix = "🆕 " if is_latest else ""
+        # Customer response
+        st.markdown("**👤 Customer Response:**")
+        st.markdown(f"""
+        <div class="customer-message">
+            {entry.get('customer_response', '')}
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Analysis tabs
+        if entry.get('strategy_analysis') or entry.get('personality_analysis'):
+            tab1, tab2 = st.tabs(["🎯 Personality Analysis", "📈 Strategy Analysis"])
             
-            with st.expander(f"{title_prefix}Exchange {i} - {entry.get('message_type', 'Unknown')} via {entry.get('channel', 'Unknown')}", expanded=is_latest):
-                
-                # Company message
-                st.markdown("**🏢 Your Message:**")
-                st.markdown(f"""
-                <div class="company-message">
-                    {entry.get('company_message', '')}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Customer response
-                st.markdown("**👤 Customer Response:**")
-                st.markdown(f"""
-                <div class="customer-message">
-                    {entry.get('customer_response', '')}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Analysis tabs
-                if entry.get('strategy_analysis') or entry.get('personality_analysis'):
-                    tab1, tab2 = st.tabs(["🎯 Personality Analysis", "📈 Strategy Analysis"])
-                    
-                    with tab1:
-                        if entry.get('personality_analysis'):
-                            personality = entry['personality_analysis']
-                            # Use the proper display function for full 5-profile classification
-                            display_personality_analysis(personality)
-                        else:
-                            st.info("Personality analysis not available")
-                    
-                    with tab2:
-                        if entry.get('strategy_analysis'):
-                            strategy = entry['strategy_analysis']
-                            # Use the proper display function for comprehensive strategy analysis
-                            display_strategy_analysis(strategy)
-                        else:
-                            st.info("Strategy analysis not available")
-                
-                # Timestamp
-                timestamp = entry.get('timestamp', '')
-                if timestamp:
-                    st.caption(f"📅 {timestamp}")
+            with tab1:
+                if entry.get('personality_analysis'):
+                    # Use the proper display function for full 5-profile classification
+                    display_personality_analysis(entry['personality_analysis'])
+                else:
+                    st.info("Personality analysis not available")
+            
+            with tab2:
+                if entry.get('strategy_analysis'):
+                    # Use the proper display function for comprehensive strategy analysis
+                    display_strategy_analysis(entry['strategy_analysis'])
+                else:
+                    st.info("Strategy analysis not available")
+        
+        # Timestamp
+        timestamp = entry.get('timestamp', '')
+        if timestamp:
+            st.caption(f"📅 {timestamp}")
 
 def display_message_generation_section(message_type, channel, goal):
     """Display message generation section"""
@@ -582,40 +635,15 @@ def display_message_review_section(message_type, channel, goal):
 
 def display_strategy_analysis(strategy_analysis):
     """Display strategy analysis with enhanced styling"""
-    if not strategy_analysis:
+    view = strategy_view(strategy_analysis)
+    if view is None:
         st.warning("No strategy analysis available")
         return
     
-    # Handle both object and dict formats
-    if hasattr(strategy_analysis, 'overall_effectiveness'):
-        # Object format
-        overall_effectiveness = strategy_analysis.overall_effectiveness
-        methodology_assessment = getattr(strategy_analysis, 'methodology_assessment', {})
-        competitive_positioning = getattr(strategy_analysis, 'competitive_positioning', {})
-        objection_handling = getattr(strategy_analysis, 'objection_handling', {})
-        value_proposition_delivery = getattr(strategy_analysis, 'value_proposition_delivery', {})
-        recommendations = strategy_analysis.recommendations
-        improvement_areas = strategy_analysis.improvement_areas
-        strengths = strategy_analysis.strengths
-        next_steps = strategy_analysis.next_steps
-        raw_details = getattr(strategy_analysis, 'raw_details', {})
-    else:
-        # Dict format
-        overall_effectiveness = strategy_analysis.get('overall_effectiveness', 0)
-        methodology_assessment = strategy_analysis.get('methodology_assessment', {})
-        competitive_positioning = strategy_analysis.get('competitive_positioning', {})
-        objection_handling = strategy_analysis.get('objection_handling', {})
-        value_proposition_delivery = strategy_analysis.get('value_proposition_delivery', {})
-        recommendations = strategy_analysis.get('recommendations', [])
-        improvement_areas = strategy_analysis.get('improvement_areas', [])
-        strengths = strategy_analysis.get('strengths', [])
-        next_steps = strategy_analysis.get('next_steps', [])
-        raw_details = strategy_analysis.get('raw_details', {})
     # 📝 Full LLM Step Outputs (Raw Details)
-    if raw_details:
+    if view.raw_details_json:
         with st.expander("🔍 Show Full LLM Step Outputs (Raw Details)"):
-            import json
-            st.code(json.dumps(raw_details, indent=2, ensure_ascii=False), language="json")
+            st.code(view.raw_details_json, language="json")
 
     # 📊 Key Effectiveness Metrics
     st.markdown("### 📊 Sales Strategy Assessment")
@@ -623,19 +651,16 @@ def display_strategy_analysis(strategy_analysis):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Overall Effectiveness", f"{overall_effectiveness:.1f}/10")
+        st.metric("Overall Effectiveness", f"{view.overall_effectiveness:.1f}/10")
     
     with col2:
-        methodology_score = methodology_assessment.get('score', 0) if isinstance(methodology_assessment, dict) else 0
-        st.metric("Methodology Score", f"{methodology_score:.1f}/10" if methodology_score else "N/A")
+        st.metric("Methodology Score", f"{view.methodology_score:.1f}/10" if view.methodology_score else "N/A")
     
     with col3:
-        positioning_score = competitive_positioning.get('score', 0) if isinstance(competitive_positioning, dict) else 0
-        st.metric("Positioning Score", f"{positioning_score:.1f}/10" if positioning_score else "N/A")
+        st.metric("Positioning Score", f"{view.positioning_score:.1f}/10" if view.positioning_score else "N/A")
     
     with col4:
-        value_prop_score = value_proposition_delivery.get('score', 0) if isinstance(value_proposition_delivery, dict) else 0
-        st.metric("Value Prop Score", f"{value_prop_score:.1f}/10" if value_prop_score else "N/A")
+        st.metric("Value Prop Score", f"{view.value_prop_score:.1f}/10" if view.value_prop_score else "N/A")
 
     # 🎯 Detailed Analysis
     col1, col2 = st.columns(2)
@@ -643,123 +668,66 @@ def display_strategy_analysis(strategy_analysis):
     with col1:
         # Strengths
         st.markdown("### ✅ Conversation Strengths")
-        if strengths:
-            for strength in strengths:
-                st.markdown(f"• {strength}")
+        if view.strengths:
+            st.markdown("  \n".join(f"• {strength}" for strength in view.strengths))
         else:
             st.info("No specific strengths identified")
         
         # Methodology Assessment
-        if methodology_assessment and isinstance(methodology_assessment, dict):
+        if view.methodology:
             st.markdown("### 🔄 Sales Methodology")
-            for key, value in methodology_assessment.items():
-                if key != 'score':
-                    st.markdown(f"**{key.replace('_', ' ').title()}:** {value}")
+            st.markdown(format_pairs(view.methodology))
     
     with col2:
         # Improvement Areas
         st.markdown("### 🔧 Areas for Improvement")
-        if improvement_areas:
-            for area in improvement_areas:
-                st.markdown(f"• {area}")
+        if view.improvement_areas:
+            st.markdown("  \n".join(f"• {area}" for area in view.improvement_areas))
         else:
             st.info("No major improvement areas identified")
         
         # Competitive Positioning
-        if competitive_positioning and isinstance(competitive_positioning, dict):
+        if view.positioning:
             st.markdown("### 🏆 Competitive Position")
-            for key, value in competitive_positioning.items():
-                if key != 'score':
-                    st.markdown(f"**{key.replace('_', ' ').title()}:** {value}")
+            st.markdown(format_pairs(view.positioning))
 
     # 💡 Strategic Recommendations
     st.markdown("### 💡 Strategic Recommendations")
-    if recommendations:
-        for i, rec in enumerate(recommendations, 1):
-            st.markdown(f"{i}. {rec}")
+    if view.recommendations:
+        st.markdown("\n".join(f"{i}. {rec}" for i, rec in enumerate(view.recommendations, 1)))
     else:
         st.info("No specific recommendations available")
 
     # 👉 Next Steps  
     st.markdown("### � Recommended Next Steps")
-    if next_steps:
-        for i, step in enumerate(next_steps, 1):
-            st.markdown(f"{i}. {step}")
+    if view.next_steps:
+        st.markdown("\n".join(f"{i}. {step}" for i, step in enumerate(view.next_steps, 1)))
     else:
         st.info("No specific next steps defined")
 
     # 🎤 Objection Handling Assessment
-    if objection_handling and isinstance(objection_handling, dict):
+    if view.objection_handling:
         st.markdown("### 🎤 Objection Handling Analysis")
         col1, col2 = st.columns(2)
+        half = len(view.objection_handling) // 2
         
         with col1:
-            for key, value in list(objection_handling.items())[:len(objection_handling)//2]:
-                if key != 'score':
-                    st.markdown(f"**{key.replace('_', ' ').title()}:** {value}")
+            st.markdown(format_pairs(view.objection_handling[:half]))
         
         with col2:
-            for key, value in list(objection_handling.items())[len(objection_handling)//2:]:
-                if key != 'score':
-                    st.markdown(f"**{key.replace('_', ' ').title()}:** {value}")
+            st.markdown(format_pairs(view.objection_handling[half:]))
 
     # 📈 Value Proposition Delivery
-    if value_proposition_delivery and isinstance(value_proposition_delivery, dict):
+    if view.value_delivery:
         st.markdown("### 📈 Value Proposition Delivery")
-        for key, value in value_proposition_delivery.items():
-            if key != 'score':
-                st.markdown(f"**{key.replace('_', ' ').title()}:** {value}")
+        st.markdown(format_pairs(view.value_delivery))
 
 def display_personality_analysis(personality_analysis):
     """Display personality analysis with enhanced styling - Updated for 5-profile B2B system"""
-    # DEBUG: Show what the frontend is actually receiving
-    st.write("## [DEBUG] Raw personality_analysis received by UI:")
-    st.write(personality_analysis)
-    if not personality_analysis:
+    view = personality_view(personality_analysis)
+    if view is None:
         st.warning("No personality analysis available")
         return
-    
-    # Check if we have the new format with personality_profile
-    if hasattr(personality_analysis, 'personality_profile'):
-        personality_profile = personality_analysis.personality_profile
-        profile_confidence = getattr(personality_analysis, 'profile_confidence', 'N/A')
-        disc_profile = personality_analysis.disc_profile
-        communication_style = personality_analysis.communication_style
-        decision_making_style = personality_analysis.decision_making_style
-        relationship_orientation = getattr(personality_analysis, 'relationship_orientation', 'N/A')
-        risk_tolerance = personality_analysis.risk_tolerance
-        information_processing = personality_analysis.information_processing
-        motivational_drivers = getattr(personality_analysis, 'motivational_drivers', [])
-        personality_based_recommendations = personality_analysis.personality_based_recommendations
-        optimal_communication_approach = getattr(personality_analysis, 'optimal_communication_approach', {})
-        objection_handling_style = getattr(personality_analysis, 'objection_handling_style', 'N/A')
-    elif isinstance(personality_analysis, dict):
-        personality_profile = personality_analysis.get('personality_profile', 'Unknown')
-        profile_confidence = personality_analysis.get('profile_confidence', 'N/A')
-        disc_profile = personality_analysis.get('disc_profile', {})
-        communication_style = personality_analysis.get('communication_style', 'Unknown')
-        decision_making_style = personality_analysis.get('decision_making_style', 'Unknown')
-        relationship_orientation = personality_analysis.get('relationship_orientation', 'N/A')
-        risk_tolerance = personality_analysis.get('risk_tolerance', 'Unknown')
-        information_processing = personality_analysis.get('information_processing', 'Unknown')
-        motivational_drivers = personality_analysis.get('motivational_drivers', [])
-        personality_based_recommendations = personality_analysis.get('personality_based_recommendations', [])
-        optimal_communication_approach = personality_analysis.get('optimal_communication_approach', {})
-        objection_handling_style = personality_analysis.get('objection_handling_style', 'N/A')
-    else:
-        # Fallback for old format
-        disc_profile = getattr(personality_analysis, "disc_profile", {})
-        personality_profile = "Unknown"
-        profile_confidence = "N/A"
-        communication_style = getattr(personality_analysis, "communication_style", "Unknown")
-        decision_making_style = getattr(personality_analysis, "decision_making_style", "Unknown")
-        relationship_orientation = getattr(personality_analysis, "relationship_orientation", "N/A")
-        risk_tolerance = getattr(personality_analysis, "risk_tolerance", "Unknown")
-        information_processing = getattr(personality_analysis, "information_processing", "Unknown")
-        motivational_drivers = getattr(personality_analysis, "motivational_drivers", [])
-        personality_based_recommendations = getattr(personality_analysis, "personality_based_recommendations", [])
-        optimal_communication_approach = {}
-        objection_handling_style = "N/A"
 
     # 🎯 B2B Personality Profile Header
     st.markdown("### 🎯 B2B Personality Profile Classification")
@@ -767,69 +735,52 @@ def display_personality_analysis(personality_analysis):
     col1, col2 = st.columns(2)
     
     with col1:
-        # Profile classification with confidence
-        profile_color = {
-            "Tech-Savvy Innovator": "🔧",
-            "Business-Oriented Decision Maker": "📊", 
-            "Cost-Conscious Pragmatist": "💰",
-            "Early Adopter Innovator": "🚀",
-            "Relationship-Driven Connector": "🤝"
-        }.get(personality_profile, "🎯")
-        
-        st.markdown(f"**{profile_color} Primary Profile: {personality_profile}**")
-        st.markdown(f"**Confidence: {profile_confidence}**")
-        
-        # Relationship orientation
-        st.markdown(f"**Focus: {relationship_orientation}**")
+        # Profile classification with confidence and relationship orientation
+        st.markdown(f"**{view.profile_icon} Primary Profile: {view.profile}**  \n"
+                    f"**Confidence: {view.confidence}**  \n"
+                    f"**Focus: {view.relationship_orientation}**")
         
     with col2:
         # Communication and decision making style
-        st.markdown("**Communication Profile:**")
-        st.markdown(f"• Style: {communication_style}")
-        st.markdown(f"• Decision Making: {decision_making_style}")
-        st.markdown(f"• Risk Tolerance: {risk_tolerance}")
-        st.markdown(f"• Info Processing: {information_processing}")
+        st.markdown("**Communication Profile:**  \n"
+                    f"• Style: {view.communication_style}  \n"
+                    f"• Decision Making: {view.decision_making_style}  \n"
+                    f"• Risk Tolerance: {view.risk_tolerance}  \n"
+                    f"• Info Processing: {view.information_processing}")
 
     # DISC Profile
-    if disc_profile:
+    if view.disc:
         st.markdown("### 📊 DISC Profile Breakdown")
-        col1, col2, col3, col4 = st.columns(4)
-        
-        disc_colors = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4"]
-        disc_traits = ["D", "I", "S", "C"]
-        disc_names = ["Dominance", "Influence", "Steadiness", "Compliance"]
-        
-        for i, (trait, name, color) in enumerate(zip(disc_traits, disc_names, disc_colors)):
-            with [col1, col2, col3, col4][i]:
-                score = disc_profile.get(trait, 0)
+        for column, (trait, name, score) in zip(st.columns(4), view.disc):
+            with column:
                 st.metric(label=f"{trait} - {name}", value=f"{score}%")
     
     # Motivational Drivers
-    if motivational_drivers:
+    if view.motivational_drivers:
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("### 🎯 Key Motivational Drivers")
-            for driver in motivational_drivers:
-                st.markdown(f"• {driver}")
+            st.markdown("  \n".join(f"• {driver}" for driver in view.motivational_drivers))
         
         with col2:
             st.markdown("### 📋 Sales Approach Recommendations")
-            for rec in personality_based_recommendations[:3]:  # Show first 3
-                st.markdown(f"• {rec}")
+            st.markdown("  \n".join(f"• {rec}" for rec in view.recommendations[:3]))  # Show first 3
     
     # Optimal Communication Approach
-    if optimal_communication_approach:
+    if view.communication_approach:
         st.markdown("### 📞 Optimal Communication Strategy")
         col1, col2 = st.columns(2)
         
         with col1:
-            if isinstance(optimal_communication_approach, dict):
-                for key, value in optimal_communication_approach.items():
-                    st.markdown(f"**{key.replace('_', ' ').title()}:** {value}")
+            st.markdown(format_pairs(view.communication_approach))
         
         with col2:
-            st.markdown(f"**Objection Handling Style:** {objection_handling_style}")
+            st.markdown(f"**Objection Handling Style:** {view.objection_handling_style}")
+
+def format_pairs(pairs):
+    """Markdown block of ``**Title:** value`` lines"""
+    return "  \n".join(f"**{title}:** {value}" for title, value in pairs)
 
 # Utility functions
 def process_customer_data(customer_json):
@@ -841,31 +792,21 @@ def process_customer_data(customer_json):
         True if processing is successful, False otherwise.
     """
     try:
-        # Save uploaded file to a temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.json') as tmp_json:
-            tmp_json.write(customer_json.getvalue())
-            customer_json_path = tmp_json.name
+        # Parse and validate the upload in memory, the agent receives the parsed profile
+        try:
+            customer_data = load_customer_json(customer_json)
+        except ValueError as e:
+            st.error(f"❌ Invalid customer profile: {str(e)}")
+            return False
         
         # Use the Pure LangGraph B2B Sales Workflow - ONLY document analysis step
         workflow = PureLangGraphB2BWorkflow()
         
         # Run ONLY the document analysis step (not the complete workflow)
-        result = workflow.run_document_analysis_only(customer_json_path)
-        
-        st.write(f"🔍 Debug: Workflow status: {result.status}")  # Debug info
-        st.write(f"🔍 Debug: Customer analysis exists: {hasattr(result, 'customer_analysis')}")
-        st.write(f"🔍 Debug: Customer analysis value: {getattr(result, 'customer_analysis', 'NOT_FOUND')}")
-        st.write(f"🔍 Debug: Customer analysis type: {type(getattr(result, 'customer_analysis', None))}")
-        if hasattr(result, 'customer_analysis') and result.customer_analysis:
-            st.write(f"🔍 Debug: Customer name: {getattr(result.customer_analysis, 'customer_name', 'NO_NAME')}")
-        st.write(f"🔍 Debug: Result type: {type(result)}")
-        st.write(f"🔍 Debug: Errors: {getattr(result, 'errors', 'NO_ERRORS')}")
-        
-        # Check the exact condition that's failing
-        condition_result = result.status in ["document_analysis_complete", "awaiting_channel_selection"] and result.customer_analysis
-        st.write(f"🔍 Debug: Condition result: {condition_result}")
-        st.write(f"🔍 Debug: Status check: {result.status in ['document_analysis_complete', 'awaiting_channel_selection']}")
-        st.write(f"🔍 Debug: Customer analysis bool: {bool(result.customer_analysis) if hasattr(result, 'customer_analysis') else 'NO_ATTR'}")
+        result = workflow.run_document_analysis_only(customer_data=customer_data)
+        
+        logger.debug("Document analysis finished with status %s (customer analysis: %s, errors: %s)",
+                     result.status, bool(result.customer_analysis), result.errors)
         
         # Check for successful document analysis
         if result.status in ["document_analysis_complete", "awaiting_channel_selection"] and result.customer_analysis:
@@ -1002,8 +943,180 @@ def display_conversation_results(result):
     else:
         st.error("❌ No conversation messages available")
 
+@st.cache_resource
+def get_job_manager():
+    """Background worker pool shared by every session of this Streamlit server"""
+    return JobManager(max_workers=Config.UI_JOB_WORKERS, max_queue=Config.JOB_QUEUE_SIZE,
+                      overflow_policy="reject", name="streamlit")
+
+def submit_background_job(kind, fn, *args, key_payload=None, context=None, track=True):
+    """
+    Queue LLM work for this session without blocking the script thread
+
+    Identical in-flight work (same session, kind and inputs) is de-duplicated, so a second
+    click attaches to the running job instead of starting a new one. Untracked jobs are not
+    polled by the status panel; the caller keeps the returned job.
+    """
+    key = task_key(st.session_state.session_id, kind, key_payload if key_payload is not None else args)
+    try:
+        job = get_job_manager().submit(fn, *args, kind=kind, key=key)
+    except QueueFullError:
+        if track:
+            st.warning("⏳ The server is busy, please try again in a few seconds.")
+        return None
+    if track:
+        st.session_state.active_jobs[kind] = {"job_id": job.job_id, "context": context or {}}
+    return job
+
+def customer_response_key_payload(conversation_messages, talan_content, goal):
+    """Inputs that determine the customer reply, shared by speculative and approved requests"""
+    return [conversation_messages, talan_content, goal]
+
+def start_speculative_reply(draft, message_config):
+    """Start generating the customer reply to an unedited draft while the user reviews it"""
+    if not Config.SPECULATIVE_CUSTOMER_REPLY or not draft or not message_config:
+        return
+    discard_speculative_reply()
+    conversation_messages = list(st.session_state.conversation_messages)
+    talan_message = {
+        'sender': 'company',
+        'content': draft,
+        'message_type': message_config["message_type"],
+        'channel': message_config["channel"],
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    key_payload = customer_response_key_payload(conversation_messages, draft, message_config["goal"])
+    job = submit_background_job(
+        "customer_response",
+        run_customer_response_task,
+        branch_copy(st.session_state.workflow_state),
+        conversation_messages,
+        talan_message,
+        st.session_state.customer_info['company_name'],
+        message_config["goal"],
+        key_payload=key_payload,
+        track=False
+    )
+    if job is not None:
+        st.session_state.speculative_reply = {
+            "job_id": job.job_id,
+            "key": task_key(st.session_state.session_id, "customer_response", key_payload)
+        }
+
+def discard_speculative_reply():
+    """Cancel the speculative reply (the draft was edited, regenerated or dropped)"""
+    speculation = st.session_state.get("speculative_reply")
+    st.session_state.speculative_reply = None
+    if speculation:
+        job = get_job_manager().get(speculation["job_id"])
+        if job is not None and not job.done:
+            job.cancel()
+
+def is_job_running(kind):
+    """True while a background job of this kind is queued or running for the session"""
+    entry = st.session_state.active_jobs.get(kind)
+    if not entry:
+        return False
+    job = get_job_manager().get(entry["job_id"])
+    return job is not None and not job.done
+
+def apply_job_result(kind, job, context):
+    """Move a finished job's result into session state (runs on the script thread)"""
+    if job.status != JobStatus.SUCCEEDED:
+        st.session_state.job_errors[kind] = job.error or job.status
+        return
+
+    result = job.result
+    if kind == "talan_message":
+        if isinstance(result, list):
+            # Ranked drafts: the best one is pre-selected for review
+            st.session_state.talan_candidates = result
+            st.session_state.talan_candidate_applied = 0
+            st.session_state.pop("talan_candidate_choice", None)
+            result = result[0]["content"] if result else None
+        if result:
+            st.session_state.pending_talan_message = result
+            st.session_state.pending_message_config = context.get("message_config")
+            start_speculative_reply(result, context.get("message_config"))
+        else:
+            st.session_state.job_errors[kind] = "Failed to generate Talan message"
+    elif kind == "customer_response":
+        if result:
+            # The transcript is kept as slots records, read like the message dicts
+            st.session_state.conversation_messages.append(CompactMessage.from_dict(context["talan_message"]))
+            st.session_state.conversation_messages.append(
+                CompactMessage('customer', result, 'response', channel=context["channel"]))
+            # The exchange joins the paginated history with the analyses current at that point
+            talan_message = context["talan_message"]
+            st.session_state.conversation_history.append({
+                "timestamp": talan_message['timestamp'],
+                "company_message": talan_message['content'],
+                "customer_response": result,
+                "message_type": talan_message['message_type'],
+                "channel": context["channel"],
+                "goal": context.get("goal", ""),
+                "personality_analysis": st.session_state.get('personality_analysis'),
+                "strategy_analysis": st.session_state.get('strategy_analysis'),
+            })
+            st.session_state.pop('history_selected', None)
+            st.session_state.pending_talan_message = None
+            st.session_state.pending_message_config = None
+            st.session_state.talan_candidates = []
+        else:
+            st.session_state.job_errors[kind] = "Failed to generate customer response"
+    elif kind == "personality":
+        # Snapshots let the next analysis send only the new turns to the LLM
+        st.session_state.analysis_snapshots[kind] = result
+        if result and result["analysis"]:
+            st.session_state.personality_analysis = result["analysis"]
+        else:
+            st.session_state.job_errors[kind] = "Failed to generate personality analysis"
+    elif kind == "strategy":
+        st.session_state.analysis_snapshots[kind] = result
+        if result and result["analysis"]:
+            st.session_state.strategy_analysis = result["analysis"]
+        else:
+            st.session_state.job_errors[kind] = "Failed to generate strategy analysis"
+
+JOB_LABELS = {
+    "talan_message": "🔄 Generating Talan message for your review...",
+    "customer_response": "🎭 Generating customer response...",
+    "personality": "🧠 Analyzing customer personality from conversation...",
+    "strategy": "🎯 Analyzing conversation strategy...",
+}
+
+@st.fragment(run_every=Config.UI_JOB_POLL_INTERVAL)
+def poll_background_jobs():
+    """Poll this session's background jobs; only this fragment reruns while they are in flight"""
+    manager = get_job_manager()
+    finished = False
+    for kind, entry in list(st.session_state.active_jobs.items()):
+        job = manager.get(entry["job_id"])
+        if job is None:
+            del st.session_state.active_jobs[kind]
+            continue
+        if job.done:
+            apply_job_result(kind, job, entry["context"])
+            del st.session_state.active_jobs[kind]
+            finished = True
+        else:
+            st.info(JOB_LABELS.get(kind, f"⏳ {kind} in progress..."))
+
+    if finished or not st.session_state.active_jobs:
+        # Refresh the whole page so the new messages/analysis are rendered (and polling stops
+        # once nothing is left in flight)
+        st.rerun(scope="app")
+
+def background_jobs_panel():
+    """Job errors, plus the polling fragment while this session has jobs in flight"""
+    if st.session_state.active_jobs:
+        poll_background_jobs()
+
+    for kind, error in list(st.session_state.job_errors.items()):
+        st.error(f"❌ {kind.replace('_', ' ').capitalize()} error: {error}")
+
 def generate_single_message(message_type, channel, goal):
-    """Generate a single Talan message for review"""
+    """Queue generation of a single Talan message for review"""
     try:
         # Get the stored workflow state from document analysis
         if 'workflow_state' not in st.session_state:
@@ -1015,81 +1128,55 @@ def generate_single_message(message_type, channel, goal):
             display_message_review(message_type, channel, goal)
             return
         
-        workflow_state = st.session_state.workflow_state
-        workflow = PureLangGraphB2BWorkflow()
+        st.session_state.job_errors.pop("talan_message", None)
+        customer_name = st.session_state.customer_info['company_name']
+        conversation_messages = list(st.session_state.get('conversation_messages', []))
         
-        # Create conversation parameters for this single Talan message
-        conversation_params = ConversationParams(
-            goal=goal,
-            tone=ConversationTone.PROFESSIONAL,
-            channel=getattr(ConversationChannel, channel),
-            exchanges=1,  # Single exchange
-            company_representative="Consultant Senior Talan Tunisie",
-            customer_representative=f"Decision Maker at {st.session_state.customer_info['company_name']}"
+        # The worker gets its own copy of the state, session state is only updated when the job finishes
+        candidate_count = Config.UI_TALAN_MESSAGE_CANDIDATES
+        task_args = [branch_copy(st.session_state.workflow_state), conversation_messages,
+                     customer_name, goal, channel]
+        if candidate_count > 1:
+            task, task_args = run_talan_candidates_task, task_args + [candidate_count]
+        else:
+            task = run_talan_message_task
+        st.session_state.talan_candidates = []
+        submit_background_job(
+            "talan_message",
+            task,
+            *task_args,
+            key_payload=[conversation_messages, goal, channel, message_type, candidate_count],
+            context={"message_config": {"message_type": message_type, "channel": channel, "goal": goal}}
         )
-        
-        # Update workflow state with current conversation history
-        if hasattr(st.session_state, 'conversation_messages') and st.session_state.conversation_messages:
-            # Create a conversation object with existing messages for context
-            from utils.models import Conversation, Message
-            
-            existing_messages = []
-            for msg in st.session_state.conversation_messages:
-                existing_messages.append(Message(
-                    sender=msg['sender'],
-                    content=msg['content'],
-                    message_type=msg.get('message_type', 'unknown'),
-                    timestamp=datetime.now()
-                ))
-            
-            workflow_state.conversation = Conversation(
-                messages=existing_messages,
-                conversation_id=f"talan_conv_{len(existing_messages)}",
-                goal=goal,
-                participants={"company": "Talan Tunisie", "customer": st.session_state.customer_info['company_name']},
-                status="in_progress",
-                channel=getattr(ConversationChannel, channel)
-            )
-        
-        with st.spinner("🔄 Generating Talan message for your review..."):
-            # Generate only the Talan message first
-            result = generate_talan_message_only(workflow_state, conversation_params, message_type, channel)
-            
-            if result:
-                # Store the generated message for review
-                st.session_state.pending_talan_message = result
-                st.session_state.pending_message_config = {
-                    "message_type": message_type,
-                    "channel": channel,
-                    "goal": goal
-                }
-                st.success("✅ Talan message generated! Please review below.")
-                st.rerun()
-            else:
-                st.error("❌ Failed to generate Talan message")
+        st.rerun()
                 
     except Exception as e:
         st.error(f"❌ Error: {str(e)}")
 
-def generate_talan_message_only(workflow_state, conversation_params, message_type, channel):
-    """Generate only the Talan message for review"""
-    try:
-        from agents.message_composer_agent_pure import MessageComposerAgentPure
-
-        # Use the message composer in talan_only mode to generate just the Talan message
-        message_composer = MessageComposerAgentPure(mode="talan_only")
-        result = message_composer.execute(workflow_state)
-
-        if result.conversation and result.conversation.messages:
-            # Find the Talan message (company sender)
-            talan_messages = [msg for msg in result.conversation.messages if msg.sender == "company"]
-            if talan_messages:
-                return talan_messages[-1].content  # Get the last Talan message
-
-        return None
-    except Exception as e:
-        st.error(f"❌ Error generating Talan message: {str(e)}")
-        return None
+def display_talan_candidates():
+    """Show every ranked draft side by side and let the user pick the one to review"""
+    candidates = st.session_state.get("talan_candidates") or []
+    if len(candidates) < 2:
+        return
+    
+    def label(index):
+        score = candidates[index]["score"]
+        return (f"Draft {index + 1} · score {score['total']:.2f} "
+                f"(length {score['length']:.2f}, services {score['services']:.2f}, pain points {score['pain_points']:.2f})")
+    
+    choice = st.radio("📝 Generated drafts (ranked locally):", range(len(candidates)), format_func=label,
+                      key="talan_candidate_choice")
+    tabs = st.tabs([f"Draft {i + 1}" for i in range(len(candidates))])
+    for tab, candidate in zip(tabs, candidates):
+        with tab:
+            st.caption(f"Type: {candidate['message_type']} · temperature {candidate['temperature']}")
+            st.markdown(candidate["content"])
+    
+    # Picking another draft replaces the text under review (and its speculative reply)
+    if choice != st.session_state.get("talan_candidate_applied"):
+        st.session_state.talan_candidate_applied = choice
+        st.session_state.pending_talan_message = candidates[choice]["content"]
+        start_speculative_reply(candidates[choice]["content"], st.session_state.pending_message_config)
 
 def display_message_review(message_type, channel, goal):
     """Display the message review interface"""
@@ -1097,6 +1184,8 @@ def display_message_review(message_type, channel, goal):
     st.subheader("✏️ Review Talan Message")
     st.info("Please review the generated message. You can edit it, regenerate it, or approve it to get the customer response.")
     
+    display_talan_candidates()
+    
     # Display the message for editing
     edited_message = st.text_area(
         "🏢 Talan Message:",
@@ -1105,9 +1194,10 @@ def display_message_review(message_type, channel, goal):
         help="Review and modify the generated Talan message as needed"
     )
     
-    # Update the pending message if edited
+    # Update the pending message if edited; a reply pre-generated for the old draft is stale
     if edited_message != st.session_state.pending_talan_message:
         st.session_state.pending_talan_message = edited_message
+        discard_speculative_reply()
     
     # Action buttons
     col1, col2, col3 = st.columns(3)
@@ -1115,121 +1205,82 @@ def display_message_review(message_type, channel, goal):
     with col1:
         if st.button("🔄 Regenerate", help="Generate a new version", use_container_width=True):
             # Clear the pending message and regenerate
+            discard_speculative_reply()
             st.session_state.pending_talan_message = None
+            st.session_state.talan_candidates = []
             st.session_state.pending_message_config = None
             generate_single_message(message_type, channel, goal)
     
     with col2:
-        if st.button("✅ Approve & Get Response", help="Finalize message and generate customer response", use_container_width=True, type="primary"):
+        if st.button("✅ Approve & Get Response", help="Finalize message and generate customer response", use_container_width=True, type="primary",
+                     disabled=is_job_running("customer_response")):
             finalize_talan_message_and_generate_response(message_type, channel, goal)
     
     with col3:
         if st.button("❌ Cancel", help="Discard this message", use_container_width=True):
+            discard_speculative_reply()
             st.session_state.pending_talan_message = None
+            st.session_state.talan_candidates = []
             st.session_state.pending_message_config = None
             st.rerun()
 
 def finalize_talan_message_and_generate_response(message_type, channel, goal):
-    """Finalize the Talan message and generate customer response"""
+    """Approve the Talan message and queue the customer response"""
     try:
         if not st.session_state.pending_talan_message:
             st.error("❌ No pending message to finalize")
             return
         
-        with st.spinner("🎭 Generating customer response..."):
-            # Add the approved Talan message to conversation
-            talan_message = {
-                'sender': 'company',
-                'content': st.session_state.pending_talan_message,
-                'message_type': message_type,
-                'channel': channel,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # Generate customer response
-            customer_response = generate_customer_response(talan_message, goal)
-            
-            if customer_response:
-                # Add both messages to conversation history
-                st.session_state.conversation_messages.append(talan_message)
-                st.session_state.conversation_messages.append({
-                    'sender': 'customer',
-                    'content': customer_response,
-                    'message_type': 'response',
-                    'channel': channel,
-                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                })
-                
-                # Clear pending message
-                st.session_state.pending_talan_message = None
-                st.session_state.pending_message_config = None
-                
-                # Show success
-                exchange_num = len(st.session_state.conversation_messages) // 2
-                st.success(f"✅ Exchange {exchange_num} completed! Both Talan message and customer response added.")
-                
-                # Display the new exchange
+        # The approved Talan message joins the conversation together with the customer response
+        talan_message = {
+            'sender': 'company',
+            'content': st.session_state.pending_talan_message,
+            'message_type': message_type,
+            'channel': channel,
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        conversation_messages = list(st.session_state.conversation_messages)
+        key_payload = customer_response_key_payload(conversation_messages, talan_message['content'], goal)
+        context = {"talan_message": talan_message, "channel": channel, "goal": goal}
+        st.session_state.job_errors.pop("customer_response", None)
+        
+        # Reuse the reply pre-generated during review when the approved inputs are unchanged
+        speculation = st.session_state.get("speculative_reply")
+        st.session_state.speculative_reply = None
+        if speculation:
+            job = get_job_manager().get(speculation["job_id"])
+            decision = resolve_speculation(
+                job, speculation["key"], task_key(st.session_state.session_id, "customer_response", key_payload)
+            )
+            if decision == "reuse":
+                apply_job_result("customer_response", job, context)
                 st.rerun()
-            else:
-                st.error("❌ Failed to generate customer response")
+            if decision == "adopt":
+                st.session_state.active_jobs["customer_response"] = {"job_id": job.job_id, "context": context}
+                st.rerun()
+            if job is not None and not job.done:
+                job.cancel()
+        
+        submit_background_job(
+            "customer_response",
+            run_customer_response_task,
+            branch_copy(st.session_state.workflow_state),
+            conversation_messages,
+            talan_message,
+            st.session_state.customer_info['company_name'],
+            goal,
+            key_payload=key_payload,
+            context=context
+        )
+        st.rerun()
                 
     except Exception as e:
         st.error(f"❌ Error finalizing message: {str(e)}")
 
-def generate_customer_response(talan_message, goal):
-    """Generate customer response to the approved Talan message"""
-    try:
-        from agents.message_composer_agent_pure import MessageComposerAgentPure
-        from utils.models import Conversation, Message
-
-        # Create a temporary conversation with just the Talan message
-        temp_messages = []
-
-        # Add existing conversation messages
-        for msg in st.session_state.conversation_messages:
-            temp_messages.append(Message(
-                sender=msg['sender'],
-                content=msg['content'],
-                message_type=msg.get('message_type', 'unknown'),
-                timestamp=datetime.now()
-            ))
-
-        # Add the new Talan message
-        temp_messages.append(Message(
-            sender=talan_message['sender'],
-            content=talan_message['content'],
-            message_type=talan_message['message_type'],
-            timestamp=datetime.now()
-        ))
-
-        # Create workflow state for customer response generation
-        workflow_state = st.session_state.workflow_state
-        workflow_state.conversation = Conversation(
-            messages=temp_messages,
-            conversation_id=f"response_conv_{len(temp_messages)}",
-            goal=goal,
-            participants={"company": "Talan Tunisie", "customer": st.session_state.customer_info['company_name']},
-            status="in_progress"
-        )
-
-        # Generate customer response using message composer in customer_only mode
-        message_composer = MessageComposerAgentPure(mode="customer_only")
-        result = message_composer.execute(workflow_state)
-
-        if result.conversation and result.conversation.messages:
-            # Find the customer response (last message from customer)
-            customer_messages = [msg for msg in result.conversation.messages if msg.sender == "customer"]
-            if customer_messages:
-                return customer_messages[-1].content
-
-        return None
-    except Exception as e:
-        st.error(f"❌ Error generating customer response: {str(e)}")
-        return None
-
 def clear_conversation():
     """Clear conversation history and reset state"""
-    st.session_state.conversation_history = []
+    st.session_state.conversation_history.clear()
+    st.session_state.pop('history_selected', None)
     st.session_state.current_company_message = ""
     st.session_state.show_edit_mode = False
     st.success("🗑️ Conversation cleared!")
@@ -1246,15 +1297,15 @@ def generate_company_message(message_type, channel, goal):
             if hasattr(st.session_state, 'workflow_result') and st.session_state.workflow_result:
                 workflow_result = st.session_state.workflow_result
                 
-                st.write(f"🔍 Debug: Workflow status in message generation: {workflow_result.status}")  # Debug info
+                logger.debug(f"Workflow status in message generation: {workflow_result.status}")
                 
                 # Extract the generated conversation from the workflow result
                 if workflow_result.conversation and len(workflow_result.conversation.messages) > 0:
-                    st.write(f"🔍 Debug: Found {len(workflow_result.conversation.messages)} messages in conversation")  # Debug info
+                    logger.debug(f"Found {len(workflow_result.conversation.messages)} messages in conversation")
                     # Get the first company message
                     company_messages = [msg for msg in workflow_result.conversation.messages if msg.sender.lower() == "company"]
                     if company_messages:
-                        st.write(f"🔍 Debug: Found {len(company_messages)} company messages")  # Debug info
+                        logger.debug(f"Found {len(company_messages)} company messages")
                         st.session_state.current_company_message = company_messages[0].content
                         st.session_state.message_config = {
                             "type": message_type,
@@ -1266,13 +1317,13 @@ def generate_company_message(message_type, channel, goal):
                         st.rerun()
                         return
                     else:
-                        st.write("🔍 Debug: No company messages found in conversation")  # Debug info
+                        logger.debug("No company messages found in conversation")
                 else:
-                    st.write("🔍 Debug: No conversation or messages found in workflow result")  # Debug info
+                    logger.debug("No conversation or messages found in workflow result")
                 
                 # If no pre-generated message, create a new one based on the analyses
                 if workflow_result.strategy_analysis and workflow_result.personality_analysis:
-                    st.write("🔍 Debug: Using strategy and personality analysis to create message")  # Debug info
+                    logger.debug("Using strategy and personality analysis to create message")
                     # Use the strategy and personality analysis to craft a message
                     message_content = f"""
 Dear {st.session_state.customer_info['company_name']} team,
@@ -1300,12 +1351,12 @@ Sales Representative
                     st.rerun()
                     return
                 else:
-                    st.write("🔍 Debug: No strategy or personality analysis available")  # Debug info
+                    logger.debug("No strategy or personality analysis available")
             else:
-                st.write("🔍 Debug: No workflow result available in session state")  # Debug info
+                logger.debug("No workflow result available in session state")
             
             # Fallback: Generate a basic message
-            st.write("🔍 Debug: Using fallback message generation")  # Debug info
+            logger.debug("Using fallback message generation")
             basic_message = f"""
 Dear {st.session_state.customer_info['company_name']} team,
 
@@ -1386,6 +1437,7 @@ def finalize_message_and_generate_response(message_type, channel, goal):
                 }
                 
                 st.session_state.conversation_history.append(new_entry)
+                st.session_state.pop('history_selected', None)
                 st.session_state.current_company_message = ""
                 st.session_state.show_edit_mode = False
                 
@@ -1418,27 +1470,14 @@ def main():
         display_metrics_row()
         st.markdown("---")
         
+        # Status of LLM work running in the background for this session
+        background_jobs_panel()
+        
         # Show current conversation history if exists
-        if hasattr(st.session_state, 'conversation_messages') and st.session_state.conversation_messages:
-            st.subheader("� Current Conversation")
-            
-            for i, msg in enumerate(st.session_state.conversation_messages, 1):
-                if msg['sender'] == "company":
-                    st.markdown(f"**🏢 TALAN - Exchange {i}** ({msg.get('message_type', 'N/A')} - {msg.get('channel', 'N/A')})")
-                    st.markdown(f"""
-                    <div style="background: #e8f4f8; padding: 1rem; border-radius: 8px; border-left: 4px solid #4258dc; margin: 0.5rem 0;">
-                        {msg['content']}
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"**👤 CLIENT - Exchange {i}** ({msg.get('message_type', 'N/A')})")
-                    st.markdown(f"""
-                    <div style="background: #f0f8f0; padding: 1rem; border-radius: 8px; border-left: 4px solid #28a745; margin: 0.5rem 0;">
-                        {msg['content']}
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            st.markdown("---")
+        conversation_pane()
+        
+        # Approved exchanges, paginated; older ones are reloaded from the history store on demand
+        display_conversation_history()
         
         # Show next message generation section
         st.subheader("📝 Generate Next Message")
@@ -1478,7 +1517,8 @@ def main():
             # Show generate button for Talan message only
             col_center = st.columns([1, 2, 1])[1]
             with col_center:
-                if st.button("🚀 Generate Next Message", type="primary", use_container_width=True):
+                if st.button("🚀 Generate Next Message", type="primary", use_container_width=True,
+                             disabled=is_job_running("talan_message")):
                     generate_single_message(message_type, selected_channel, selected_goal)
         
         # Clear conversation button
@@ -1486,44 +1526,16 @@ def main():
             col_clear = st.columns([3, 1])[1]
             with col_clear:
                 if st.button("🗑️ Clear Conversation", use_container_width=True):
+                    discard_speculative_reply()
                     st.session_state.conversation_messages = []
+                    st.session_state.conversation_history.clear()
+                    st.session_state.pop('history_selected', None)
                     if hasattr(st.session_state, 'conversation_result'):
                         delattr(st.session_state, 'conversation_result')
                     st.rerun()
         
-        # Analysis buttons - show if we have conversation messages
-        if hasattr(st.session_state, 'conversation_messages') and st.session_state.conversation_messages:
-            st.markdown("---")
-            st.subheader("📊 Conversation Analysis")
-            st.write("Analyze the conversation exchange above:")
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                if st.button("🧠 Personality Analysis", key="personality_btn_main", use_container_width=True):
-                    run_personality_analysis()
-            
-            with col2:
-                if st.button("🎯 Strategy Analysis", key="strategy_btn_main", use_container_width=True):
-                    run_strategy_analysis()
-            
-            with col3:
-                if st.button("🗑️ Clear Analysis", key="clear_analysis_btn_main", use_container_width=True):
-                    st.session_state.personality_analysis = None
-                    st.session_state.strategy_analysis = None
-                    st.success("🗑️ Analysis cleared!")
-                    st.rerun()
-            
-            # Display stored analysis if available
-            if hasattr(st.session_state, 'personality_analysis') and st.session_state.personality_analysis:
-                with st.expander("🧠 Personality Analysis Results", expanded=True):
-                    # Use the proper display function for full 5-profile classification
-                    display_personality_analysis(st.session_state.personality_analysis)
-            
-            if hasattr(st.session_state, 'strategy_analysis') and st.session_state.strategy_analysis:
-                with st.expander("🎯 Strategy Analysis Results", expanded=True):
-                    # Use the proper display function for comprehensive strategy analysis
-                    display_strategy_analysis(st.session_state.strategy_analysis)
+        # Analysis buttons and results - show if we have conversation messages
+        analysis_pane()
     
     else:
         st.markdown("""
@@ -1533,114 +1545,98 @@ def main():
         </div>
         """, unsafe_allow_html=True)
 
+@st.fragment
+def conversation_pane():
+    """Current conversation, rendered from cached message views as a single block"""
+    messages = st.session_state.get('conversation_messages')
+    if not messages:
+        return
+    st.subheader("� Current Conversation")
+    st.markdown(conversation_html(message_views(messages)), unsafe_allow_html=True)
+    st.markdown("---")
+
+@st.fragment
+def analysis_pane():
+    """Analysis buttons and results; clicking them reruns only this pane"""
+    if not st.session_state.get('conversation_messages'):
+        return
+    st.markdown("---")
+    st.subheader("📊 Conversation Analysis")
+    st.write("Analyze the conversation exchange above:")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if st.button("🧠 Personality Analysis", key="personality_btn_main", use_container_width=True,
+                     disabled=is_job_running("personality")):
+            run_personality_analysis()
+    
+    with col2:
+        if st.button("🎯 Strategy Analysis", key="strategy_btn_main", use_container_width=True,
+                     disabled=is_job_running("strategy")):
+            run_strategy_analysis()
+    
+    with col3:
+        if st.button("🗑️ Clear Analysis", key="clear_analysis_btn_main", use_container_width=True):
+            st.session_state.personality_analysis = None
+            st.session_state.strategy_analysis = None
+            st.success("🗑️ Analysis cleared!")
+    
+    # Display stored analysis if available
+    if st.session_state.get('personality_analysis'):
+        with st.expander("🧠 Personality Analysis Results", expanded=True):
+            # Use the proper display function for full 5-profile classification
+            display_personality_analysis(st.session_state.personality_analysis)
+    
+    if st.session_state.get('strategy_analysis'):
+        with st.expander("🎯 Strategy Analysis Results", expanded=True):
+            # Use the proper display function for comprehensive strategy analysis
+            display_strategy_analysis(st.session_state.strategy_analysis)
+
+def rerun_pane():
+    """Rerun the fragment that triggered this run, or the whole app outside a fragment rerun"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
 def run_personality_analysis():
-    """Run personality analysis on the current conversation"""
+    """Queue personality analysis of the current conversation"""
     try:
-        with st.spinner("🧠 Analyzing customer personality from conversation..."):
-            from agents.personality_classifier_agent_pure import PersonalityClassifierAgentPure
-            from utils.models import Message, Conversation, WorkflowState
-            
-            # Convert session messages to Message objects
-            conversation_messages = []
-            for msg_data in st.session_state.conversation_messages:
-                conversation_messages.append(Message(
-                    sender=msg_data['sender'],
-                    content=msg_data['content'],
-                    message_type=msg_data.get('message_type', 'unknown'),
-                    timestamp=datetime.now()
-                ))
-            
-            # Create conversation object
-            conversation = Conversation(
-                messages=conversation_messages,
-                conversation_id=f"analysis_conv_{len(conversation_messages)}",
-                goal="Analysis",
-                participants={"company": "Talan Tunisie", "customer": st.session_state.customer_info['company_name']},
-                status="completed"
-            )
-            
-            # Create workflow state with conversation and customer analysis
-            workflow_state = WorkflowState()
-            workflow_state.conversation = conversation
-            
-            # Convert customer_info to proper CustomerAnalysis object
-            from utils.models import CustomerAnalysis
-            workflow_state.customer_analysis = CustomerAnalysis(
-                customer_name=st.session_state.customer_info['company_name'],
-                industry=st.session_state.customer_info['industry'],
-                company_size=st.session_state.customer_info['company_size'],
-                pain_points=st.session_state.customer_info.get('pain_points', []),
-                needs=st.session_state.customer_info.get('business_needs', []),
-                communication_style=st.session_state.customer_info.get('communication_style', 'professional'),
-                decision_makers=st.session_state.customer_info.get('decision_makers', [])
-            )
-            
-            # Run personality analysis using run_simple method
-            personality_agent = PersonalityClassifierAgentPure()
-            result_state = personality_agent.execute(workflow_state)
-            
-            if result_state.personality_analysis:
-                st.session_state.personality_analysis = result_state.personality_analysis
-                st.success("✅ Personality analysis completed!")
-                st.rerun()
-            else:
-                st.error("❌ Failed to generate personality analysis")
+        conversation_messages = list(st.session_state.conversation_messages)
+        st.session_state.job_errors.pop("personality", None)
+        customer_info = dict(st.session_state.customer_info)
+        submit_background_job(
+            "personality",
+            update_personality_task,
+            conversation_messages,
+            customer_info,
+            st.session_state.analysis_snapshots.get("personality"),
+            key_payload=[conversation_messages, customer_info]
+        )
+        rerun_pane()
                 
     except Exception as e:
         st.error(f"❌ Personality analysis error: {str(e)}")
 
 def run_strategy_analysis():
-    """Run strategy analysis on the current conversation"""
+    """Queue strategy analysis of the current conversation"""
     try:
-        with st.spinner("🎯 Analyzing conversation strategy..."):
-            from agents.strategy_agent_pure import StrategyAgentPure
-            from utils.models import Message, Conversation, WorkflowState
-            
-            # Convert session messages to Message objects
-            conversation_messages = []
-            for msg_data in st.session_state.conversation_messages:
-                conversation_messages.append(Message(
-                    sender=msg_data['sender'],
-                    content=msg_data['content'],
-                    message_type=msg_data.get('message_type', 'unknown'),
-                    timestamp=datetime.now()
-                ))
-            
-            # Create conversation object
-            conversation = Conversation(
-                messages=conversation_messages,
-                conversation_id=f"analysis_conv_{len(conversation_messages)}",
-                goal="Analysis",
-                participants={"company": "Talan Tunisie", "customer": st.session_state.customer_info['company_name']},
-                status="completed"
-            )
-            
-            # Create workflow state with conversation and customer analysis
-            workflow_state = WorkflowState()
-            workflow_state.conversation = conversation
-            
-            # Convert customer_info to proper CustomerAnalysis object
-            from utils.models import CustomerAnalysis
-            workflow_state.customer_analysis = CustomerAnalysis(
-                customer_name=st.session_state.customer_info['company_name'],
-                industry=st.session_state.customer_info['industry'],
-                company_size=st.session_state.customer_info['company_size'],
-                pain_points=st.session_state.customer_info.get('pain_points', []),
-                needs=st.session_state.customer_info.get('business_needs', []),
-                communication_style=st.session_state.customer_info.get('communication_style', 'professional'),
-                decision_makers=st.session_state.customer_info.get('decision_makers', [])
-            )
-            
-            # Run strategy analysis using run_simple method
-            strategy_agent = StrategyAgentPure()
-            result_state = strategy_agent.execute(workflow_state)
-            
-            if result_state.strategy_analysis:
-                st.session_state.strategy_analysis = result_state.strategy_analysis
-                st.success("✅ Strategy analysis completed!")
-                st.rerun()
-            else:
-                st.error("❌ Failed to generate strategy analysis")
+        conversation_messages = list(st.session_state.conversation_messages)
+        st.session_state.job_errors.pop("strategy", None)
+        customer_info = dict(st.session_state.customer_info)
+        submit_background_job(
+            "strategy",
+            update_strategy_task,
+            conversation_messages,
+            customer_info,
+            st.session_state.analysis_snapshots.get("strategy"),
+            key_payload=[conversation_messages, customer_info]
+        )
+        rerun_pane()
                 
     except Exception as e:
-        st.error(f"❌ Strategy analysis error: {str(e)}")
\ No newline at end of file
+        st.error(f"❌ Strategy analysis error: {str(e)}")
+
+if __name__ == "__main__":
+    main()
@@ -6,46 +6,121 @@ import logging
 import asyncio
 import time
 import uuid
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import importlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from langgraph.graph import StateGraph
-from langgraph.checkpoint.memory import MemorySaver
 
-from agents.document_analysis_agent import DocumentAnalysisAgent
-from agents.message_composer_agent_pure import MessageComposerAgentPure
-from agents.strategy_agent_pure import StrategyAgentPure
-from agents.personality_classifier_agent_pure import PersonalityClassifierAgentPure
-from utils.models import WorkflowState, ConversationParams
+from utils.models import WorkflowState, ConversationParams, CustomerAnalysis
 from utils.helpers import FileProcessor, generate_unique_filename, ensure_directory_exists
+from utils.results_store import get_results_store
+from utils.compact_state import branch_copy
+from utils.customer_dedup import CustomerDeduplicator, group_profiles
+from utils.customer_stream import CustomerExportReader
+from utils.scenario_matrix import ScenarioMatrixResult, comparison_table, scenario_state
+from utils.stage_memo import get_stage_memo
+from utils.step_resume import (RESUME_COMPLETE, RESUME_MISSING, find_resume_point, is_resuming, resume_config,
+                               state_from_values)
 from config.settings import Config
 
 logger = logging.getLogger(__name__)
 
+
+class LazyAgent:
+    """
+    Descriptor that imports and constructs an agent on first access
+
+    Importing the workflow module stays cheap (no langgraph, langchain or Groq client);
+    a document-analysis-only run never builds the composer, strategy or personality agents.
+    Assigning the attribute (e.g. a test double) replaces the lazily built instance.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, module_path: str, class_name: str):
+        self.module_path = module_path
+        self.class_name = class_name
+
+    def __set_name__(self, owner, name):
+        self.attr_name = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        agent = instance.__dict__.get(self.attr_name)
+        if agent is None:
+            # Concurrent jobs may hit the same agent first; build it only once
+            with self._lock:
+                agent = instance.__dict__.get(self.attr_name)
+                if agent is None:
+                    agent_class = getattr(importlib.import_module(self.module_path), self.class_name)
+                    agent = agent_class()
+                    instance.__dict__[self.attr_name] = agent
+                    logger.info(f"Lazily initialized {self.class_name}")
+        return agent
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.attr_name] = value
+
+
 class PureLangGraphB2BWorkflow:
     """Pure LangGraph implementation for B2B sales conversation generation workflow"""
+
+    # Agents are constructed on first use with the standardized interface
+    document_agent = LazyAgent("agents.document_analysis_agent", "DocumentAnalysisAgent")
+    message_composer_agent = LazyAgent("agents.message_composer_agent_pure", "MessageComposerAgentPure")
+    strategy_agent = LazyAgent("agents.strategy_agent_pure", "StrategyAgentPure")
+    personality_agent = LazyAgent("agents.personality_classifier_agent_pure", "PersonalityClassifierAgentPure")
     
     def __init__(self):
         logger.info("Initializing Pure LangGraph B2B Sales Workflow")
         
-        # Initialize agents with standardized interface
-        self.document_agent = DocumentAnalysisAgent()
-        self.message_composer_agent = MessageComposerAgentPure()
-        self.strategy_agent = StrategyAgentPure()
-        self.personality_agent = PersonalityClassifierAgentPure()
-        
         # Initialize utilities
         self.file_processor = FileProcessor()
         
-        # Initialize checkpoint saver for main workflow
-        self.checkpoint_saver = MemorySaver() if Config.ENABLE_CHECKPOINTING else None
+        # Stage outputs keyed on their inputs, shared by every workflow instance in the process
+        self.stage_memo = get_stage_memo()
         
-        # Build main workflow
-        self.workflow = self._build_main_workflow()
+        # Checkpoint saver and main graph are built on first use
+        self._checkpoint_saver = None
+        self._workflow = None
+        self._build_lock = threading.RLock()
         
         logger.info("Pure LangGraph B2B Sales Workflow initialized successfully")
     
+    @property
+    def checkpoint_saver(self):
+        """Checkpoint saver for the main workflow (None when checkpointing is disabled)"""
+        if self._checkpoint_saver is None and Config.ENABLE_CHECKPOINTING:
+            with self._build_lock:
+                if self._checkpoint_saver is None:
+                    from utils.delta_checkpoint import create_checkpoint_saver
+                    self._checkpoint_saver = create_checkpoint_saver()
+        return self._checkpoint_saver
+    
+    @checkpoint_saver.setter
+    def checkpoint_saver(self, value):
+        self._checkpoint_saver = value
+    
+    @property
+    def workflow(self):
+        """Compiled main workflow, built on first access"""
+        if self._workflow is None:
+            with self._build_lock:
+                if self._workflow is None:
+                    self._workflow = self._build_main_workflow()
+        return self._workflow
+    
+    @workflow.setter
+    def workflow(self, value):
+        self._workflow = value
+    
     def _build_main_workflow(self):
         """Build the main LangGraph workflow orchestrating all agents"""
+        from langgraph.graph import StateGraph
+        
         workflow = StateGraph(WorkflowState)
         
         # Add nodes for each major step
@@ -109,7 +184,7 @@ class PureLangGraphB2BWorkflow:
             state.add_error(f"Initialization error: {str(e)}")
             return state
     
-    def _run_document_analysis(self, state: WorkflowState) -> WorkflowState:
+    def _run_document_analysis(self, state: WorkflowState, config: Optional[Dict[str, Any]] = None) -> WorkflowState:
         """Execute document analysis agent using standardized interface"""
         start_time = time.time()
         
@@ -117,14 +192,14 @@ class PureLangGraphB2BWorkflow:
             logger.info("Starting document analysis phase")
             
             # Configure execution
-            config = {
+            agent_config = {
                 "configurable": {
                     "thread_id": f"{state.thread_id}_document_analysis"
                 }
             }
             
             # Execute document analysis agent
-            state = self.document_agent.execute(state, config)
+            state = self._run_stage("document_analysis", self.document_agent, state, agent_config, is_resuming(config))
             
             # Update workflow state
             state.current_step = "message_composition"
@@ -138,7 +213,7 @@ class PureLangGraphB2BWorkflow:
             state.add_error(f"Document analysis error: {str(e)}")
             return state
     
-    def _run_message_composition(self, state: WorkflowState) -> WorkflowState:
+    def _run_message_composition(self, state: WorkflowState, config: Optional[Dict[str, Any]] = None) -> WorkflowState:
         """Execute message composition agent using standardized interface"""
         start_time = time.time()
         
@@ -150,14 +225,15 @@ class PureLangGraphB2BWorkflow:
                 raise ValueError("Customer analysis is required for message composition")
             
             # Configure execution
-            config = {
+            agent_config = {
                 "configurable": {
                     "thread_id": f"{state.thread_id}_message_composition"
                 }
             }
             
             # Execute message composition agent
-            state = self.message_composer_agent.execute(state, config)
+            state = self._run_stage("message_composition", self.message_composer_agent, state, agent_config,
+                                   is_resuming(config))
             
             # Update workflow state
             state.current_step = "parallel_analysis"
@@ -171,7 +247,7 @@ class PureLangGraphB2BWorkflow:
             state.add_error(f"Message composition error: {str(e)}")
             return state
     
-    def _run_parallel_analysis(self, state: WorkflowState) -> WorkflowState:
+    def _run_parallel_analysis(self, state: WorkflowState, config: Optional[Dict[str, Any]] = None) -> WorkflowState:
         """Execute strategy and personality analysis in parallel"""
         start_time = time.time()
         
@@ -188,12 +264,12 @@ class PureLangGraphB2BWorkflow:
                 asyncio.set_event_loop(loop)
                 
                 try:
-                    state = loop.run_until_complete(self._run_parallel_analysis_async(state))
+                    state = loop.run_until_complete(self._run_parallel_analysis_async(state, is_resuming(config)))
                 finally:
                     loop.close()
             else:
                 # Run analyses sequentially
-                state = self._run_sequential_analysis(state)
+                state = self._run_sequential_analysis(state, is_resuming(config))
             
             # Update workflow state
             state.current_step = "integrate_results"
@@ -207,7 +283,7 @@ class PureLangGraphB2BWorkflow:
             state.add_error(f"Parallel analysis error: {str(e)}")
             return state
     
-    async def _run_parallel_analysis_async(self, state: WorkflowState) -> WorkflowState:
+    async def _run_parallel_analysis_async(self, state: WorkflowState, resume: bool = False) -> WorkflowState:
         """Run strategy and personality analysis asynchronously"""
         logger.info("Running strategy and personality analysis in parallel")
         
@@ -228,12 +304,14 @@ class PureLangGraphB2BWorkflow:
         async def run_strategy():
             import asyncio
             loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, self.strategy_agent.execute, state.model_copy(), strategy_config)
+            return await loop.run_in_executor(None, self._run_stage, "strategy_analysis", self.strategy_agent,
+                                              branch_copy(state), strategy_config, resume)
         
         async def run_personality():
             import asyncio
             loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, self.personality_agent.execute, state.model_copy(), personality_config)
+            return await loop.run_in_executor(None, self._run_stage, "personality_analysis", self.personality_agent,
+                                              branch_copy(state), personality_config, resume)
         
         # Create tasks for parallel execution
         strategy_task = asyncio.create_task(run_strategy())
@@ -252,16 +330,18 @@ class PureLangGraphB2BWorkflow:
             state.add_error(f"Strategy analysis error: {str(strategy_result)}")
         else:
             state.strategy_analysis = strategy_result.strategy_analysis
+            self._adopt_agent_errors(state, strategy_result)
         
         if isinstance(personality_result, Exception):
             logger.error(f"Personality analysis failed: {personality_result}")
             state.add_error(f"Personality analysis error: {str(personality_result)}")
         else:
             state.personality_analysis = personality_result.personality_analysis
+            self._adopt_agent_errors(state, personality_result)
         
         return state
     
-    def _run_sequential_analysis(self, state: WorkflowState) -> WorkflowState:
+    def _run_sequential_analysis(self, state: WorkflowState, resume: bool = False) -> WorkflowState:
         """Run strategy and personality analysis sequentially"""
         logger.info("Running strategy and personality analysis sequentially")
         
@@ -272,8 +352,9 @@ class PureLangGraphB2BWorkflow:
                     "thread_id": f"{state.thread_id}_strategy_analysis"
                 }
             }
-            strategy_result = self.strategy_agent.execute(state, strategy_config)
+            strategy_result = self._run_stage("strategy_analysis", self.strategy_agent, state, strategy_config, resume)
             state.strategy_analysis = strategy_result.strategy_analysis
+            self._adopt_agent_errors(state, strategy_result)
         except Exception as e:
             logger.error(f"Strategy analysis failed: {e}")
             state.add_error(f"Strategy analysis error: {str(e)}")
@@ -285,14 +366,41 @@ class PureLangGraphB2BWorkflow:
                     "thread_id": f"{state.thread_id}_personality_analysis"
                 }
             }
-            personality_result = self.personality_agent.execute(state, personality_config)
+            personality_result = self._run_stage("personality_analysis", self.personality_agent, state, personality_config,
+                                                 resume)
             state.personality_analysis = personality_result.personality_analysis
+            self._adopt_agent_errors(state, personality_result)
         except Exception as e:
             logger.error(f"Personality analysis failed: {e}")
             state.add_error(f"Personality analysis error: {str(e)}")
         
         return state
     
+    def _run_agent(self, agent, state: WorkflowState, config: Dict[str, Any], resume: bool = False) -> WorkflowState:
+        """Execute an agent, or resume it from its own checkpoints when the workflow is resuming"""
+        if resume:
+            return agent.resume_from_checkpoint(config["configurable"]["thread_id"], state)
+        return agent.execute(state, config)
+    
+    def _run_stage(self, stage: str, agent, state: WorkflowState, config: Dict[str, Any],
+                   resume: bool = False) -> WorkflowState:
+        """Run an agent stage, reusing its memoized outputs when the inputs it consumes are unchanged"""
+        key = self.stage_memo.key(stage, state)
+        if self.stage_memo.restore(stage, key, state):
+            logger.info(f"Inputs of {stage} unchanged, reusing memoized outputs")
+            return state
+        errors_before = len(state.errors)
+        result = self._run_agent(agent, state, config, resume)
+        self.stage_memo.store(stage, key, result, errors_before)
+        return result
+    
+    @staticmethod
+    def _adopt_agent_errors(state: WorkflowState, result: WorkflowState):
+        """Copy errors an analysis agent recorded on its own state, so failed steps are visible for resume"""
+        for error in result.errors:
+            if error not in state.errors:
+                state.errors.append(error)
+    
     def _integrate_results(self, state: WorkflowState) -> WorkflowState:
         """Integrate all analysis results and prepare final output"""
         start_time = time.time()
@@ -348,14 +456,6 @@ class PureLangGraphB2BWorkflow:
         try:
             logger.info("Saving workflow outputs")
             
-            # Ensure output directory exists
-            ensure_directory_exists(Config.OUTPUT_DIR)
-            
-            # Generate output filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"b2b_sales_workflow_{timestamp}_complete_results.json"
-            output_path = f"{Config.OUTPUT_DIR}/{filename}"
-            
             # Prepare complete output data
             output_data = {
                 "execution_metadata": {
@@ -385,18 +485,25 @@ class PureLangGraphB2BWorkflow:
                 }
             }
             
-            # Save to file
-            self.file_processor.save_json_file(output_data, output_path)
+            # Append to the results store; inside a batch the write is deferred to the batch flush
+            store = get_results_store()
+            result_id = store.append(
+                output_data,
+                execution_id=state.execution_id,
+                customer=state.customer_analysis.customer_name if state.customer_analysis else None
+            )
+            if not store.in_batch:
+                store.flush()
             
             # Update state with output information
-            state.intermediate_results["output_path"] = output_path
-            state.intermediate_results["output_filename"] = filename
+            state.intermediate_results["result_id"] = result_id
+            state.intermediate_results["output_path"] = store.root_dir
             
             # Update workflow state
             state.current_step = "finalize_workflow"
             state.mark_step_completed("save_outputs", time.time() - start_time)
             
-            logger.info(f"Workflow outputs saved to: {output_path}")
+            logger.info(f"Workflow outputs saved as result {result_id} in: {store.root_dir}")
             return state
             
         except Exception as e:
@@ -438,9 +545,10 @@ class PureLangGraphB2BWorkflow:
     
     def execute_complete_workflow(
         self, 
-        customer_json_path: str,
+        customer_json_path: Optional[str] = None,
         conversation_params: Optional[ConversationParams] = None,
-        config: Optional[Dict[str, Any]] = None
+        config: Optional[Dict[str, Any]] = None,
+        customer_data: Optional[Dict[str, Any]] = None
     ) -> WorkflowState:
         """
         Execute the complete B2B sales workflow
@@ -449,6 +557,7 @@ class PureLangGraphB2BWorkflow:
             customer_json_path: Path to customer JSON file
             conversation_params: Optional conversation parameters
             config: Optional workflow configuration
+            customer_data: Customer profile already parsed (see load_customer_json), instead of a path
             
         Returns:
             Final workflow state with all results
@@ -463,7 +572,8 @@ class PureLangGraphB2BWorkflow:
                 customer_json_path=customer_json_path,
                 conversation_params=conversation_params,
                 status="starting",
-                config=config or {}
+                config=config or {},
+                intermediate_results=self._customer_data_results(customer_data)
             )
             
             # Prepare execution config
@@ -490,7 +600,13 @@ class PureLangGraphB2BWorkflow:
             return error_state
     
     def resume_workflow_from_checkpoint(self, thread_id: str) -> Optional[WorkflowState]:
-        """Resume workflow execution from a checkpoint"""
+        """
+        Resume workflow execution from the last successful step of a checkpointed run
+        
+        Steps that completed are not executed again: the graph restarts at the first step that
+        failed (or was interrupted) on the persisted outputs of the previous steps, and agents
+        rerun inside that step resume from their own last successful node.
+        """
         if not self.checkpoint_saver:
             logger.warning("Checkpointing not enabled, cannot resume from checkpoint")
             return None
@@ -498,16 +614,17 @@ class PureLangGraphB2BWorkflow:
         try:
             logger.info(f"Attempting to resume workflow from checkpoint: {thread_id}")
             
-            # Get checkpoint
-            checkpoint = self.checkpoint_saver.get({"configurable": {"thread_id": thread_id}})
-            
-            if not checkpoint:
+            point = find_resume_point(self.workflow, {"configurable": {"thread_id": thread_id}})
+            if point.action == RESUME_MISSING:
                 logger.warning(f"No checkpoint found for thread_id: {thread_id}")
                 return None
+            if point.action == RESUME_COMPLETE:
+                logger.info(f"Workflow {thread_id} already completed, nothing to resume")
+                return state_from_values(point.values)
             
-            # Resume execution
-            config = {"configurable": {"thread_id": thread_id}}
-            final_state = self.workflow.invoke(checkpoint.values, config=config)
+            # Resume execution at the failed step
+            logger.info(f"Resuming at {point.failed}, skipping completed steps {point.completed}")
+            final_state = state_from_values(self.workflow.invoke(None, config=resume_config(point)))
             
             logger.info(f"Successfully resumed workflow from checkpoint")
             return final_state
@@ -516,8 +633,14 @@ class PureLangGraphB2BWorkflow:
             logger.error(f"Error resuming workflow from checkpoint: {e}")
             return None
     
-    def run_document_analysis_only(self, customer_json_path: str) -> WorkflowState:
-        """Run ONLY the document analysis step - for initial customer data processing"""
+    @staticmethod
+    def _customer_data_results(customer_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # The document agent validates a handed-over profile instead of reading a file
+        return {"raw_customer_data": customer_data} if customer_data is not None else {}
+    
+    def run_document_analysis_only(self, customer_json_path: Optional[str] = None,
+                                   customer_data: Optional[Dict[str, Any]] = None) -> WorkflowState:
+        """Run ONLY the document analysis step - for initial customer data processing (from a path or a parsed profile)"""
         try:
             logger.info("Starting document analysis only (customer JSON)")
             
@@ -532,7 +655,8 @@ class PureLangGraphB2BWorkflow:
                 customer_json_path=customer_json_path,
                 conversation_params=conversation_params,
                 status="initialized",
-                current_step="document_analysis_only"
+                current_step="document_analysis_only",
+                intermediate_results=self._customer_data_results(customer_data)
             )
             
             # Run just the document analysis agent
@@ -543,7 +667,7 @@ class PureLangGraphB2BWorkflow:
             }
             
             # Execute document analysis agent directly
-            state = self.document_agent.execute(state, config)
+            state = self._run_stage("document_analysis", self.document_agent, state, config)
             
             if state.status != "error":
                 state.status = "document_analysis_complete"
@@ -560,6 +684,91 @@ class PureLangGraphB2BWorkflow:
             )
             return error_state
     
+    def iter_document_analysis(self, export_path: str, checkpoint_path: Optional[str] = None,
+                               deduplicate: Optional[bool] = None) -> Iterator[WorkflowState]:
+        """
+        Run document analysis on every customer of a large export (JSON array or NDJSON)
+        
+        Customers are read one at a time in constant memory. With ``checkpoint_path``, a customer
+        is committed (its end offset checkpointed) only when the consumer resumes the generator
+        for the next one, so a rerun of an interrupted batch starts with the first customer whose
+        result the consumer did not finish handling. With deduplication (default
+        ``Config.BATCH_DEDUPLICATION``), a customer duplicating one analysed earlier in the run
+        reuses that analysis instead of calling the agent. Only the CustomerAnalysis and execution
+        id of the ``Config.DEDUP_MAX_ANALYSES`` most recently used groups are kept; a duplicate of
+        an evicted group is analysed again. Dedup groups are not checkpointed: after resuming
+        from ``checkpoint_path``, duplicates of customers analysed before the interruption are
+        analysed again.
+        """
+        deduplicate = Config.BATCH_DEDUPLICATION if deduplicate is None else deduplicate
+        deduplicator = CustomerDeduplicator() if deduplicate else None
+        # group -> (analysis, execution id of the analysed state), least recently used first
+        analysed: "OrderedDict[int, Tuple[CustomerAnalysis, str]]" = OrderedDict()
+        with CustomerExportReader(export_path, checkpoint_path) as reader:
+            for record in reader:
+                group, is_new = deduplicator.add(record.data) if deduplicator is not None else (None, True)
+                if not is_new and group in analysed:
+                    analysed.move_to_end(group)
+                    state = self._duplicate_result(*analysed[group], record.data)
+                else:
+                    # New group, or its representative failed or was evicted: analyse this member
+                    state = self.run_document_analysis_only(customer_data=record.data)
+                    if deduplicator is not None and state.customer_analysis is not None:
+                        analysed[group] = (state.customer_analysis, state.execution_id)
+                        analysed.move_to_end(group)
+                        while len(analysed) > Config.DEDUP_MAX_ANALYSES:
+                            analysed.popitem(last=False)
+                state.intermediate_results["export_record"] = {"index": record.index, "offset": record.offset}
+                yield state
+                # The consumer asked for the next customer: it is done with this one
+                reader.commit(record)
+    
+    def run_document_analysis_batch(self, profiles: Iterable[Dict[str, Any]],
+                                    deduplicate: Optional[bool] = None) -> List[WorkflowState]:
+        """
+        Document analysis of many customer profiles, one result per profile in input order
+        
+        Exact and near-duplicate profiles (see utils.customer_dedup) are analysed once and the
+        resulting CustomerAnalysis is shared by every member of the group.
+        """
+        profiles = list(profiles)
+        deduplicate = Config.BATCH_DEDUPLICATION if deduplicate is None else deduplicate
+        groups = group_profiles(profiles) if deduplicate else [[index] for index in range(len(profiles))]
+        results: List[Optional[WorkflowState]] = [None] * len(profiles)
+        for members in groups:
+            representative = None
+            for index in members:
+                if representative is None:
+                    results[index] = self.run_document_analysis_only(customer_data=profiles[index])
+                    if results[index].customer_analysis is not None:
+                        representative = index
+                else:
+                    results[index] = self._fan_out(results[representative], profiles[index])
+        logger.info(f"Batch document analysis: {len(profiles)} profiles, {len(groups)} distinct")
+        return results
+    
+    @staticmethod
+    def _fan_out(analysed: WorkflowState, customer_data: Dict[str, Any]) -> WorkflowState:
+        """Result for a duplicate profile: the analysed state, sharing its CustomerAnalysis"""
+        state = branch_copy(analysed)
+        state.execution_id = str(uuid.uuid4())
+        state.intermediate_results["raw_customer_data"] = customer_data
+        state.intermediate_results["duplicate_of"] = analysed.execution_id
+        return state
+    
+    @staticmethod
+    def _duplicate_result(customer_analysis: CustomerAnalysis, duplicate_of: str,
+                          customer_data: Dict[str, Any]) -> WorkflowState:
+        """Document analysis result for a duplicate profile from its group's analysis alone"""
+        return WorkflowState(
+            customer_analysis=customer_analysis,
+            conversation_params=ConversationParams(goal="Initial customer analysis", tone="professional",
+                                                   channel="email"),
+            status="document_analysis_complete",
+            current_step="awaiting_channel_selection",
+            intermediate_results={"raw_customer_data": customer_data, "duplicate_of": duplicate_of}
+        )
+    
     def run_conversation_generation(self, state: WorkflowState, conversation_params: ConversationParams) -> WorkflowState:
         """Run message composition + analysis after channel/type selection"""
         try:
@@ -582,7 +791,7 @@ class PureLangGraphB2BWorkflow:
             
             # Run message composition
             start_time = time.time()
-            state = self.message_composer_agent.execute(state, config)
+            state = self._run_stage("message_composition", self.message_composer_agent, state, config)
             state.mark_step_completed("message_composition", time.time() - start_time)
             
             if state.status == "error":
@@ -597,7 +806,7 @@ class PureLangGraphB2BWorkflow:
                             "thread_id": f"{state.thread_id}_strategy_analysis"
                         }
                     }
-                    strategy_result = self.strategy_agent.execute(state, strategy_config)
+                    strategy_result = self._run_stage("strategy_analysis", self.strategy_agent, state, strategy_config)
                     state.strategy_analysis = strategy_result.strategy_analysis
                 except Exception as e:
                     logger.error(f"Strategy analysis failed: {e}")
@@ -610,7 +819,8 @@ class PureLangGraphB2BWorkflow:
                             "thread_id": f"{state.thread_id}_personality_analysis"
                         }
                     }
-                    personality_result = self.personality_agent.execute(state, personality_config)
+                    personality_result = self._run_stage("personality_analysis", self.personality_agent, state,
+                                                         personality_config)
                     state.personality_analysis = personality_result.personality_analysis
                 except Exception as e:
                     logger.error(f"Personality analysis failed: {e}")
@@ -630,6 +840,31 @@ class PureLangGraphB2BWorkflow:
             state.status = "conversation_error"
             return state
 
+    def run_scenario_matrix(self, state: WorkflowState, scenarios: Iterable[ConversationParams],
+                            max_workers: Optional[int] = None) -> ScenarioMatrixResult:
+        """
+        Generate and analyse one conversation per scenario for an analysed customer, concurrently
+        
+        Scenarios branch off ``state`` (shared analyses, own conversation and checkpoint threads)
+        and run ``run_conversation_generation`` on a thread pool; LLM calls of all branches share
+        the process-wide scheduler. The result holds the states in scenario order and a comparison
+        table ranked by overall effectiveness.
+        """
+        scenarios = list(scenarios)
+        if not scenarios:
+            return ScenarioMatrixResult([], [], [])
+        if state.customer_analysis is None:
+            raise ValueError("Customer analysis is required for a scenario matrix")
+        
+        branches = [scenario_state(state, params, index) for index, params in enumerate(scenarios)]
+        workers = max(1, min(len(scenarios), max_workers or Config.SCENARIO_MAX_WORKERS))
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scenario") as pool:
+            results = list(pool.map(self.run_conversation_generation, branches, scenarios))
+        logger.info(f"Scenario matrix: {len(scenarios)} scenarios on {workers} workers in "
+                    f"{time.time() - start_time:.1f}s")
+        return ScenarioMatrixResult(scenarios, results, comparison_table(scenarios, results))
+
 # Maintain backward compatibility
 class B2BSalesWorkflow(PureLangGraphB2BWorkflow):
     """Backward compatibility alias for the pure LangGraph workflow"""
@@ -0,0 +1,45 @@
+"""
+Chat model stand-ins shared by the test suites
+"""
+import asyncio
+import time
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def __eq__(self, other):
+        return isinstance(other, FakeResponse) and other.content == self.content
+
+
+class FakeLLM:
+    """
+    Answers ``content`` (or echoes the prompt when None) after ``delay`` seconds
+
+    Counts calls and records the last message of every prompt; ``bind`` keeps its kwargs in ``bound``.
+    """
+
+    def __init__(self, content=None, delay=0.0, bound=None):
+        self.content = content
+        self.delay = delay
+        self.bound = bound
+        self.calls = 0
+        self.prompts = []
+
+    def _answer(self, messages):
+        self.calls += 1
+        self.prompts.append(getattr(messages[-1], "content", messages[-1]) if messages else None)
+        return messages if self.content is None else FakeResponse(self.content)
+
+    def invoke(self, messages):
+        if self.delay:
+            time.sleep(self.delay)
+        return self._answer(messages)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.delay)
+        return self._answer(messages)
+
+    def bind(self, **kwargs):
+        return FakeLLM(self.content, self.delay, kwargs)
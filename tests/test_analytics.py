@@ -0,0 +1,98 @@
+"""
+Test suite for workflow output analytics
+"""
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.analytics import OutputAnalytics, flatten_output
+from utils.results_store import ResultsStore
+
+
+def make_output(execution_id, industry, effectiveness, disc, errors=(), day=1):
+    return {
+        "execution_metadata": {
+            "execution_id": execution_id,
+            "started_at": f"2026-01-{day:02d}T10:00:00",
+            "completed_at": f"2026-01-{day:02d}T10:01:00",
+            "total_duration": 60.0,
+            "status": "completed_with_errors" if errors else "completed"
+        },
+        "analysis_results": {
+            "customer_analysis": {"customer_name": f"Customer {execution_id}", "industry": industry, "company_size": "Medium"},
+            "conversation": {"messages": [{"sender": "Talan"}, {"sender": "Customer"}]},
+            "strategy_analysis": {"overall_effectiveness": effectiveness, "methodology_assessment": {"score": 7},
+                                  "recommendations": ["a", "b"]},
+            "personality_analysis": {"disc_profile": disc, "communication_style": "Analytical"}
+        },
+        "execution_details": {
+            "step_durations": {"document_analysis": 2.0, "message_composition": 4.0},
+            "errors": list(errors),
+            "warnings": []
+        }
+    }
+
+
+class TestOutputAnalytics(unittest.TestCase):
+    """Test cases for flattening, aggregates and incremental refresh"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.temp_dir, "results_store")
+        self.store = ResultsStore(root_dir=self.store_dir)
+
+        legacy = make_output("legacy-1", "Banking", 6.0, {"D": 0.7, "I": 0.1, "S": 0.1, "C": 0.1}, day=1)
+        with open(os.path.join(self.temp_dir, "b2b_sales_workflow_20260101_100000_complete_results.json"), "w") as f:
+            json.dump(legacy, f)
+
+        with self.store.batch():
+            self.store.append(make_output("run-1", "Retail", 8.0, {"D": 0.1, "I": 0.2, "S": 0.1, "C": 0.6}, day=2))
+            self.store.append(make_output("run-2", "Retail", 4.0, {"D": 0.1, "I": 0.2, "S": 0.1, "C": 0.6},
+                                          errors=["LLM timeout"], day=2))
+
+        self.analytics = OutputAnalytics(output_dir=self.temp_dir, store_dir=self.store_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_flatten(self):
+        row = flatten_output(make_output("x", "Retail", 5.0, {"D": 1, "I": 0, "S": 0, "C": 0}))
+        self.assertEqual(row["industry"], "Retail")
+        self.assertEqual(row["disc_D"], 1.0)
+        self.assertEqual(row["methodology_assessment_score"], 7.0)
+        self.assertEqual(row["step_message_composition"], 4.0)
+        self.assertEqual(row["message_count"], 2)
+
+    def test_loads_legacy_and_store(self):
+        self.assertEqual(len(self.analytics.frame), 3)
+        self.assertAlmostEqual(self.analytics.error_rate(), 1 / 3)
+
+    def test_aggregates(self):
+        self.assertEqual(self.analytics.effectiveness_percentiles([0.5])[0.5], 6.0)
+        disc = self.analytics.disc_distribution()
+        self.assertAlmostEqual(disc.loc["C", "share"], 2 / 3)
+        breakdown = self.analytics.industry_breakdown()
+        self.assertEqual(breakdown.loc["Retail", "runs"], 2)
+        self.assertEqual(breakdown.loc["Retail", "mean_effectiveness"], 6.0)
+        steps = self.analytics.step_duration_stats()
+        self.assertEqual(steps.loc["message_composition", "p50"], 4.0)
+        trend = self.analytics.trend("D")
+        self.assertEqual(list(trend["runs"]), [1, 2])
+
+    def test_incremental_refresh(self):
+        self.assertEqual(self.analytics.refresh(), 3)
+        self.assertEqual(self.analytics.refresh(), 0)
+        self.store.append(make_output("run-3", "Energy", 9.0, {"D": 0, "I": 1, "S": 0, "C": 0}, day=3))
+        self.store.flush()
+        self.assertEqual(self.analytics.refresh(), 1)
+        self.assertEqual(len(self.analytics.frame), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Test suite for the workflow HTTP API server
+"""
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_server import WorkflowService, create_server
+from config.settings import Config
+from utils.jobs import JobManager
+from utils.models import WorkflowState
+
+
+class FakeWorkflow:
+    """Stands in for PureLangGraphB2BWorkflow without calling the LLM"""
+
+    def run_document_analysis_only(self, customer_json_path=None, customer_data=None):
+        data = customer_data
+        if data is None:
+            with open(customer_json_path, encoding="utf-8") as f:
+                data = json.load(f)
+        return WorkflowState(customer_json_path=customer_json_path, status="document_analysis_complete",
+                             intermediate_results={"customer": data.get("name")})
+
+
+class TestApiServer(unittest.TestCase):
+    """Test cases for submit, poll and stream endpoints"""
+
+    def setUp(self):
+        self.jobs = JobManager(max_workers=2, max_queue=4, name="test-api")
+        self.server = create_server("127.0.0.1", 0, WorkflowService(FakeWorkflow(), self.jobs))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.jobs.shutdown(wait=True)
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=10) as response:
+                return response.status, response.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode("utf-8")
+
+    def test_submit_poll_and_stream(self):
+        status, body = self.request("POST", "/jobs", {"operation": "document_analysis",
+                                                      "customer_data": {"name": "Acme"}})
+        self.assertEqual(status, 202)
+        job_id = json.loads(body)["job_id"]
+
+        status, body = self.request("GET", f"/jobs/{job_id}?wait=5")
+        job = json.loads(body)
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"]["status"], "document_analysis_complete")
+        self.assertEqual(job["result"]["intermediate_results"]["customer"], "Acme")
+
+        status, body = self.request("GET", f"/jobs/{job_id}/events")
+        events = [json.loads(line)["event"] for line in body.splitlines()]
+        self.assertEqual(events[0], "queued")
+        self.assertEqual(events[-1], "succeeded")
+
+    def test_validation_and_health(self):
+        status, _ = self.request("POST", "/jobs", {"operation": "unknown"})
+        self.assertEqual(status, 400)
+        status, _ = self.request("POST", "/jobs", {"operation": "document_analysis", "customer_data": ["Acme"]})
+        self.assertEqual(status, 400)
+        status, _ = self.request("POST", "/jobs", ["document_analysis"])
+        self.assertEqual(status, 400)
+        status, _ = self.request("GET", "/jobs/missing")
+        self.assertEqual(status, 404)
+
+        status, body = self.request("POST", "/jobs", {"operation": "document_analysis",
+                                                      "customer_data": {"name": "Acme"}})
+        job_id = json.loads(body)["job_id"]
+        self.assertEqual(self.request("GET", f"/jobs/{job_id}?wait=soon")[0], 400)
+        self.assertEqual(self.request("GET", f"/jobs/{job_id}/events?since=first")[0], 400)
+        status, body = self.request("GET", "/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["workers"], 2)
+
+    def test_customer_paths_stay_in_data_directory(self):
+        customer_dir = tempfile.mkdtemp()
+        self.addCleanup(setattr, Config, "API_CUSTOMER_DIR", Config.API_CUSTOMER_DIR)
+        Config.API_CUSTOMER_DIR = customer_dir
+        with open(os.path.join(customer_dir, "acme.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": "Acme"}, f)
+        outside = os.path.join(os.path.dirname(customer_dir), "outside.json")
+
+        for path in ("../outside.json", outside, "missing.json", ["acme.json"]):
+            status, _ = self.request("POST", "/jobs", {"operation": "document_analysis", "customer_json_path": path})
+            self.assertEqual(status, 400, path)
+
+        status, body = self.request("POST", "/jobs", {"operation": "document_analysis",
+                                                      "customer_json_path": "acme.json"})
+        self.assertEqual(status, 202)
+        job = json.loads(self.request("GET", f"/jobs/{json.loads(body)['job_id']}?wait=5")[1])
+        self.assertEqual(job["result"]["intermediate_results"]["customer"], "Acme")
+
+        Config.API_CUSTOMER_DIR = ""
+        status, _ = self.request("POST", "/jobs", {"operation": "document_analysis", "customer_json_path": "acme.json"})
+        self.assertEqual(status, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
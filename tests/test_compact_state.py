@@ -0,0 +1,86 @@
+"""
+Test suite for compact message records and branch copies of workflow state
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.compact_state import CompactMessage, branch_copy, run_benchmark
+from utils.conversation_tasks import task_key, to_messages
+from utils.delta_checkpoint import MESSAGE_TYPE, DeltaCheckpointSaver
+from utils.models import (Conversation, ConversationChannel, ConversationParams, ConversationTone,
+                          CustomerAnalysis, Message, WorkflowState)
+
+
+def make_state():
+    return WorkflowState(
+        customer_analysis=CustomerAnalysis(customer_name="Acme", industry="Retail", company_size="Medium",
+                                           pain_points=[{"description": "Legacy ERP"}], needs=[]),
+        conversation_params=ConversationParams(goal="Discovery", tone=ConversationTone.PROFESSIONAL),
+        conversation=Conversation(conversation_id="c1", channel=ConversationChannel.LINKEDIN, messages=[
+            Message(sender="company", content="Bonjour", message_type="opening"),
+            Message(sender="customer", content="Bonjour, merci", message_type="response"),
+        ]),
+        completed_steps=["document_analysis"],
+        intermediate_results={"current_message_type": "opening"}
+    )
+
+
+class TestCompactState(unittest.TestCase):
+    """Test cases for interned message values, compact records and branch copies"""
+
+    def test_interned_values(self):
+        first = Message(sender="".join(["cust", "omer"]), content="a", message_type="".join(["resp", "onse"]))
+        second = Message(sender="".join(["cust", "omer"]), content="b", message_type="".join(["resp", "onse"]))
+        self.assertIs(first.sender, second.sender)
+        self.assertIs(first.message_type, second.message_type)
+
+    def test_branch_copy_isolation(self):
+        state = make_state()
+        branch = branch_copy(state)
+        self.assertIs(branch.customer_analysis, state.customer_analysis)
+        self.assertIs(branch.conversation.messages[0], state.conversation.messages[0])
+
+        branch.conversation.messages.append(Message(sender="company", content="Suite"))
+        branch.completed_steps.append("strategy_analysis")
+        branch.intermediate_results["x"] = 1
+        branch.conversation_params.channel = ConversationChannel.EMAIL
+        self.assertEqual(len(state.conversation.messages), 2)
+        self.assertEqual(state.completed_steps, ["document_analysis"])
+        self.assertNotIn("x", state.intermediate_results)
+        self.assertEqual(state.conversation_params.channel, ConversationChannel.EMAIL)
+
+    def test_compact_message_reads_like_a_dict(self):
+        record = {"sender": "company", "content": "Bonjour", "message_type": "opening", "channel": "LINKEDIN",
+                  "timestamp": "2026-10-19 09:30:00"}
+        message = CompactMessage.from_dict(record)
+        self.assertEqual(dict(message), record)
+        self.assertEqual((message["sender"], message.get("channel"), message.get("missing", "N/A")),
+                         ("company", "LINKEDIN", "N/A"))
+        self.assertIs(message.sender, CompactMessage.from_dict(dict(record, content="Autre")).sender)
+        self.assertFalse(hasattr(message, "__dict__"))
+        self.assertNotIn("channel", CompactMessage("customer", "Merci", "response"))
+        # Background tasks and their de-duplication keys take either form
+        self.assertEqual(task_key("s", "k", [message]), task_key("s", "k", [record]))
+        self.assertEqual(to_messages([message])[0].content, "Bonjour")
+
+    def test_checkpoints_store_compact_messages(self):
+        state = make_state()
+        saver = DeltaCheckpointSaver()
+        digest = saver._store("thread", state.conversation.messages[0])
+        self.assertEqual(saver.content.values[digest][0], MESSAGE_TYPE)
+        self.assertEqual(saver._load(digest), state.conversation.messages[0])
+        restored = saver._load(saver._store("thread", state))
+        self.assertEqual(restored.conversation, state.conversation)
+
+    def test_measured_bytes_per_conversation(self):
+        result = run_benchmark(sessions=5, turns=6)
+        self.assertLess(result["session_compact_bytes"], result["session_dict_bytes"])
+        self.assertLess(result["checkpoint_compact_bytes"], result["checkpoint_model_bytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Test suite for UI conversation tasks and background job wiring
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.conversation_tasks import build_analysis_state, resolve_speculation, task_key, to_messages
+from utils.jobs import Job, JobStatus
+
+CUSTOMER_INFO = {
+    "company_name": "Acme",
+    "industry": "Retail",
+    "company_size": "Medium",
+    "pain_points": [{"description": "Manual stock management"}],
+    "business_needs": [{"need": "ERP"}]
+}
+
+MESSAGES = [
+    {"sender": "company", "content": "Bonjour, Talan vous propose...", "message_type": "opening"},
+    {"sender": "customer", "content": "Merci, pouvez-vous détailler ?", "message_type": "response"}
+]
+
+
+class TestConversationTasks(unittest.TestCase):
+    """Test cases for task snapshots and de-duplication keys"""
+
+    def test_task_key_dedupes_identical_work(self):
+        self.assertEqual(task_key("s1", "strategy", [MESSAGES, CUSTOMER_INFO]),
+                         task_key("s1", "strategy", [list(MESSAGES), dict(CUSTOMER_INFO)]))
+        self.assertNotEqual(task_key("s1", "strategy", [MESSAGES]), task_key("s2", "strategy", [MESSAGES]))
+        self.assertNotEqual(task_key("s1", "strategy", [MESSAGES]), task_key("s1", "strategy", [MESSAGES[:1]]))
+
+    def test_build_analysis_state(self):
+        state = build_analysis_state(MESSAGES, CUSTOMER_INFO)
+        self.assertEqual(len(state.conversation.messages), 2)
+        self.assertEqual(state.customer_analysis.customer_name, "Acme")
+        self.assertEqual(state.customer_analysis.needs, [{"need": "ERP"}])
+        self.assertEqual([m.sender for m in to_messages(MESSAGES)], ["company", "customer"])
+
+    def test_speculative_reply_resolution(self):
+        key = task_key("s1", "customer_response", [MESSAGES, "draft", "goal"])
+        edited = task_key("s1", "customer_response", [MESSAGES, "draft (edited)", "goal"])
+
+        running = Job(lambda: None, (), {}, key=key)
+        self.assertEqual(resolve_speculation(running, key, key), "adopt")
+        self.assertEqual(resolve_speculation(running, key, edited), "discard")
+        self.assertEqual(resolve_speculation(None, key, key), "discard")
+
+        finished = Job(lambda: None, (), {}, key=key)
+        finished._finish(JobStatus.SUCCEEDED, result="Merci, envoyons une proposition.")
+        self.assertEqual(resolve_speculation(finished, key, key), "reuse")
+
+        cancelled = Job(lambda: None, (), {}, key=key)
+        cancelled.cancel()
+        self.assertEqual(resolve_speculation(cancelled, key, key), "discard")
+
+    def test_app_renders_with_background_panel(self):
+        try:
+            from streamlit.testing.v1 import AppTest
+        except ImportError:
+            self.skipTest("streamlit testing API not available")
+        from config.settings import Config
+        saved_key = Config.GROQ_API_KEY
+        # The sidebar stops the script when no API key is configured
+        Config.GROQ_API_KEY = saved_key or "test-key"
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", saved_key)
+        app_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "enhanced_app_styled.py")
+        at = AppTest.from_file(app_path, default_timeout=60)
+        at.session_state["customer_info"] = CUSTOMER_INFO
+        at.session_state["conversation_messages"] = list(MESSAGES)
+        at.run()
+        self.assertEqual(len(at.exception), 0)
+        labels = [button.label for button in at.button]
+        self.assertIn("🧠 Personality Analysis", labels)
+
+
+if __name__ == "__main__":
+    unittest.main()
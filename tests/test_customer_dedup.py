@@ -0,0 +1,136 @@
+"""
+Test suite for customer profile deduplication
+"""
+import unittest
+import sys
+import os
+import copy
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from pure_langgraph_workflow import PureLangGraphB2BWorkflow
+from utils.customer_dedup import CustomerDeduplicator, MinHasher, fingerprint, group_profiles, shingles
+from utils.models import CustomerAnalysis
+from utils.stage_memo import StageMemo
+
+ACME = {
+    "customer_name": "Acme Retail",
+    "industry": "Retail",
+    "updated_at": "2024-05-01T10:00:00",
+    "pain_points": ["Manual inventory tracking across forty stores causes frequent stock ruptures",
+                    "Legacy ERP cannot share real-time sales data with the e-commerce platform"],
+    "needs": ["Unified inventory platform with real-time visibility", "ERP integration and demand forecasting"],
+}
+
+
+def variant(profile, **changes):
+    result = copy.deepcopy(profile)
+    result.update(changes)
+    return result
+
+
+class FakeDocumentAgent:
+    """Document agent stand-in counting analyses"""
+
+    def __init__(self):
+        self.runs = 0
+
+    def execute(self, state, config=None):
+        self.runs += 1
+        data = state.intermediate_results["raw_customer_data"]
+        state.customer_analysis = CustomerAnalysis(customer_name=data["customer_name"], industry=data["industry"],
+                                                   company_size="Medium", pain_points=[], needs=[])
+        return state
+
+
+class TestCustomerDedup(unittest.TestCase):
+    """Test cases for canonical fingerprints, MinHash grouping and fan-out"""
+
+    def test_fingerprint_ignores_formatting_and_volatile_fields(self):
+        reordered = dict(reversed(list(ACME.items())))
+        noisy = variant(ACME, customer_name="  ACME   retail ", updated_at="2024-06-02T08:00:00", crm_id=42,
+                        needs=list(reversed(ACME["needs"])))
+        self.assertEqual(fingerprint(reordered), fingerprint(ACME))
+        self.assertEqual(fingerprint(noisy), fingerprint(ACME))
+        self.assertNotEqual(fingerprint(variant(ACME, industry="Banking")), fingerprint(ACME))
+
+    def test_minhash_estimates_jaccard(self):
+        hasher = MinHasher(num_perm=256)
+        left = shingles(ACME)
+        reworded = variant(ACME, needs=ACME["needs"][:1] + ["ERP integration and better demand forecasting"])
+        right = shingles(reworded)
+        exact = len(set(left) & set(right)) / len(set(left) | set(right))
+        estimate = hasher.similarity(hasher.signature(left), hasher.signature(right))
+        self.assertAlmostEqual(estimate, exact, delta=0.1)
+        self.assertEqual(hasher.similarity(hasher.signature(left), hasher.signature(list(left))), 1.0)
+
+    def test_groups_near_duplicates_of_the_same_company(self):
+        profiles = [
+            ACME,
+            variant(ACME, customer_name="ACME RETAIL", exported_at="yesterday"),
+            # One pain point slightly reworded
+            variant(ACME, pain_points=[ACME["pain_points"][0], "Legacy ERP cannot share real-time sales data "
+                                       "with the e-commerce platform today"]),
+            # Same text, another company: analysed separately
+            variant(ACME, customer_name="Globex"),
+            {"customer_name": "Initech", "industry": "Software", "pain_points": ["Slow releases"], "needs": ["CI/CD"]},
+        ]
+        self.assertEqual(group_profiles(profiles), [[0, 1, 2], [3], [4]])
+        deduplicator = CustomerDeduplicator()
+        for profile in profiles:
+            deduplicator.add(profile)
+        self.assertEqual((deduplicator.exact_duplicates, deduplicator.near_duplicates, len(deduplicator)), (1, 1, 3))
+        self.assertEqual(group_profiles(profiles, threshold=1.01), [[0, 1], [2], [3], [4]])
+
+    def test_batch_analyses_each_group_once(self):
+        workflow = PureLangGraphB2BWorkflow()
+        workflow.stage_memo = StageMemo()
+        workflow.document_agent = FakeDocumentAgent()
+        profiles = [ACME, variant(ACME, updated_at="2024-07-01"), variant(ACME, customer_name="Globex")]
+
+        results = workflow.run_document_analysis_batch(profiles)
+        self.assertEqual(workflow.document_agent.runs, 2)
+        self.assertEqual([state.customer_analysis.customer_name for state in results],
+                         ["Acme Retail", "Acme Retail", "Globex"])
+        self.assertIs(results[1].customer_analysis, results[0].customer_analysis)
+        self.assertEqual(results[1].intermediate_results["duplicate_of"], results[0].execution_id)
+        self.assertEqual(results[1].intermediate_results["raw_customer_data"]["updated_at"], "2024-07-01")
+        self.assertNotIn("duplicate_of", results[0].intermediate_results)
+
+        workflow.stage_memo.clear()
+        workflow.run_document_analysis_batch(profiles, deduplicate=False)
+        self.assertEqual(workflow.document_agent.runs, 5)
+
+    def test_streamed_batch_keeps_bounded_analyses(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        path = os.path.join(temp_dir, "export.ndjson")
+        profiles = [ACME, variant(ACME, customer_name="Globex"), variant(ACME, updated_at="2024-07-01")]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(json.dumps(profile) for profile in profiles))
+        workflow = PureLangGraphB2BWorkflow()
+        workflow.stage_memo = StageMemo()
+        workflow.document_agent = FakeDocumentAgent()
+
+        results = list(workflow.iter_document_analysis(path))
+        self.assertEqual(workflow.document_agent.runs, 2)
+        self.assertIs(results[2].customer_analysis, results[0].customer_analysis)
+        self.assertEqual(results[2].intermediate_results["duplicate_of"], results[0].execution_id)
+        self.assertEqual(results[2].status, "document_analysis_complete")
+
+        # Acme's analysis is evicted by Globex's: its duplicate is analysed again
+        workflow.stage_memo.clear()
+        with mock.patch.object(Config, "DEDUP_MAX_ANALYSES", 1):
+            results = list(workflow.iter_document_analysis(path))
+        self.assertEqual(workflow.document_agent.runs, 5)
+        self.assertNotIn("duplicate_of", results[2].intermediate_results)
+
+
+if __name__ == "__main__":
+    unittest.main()
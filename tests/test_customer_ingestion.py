@@ -0,0 +1,80 @@
+"""
+Test suite for single-pass customer profile ingestion
+"""
+import unittest
+import sys
+import os
+import io
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from utils.helpers import DataValidator, FileProcessor, load_customer_json
+from utils.models import WorkflowState
+
+PROFILE = {"customer_name": "Acme", "industry": "Retail", "pain_points": ["Stock ruptures"], "needs": []}
+
+
+class TestCustomerIngestion(unittest.TestCase):
+    """Test cases for load_customer_json and the document agent input steps"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.path = os.path.join(self.temp_dir, "customer.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(PROFILE, f)
+
+    def test_path_bytes_and_streams(self):
+        raw = json.dumps(PROFILE).encode("utf-8")
+        self.assertEqual(load_customer_json(self.path), PROFILE)
+        self.assertEqual(load_customer_json(raw), PROFILE)
+        self.assertEqual(load_customer_json(io.BytesIO(raw)), PROFILE)
+        self.assertEqual(load_customer_json(io.StringIO(raw.decode("utf-8"))), PROFILE)
+        self.assertEqual(FileProcessor().read_json_file(self.path), PROFILE)
+        self.assertTrue(DataValidator.validate_json_file(self.path))
+
+    def test_invalid_profiles(self):
+        with self.assertRaisesRegex(ValueError, "Invalid JSON format"):
+            load_customer_json(b"{not json")
+        with self.assertRaisesRegex(ValueError, "JSON object"):
+            load_customer_json(b"[1, 2]")
+        with self.assertRaisesRegex(ValueError, "'industry' must be str"):
+            load_customer_json(b'{"customer_name": "Acme", "industry": ["Retail"]}')
+        with self.assertRaises(FileNotFoundError):
+            load_customer_json(os.path.join(self.temp_dir, "missing.json"))
+        with self.assertRaisesRegex(ValueError, "must be a JSON"):
+            load_customer_json(os.path.join(self.temp_dir, "customer.txt"))
+        self.assertIsNone(FileProcessor().read_json_file(os.path.join(self.temp_dir, "missing.json")))
+
+    def test_document_agent_parses_once(self):
+        from agents import document_analysis_agent
+        saved_key = Config.GROQ_API_KEY
+        Config.GROQ_API_KEY = saved_key or "test-key"
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", saved_key)
+        agent = document_analysis_agent.DocumentAnalysisAgent()
+
+        with mock.patch.object(document_analysis_agent, "load_customer_json", wraps=load_customer_json) as loader, \
+                mock.patch("utils.helpers.load_customer_json", wraps=load_customer_json) as helper_loader:
+            state = agent._extract_customer_info(agent._validate_inputs(WorkflowState(customer_json_path=self.path)))
+        self.assertEqual(state.errors, [])
+        self.assertEqual(state.intermediate_results["raw_customer_data"], PROFILE)
+        self.assertEqual(loader.call_count + helper_loader.call_count, 1)
+
+        # A profile handed over already parsed needs no file at all
+        handed_over = WorkflowState(intermediate_results={"raw_customer_data": dict(PROFILE)})
+        state = agent._extract_customer_info(agent._validate_inputs(handed_over))
+        self.assertEqual(state.errors, [])
+        self.assertEqual(state.intermediate_results["raw_customer_data"], PROFILE)
+
+        invalid = agent._validate_inputs(WorkflowState(intermediate_results={"raw_customer_data": {"industry": 3}}))
+        self.assertEqual(len(invalid.errors), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Test suite for streaming customer exports
+"""
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import tracemalloc
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from pure_langgraph_workflow import PureLangGraphB2BWorkflow
+from utils.customer_stream import (FORMAT_ARRAY, FORMAT_NDJSON, FORMAT_OBJECTS, CustomerExportReader,
+                                   iter_customers)
+from utils.models import CustomerAnalysis
+from utils.stage_memo import StageMemo
+
+CUSTOMERS = [
+    {"customer_name": "Acme {inc} [EU]", "industry": "Retail", "needs": ["ERP"]},
+    {"customer_name": "Société \"Générale\" \\ Test", "industry": "Banque", "pain_points": [{"issue": "]}"}]},
+    {"customer_name": "Globex", "industry": "Énergie", "decision_makers": []},
+]
+
+
+class FakeDocumentAgent:
+    """Document agent stand-in reading the handed-over profile"""
+
+    def __init__(self):
+        self.names = []
+
+    def execute(self, state, config=None):
+        data = state.intermediate_results["raw_customer_data"]
+        self.names.append(data["customer_name"])
+        state.customer_analysis = CustomerAnalysis(customer_name=data["customer_name"], industry=data["industry"],
+                                                   company_size="Medium", pain_points=[], needs=[])
+        return state
+
+
+class TestCustomerStream(unittest.TestCase):
+    """Test cases for array/NDJSON parsing, chunk boundaries and resumable runs"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_formats_and_chunk_boundaries(self):
+        exports = {
+            FORMAT_ARRAY: self.write("array.json", json.dumps(CUSTOMERS, indent=2, ensure_ascii=False)),
+            FORMAT_NDJSON: self.write("export.ndjson", "\n".join(json.dumps(c) for c in CUSTOMERS) + "\n\n"),
+            FORMAT_OBJECTS: self.write("objects.json", "\n".join(json.dumps(c, indent=1) for c in CUSTOMERS)),
+        }
+        for chunk_bytes in (1, 7, 1 << 20):
+            with mock.patch.object(Config, "EXPORT_CHUNK_BYTES", chunk_bytes):
+                for export_format, path in exports.items():
+                    reader = CustomerExportReader(path)
+                    self.assertEqual(reader.format, export_format)
+                    records = list(reader)
+                    self.assertEqual([record.data for record in records], CUSTOMERS, (export_format, chunk_bytes))
+                    self.assertEqual([record.index for record in records], [0, 1, 2])
+                    with open(path, "rb") as f:
+                        raw = f.read()
+                    self.assertEqual(json.loads(raw[records[1].offset:records[1].end]), CUSTOMERS[1])
+
+    def test_invalid_records_are_skipped(self):
+        path = self.write("export.ndjson", '{"customer_name": "Acme"}\n{broken\n[1]\n{"customer_name": "Globex"}\n')
+        reader = CustomerExportReader(path)
+        self.assertEqual([record.data["customer_name"] for record in reader], ["Acme", "Globex"])
+        self.assertEqual(reader.skipped, 2)
+
+        truncated = self.write("truncated.json", json.dumps(CUSTOMERS)[:-10])
+        with self.assertRaisesRegex(ValueError, "Truncated"):
+            list(iter_customers(truncated))
+
+    def test_checkpoint_resumes_after_last_commit(self):
+        path = self.write("array.json", json.dumps(CUSTOMERS * 2))
+        checkpoint = os.path.join(self.temp_dir, "checkpoints", "array.json.offset")
+        with CustomerExportReader(path, checkpoint, checkpoint_every=10) as reader:
+            for record in reader:
+                reader.commit(record)
+                if record.index == 2:
+                    break
+
+        resumed = CustomerExportReader(path, checkpoint)
+        records = list(resumed)
+        self.assertEqual([record.index for record in records], [3, 4, 5])
+        self.assertEqual(records[0].data, CUSTOMERS[0])
+
+        # A checkpoint of another export is ignored
+        other = self.write("other.json", json.dumps(CUSTOMERS))
+        self.assertEqual(len(list(CustomerExportReader(other, checkpoint))), 3)
+
+    def test_memory_does_not_grow_with_export(self):
+        customer = {"customer_name": "Acme", "industry": "Retail", "needs": ["x" * 200] * 10}
+        path = os.path.join(self.temp_dir, "large.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[" + ",\n".join(json.dumps(customer) for _ in range(2000)) + "]")
+        self.assertGreater(os.path.getsize(path), 4_000_000)
+
+        with mock.patch.object(Config, "EXPORT_CHUNK_BYTES", 64 * 1024):
+            tracemalloc.start()
+            count = sum(1 for _ in iter_customers(path))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.assertEqual(count, 2000)
+        self.assertLess(peak, 1_000_000)
+
+    def test_workflow_batch_document_analysis(self):
+        path = self.write("export.ndjson", "\n".join(json.dumps(c) for c in CUSTOMERS))
+        checkpoint = os.path.join(self.temp_dir, "export.offset")
+        workflow = PureLangGraphB2BWorkflow()
+        workflow.stage_memo = StageMemo()
+        workflow.document_agent = FakeDocumentAgent()
+
+        batch = workflow.iter_document_analysis(path, checkpoint)
+        first = next(batch)
+        self.assertEqual(first.status, "document_analysis_complete")
+        self.assertEqual(first.customer_analysis.customer_name, CUSTOMERS[0]["customer_name"])
+        # Asking for the second customer commits the first; the second is still being handled
+        next(batch)
+        batch.close()
+
+        remaining = list(workflow.iter_document_analysis(path, checkpoint))
+        self.assertEqual([state.intermediate_results["export_record"]["index"] for state in remaining], [1, 2])
+        # The redelivered customer is served from the stage memo
+        self.assertEqual(workflow.document_agent.names, [c["customer_name"] for c in CUSTOMERS])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Test suite for the delta checkpoint saver
+"""
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+
+from utils.delta_checkpoint import DeltaCheckpointSaver, _saver_bytes
+from utils.models import Conversation, CustomerAnalysis, Message, WorkflowState
+
+
+def make_node(index):
+    def node(state: WorkflowState) -> WorkflowState:
+        state.conversation.messages.append(Message(sender="company", content=f"Étape {index} " + "mot " * 100))
+        state.mark_step_completed(f"step_{index}", 0.1)
+        return state
+    return node
+
+
+def make_app(saver, nodes=4):
+    graph = StateGraph(WorkflowState)
+    for index in range(nodes):
+        graph.add_node(f"step_{index}", make_node(index))
+        if index:
+            graph.add_edge(f"step_{index - 1}", f"step_{index}")
+    graph.set_entry_point("step_0")
+    graph.add_edge(f"step_{nodes - 1}", END)
+    return graph.compile(checkpointer=saver)
+
+
+def make_state():
+    return WorkflowState(
+        customer_analysis=CustomerAnalysis(customer_name="Acme", industry="Retail", company_size="Medium",
+                                           pain_points=[{"description": "Legacy ERP"}] * 5, needs=[]),
+        conversation=Conversation(conversation_id="c1", messages=[
+            Message(sender="customer", content="Bonjour " * 50, message_type="response")
+        ])
+    )
+
+
+def without_times(value):
+    """Dumped value without timestamps, which differ between the two runs"""
+    value = value.model_dump() if hasattr(value, "model_dump") else value
+    if isinstance(value, dict):
+        return {key: without_times(item) for key, item in value.items() if not isinstance(item, datetime)}
+    if isinstance(value, list):
+        return [without_times(item) for item in value]
+    return value
+
+
+def history(app, thread_id):
+    config = {"configurable": {"thread_id": thread_id}}
+    return [(snapshot.values, snapshot.metadata) for snapshot in app.get_state_history(config)]
+
+
+class TestDeltaCheckpoint(unittest.TestCase):
+    """Test cases for step reconstruction and structural sharing"""
+
+    def run_both(self, threads=1, saver=None):
+        full, delta = MemorySaver(), saver or DeltaCheckpointSaver()
+        full_app, delta_app = make_app(full), make_app(delta)
+        for index in range(threads):
+            config = {"configurable": {"thread_id": f"t{index}"}}
+            state = make_state()
+            full_app.invoke(state.model_copy(deep=True), config)
+            delta_app.invoke(state, config)
+        return full, full_app, delta, delta_app
+
+    def assert_same_history(self, full_app, delta_app, thread_id):
+        expected, actual = history(full_app, thread_id), history(delta_app, thread_id)
+        self.assertEqual(len(actual), len(expected))
+        for (expected_values, expected_meta), (values, meta) in zip(expected, actual):
+            self.assertEqual(set(values), set(expected_values))
+            self.assertEqual(without_times(values), without_times(expected_values))
+            self.assertEqual(meta["step"], expected_meta["step"])
+            self.assertEqual(set(meta.get("writes") or {}), set(expected_meta.get("writes") or {}))
+
+    def test_every_step_is_reconstructed(self):
+        _, full_app, _, delta_app = self.run_both()
+        self.assert_same_history(full_app, delta_app, "t0")
+        final = delta_app.get_state({"configurable": {"thread_id": "t0"}}).values
+        self.assertEqual(len(final["conversation"].messages), 5)
+        self.assertEqual(final["completed_steps"], [f"step_{index}" for index in range(4)])
+
+    def test_stores_fewer_bytes(self):
+        full, _, delta, _ = self.run_both(threads=3)
+        self.assertLess(_saver_bytes(delta) * 2, _saver_bytes(full))
+        self.assertGreater(delta.stats()["compression"], 2)
+
+    def test_periodic_full_snapshot(self):
+        _, full_app, delta, delta_app = self.run_both(saver=DeltaCheckpointSaver(full_snapshot_every=1))
+        self.assert_same_history(full_app, delta_app, "t0")
+        without_full = DeltaCheckpointSaver(full_snapshot_every=1000)
+        make_app(without_full).invoke(make_state(), {"configurable": {"thread_id": "t0"}})
+        self.assertGreater(delta.stats()["serialized"], without_full.stats()["serialized"])
+
+    def test_nodes_do_not_mutate_checkpointed_values(self):
+        # Checkpoints are written in the background: what a node received must stay as it was
+        received = []
+
+        def record(state: WorkflowState) -> WorkflowState:
+            received.append(state.conversation)
+            state.conversation.messages.append(Message(sender="company", content="Suite"))
+            return state
+
+        graph = StateGraph(WorkflowState)
+        graph.add_node("first", record)
+        graph.add_node("second", record)
+        graph.add_edge("first", "second")
+        graph.set_entry_point("first")
+        graph.add_edge("second", END)
+        initial = make_state()
+        graph.compile().invoke(initial)
+        self.assertEqual([len(conversation.messages) for conversation in received], [2, 3])
+        self.assertEqual(len(initial.conversation.messages), 1)
+        self.assertIs(received[1].messages[0], initial.conversation.messages[0])
+
+    def test_delete_thread_releases_content(self):
+        _, _, delta, _ = self.run_both(threads=2)
+        both = delta.content.stored_bytes()
+        delta.delete_thread("t0")
+        self.assertTrue(0 < delta.content.stored_bytes() < both)
+        self.assertIsNotNone(delta.get_tuple({"configurable": {"thread_id": "t1"}}))
+        delta.delete_thread("t1")
+        self.assertEqual(delta.content.stored_bytes(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
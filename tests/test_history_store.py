@@ -0,0 +1,84 @@
+"""
+Test suite for the bounded conversation history
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.history_store import ConversationHistory
+from utils.models import StrategyAnalysis
+from utils.results_store import ResultsStore
+from utils.view_models import strategy_view
+
+
+def make_entry(number):
+    return {
+        "timestamp": f"2024-05-01 10:00:{number:02d}",
+        "company_message": f"Message {number} " + "détails " * 40,
+        "customer_response": f"Réponse {number}",
+        "message_type": "follow_up",
+        "channel": "EMAIL",
+        "goal": "Discovery",
+        "personality_analysis": None,
+        "strategy_analysis": StrategyAnalysis(
+            conversation_id=f"c{number}", overall_effectiveness=float(number), methodology_assessment={"score": 5},
+            competitive_positioning={}, objection_handling={}, value_proposition_delivery={}, recommendations=["ROI"],
+            improvement_areas=[], strengths=[], next_steps=[]),
+    }
+
+
+class TestConversationHistory(unittest.TestCase):
+    """Test cases for the in-memory window, spilling and pagination"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.store = ResultsStore(root_dir=self.temp_dir)
+        self.history = ConversationHistory("session-1", store=self.store, window=3, page_size=4)
+        self.entries = [make_entry(number) for number in range(1, 11)]
+        for entry in self.entries:
+            self.history.append(entry)
+
+    def test_window_bounds_memory(self):
+        self.assertEqual(len(self.history), 10)
+        self.assertEqual(self.history.in_memory(), 3)
+        self.assertIs(self.history.get(10), self.entries[-1])
+        self.assertEqual(len(self.store.find(execution_id="session-1")), 7)
+
+    def test_spilled_entry_round_trip(self):
+        entry = self.history.get(2)
+        self.assertIsNot(entry, self.entries[1])
+        self.assertEqual(entry["customer_response"], "Réponse 2")
+        self.assertEqual(entry["strategy_analysis"]["overall_effectiveness"], 2.0)
+        self.assertEqual(strategy_view(entry["strategy_analysis"]).methodology_score, 5)
+        # Rerendering the same exchange reuses the loaded entry (and thus its cached views)
+        self.assertIs(self.history.get(2), entry)
+        self.assertEqual(self.history.in_memory(), 4)
+        self.assertIsNone(self.history.get(11))
+
+    def test_pages_list_newest_first(self):
+        self.assertEqual(self.history.page_count, 3)
+        self.assertEqual([summary.index for summary in self.history.page(1)], [10, 9, 8, 7])
+        self.assertEqual([summary.index for summary in self.history.page(3)], [2, 1])
+        self.assertEqual(self.history.page(9), self.history.page(3))
+        summary = self.history.page(1)[0]
+        self.assertTrue(summary.has_analysis)
+        self.assertLessEqual(len(summary.company_excerpt), 120)
+        self.assertTrue(summary.company_excerpt.endswith("…"))
+
+    def test_clear(self):
+        self.history.get(1)
+        self.history.clear()
+        self.assertFalse(self.history)
+        self.assertEqual(self.history.in_memory(), 0)
+        self.assertEqual(self.history.page_count, 1)
+        self.assertEqual(self.history.append(make_entry(1)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Test suite for incremental strategy/personality analysis
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from utils.conversation_tasks import _update_analysis_snapshot
+from utils.incremental_analysis import blend_score, merge_list, message_features, pending_turns
+from utils.models import StrategyAnalysis
+from tests.fakes import FakeLLM
+
+CUSTOMER_INFO = {"company_name": "Acme", "industry": "Retail", "company_size": "Medium",
+                 "pain_points": [{"description": "Manual stock management"}]}
+
+
+def turn(i):
+    sender = "company" if i % 2 == 0 else "customer"
+    return {"sender": sender, "content": f"Message {i} : quel budget pour le cloud ?", "message_type": "text"}
+
+
+class RecordingAgent:
+    """Stands in for the analysis agents and records what each update receives"""
+    calls = []
+
+    def update_analysis(self, previous, customer_analysis, new_messages, features, analyzed):
+        RecordingAgent.calls.append((len(new_messages), analyzed, features))
+        return f"{previous}+{len(new_messages)}"
+
+
+class TestIncrementalAnalysis(unittest.TestCase):
+    """Test cases for delta detection and score merging"""
+
+    def setUp(self):
+        RecordingAgent.calls = []
+        self.full_runs = []
+
+    def full_task(self, messages, customer_info):
+        self.full_runs.append(len(messages))
+        return "full"
+
+    def update(self, messages, snapshot):
+        return _update_analysis_snapshot(self.full_task, RecordingAgent, messages, CUSTOMER_INFO, snapshot,
+                                         counts_customer_only=False)
+
+    def test_only_new_turns_are_analyzed(self):
+        conversation = [turn(i) for i in range(4)]
+        snapshot = self.update(conversation, None)
+        self.assertEqual(self.full_runs, [4])
+
+        for size in (6, 8, 10):
+            conversation = [turn(i) for i in range(size)]
+            snapshot = self.update(conversation, snapshot)
+        self.assertEqual(self.full_runs, [4])
+        self.assertEqual([call[:2] for call in RecordingAgent.calls], [(2, 4), (2, 6), (2, 8)])
+        self.assertEqual(RecordingAgent.calls[0][2]["objections"], 2)
+        self.assertEqual(snapshot["analysis"], "full+2+2+2")
+        self.assertIs(self.update(conversation, snapshot), snapshot)
+
+    def test_edited_history_triggers_full_analysis(self):
+        conversation = [turn(i) for i in range(4)]
+        snapshot = self.update(conversation, None)
+        edited = [dict(conversation[0], content="Autre ouverture")] + conversation[1:] + [turn(4)]
+        self.update(edited, snapshot)
+        self.assertEqual(self.full_runs, [4, 5])
+        self.assertIsNone(pending_turns(snapshot, conversation + [turn(4)], "another-customer"))
+        self.assertEqual(pending_turns(snapshot, conversation + [turn(4)], snapshot["context"]), [turn(4)])
+
+    def test_update_limit_forces_refresh(self):
+        snapshot = self.update([turn(0), turn(1)], None)
+        snapshot["updates"] = Config.INCREMENTAL_ANALYSIS_MAX_UPDATES
+        self.update([turn(i) for i in range(3)], snapshot)
+        self.assertEqual(self.full_runs, [2, 3])
+
+    def test_merge_helpers(self):
+        self.assertEqual(blend_score(6.0, 4, 9.0, 2), 7.0)
+        self.assertEqual(blend_score(6.0, 4, "n/a", 2), 6.0)
+        self.assertEqual(blend_score(None, 0, 12, 2), 10.0)
+        self.assertEqual(merge_list(["b", "c"], ["a", "b"]), ["b", "c", "a"])
+        self.assertEqual(message_features(turn(1))["services"], ["cloud"])
+
+    def test_strategy_agent_update(self):
+        from agents.strategy_agent_pure import StrategyAgentPure
+
+        api_key = Config.GROQ_API_KEY
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", api_key)
+        Config.GROQ_API_KEY = Config.GROQ_API_KEY or "test-key"
+
+        previous = StrategyAnalysis(
+            conversation_id="c1", overall_effectiveness=6.0,
+            methodology_assessment={"effectiveness_score": 6.0}, competitive_positioning={},
+            objection_handling={}, value_proposition_delivery={"overall_delivery_score": 5.0},
+            recommendations=["Quantify ROI"], improvement_areas=["Discovery"], strengths=["Tone"], next_steps=[]
+        )
+        agent = StrategyAgentPure()
+        agent.llm = FakeLLM('{"overall_effectiveness": 9, "methodology_score": 9, "value_prop_score": 8,'
+                            ' "strengths": ["Handled budget objection"], "next_steps": ["Send proposal"]}')
+        from utils.conversation_tasks import customer_analysis_from_info, to_messages
+        updated = agent.update_analysis(previous, customer_analysis_from_info(CUSTOMER_INFO),
+                                        to_messages([turn(4), turn(5)]), {"objections": 2}, 4)
+        self.assertEqual(updated.overall_effectiveness, 7.0)
+        self.assertEqual(updated.methodology_assessment["effectiveness_score"], 7.0)
+        self.assertEqual(updated.value_proposition_delivery["overall_delivery_score"], 6.0)
+        self.assertEqual(updated.strengths, ["Handled budget objection", "Tone"])
+        self.assertEqual(updated.next_steps, ["Send proposal"])
+        self.assertNotIn("Message 0", agent.llm.prompts[0])
+        self.assertIn("Message 5", agent.llm.prompts[0])
+
+        agent.llm = FakeLLM("Désolé, je ne peux pas répondre en JSON.")
+        self.assertIsNone(agent.update_analysis(previous, customer_analysis_from_info(CUSTOMER_INFO),
+                                                to_messages([turn(4), turn(5)]), {"objections": 2}, 4))
+
+    def test_unparseable_update_keeps_turns_pending(self):
+        from agents.strategy_agent_pure import StrategyAgentPure
+
+        api_key = Config.GROQ_API_KEY
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", api_key)
+        Config.GROQ_API_KEY = Config.GROQ_API_KEY or "test-key"
+
+        class UnparseableAgent(StrategyAgentPure):
+            def __init__(self):
+                super().__init__()
+                self.llm = FakeLLM("Pas de JSON cette fois")
+
+        conversation = [turn(i) for i in range(4)]
+        snapshot = self.update(conversation, None)
+        snapshot["analysis"] = StrategyAnalysis(
+            conversation_id="c1", overall_effectiveness=6.0, methodology_assessment={}, competitive_positioning={},
+            objection_handling={}, value_proposition_delivery={}, recommendations=[], improvement_areas=[],
+            strengths=[], next_steps=[]
+        )
+        longer = conversation + [turn(4), turn(5)]
+        unchanged = _update_analysis_snapshot(self.full_task, UnparseableAgent, longer, CUSTOMER_INFO, snapshot,
+                                              counts_customer_only=False)
+        self.assertIs(unchanged, snapshot)
+        self.assertEqual(pending_turns(unchanged, longer, snapshot["context"]), [turn(4), turn(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
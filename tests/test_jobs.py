@@ -0,0 +1,101 @@
+"""
+Test suite for the in-process job manager
+"""
+import unittest
+import sys
+import os
+import threading
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jobs import Job, JobManager, JobStatus, QueueFullError, current_job
+
+
+class TestJobManager(unittest.TestCase):
+    """Test cases for job execution, de-duplication and backpressure"""
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.manager = JobManager(max_workers=1, max_queue=1, overflow_policy="reject", retention=10)
+
+    def tearDown(self):
+        self.release.set()
+        self.manager.shutdown(wait=True)
+
+    def blocking(self, value):
+        self.release.wait(5)
+        return value
+
+    def test_success_and_events(self):
+        def work(x):
+            current_job().emit("progress", {"x": x})
+            return x * 2
+
+        job = self.manager.submit(work, 21, kind="double")
+        self.assertTrue(job.wait(5))
+        self.assertEqual(job.status, JobStatus.SUCCEEDED)
+        self.assertEqual(job.result, 42)
+        self.assertEqual([e["event"] for e in job.iter_events()], ["queued", "started", "progress", "succeeded"])
+
+    def test_failure_is_recorded(self):
+        def boom():
+            raise ValueError("bad input")
+
+        job = self.manager.submit(boom)
+        job.wait(5)
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertIn("bad input", job.error)
+
+    def test_dedupe_by_key(self):
+        first = self.manager.submit(self.blocking, 1, key="session-1")
+        second = self.manager.submit(self.blocking, 2, key="session-1")
+        self.assertIs(first, second)
+        self.release.set()
+        first.wait(5)
+        third = self.manager.submit(self.blocking, 3, key="session-1")
+        self.assertIsNot(third, first)
+        third.wait(5)
+        self.assertEqual(third.result, 3)
+
+    def test_cancelled_job_is_not_reused(self):
+        first = self.manager.submit(self.blocking, 1, key="reply")
+        while first.status != JobStatus.RUNNING:
+            first.wait(0.01)
+        first.cancel()
+        second = self.manager.submit(self.blocking, 2, key="reply")
+        self.assertIsNot(second, first)
+        self.release.set()
+        first.wait(5)
+        second.wait(5)
+        self.assertEqual(first.status, JobStatus.CANCELLED)
+        self.assertEqual(second.result, 2)
+
+    def test_cancel_and_start_are_exclusive(self):
+        # A job is either cancelled before a worker starts it, or runs and is only flagged
+        job = Job(self.blocking, (2,), {})
+        self.assertTrue(job.start())
+        self.assertFalse(job.cancel())
+        self.assertTrue(job.cancel_requested)
+        self.assertEqual(job.status, JobStatus.RUNNING)
+
+        queued = Job(self.blocking, (3,), {})
+        self.assertTrue(queued.cancel())
+        self.assertFalse(queued.start())
+        self.assertEqual(queued.status, JobStatus.CANCELLED)
+
+    def test_reject_when_saturated(self):
+        running = self.manager.submit(self.blocking, 1)
+        while running.status != JobStatus.RUNNING:
+            running.wait(0.01)
+        queued = self.manager.submit(self.blocking, 2)
+        with self.assertRaises(QueueFullError):
+            self.manager.submit(self.blocking, 3)
+        self.assertTrue(queued.cancel())
+        self.release.set()
+        running.wait(5)
+        self.assertEqual(queued.status, JobStatus.CANCELLED)
+
+
+if __name__ == "__main__":
+    unittest.main()
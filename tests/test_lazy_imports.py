@@ -0,0 +1,40 @@
+"""
+Test suite for lazy imports and cold start of the workflow package
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.import_benchmark import measure_import
+
+
+class TestLazyImports(unittest.TestCase):
+    """Heavy dependencies must only load when a feature needs them"""
+
+    def test_workflow_import_is_light(self):
+        result = measure_import("pure_langgraph_workflow")
+        self.assertEqual(result["loaded"], [])
+
+    def test_packages_import_is_light(self):
+        for module in ("agents", "config", "utils"):
+            self.assertEqual(measure_import(module)["loaded"], [], module)
+
+    def test_agent_import_on_attribute_access(self):
+        import agents
+        from agents.document_analysis_agent import DocumentAnalysisAgent
+        self.assertIs(agents.DocumentAnalysisAgent, DocumentAnalysisAgent)
+
+    def test_agents_built_on_first_use(self):
+        from pure_langgraph_workflow import PureLangGraphB2BWorkflow
+        workflow = PureLangGraphB2BWorkflow()
+        self.assertNotIn("_document_agent", workflow.__dict__)
+        sentinel = object()
+        workflow.strategy_agent = sentinel
+        self.assertIs(workflow.strategy_agent, sentinel)
+
+
+if __name__ == "__main__":
+    unittest.main()
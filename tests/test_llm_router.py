@@ -0,0 +1,240 @@
+"""
+Test suite for the multi-backend LLM router, against local OpenAI-compatible stub servers
+"""
+import unittest
+import sys
+import os
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.schema import HumanMessage, SystemMessage
+
+from config.settings import Config, _json_env
+from utils.llm_router import (Backend, BackendStats, LLMRouter, OpenAICompatibleChat, create_client, create_llm,
+                              route_backends)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = self.server.stub
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        stub.requests.append(body)
+        time.sleep(stub.delay)
+        if stub.fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+        payload = json.dumps({
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"{stub.name}: {body['messages'][-1]['content']}"}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode("utf-8")
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except ConnectionError:
+            pass  # the client timed out
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """OpenAI-compatible chat completions endpoint answering after ``delay`` seconds (or failing)"""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def backend(self):
+        return Backend(self.name, OpenAICompatibleChat("stub-model", self.base_url, timeout=5), BackendStats(window=20))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def prompt(text):
+    return [SystemMessage(content="Analyse"), HumanMessage(content=text)]
+
+
+class ThreadRecordingChat:
+    """Client answering after ``delay`` seconds and recording the names of the threads it was called from"""
+
+    def __init__(self, delay=0.0, threads=None):
+        self.delay = delay
+        self.threads = [] if threads is None else threads
+
+    def invoke(self, messages, **kwargs):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        return messages
+
+    def bind(self, **kwargs):
+        return ThreadRecordingChat(self.delay, self.threads)
+
+
+class TestLLMRouter(unittest.TestCase):
+    """Test cases for latency tracking, hedging, failover and routing"""
+
+    def stub(self, name, **kwargs):
+        server = StubServer(name, **kwargs)
+        self.addCleanup(server.close)
+        return server
+
+    def test_openai_compatible_client(self):
+        server = self.stub("local")
+        llm = OpenAICompatibleChat("stub-model", server.base_url, api_key="k", temperature=0.2)
+        self.assertEqual(llm.invoke(prompt("Acme")).content, "local: Acme")
+        self.assertEqual(server.requests[0]["messages"], [{"role": "system", "content": "Analyse"},
+                                                           {"role": "user", "content": "Acme"}])
+        self.assertEqual(asyncio.run(llm.bind(temperature=0.9).ainvoke(prompt("Globex"))).content, "local: Globex")
+        self.assertEqual([request["temperature"] for request in server.requests], [0.2, 0.9])
+
+    def test_percentiles(self):
+        stats = BackendStats(window=10)
+        self.assertIsNone(stats.percentile(50))
+        for seconds in range(1, 21):
+            stats.record(seconds / 10)
+        stats.record(5.0, ok=False)
+        self.assertEqual((stats.samples, stats.percentile(50), stats.percentile(95)), (10, 1.5, 2.0))
+        self.assertEqual((stats.requests, stats.errors, stats.consecutive_failures), (21, 1, 1))
+
+    def test_slow_primary_is_hedged(self):
+        slow, fast = self.stub("slow", delay=0.6), self.stub("fast", delay=0.05)
+        router = LLMRouter([slow.backend(), fast.backend()], hedge_after=0.1)
+
+        async def hedged():
+            started = time.monotonic()
+            return await router.ainvoke(prompt("Globex")), time.monotonic() - started
+
+        response, seconds = asyncio.run(hedged())
+        self.assertEqual(response.content, "fast: Globex")
+        self.assertLess(seconds, 0.5)
+        stats = router.stats()
+        self.assertEqual((stats["fast"]["hedges"], stats["fast"]["wins"]), (1, 1))
+
+        started = time.monotonic()
+        self.assertEqual(router.invoke(prompt("Acme")).content, "fast: Acme")
+        self.assertLess(time.monotonic() - started, 0.5)
+        stats = router.stats()
+        self.assertEqual((stats["fast"]["hedges"], stats["fast"]["wins"]), (2, 2))
+        self.assertEqual(len(slow.requests), 2)
+
+    def test_hedge_in_flight_answers_when_primary_fails(self):
+        down, up = self.stub("down", delay=0.3, fail=True), self.stub("up", delay=0.05)
+        router = LLMRouter([down.backend(), up.backend()], hedge_after=0.1)
+        started = time.monotonic()
+        self.assertEqual(router.invoke(prompt("Acme")).content, "up: Acme")
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(len(up.requests), 1)
+        self.assertEqual(router.stats()["up"]["wins"], 1)
+
+    def test_hedges_time_out_sooner(self):
+        timeout = Config.LLM_HEDGE_TIMEOUT
+        self.addCleanup(setattr, Config, "LLM_HEDGE_TIMEOUT", timeout)
+        Config.LLM_HEDGE_TIMEOUT = 0.2
+        down, stuck, up = self.stub("down", delay=0.3, fail=True), self.stub("stuck", delay=2), self.stub("up")
+        router = LLMRouter([down.backend(), stuck.backend(), up.backend()], hedge_after=0.1)
+        started = time.monotonic()
+        self.assertEqual(router.invoke(prompt("Acme")).content, "up: Acme")
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(len(stuck.requests), 1)
+        self.assertEqual(router.stats()["stuck"]["errors"], 1)
+
+    def test_hedges_run_on_their_own_pool(self):
+        primary, other = ThreadRecordingChat(delay=0.3), ThreadRecordingChat()
+        router = LLMRouter([Backend("primary", primary), Backend("other", other)], hedge_after=0.05)
+        router.invoke(prompt("Acme"))
+        self.assertTrue(primary.threads[0].startswith("llm-router"))
+        self.assertTrue(other.threads[0].startswith("llm-hedge"))
+
+    def test_ranking_follows_latency_and_adaptive_hedge(self):
+        slow, fast = self.stub("slow", delay=0.15), self.stub("fast")
+        router = LLMRouter([slow.backend(), fast.backend()], hedge_after=0)
+        # Unmeasured: configured order, hedged after the initial delay (never reached here)
+        self.assertEqual([b.name for b in router.ranked()], ["slow", "fast"])
+        for backend in router.backends:
+            for _ in range(Config.LLM_LATENCY_MIN_SAMPLES):
+                backend.stats.record(0.15 if backend.name == "slow" else 0.01)
+        self.assertEqual([b.name for b in router.ranked()], ["fast", "slow"])
+        self.assertEqual(router.hedge_delay(router.backends[1]), Config.LLM_HEDGE_MIN_SECONDS)
+        self.assertEqual(router.invoke(prompt("Acme")).content, "fast: Acme")
+        self.assertEqual(slow.requests, [])
+
+    def test_failover_and_health(self):
+        down, up = self.stub("down", fail=True), self.stub("up")
+        router = LLMRouter([down.backend(), up.backend()], hedge_after=5)
+        for _ in range(Config.LLM_BACKEND_MAX_FAILURES):
+            self.assertEqual(router.invoke(prompt("Acme")).content, "up: Acme")
+        self.assertFalse(router.backends[0].stats.healthy)
+        # Unhealthy backends are ranked last: no more requests while another answers
+        router.invoke(prompt("Acme"))
+        self.assertEqual(len(down.requests), Config.LLM_BACKEND_MAX_FAILURES)
+
+        up.fail = True
+        with self.assertRaises(Exception):
+            router.invoke(prompt("Acme"))
+
+        bound = router.bind(temperature=0.1)
+        self.assertIs(bound.backends[0].stats, router.backends[0].stats)
+        self.assertEqual(bound.temperature, 0.1)
+
+    def test_env_json_is_parsed_defensively(self):
+        for value, expected in (("", {}), ("not json", {}), ('["groq"]', {}), ('{"a": ["b"]}', {"a": ["b"]})):
+            os.environ["LLM_ROUTES_TEST"] = value
+            self.assertEqual(_json_env("LLM_ROUTES_TEST"), expected)
+        del os.environ["LLM_ROUTES_TEST"]
+        self.assertEqual(_json_env("LLM_ROUTES_TEST"), {})
+
+    def test_routes(self):
+        routes, backends = Config.LLM_ROUTES, Config.LLM_BACKENDS
+        self.addCleanup(setattr, Config, "LLM_ROUTES", routes)
+        self.addCleanup(setattr, Config, "LLM_BACKENDS", backends)
+        local = self.stub("local")
+        Config.LLM_BACKENDS = {**backends, "local": {"provider": "openai", "model": "m", "base_url": local.base_url},
+                               "local2": {"provider": "openai", "model": "m", "base_url": local.base_url}}
+        Config.LLM_ROUTES = {"default": ["groq"], "StrategyAgent": ["local", "local2"],
+                             "StrategyAgent.update_analysis": ["local"]}
+
+        self.assertEqual(route_backends("document_analysis"), ["groq"])
+        self.assertEqual(route_backends("StrategyAgent"), ["local", "local2"])
+        self.assertIsNone(route_backends("StrategyAgent", "analyze_methodology"))
+        self.assertIsInstance(create_llm(["local", "local2"]), LLMRouter)
+        self.assertIsInstance(create_llm(["local"]), OpenAICompatibleChat)
+        with self.assertRaises(ValueError):
+            create_llm(["missing"])
+        with self.assertRaises(ValueError):
+            create_client({"provider": "unknown"})
+
+        from agents.strategy_agent_pure import StrategyAgentPure
+
+        agent = StrategyAgentPure()
+        self.assertIsInstance(agent.llm.llm, LLMRouter)
+        self.assertIs(agent.llm_for("analyze_methodology"), agent.llm)
+        self.assertIsInstance(agent.llm_for("update_analysis").llm, OpenAICompatibleChat)
+        self.assertEqual(agent.llm_for("update_analysis").invoke(prompt("Acme")).content, "local: Acme")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Test suite for the asynchronous logging pipeline
+"""
+import unittest
+import sys
+import os
+import json
+import logging
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from utils import log_pipeline
+
+
+class ExplodingPayload:
+    """Payload whose rendering must never happen when payload logging is off"""
+
+    def __str__(self):
+        raise AssertionError("payload was formatted")
+
+    __repr__ = __str__
+
+
+class TestLogPipeline(unittest.TestCase):
+    """Test cases for queue-based JSON logging and payload sampling"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.saved = {name: getattr(Config, name) for name in ("LOG_FILE", "LOG_JSON", "LOG_PAYLOADS", "LOG_LEVEL")}
+        Config.LOG_FILE = os.path.join(self.temp_dir, "app.log")
+        Config.LOG_JSON = True
+        Config.LOG_LEVEL = "INFO"
+        log_pipeline.configure_logging(force=True)
+        self.logger = logging.getLogger("tests.log_pipeline")
+
+    def tearDown(self):
+        log_pipeline.shutdown_logging()
+        for name, value in self.saved.items():
+            setattr(Config, name, value)
+        log_pipeline.configure_logging(force=True)
+
+    def read_records(self):
+        log_pipeline.shutdown_logging()
+        if not os.path.exists(Config.LOG_FILE):
+            # The file handler opens lazily, so nothing logged means no file
+            return []
+        with open(Config.LOG_FILE, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def test_json_records(self):
+        self.logger.info("hello %s", "world", extra={"execution_id": "abc"})
+        records = [r for r in self.read_records() if r["logger"] == "tests.log_pipeline"]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["message"], "hello world")
+        self.assertEqual(records[0]["level"], "INFO")
+        self.assertEqual(records[0]["execution_id"], "abc")
+
+    def test_payload_off_skips_formatting(self):
+        Config.LOG_PAYLOADS = "off"
+        log_pipeline.log_payload(self.logger, "[LLM RAW RESPONSE]", ExplodingPayload())
+        self.assertEqual([r for r in self.read_records() if r["logger"] == "tests.log_pipeline"], [])
+
+    def test_payload_full(self):
+        Config.LOG_PAYLOADS = "full"
+        log_pipeline.log_payload(self.logger, "[LLM RAW RESPONSE]", {"answer": 42})
+        records = [r for r in self.read_records() if r["logger"] == "tests.log_pipeline"]
+        self.assertEqual(len(records), 1)
+        self.assertTrue(records[0]["payload"])
+        self.assertIn("42", records[0]["message"])
+
+    def test_message_is_rendered_in_caller_thread(self):
+        handler = log_pipeline.NonBlockingQueueHandler(None)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = self.logger.makeRecord(self.logger.name, logging.ERROR, __file__, 0, "failed %s",
+                                            ({"stage": "analysis"},), sys.exc_info())
+            self.logger.exception("analysis failed")
+        # Args changed after the call (a lone dict arg becomes record.args) do not reach the listener;
+        # the traceback survives as text
+        prepared = handler.prepare(record)
+        record.args["stage"] = "changed"
+        self.assertEqual((prepared.getMessage(), prepared.args, prepared.exc_info),
+                         ("failed {'stage': 'analysis'}", None, None))
+        self.assertIn("ValueError: boom", prepared.exc_text)
+
+        payload = {"answer": 42}
+        self.logger.info("state %s", payload)
+        payload["answer"] = 0
+        records = [r for r in self.read_records() if r["logger"] == "tests.log_pipeline"]
+        self.assertIn("ValueError", records[0]["exception"])
+        self.assertEqual(records[1]["message"], "state {'answer': 42}")
+
+    def test_configure_is_idempotent(self):
+        self.assertIs(log_pipeline.configure_logging(), log_pipeline.configure_logging())
+        queue_handlers = [h for h in logging.getLogger().handlers
+                          if isinstance(h, log_pipeline.NonBlockingQueueHandler)]
+        self.assertEqual(len(queue_handlers), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Test suite for Talan message scoring and multi-candidate generation
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from utils.message_scorer import MessageScorer, channel_key, length_range
+from utils.models import (Conversation, ConversationChannel, ConversationParams, ConversationTone,
+                          CustomerAnalysis, WorkflowState)
+from tests.fakes import FakeResponse
+
+CUSTOMER = CustomerAnalysis(
+    customer_name="Acme",
+    industry="Retail",
+    company_size="Medium",
+    pain_points=[{"description": "Gestion manuelle des stocks et inventaires"}],
+    needs=[{"need": "ERP cloud"}]
+)
+
+GOOD = ("Bonjour, Talan Tunisie accompagne les distributeurs dans la modernisation de leur ERP et la migration "
+        "cloud afin de fiabiliser la gestion des stocks et automatiser les inventaires. ") * 2
+OFF_TOPIC = "Bonjour, nous organisons un séminaire sur le leadership la semaine prochaine."
+
+
+class FakeLLM:
+    """Returns a canned draft per sampling temperature"""
+
+    def __init__(self, drafts, temperature=None):
+        self.drafts = drafts
+        self.temperature = temperature
+
+    def bind(self, temperature=None, **kwargs):
+        return FakeLLM(self.drafts, temperature)
+
+    def invoke(self, messages):
+        draft = self.drafts[self.temperature]
+        if isinstance(draft, Exception):
+            raise draft
+        return FakeResponse(draft)
+
+
+class TestMessageScorer(unittest.TestCase):
+    """Test cases for the local candidate ranking"""
+
+    def setUp(self):
+        self.scorer = MessageScorer()
+
+    def test_channel_length_range(self):
+        self.assertEqual(channel_key(ConversationChannel.LINKEDIN), "linkedin")
+        self.assertEqual(channel_key("ConversationChannel.EMAIL"), "email")
+        self.assertEqual(length_range(ConversationChannel.EMAIL), (300, 500))
+        self.assertIsNone(length_range(ConversationChannel.PHONE))
+
+    def test_length_score(self):
+        self.assertEqual(self.scorer.length_score("mot " * 200, ConversationChannel.LINKEDIN), 1.0)
+        self.assertAlmostEqual(self.scorer.length_score("mot " * 75, ConversationChannel.LINKEDIN), 0.5)
+        self.assertEqual(self.scorer.length_score("court", ConversationChannel.PHONE), 1.0)
+
+    def test_relevant_message_ranks_first(self):
+        ranked = self.scorer.rank([{"content": OFF_TOPIC}, {"content": GOOD}], CUSTOMER, ConversationChannel.LINKEDIN)
+        self.assertEqual(ranked[0]["content"], GOOD)
+        self.assertEqual(ranked[0]["score"]["services"], 1.0)
+        self.assertEqual(ranked[0]["score"]["pain_points"], 1.0)
+        self.assertEqual(ranked[1]["score"]["pain_points"], 0.0)
+
+
+class TestTalanCandidates(unittest.TestCase):
+    """Test cases for parallel candidate generation in the message composer"""
+
+    def setUp(self):
+        api_key = Config.GROQ_API_KEY
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", api_key)
+        Config.GROQ_API_KEY = Config.GROQ_API_KEY or "test-key"
+
+    def test_candidates_are_ranked(self):
+        from agents.message_composer_agent_pure import MessageComposerAgentPure
+
+        agent = MessageComposerAgentPure(mode="talan_only")
+        agent.llm = FakeLLM({0.7: OFF_TOPIC, 0.9: GOOD, 0.5: "Bonjour."})
+        state = WorkflowState(
+            customer_analysis=CUSTOMER,
+            conversation_params=ConversationParams(goal="Discovery", tone=ConversationTone.PROFESSIONAL,
+                                                   channel=ConversationChannel.LINKEDIN),
+            conversation=Conversation(conversation_id="c1", messages=[])
+        )
+        candidates = agent.generate_talan_candidates(state, "opening", ["erp", "cloud"], 3)
+        self.assertEqual(len(candidates), 3)
+        self.assertEqual(candidates[0]["content"], GOOD.strip())
+        self.assertEqual(candidates[0]["temperature"], 0.9)
+        totals = [c["score"]["total"] for c in candidates]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+
+    def test_failed_drafts_are_dropped(self):
+        from agents.message_composer_agent_pure import MessageComposerAgentPure
+
+        agent = MessageComposerAgentPure(mode="talan_only")
+        agent.llm = FakeLLM({0.7: OFF_TOPIC, 0.9: RuntimeError("rate limited"), 0.5: GOOD})
+        state = WorkflowState(
+            customer_analysis=CUSTOMER,
+            conversation_params=ConversationParams(goal="Discovery", tone=ConversationTone.PROFESSIONAL,
+                                                   channel=ConversationChannel.LINKEDIN),
+            conversation=Conversation(conversation_id="c1", messages=[])
+        )
+        candidates = agent.generate_talan_candidates(state, "opening", ["erp", "cloud"], 3)
+        self.assertEqual([c["temperature"] for c in candidates], [0.5, 0.7])
+
+        agent.llm = FakeLLM({0.7: RuntimeError("down"), 0.9: RuntimeError("down"), 0.5: RuntimeError("down")})
+        with self.assertRaises(RuntimeError):
+            agent.generate_talan_candidates(state, "opening", ["erp", "cloud"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Test suite for conversation outcome detection and early termination
+"""
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from utils.models import Conversation, ConversationParams, ConversationTone, Message, WorkflowState
+from utils.outcome_detector import (OUTCOME_MEETING_BOOKED, OUTCOME_OPEN, OUTCOME_REJECTED, classify_outcome,
+                                    detect_outcome)
+from tests.fakes import FakeLLM
+
+
+class TestOutcomeDetector(unittest.TestCase):
+    """Test cases for the lexical classifier, the LLM check and the composer loop"""
+
+    def test_lexical_outcomes(self):
+        cases = {
+            "Parfait, je vous confirme le rendez-vous de mardi à 10h. N'hésitez pas à m'envoyer l'ordre du jour.":
+                OUTCOME_MEETING_BOOKED,
+            "D'accord pour jeudi 14h, j'ai bien reçu l'invitation.": OUTCOME_MEETING_BOOKED,
+            "Great, the demo is booked. See you on Monday!": OUTCOME_MEETING_BOOKED,
+            "Merci, mais nous ne sommes pas intéressés. Nous avons déjà choisi un autre prestataire.": OUTCOME_REJECTED,
+            "Thanks, but we are not interested.": OUTCOME_REJECTED,
+            # Proposals, questions, refusals of a slot and plain interest stay open
+            "Pouvez-vous me préciser vos tarifs pour la migration cloud ?": OUTCOME_OPEN,
+            "Je ne confirme pas le rendez-vous de mardi, il faut d'abord valider le budget.": OUTCOME_OPEN,
+            "Votre offre nous intéresse, quelles références avez-vous dans le retail ?": OUTCOME_OPEN,
+        }
+        for text, label in cases.items():
+            outcome = classify_outcome(text)
+            self.assertEqual(outcome.label, label, text)
+            if label != OUTCOME_OPEN:
+                self.assertGreaterEqual(outcome.confidence, Config.OUTCOME_MIN_CONFIDENCE, text)
+                self.assertTrue(outcome.reason)
+
+        conflicting = classify_outcome("Je confirme le rendez-vous. Mais honnêtement, ce n'est pas une priorité.")
+        self.assertEqual(conflicting.label, OUTCOME_MEETING_BOOKED)
+        self.assertLess(conflicting.confidence, Config.OUTCOME_MIN_CONFIDENCE)
+
+    def test_clauses_scoped_objections_and_acceptances(self):
+        cases = {
+            "Mardi 10h me convient.": OUTCOME_MEETING_BOOKED,
+            "Je ne suis pas disponible lundi, mais jeudi 14h nous convient.": OUTCOME_MEETING_BOOKED,
+            "I cannot make Monday but Tuesday 10:00 works for me.": OUTCOME_MEETING_BOOKED,
+            "Thanks, but we are not interested.": OUTCOME_REJECTED,
+            # Objections to one offer or moment, and confirmations taken back, stay open
+            "Pas intéressé par le cloud, mais la partie data nous intéresse.": OUTCOME_OPEN,
+            "Not interested in a call right now, maybe next quarter.": OUTCOME_OPEN,
+            "Je confirme le rendez-vous, mais je dois encore valider le budget.": OUTCOME_OPEN,
+        }
+        for text, label in cases.items():
+            outcome = detect_outcome(text)
+            self.assertEqual(outcome.label, label, text)
+
+    def test_reported_false_positives(self):
+        cases = {
+            "Our demo is scheduled internally for Monday, we will revert after that.": OUTCOME_OPEN,
+            "Our demo is scheduled for Monday.": OUTCOME_OPEN,
+            "Je ne dis pas que nous ne sommes pas intéressés, mais le budget est serré.": OUTCOME_OPEN,
+            # Bookings by the customer or with the sender still count
+            "The call with you is scheduled for Tuesday 10:00.": OUTCOME_MEETING_BOOKED,
+            "Votre rendez-vous de mardi est confirmé.": OUTCOME_MEETING_BOOKED,
+            "We won't proceed, not interested.": OUTCOME_REJECTED,
+        }
+        for text, label in cases.items():
+            self.assertEqual(detect_outcome(text).label, label, text)
+        # Both French "not interested" patterns cover the same phrase: counted once
+        self.assertEqual(classify_outcome("Nous ne sommes pas intéressés.").reason, "'ne sommes pas interesse'")
+
+    def test_llm_only_checks_weak_signals(self):
+        llm = FakeLLM("rejected")
+        self.assertEqual(detect_outcome("Quels sont vos délais ?", llm=llm).label, OUTCOME_OPEN)
+        self.assertEqual(detect_outcome("Nous ne sommes pas intéressés.", llm=llm).source, "lexical")
+        self.assertEqual(llm.calls, 0)
+
+        weak = "Ce n'est pas une priorité pour le moment."
+        self.assertEqual(detect_outcome(weak).label, OUTCOME_OPEN)
+        outcome = detect_outcome(weak, llm=llm)
+        self.assertEqual((outcome.label, outcome.source, llm.calls), (OUTCOME_REJECTED, "llm", 1))
+
+    def test_composer_stops_on_outcome(self):
+        from agents.message_composer_agent_pure import MessageComposerAgentPure
+
+        api_key = Config.GROQ_API_KEY
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", api_key)
+        Config.GROQ_API_KEY = Config.GROQ_API_KEY or "test-key"
+        agent = MessageComposerAgentPure()
+
+        def check(customer_reply, config=None):
+            state = WorkflowState(
+                conversation_params=ConversationParams(goal="Book a meeting", tone=ConversationTone.PROFESSIONAL,
+                                                       exchanges=6),
+                conversation=Conversation(conversation_id="c1", messages=[
+                    Message(sender="company", content="Seriez-vous disponible mardi ?"),
+                    Message(sender="customer", content=customer_reply)]),
+                config=config or {},
+            )
+            return agent._check_completion(state)
+
+        booked = check("Oui, je confirme le rendez-vous de mardi à 10h.")
+        self.assertEqual(agent._should_continue_conversation(booked), "complete")
+        self.assertEqual(booked.intermediate_results["completion_reason"], OUTCOME_MEETING_BOOKED)
+        self.assertEqual(booked.intermediate_results["conversation_outcome"]["message_index"], 1)
+        self.assertEqual(booked.conversation.metadata["outcome"], OUTCOME_MEETING_BOOKED)
+
+        self.assertEqual(agent._should_continue_conversation(check("Quels sont vos tarifs ?")), "continue")
+        disabled = check("Oui, je confirme le rendez-vous de mardi à 10h.", {"early_termination": False})
+        self.assertEqual(agent._should_continue_conversation(disabled), "continue")
+        with mock.patch.object(Config, "EARLY_TERMINATION", False):
+            self.assertEqual(agent._should_continue_conversation(check("Not interested, thanks.")), "continue")
+
+
+if __name__ == "__main__":
+    unittest.main()
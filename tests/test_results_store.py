@@ -0,0 +1,70 @@
+"""
+Test suite for the append-only results store
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.results_store import ResultsStore, new_result_id
+
+
+class TestResultsStore(unittest.TestCase):
+    """Test cases for buffered appends, indexing and lookups"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = ResultsStore(root_dir=self.temp_dir, buffer_size=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def partition_files(self):
+        return [name for name in os.listdir(self.temp_dir) if name.startswith("results-")]
+
+    def test_ids_are_unique_within_a_second(self):
+        ids = {new_result_id() for _ in range(5000)}
+        self.assertEqual(len(ids), 5000)
+
+    def test_buffered_until_threshold(self):
+        for i in range(9):
+            self.store.append({"n": i})
+        self.assertEqual(self.partition_files(), [])
+        self.store.append({"n": 9})
+        self.assertEqual(len(self.partition_files()), 1)
+
+    def test_batch_writes_once(self):
+        with self.store.batch():
+            ids = [self.store.append({"n": i}, execution_id=f"exec-{i}", customer="Acme" if i % 2 else "Globex")
+                   for i in range(1000)]
+            self.assertTrue(self.store.in_batch)
+            self.assertEqual(self.partition_files(), [])
+        self.assertEqual(len(self.partition_files()), 1)
+        self.assertEqual(self.store.get(ids[500])["record"], {"n": 500})
+        self.assertEqual(len(self.store.find(customer="Acme")), 500)
+        self.assertEqual(len(list(self.store.iter_records())), 1000)
+
+    def test_index_survives_reopen(self):
+        result_id = self.store.append({"status": "completed"}, execution_id="exec-1", customer="Acme")
+        self.store.flush()
+        reopened = ResultsStore(root_dir=self.temp_dir)
+        entries = reopened.find(execution_id="exec-1")
+        self.assertEqual([entry["result_id"] for entry in entries], [result_id])
+        self.assertEqual(reopened.read_entry(entries[0])["record"]["status"], "completed")
+
+    def test_parquet_export(self):
+        try:
+            import pyarrow  # noqa: F401
+        except Exception:
+            self.skipTest("No Parquet engine available")
+        self.store.append({"n": 1}, customer="Acme")
+        path = self.store.export_parquet(os.path.join(self.temp_dir, "results.parquet"))
+        self.assertTrue(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
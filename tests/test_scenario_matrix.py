@@ -0,0 +1,119 @@
+"""
+Test suite for concurrent scenario matrices and the shared LLM scheduler
+"""
+import unittest
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pure_langgraph_workflow import PureLangGraphB2BWorkflow
+from utils.llm_scheduler import LLMScheduler
+from utils.models import (Conversation, ConversationChannel, ConversationParams, ConversationTone, CustomerAnalysis,
+                          Message, StrategyAnalysis, WorkflowState)
+from utils.stage_memo import StageMemo
+from tests.fakes import FakeLLM
+
+CHANNEL_SCORES = {"email": 6.0, "linkedin": 8.5, "phone": 7.0}
+
+
+class FakeComposer:
+    """Composer stand-in; all scenarios must be in flight together to get past the barrier"""
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self.thread_ids = []
+
+    def execute(self, state, config=None):
+        self.thread_ids.append(config["configurable"]["thread_id"])
+        self.barrier.wait()
+        params = state.conversation_params
+        state.conversation = Conversation(conversation_id=state.execution_id, messages=[
+            Message(sender="company", content=f"Bonjour via {params.channel.value}"),
+            Message(sender="customer", content="Je confirme le rendez-vous de mardi.")])
+        state.intermediate_results["completion_reason"] = "meeting_booked"
+        return state
+
+
+class FakeStrategyAgent:
+    def execute(self, state, config=None):
+        score = CHANNEL_SCORES[state.conversation_params.channel.value]
+        state.strategy_analysis = StrategyAnalysis(
+            conversation_id=state.conversation.conversation_id, overall_effectiveness=score,
+            methodology_score=score, methodology_assessment={}, competitive_positioning={}, objection_handling={},
+            value_proposition_delivery={}, recommendations=[], improvement_areas=[], strengths=[], next_steps=[])
+        return state
+
+
+class FakePersonalityAgent:
+    def execute(self, state, config=None):
+        return state
+
+
+class TestScenarioMatrix(unittest.TestCase):
+    """Test cases for scenario branching, comparison tables and LLM scheduling"""
+
+    def test_scenarios_run_concurrently_and_are_ranked(self):
+        scenarios = [ConversationParams(goal="Book a meeting", tone=tone, channel=channel, exchanges=3)
+                     for channel, tone in ((ConversationChannel.EMAIL, ConversationTone.FORMAL),
+                                           (ConversationChannel.LINKEDIN, ConversationTone.FRIENDLY),
+                                           (ConversationChannel.PHONE, ConversationTone.CONSULTATIVE))]
+        workflow = PureLangGraphB2BWorkflow()
+        workflow.stage_memo = StageMemo()
+        workflow.message_composer_agent = FakeComposer(len(scenarios))
+        workflow.strategy_agent = FakeStrategyAgent()
+        workflow.personality_agent = FakePersonalityAgent()
+        state = WorkflowState(thread_id="t1", intermediate_results={"iteration_count": 4}, customer_analysis=
+                              CustomerAnalysis(customer_name="Acme", industry="Retail", company_size="Medium",
+                                               pain_points=[], needs=[]))
+
+        matrix = workflow.run_scenario_matrix(state, scenarios, max_workers=3)
+        self.assertEqual([row["channel"] for row in matrix.table], ["linkedin", "phone", "email"])
+        self.assertEqual(matrix.table[0]["label"], "linkedin / friendly / 3 exchanges")
+        self.assertEqual((matrix.table[0]["messages"], matrix.table[0]["completion_reason"]), (2, "meeting_booked"))
+        self.assertIs(matrix.best(), matrix.states[1])
+
+        self.assertEqual([s.conversation_params.channel for s in matrix.states], [p.channel for p in scenarios])
+        self.assertTrue(all(s.customer_analysis is state.customer_analysis for s in matrix.states))
+        self.assertEqual(len(set(workflow.message_composer_agent.thread_ids)), 3)
+        self.assertEqual(matrix.states[0].intermediate_results["scenario"]["index"], 0)
+        self.assertNotIn("iteration_count", matrix.states[0].intermediate_results)
+        # The analysed state itself is left untouched
+        self.assertIsNone(state.conversation)
+        self.assertEqual(state.intermediate_results, {"iteration_count": 4})
+
+    def test_scheduler_caps_concurrency_and_rate(self):
+        scheduler = LLMScheduler(requests_per_minute=0, max_concurrency=2)
+        llm = scheduler.wrap(FakeLLM(delay=0.05))
+        self.assertIs(scheduler.wrap(llm), llm)
+        threads = [threading.Thread(target=llm.invoke, args=([f"prompt {i}"],)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((scheduler.calls, scheduler.peak_in_flight), (6, 2))
+
+        bound = llm.bind(temperature=0.9)
+        self.assertEqual(bound.llm.bound, {"temperature": 0.9})
+        self.assertIs(bound.scheduler, scheduler)
+
+        # 600 calls per minute with a burst of 1: one call every 0.1s
+        limited = LLMScheduler(requests_per_minute=600, max_concurrency=4, burst=1).wrap(FakeLLM())
+        started = time.monotonic()
+        for _ in range(4):
+            limited.invoke(["hi"])
+        self.assertGreaterEqual(time.monotonic() - started, 0.28)
+
+        async def run_async():
+            return await asyncio.gather(*(llm.ainvoke([i]) for i in range(4)))
+
+        self.assertEqual(asyncio.run(run_async()), [[0], [1], [2], [3]])
+        self.assertEqual(scheduler.stats()["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
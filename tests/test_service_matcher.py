@@ -0,0 +1,70 @@
+"""
+Test suite for the Talan service matcher
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.models import CustomerAnalysis
+from utils.service_matcher import ServiceMatcher, get_service_matcher
+
+
+def make_customer(pain_points, needs, industry="Services"):
+    return CustomerAnalysis(
+        customer_name="Test Corp",
+        industry=industry,
+        company_size="Medium",
+        pain_points=[{"description": text} for text in pain_points],
+        needs=[{"need": text} for text in needs]
+    )
+
+
+class TestServiceMatcher(unittest.TestCase):
+    """Test cases for keyword matching and service scoring"""
+
+    def setUp(self):
+        self.matcher = ServiceMatcher()
+
+    def test_no_substring_false_positives(self):
+        """'ai' inside 'maintenance' and 'bi' inside 'mobile' must not match"""
+        hits = self.matcher.find_keywords("Coûts de maintenance élevés sur l'application mobile")
+        self.assertNotIn("ai", hits)
+        self.assertNotIn("bi", hits)
+
+    def test_whole_words_and_phrases(self):
+        hits = self.matcher.find_keywords("Adopt AI and machine learning, plus BI dashboards")
+        self.assertIn("ai", hits)
+        self.assertIn("bi", hits)
+        self.assertIn("machine learning", hits)
+
+    def test_accent_insensitive(self):
+        hits = self.matcher.find_keywords("Renforcer la securite et la conformite RGPD")
+        self.assertIn("securite", hits)
+        self.assertIn("conformite", hits)
+
+    def test_ranked_services(self):
+        customer = make_customer(
+            ["Cyber attacks and GDPR compliance gaps"],
+            ["Security audit", "Cloud migration"]
+        )
+        services = self.matcher.match_services(customer)
+        self.assertEqual(services[0], "cybersecurity")
+        self.assertIn("cloud", services)
+        self.assertNotIn("data_ai", services)
+
+    def test_default_service(self):
+        customer = make_customer(["Maintenance of mobile fleet"], ["Better onboarding"])
+        self.assertEqual(self.matcher.match_services(customer), ["transformation_digitale"])
+
+    def test_memoised_per_customer(self):
+        customer = make_customer(["Manual invoice processing"], ["SAP rollout"])
+        first = self.matcher.score_customer(customer)
+        self.assertIs(self.matcher.score_customer(customer), first)
+        self.assertIs(get_service_matcher(), get_service_matcher())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Test suite for the similarity cache of per-customer results
+"""
+import unittest
+import sys
+import os
+import json
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from utils.models import Conversation, CustomerAnalysis, Message, WorkflowState
+from utils.similarity_cache import SimilarityIndex, customer_terms, text_agreement
+from tests.fakes import FakeLLM
+
+
+def analysis(name, industry="Retail", pain_points=None, needs=None):
+    pain_points = pain_points if pain_points is not None else [
+        "Manual inventory tracking across stores causes stock ruptures", "Legacy ERP cannot share real-time sales data"]
+    needs = needs if needs is not None else ["Unified inventory platform", "ERP integration and demand forecasting"]
+    return CustomerAnalysis(customer_name=name, industry=industry, company_size="Medium",
+                            pain_points=[{"description": text} for text in pain_points],
+                            needs=[{"description": text} for text in needs])
+
+
+RECOMMENDATIONS = {
+    "overall_effectiveness": 8.0,
+    "key_strengths": ["Clear ROI"],
+    "improvement_areas": ["Discovery"],
+    "strategic_recommendations": [{"recommendation": "Pilot the inventory platform in five stores"}],
+    "next_steps": [{"action": "Send ERP integration proposal"}],
+    "alternative_approaches": [{"approach": "Start with demand forecasting"}],
+}
+
+
+class TestSimilarityCache(unittest.TestCase):
+    """Test cases for TF-IDF lookups, partitions, statistics and agent reuse"""
+
+    def test_similar_customers_hit_and_different_ones_miss(self):
+        index = SimilarityIndex(threshold=0.8)
+        index.add("recs", "meeting", analysis("Acme"), "acme result")
+
+        # Another company with the same analysis (one need reworded)
+        similar = analysis("Globex", needs=["Unified inventory platform", "ERP integration and sales forecasting"])
+        hit = index.lookup("recs", "meeting", similar)
+        self.assertEqual(hit.payload, "acme result")
+        self.assertGreaterEqual(hit.similarity, 0.8)
+        self.assertEqual(index.lookup("recs", "meeting", analysis("Acme")).similarity, 1.0)
+
+        self.assertIsNone(index.lookup("recs", "meeting", analysis("Initech", "Banking", ["Slow loan approval"],
+                                                                   ["Credit scoring automation"])))
+        self.assertIsNone(index.lookup("recs", "meeting", analysis("Acme", industry="Banking")))
+        self.assertIsNone(index.lookup("recs", "demo", similar))
+        self.assertIsNone(index.lookup("services", "meeting", similar))
+
+        stats = index.stats()
+        self.assertEqual((stats["recs"]["lookups"], stats["recs"]["hits"]), (5, 2))
+        self.assertAlmostEqual(stats["recs"]["hit_rate"], 2 / 5)
+        self.assertIsNone(stats["recs"]["agreement"])
+
+    def test_bounded_entries_and_toggle(self):
+        index = SimilarityIndex(threshold=0.99, max_entries=2)
+        customers = [analysis(f"C{i}", pain_points=[f"problem number{i}"], needs=[])
+                     for i in range(3)]
+        for i, customer in enumerate(customers):
+            index.add("recs", "", customer, i)
+        self.assertIsNone(index.lookup("recs", "", customers[0]))
+        self.assertEqual(index.lookup("recs", "", customers[2]).payload, 2)
+
+        with mock.patch.object(Config, "SIMILARITY_CACHE", False):
+            self.assertIsNone(index.lookup("recs", "", customers[2]))
+        self.assertEqual(customer_terms({"industry": "Énergie", "needs": ["Sécurité cloud", {"area": "Cloud"}]}),
+                         {"securite": 1, "cloud": 2})
+        self.assertEqual(text_agreement(["Cloud migration"], ["cloud migration"]), 1.0)
+
+        state = WorkflowState(config={"verify_similarity_cache": True})
+        self.assertTrue(index.verifying(state))
+        self.assertFalse(index.verifying(WorkflowState()))
+
+    def test_strategy_recommendations_reused_for_similar_customer(self):
+        from agents.strategy_agent_pure import StrategyAgentPure
+
+        api_key = Config.GROQ_API_KEY
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", api_key)
+        Config.GROQ_API_KEY = Config.GROQ_API_KEY or "test-key"
+        index = SimilarityIndex(threshold=0.8)
+        agent = StrategyAgentPure()
+        agent.llm = FakeLLM(json.dumps(RECOMMENDATIONS))
+
+        def run(customer, config=None, conversation=None):
+            state = WorkflowState(customer_analysis=customer, config=config or {}, conversation=conversation)
+            state._strategy_components = {"methodology": {"effectiveness_score": 6.0},
+                                          "value_delivery": {"overall_delivery_score": 7.0}}
+            with mock.patch("agents.strategy_agent_pure.get_similarity_index", return_value=index):
+                return agent._generate_recommendations(state)
+
+        self.assertEqual(run(analysis("Acme"))._strategy_recommendations, RECOMMENDATIONS)
+        reused = run(analysis("Globex"))._strategy_recommendations
+        self.assertEqual(agent.llm.calls, 1)
+        self.assertEqual(reused["strategic_recommendations"], RECOMMENDATIONS["strategic_recommendations"])
+        self.assertEqual(reused["next_steps"], RECOMMENDATIONS["next_steps"])
+        self.assertEqual(reused["overall_effectiveness"], 6.5)
+        self.assertNotIn("key_strengths", reused)
+        self.assertEqual(reused["reused_from_similar_customer"]["similarity"], 1.0)
+
+        # Verification recomputes the hit and records the agreement
+        verified = run(analysis("Globex"), {"verify_similarity_cache": True})._strategy_recommendations
+        self.assertEqual(agent.llm.calls, 2)
+        self.assertEqual(verified, RECOMMENDATIONS)
+        stats = index.stats()["strategy_recommendations"]
+        self.assertEqual((stats["lookups"], stats["hits"], stats["verified"], stats["agreement"]), (3, 2, 1, 1.0))
+
+        # Another channel or message sequence is another partition
+        linkedin = run(analysis("Globex"), {}, Conversation(
+            conversation_id="c2", channel="linkedin",
+            messages=[Message(sender="company", content="Bonjour", message_type="opening")]))
+        self.assertEqual(agent.llm.calls, 3)
+        self.assertNotIn("reused_from_similar_customer", linkedin._strategy_recommendations)
+
+        # Fallback recommendations (unparseable response) are never shared
+        agent.llm = FakeLLM("not json")
+        run(analysis("Initech", "Banking", ["Slow loan approval"], ["Credit scoring"]))
+        self.assertIsNone(index.lookup("strategy_recommendations", StrategyAgentPure._recommendation_partition(
+            WorkflowState()), analysis("Initech", "Banking", ["Slow loan approval"], ["Credit scoring"])))
+
+    def test_composer_warm_starts_services_only_without_a_specific_match(self):
+        from agents.message_composer_agent_pure import MessageComposerAgentPure
+        from utils.service_matcher import DEFAULT_SERVICE
+
+        api_key = Config.GROQ_API_KEY
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", api_key)
+        Config.GROQ_API_KEY = Config.GROQ_API_KEY or "test-key"
+        index = SimilarityIndex(threshold=0.8)
+        agent = MessageComposerAgentPure()
+        matcher = mock.Mock()
+
+        def services(customer, matched, state=None):
+            matcher.match_services.return_value = matched
+            with mock.patch("agents.message_composer_agent_pure.get_similarity_index", return_value=index), \
+                    mock.patch("agents.message_composer_agent_pure.get_service_matcher", return_value=matcher):
+                return agent._get_talan_services_for_client(customer, state)
+
+        self.assertEqual(services(analysis("Acme"), ["data_ia", "cloud"]), ["data_ia", "cloud"])
+        self.assertNotIn("talan_services", index.stats())
+        self.assertEqual(services(analysis("Globex"), [DEFAULT_SERVICE]), ["data_ia", "cloud"])
+        verifying = WorkflowState(config={"verify_similarity_cache": True})
+        self.assertEqual(services(analysis("Globex"), [DEFAULT_SERVICE], verifying), [DEFAULT_SERVICE])
+        stats = index.stats()["talan_services"]
+        self.assertEqual((stats["lookups"], stats["hits"], stats["verified"]), (2, 2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
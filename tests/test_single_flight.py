@@ -0,0 +1,181 @@
+"""
+Test suite for single-flight coalescing of identical LLM requests
+"""
+import unittest
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.schema import HumanMessage, SystemMessage
+
+from config.settings import Config
+from utils.llm_scheduler import LLMScheduler, ScheduledLLM
+from utils.single_flight import SingleFlight, get_single_flight, request_key
+from tests.fakes import FakeResponse
+
+
+class BlockingLLM:
+    """Fake client holding each call until ``followers`` identical requests joined it"""
+
+    def __init__(self, group, followers, temperature=0.7):
+        self.group = group
+        self.followers = followers
+        self.temperature = temperature
+        self.calls = []
+
+    def _wait(self):
+        deadline = time.monotonic() + 5
+        while self.group.stats()["followers"] < self.followers and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def invoke(self, messages):
+        self.calls.append(messages[-1].content)
+        self._wait()
+        if messages[-1].content == "fail":
+            raise RuntimeError("provider error")
+        return FakeResponse(f"answer {len(self.calls)}")
+
+    async def ainvoke(self, messages):
+        self.calls.append(messages[-1].content)
+        while self.group.stats()["followers"] < self.followers:
+            await asyncio.sleep(0.005)
+        return FakeResponse(f"answer {len(self.calls)}")
+
+    def bind(self, **kwargs):
+        return BlockingLLM(self.group, self.followers, kwargs.get("temperature", self.temperature))
+
+
+def prompt(text):
+    return [SystemMessage(content="Analyse"), HumanMessage(content=text)]
+
+
+def run_threads(target, count):
+    results = [None] * count
+
+    def run(index):
+        try:
+            results[index] = target()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for sync/async coalescing, errors and request keys"""
+
+    def setUp(self):
+        self.group = SingleFlight()
+
+    def client(self, followers):
+        fake = BlockingLLM(self.group, followers)
+        return fake, ScheduledLLM(fake, LLMScheduler(requests_per_minute=0, max_concurrency=8), self.group)
+
+    def test_concurrent_identical_invokes_share_one_call(self):
+        fake, llm = self.client(followers=4)
+        results = run_threads(lambda: llm.invoke(prompt("Acme profile")), 5)
+        self.assertEqual(fake.calls, ["Acme profile"])
+        # Every caller gets the answer in an object of its own
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(len({id(result) for result in results}), 5)
+        self.assertEqual(self.group.stats(), {"leaders": 1, "followers": 4, "in_flight": 0})
+
+        # Nothing is cached once the call completed
+        fake.followers = 0
+        llm.invoke(prompt("Acme profile"))
+        self.assertEqual(len(fake.calls), 2)
+
+        failing = run_threads(lambda: llm.invoke(prompt("fail")), 1)
+        self.assertIsInstance(failing[0], RuntimeError)
+
+    def test_errors_reach_every_waiter(self):
+        fake, llm = self.client(followers=2)
+        results = run_threads(lambda: llm.invoke(prompt("fail")), 3)
+        self.assertEqual(fake.calls, ["fail"])
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_async_and_sync_callers_coalesce(self):
+        fake, llm = self.client(followers=3)
+
+        async def gather():
+            return await asyncio.gather(*(llm.ainvoke(prompt("Globex")) for _ in range(3)))
+
+        sync_result = []
+        thread = threading.Thread(target=lambda: sync_result.append(llm.invoke(prompt("Globex"))))
+        thread.start()
+        results = asyncio.run(gather())
+        thread.join()
+        self.assertEqual(len(fake.calls), 1)
+        self.assertTrue(all(result == sync_result[0] and result is not sync_result[0] for result in results))
+
+    def test_cancellation_is_not_shared(self):
+        delays = []
+
+        async def call():
+            await asyncio.sleep(delays.pop(0))
+            return FakeResponse("answer")
+
+        async def cancel_follower():
+            delays[:] = [0.05]
+            leader = asyncio.create_task(self.group.do_async("key", call))
+            await asyncio.sleep(0.01)
+            followers = [asyncio.create_task(self.group.do_async("key", call)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            followers[0].cancel()
+            return await asyncio.gather(leader, followers[1])
+
+        self.assertEqual([result.content for result in asyncio.run(cancel_follower())], ["answer", "answer"])
+
+        async def cancel_leader():
+            delays[:] = [10, 0.01]
+            leader = asyncio.create_task(self.group.do_async("key", call))
+            await asyncio.sleep(0.01)
+            followers = [asyncio.create_task(self.group.do_async("key", call)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            results = await asyncio.gather(*followers)
+            return leader.cancelled(), results
+
+        cancelled, results = asyncio.run(cancel_leader())
+        self.assertTrue(cancelled)
+        self.assertEqual([result.content for result in results], ["answer", "answer"])
+        # One follower took over the call; the other waited for it
+        self.assertEqual(delays, [])
+        self.assertEqual(self.group.stats(), {"leaders": 3, "followers": 5, "in_flight": 0})
+
+    def test_keys_and_opt_out(self):
+        model = {"model": "m", "temperature": 0.7}
+        self.assertEqual(request_key(model, (prompt("a"),), {}), request_key(model, (prompt("a"),), {"config": {}}))
+        self.assertNotEqual(request_key(model, (prompt("a"),), {}), request_key(model, (prompt("b"),), {}))
+        self.assertNotEqual(request_key(model, (prompt("a"),), {}),
+                            request_key({**model, "temperature": 0.9}, (prompt("a"),), {}))
+
+        fake, llm = self.client(followers=0)
+        hot, cold = llm.bind(temperature=0.9), llm.bind(temperature=0.5)
+        self.assertNotEqual(hot.model, cold.model)
+        self.assertIsNone(hot.without_coalescing().single_flight)
+
+    def test_agents_share_the_process_group(self):
+        from agents.strategy_agent_pure import StrategyAgentPure
+
+        api_key = Config.GROQ_API_KEY
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", api_key)
+        Config.GROQ_API_KEY = Config.GROQ_API_KEY or "test-key"
+        agent = StrategyAgentPure()
+        self.assertIsInstance(agent.llm, ScheduledLLM)
+        self.assertIs(agent.llm.single_flight, get_single_flight())
+        self.assertEqual(agent.llm.model["model"], Config.MODEL_NAME)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Test suite for workflow stage memoization
+"""
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pure_langgraph_workflow import PureLangGraphB2BWorkflow
+from utils.models import (Conversation, ConversationChannel, ConversationParams, ConversationTone, CustomerAnalysis,
+                          Message, PersonalityAnalysis, StrategyAnalysis, WorkflowState)
+from utils.stage_memo import StageMemo
+
+
+class FakeAgent:
+    """Agent stand-in counting executions; ``fail`` records an error instead of an output"""
+
+    def __init__(self, produce):
+        self.produce = produce
+        self.runs = 0
+        self.fail = False
+
+    def execute(self, state, config=None):
+        self.runs += 1
+        result = state.model_copy(update={"errors": list(state.errors)})
+        if self.fail:
+            result.errors.append("rate limited")
+        else:
+            self.produce(result)
+        return result
+
+
+def analyze_documents(state):
+    with open(state.customer_json_path, encoding="utf-8") as f:
+        data = json.load(f)
+    state.customer_analysis = CustomerAnalysis(customer_name=data["company_name"], industry="Retail",
+                                               company_size="Medium", pain_points=[], needs=[])
+
+
+def compose(state):
+    # The conversation depends on the channel only, so a tone change yields the same transcript
+    channel = state.conversation_params.channel.value
+    state.conversation = Conversation(conversation_id=f"conv_{channel}", messages=[
+        Message(sender="company", content=f"Bonjour via {channel}"),
+        Message(sender="customer", content="Merci, parlons budget"),
+    ])
+
+
+def analyze_strategy(state):
+    state.strategy_analysis = StrategyAnalysis(
+        conversation_id=state.conversation.conversation_id, overall_effectiveness=7.0, methodology_assessment={},
+        competitive_positioning={}, objection_handling={}, value_proposition_delivery={}, recommendations=[],
+        improvement_areas=[], strengths=[], next_steps=[])
+
+
+def analyze_personality(state):
+    state.personality_analysis = PersonalityAnalysis(
+        conversation_id=state.conversation.conversation_id, communication_style="direct", disc_profile={"C": 0.8},
+        decision_making_style="data-driven", relationship_orientation="task", risk_tolerance="low",
+        information_processing="detailed", motivational_drivers=[], personality_based_recommendations=[],
+        optimal_communication_approach={}, objection_handling_style="Facts first")
+
+
+def params(tone=ConversationTone.PROFESSIONAL, channel=ConversationChannel.EMAIL):
+    return ConversationParams(goal="Discovery", tone=tone, channel=channel)
+
+
+class TestStageMemo(unittest.TestCase):
+    """Test cases for skipping stages whose inputs did not change"""
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        self.customer_path = os.path.join(temp_dir, "customer.json")
+        with open(self.customer_path, "w", encoding="utf-8") as f:
+            json.dump({"company_name": "Acme"}, f)
+
+        self.workflow = PureLangGraphB2BWorkflow()
+        self.workflow.stage_memo = StageMemo()
+        self.agents = {
+            "document_agent": FakeAgent(analyze_documents),
+            "message_composer_agent": FakeAgent(compose),
+            "strategy_agent": FakeAgent(analyze_strategy),
+            "personality_agent": FakeAgent(analyze_personality),
+        }
+        for attribute, agent in self.agents.items():
+            setattr(self.workflow, attribute, agent)
+
+    def runs(self):
+        return [agent.runs for agent in self.agents.values()]
+
+    def generate(self, conversation_params, state=None):
+        state = state or self.workflow.run_document_analysis_only(self.customer_path)
+        return self.workflow.run_conversation_generation(state, conversation_params)
+
+    def test_tone_change_reuses_unchanged_stages(self):
+        first = self.generate(params())
+        self.assertEqual(self.runs(), [1, 1, 1, 1])
+
+        # Same document, new tone: composition reruns, the identical conversation reuses the analyses
+        second = self.generate(params(tone=ConversationTone.FRIENDLY))
+        self.assertEqual(self.runs(), [1, 2, 1, 1])
+        self.assertEqual(second.strategy_analysis.model_dump(), first.strategy_analysis.model_dump())
+        self.assertIsNotNone(second.personality_analysis)
+
+        # A new channel changes the conversation and thus both analyses
+        third = self.generate(params(channel=ConversationChannel.LINKEDIN))
+        self.assertEqual(self.runs(), [1, 3, 2, 2])
+        self.assertEqual(third.strategy_analysis.conversation_id, "conv_linkedin")
+
+        # Unchanged parameters: a new draft is composed, the identical conversation is not analysed again
+        self.generate(params(channel=ConversationChannel.LINKEDIN))
+        self.assertEqual(self.runs(), [1, 4, 2, 2])
+
+    def test_composition_memo_is_opt_in(self):
+        state = self.workflow.run_document_analysis_only(self.customer_path)
+        state.config["memoize_composition"] = True
+        first = self.generate(params(), state)
+        self.generate(params(), state)
+        self.assertEqual(self.runs(), [1, 1, 1, 1])
+
+        # The restored conversation is a copy
+        first.conversation.messages.append(Message(sender="company", content="Relance"))
+        second = self.generate(params(), state)
+        self.assertEqual(len(second.conversation.messages), 2)
+
+    def test_failed_stage_is_not_memoized(self):
+        self.agents["personality_agent"].fail = True
+        self.generate(params())
+        self.agents["personality_agent"].fail = False
+        result = self.generate(params())
+        self.assertEqual(self.runs(), [1, 2, 1, 2])
+        self.assertIsNotNone(result.personality_analysis)
+
+    def test_refresh_and_changed_file(self):
+        state = self.workflow.run_document_analysis_only(self.customer_path)
+        state.config["memoize_composition"] = True
+        self.generate(params(), state)
+        state.config["refresh_stages"] = ["message_composition"]
+        self.generate(params(), state)
+        self.assertEqual(self.runs(), [1, 2, 1, 1])
+
+        with open(self.customer_path, "w", encoding="utf-8") as f:
+            json.dump({"company_name": "Globex"}, f)
+        result = self.workflow.run_document_analysis_only(self.customer_path)
+        self.assertEqual(result.customer_analysis.customer_name, "Globex")
+        self.assertEqual(self.agents["document_agent"].runs, 2)
+
+    def test_key_tracks_consumed_inputs_only(self):
+        memo = StageMemo()
+        state = WorkflowState(conversation_params=params(), customer_analysis=CustomerAnalysis(
+            customer_name="Acme", industry="Retail", company_size="Medium", pain_points=[], needs=[]))
+        self.assertIsNone(memo.key("message_composition", state))
+        state.config["memoize_composition"] = True
+        composition, strategy = memo.key("message_composition", state), memo.key("strategy_analysis", state)
+        state.conversation_params = params(tone=ConversationTone.FORMAL)
+        state.status = "conversation_generation"
+        self.assertNotEqual(memo.key("message_composition", state), composition)
+        self.assertEqual(memo.key("strategy_analysis", state), strategy)
+        self.assertIsNone(memo.key("document_analysis", WorkflowState(customer_json_path="/missing.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+Test suite for step-level workflow resume
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langgraph.graph import END, StateGraph
+
+from agents.base_agent import BaseAgent
+from config.settings import Config
+from pure_langgraph_workflow import PureLangGraphB2BWorkflow
+from utils.models import (Conversation, CustomerAnalysis, Message, PersonalityAnalysis, StrategyAnalysis,
+                          WorkflowState)
+from utils.results_store import ResultsStore
+from utils.stage_memo import StageMemo
+
+
+def produce(output, state):
+    if output == "customer_analysis":
+        state.customer_analysis = CustomerAnalysis(customer_name="Acme", industry="Retail", company_size="Medium",
+                                                   pain_points=[], needs=[])
+    elif output == "conversation":
+        state.conversation = Conversation(conversation_id="c1", messages=[])
+    elif output == "strategy_analysis":
+        state.strategy_analysis = StrategyAnalysis(
+            conversation_id="c1", overall_effectiveness=7.0, methodology_assessment={}, competitive_positioning={},
+            objection_handling={}, value_proposition_delivery={}, recommendations=[], improvement_areas=[],
+            strengths=[], next_steps=[])
+    else:
+        state.personality_analysis = PersonalityAnalysis(
+            conversation_id="c1", communication_style="direct", disc_profile={"C": 0.8},
+            decision_making_style="data-driven", relationship_orientation="task", risk_tolerance="low",
+            information_processing="detailed", motivational_drivers=[], personality_based_recommendations=[],
+            optimal_communication_approach={}, objection_handling_style="Facts first")
+
+
+class FakeAgent(BaseAgent):
+    """Two-node agent (prepare, then an "LLM" call that can be made to fail) counting node runs"""
+
+    def __init__(self, name, output):
+        self.output = output
+        self.fail = False
+        self.calls = []
+        super().__init__(name)
+
+    def _build_workflow(self):
+        workflow = StateGraph(WorkflowState)
+        workflow.add_node("prepare", self._prepare)
+        workflow.add_node("call_llm", self._call_llm)
+        workflow.add_edge("prepare", "call_llm")
+        workflow.add_edge("call_llm", END)
+        workflow.set_entry_point("prepare")
+        return workflow.compile(checkpointer=self.checkpoint_saver)
+
+    def _prepare(self, state):
+        self.calls.append("prepare")
+        return state
+
+    def _call_llm(self, state):
+        self.calls.append("call_llm")
+        if self.fail:
+            return self._handle_error(state, RuntimeError("rate limited"), "LLM call")
+        produce(self.output, state)
+        return state
+
+
+class InPlaceAgent(FakeAgent):
+    """FakeAgent whose nodes mutate the conversation and error list in place, as the production agents do"""
+
+    def _prepare(self, state):
+        self.calls.append("prepare")
+        if state.conversation:
+            state.conversation.messages.append(Message(sender="company", content=f"{self.agent_name} prepared"))
+        return state
+
+    def _call_llm(self, state):
+        state = super()._call_llm(state)
+        if state.conversation:
+            state.conversation.messages.append(Message(sender="company", content=f"{self.agent_name} answered"))
+        return state
+
+
+class TestStepResume(unittest.TestCase):
+    """Test cases for resuming the workflow and nested agents at the failed step"""
+
+    def setUp(self):
+        api_key = Config.GROQ_API_KEY
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", api_key)
+        Config.GROQ_API_KEY = Config.GROQ_API_KEY or "test-key"
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        store = ResultsStore(root_dir=temp_dir)
+        patcher = mock.patch("pure_langgraph_workflow.get_results_store", return_value=store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.workflow, self.agents = self.build_workflow()
+
+    @staticmethod
+    def build_workflow(agent_class=FakeAgent):
+        workflow = PureLangGraphB2BWorkflow()
+        workflow.stage_memo = StageMemo()
+        agents = {
+            "document_agent": agent_class("Documents", "customer_analysis"),
+            "message_composer_agent": agent_class("Composer", "conversation"),
+            "strategy_agent": agent_class("Strategy", "strategy_analysis"),
+            "personality_agent": agent_class("Personality", "personality_analysis"),
+        }
+        for attribute, agent in agents.items():
+            setattr(workflow, attribute, agent)
+        return workflow, agents
+
+    def run_workflow(self):
+        state = WorkflowState(customer_json_path="customer.json", status="starting")
+        thread_id = f"b2b_workflow_{state.execution_id}"
+        self.workflow.workflow.invoke(state, config={"configurable": {"thread_id": thread_id}})
+        return thread_id
+
+    def calls(self):
+        return {name: list(agent.calls) for name, agent in self.agents.items()}
+
+    def test_only_failed_agent_step_is_rerun(self):
+        self.agents["personality_agent"].fail = True
+        thread_id = self.run_workflow()
+        failed = self.workflow.workflow.get_state({"configurable": {"thread_id": thread_id}}).values
+        self.assertIsNone(failed.get("personality_analysis"))
+        self.assertEqual(failed["status"], "completed_with_errors")
+
+        self.agents["personality_agent"].fail = False
+        before = self.calls()
+        resumed = self.workflow.resume_workflow_from_checkpoint(thread_id)
+
+        after = self.calls()
+        for name in ("document_agent", "message_composer_agent", "strategy_agent"):
+            self.assertEqual(after[name], before[name], name)
+        self.assertEqual(after["personality_agent"][len(before["personality_agent"]):], ["call_llm"])
+        self.assertEqual(resumed.status, "completed_successfully")
+        self.assertEqual(resumed.errors, [])
+        self.assertIsNotNone(resumed.strategy_analysis)
+        self.assertEqual(resumed.personality_analysis.communication_style, "direct")
+
+    def test_completed_workflow_is_not_rerun(self):
+        thread_id = self.run_workflow()
+        before = self.calls()
+        resumed = self.workflow.resume_workflow_from_checkpoint(thread_id)
+        self.assertEqual(self.calls(), before)
+        self.assertEqual(resumed.status, "completed_successfully")
+        self.assertIsNone(self.workflow.resume_workflow_from_checkpoint("unknown_thread"))
+
+    def test_resume_after_restart_from_persisted_checkpoints(self):
+        checkpoint_dir = Config.CHECKPOINT_DIR
+        self.addCleanup(setattr, Config, "CHECKPOINT_DIR", checkpoint_dir)
+        Config.CHECKPOINT_DIR = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, Config.CHECKPOINT_DIR, ignore_errors=True)
+
+        self.workflow, self.agents = self.build_workflow(InPlaceAgent)
+        self.agents["personality_agent"].fail = True
+        thread_id = self.run_workflow()
+        failed = self.workflow.workflow.get_state({"configurable": {"thread_id": thread_id}}).values
+        self.assertEqual(len(failed["errors"]), 1)
+        self.assertEqual([m.content for m in failed["conversation"].messages], ["Composer answered"])
+
+        # A new process: fresh savers that only know what the journals on disk hold
+        restarted, agents = self.build_workflow(InPlaceAgent)
+        resumed = restarted.resume_workflow_from_checkpoint(thread_id)
+
+        self.assertEqual({name: agent.calls for name, agent in agents.items()},
+                         {"document_agent": [], "message_composer_agent": [], "strategy_agent": [],
+                          "personality_agent": ["call_llm"]})
+        self.assertEqual(resumed.status, "completed_successfully")
+        self.assertEqual(resumed.errors, [])
+        self.assertEqual(resumed.personality_analysis.communication_style, "direct")
+        self.assertEqual([m.content for m in resumed.conversation.messages],
+                         [m.content for m in failed["conversation"].messages])
+
+    def test_agent_resume_without_checkpoint_executes(self):
+        agent = self.agents["strategy_agent"]
+        result = agent.resume_from_checkpoint("fresh_thread", WorkflowState())
+        self.assertEqual(agent.calls, ["prepare", "call_llm"])
+        self.assertIsNotNone(result.strategy_analysis)
+        agent.resume_from_checkpoint("fresh_thread", WorkflowState())
+        self.assertEqual(agent.calls, ["prepare", "call_llm"])
+
+
+if __name__ == "__main__":
+    unittest.main()
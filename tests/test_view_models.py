@@ -0,0 +1,118 @@
+"""
+Test suite for the dashboard view models
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.models import PersonalityAnalysis, StrategyAnalysis
+from utils.view_models import conversation_html, message_views, personality_view, strategy_view
+
+STRATEGY = {
+    "overall_effectiveness": 7.5,
+    "methodology_assessment": {"score": 6, "approach": "SPIN"},
+    "competitive_positioning": {"differentiation": "Local presence"},
+    "objection_handling": {"budget": "Handled", "timing": "Deferred"},
+    "value_proposition_delivery": {"score": 8, "clarity": "High"},
+    "recommendations": ["Quantify ROI"],
+    "improvement_areas": [],
+    "strengths": ["Tone"],
+    "next_steps": ["Send proposal"],
+}
+
+MESSAGES = [
+    {"sender": "company", "content": "Bonjour, Talan vous propose...", "message_type": "opening", "channel": "EMAIL"},
+    {"sender": "customer", "content": "Merci, pouvez-vous détailler ?", "message_type": "response"},
+]
+
+
+def make_personality():
+    return PersonalityAnalysis(
+        conversation_id="c1", communication_style="direct", disc_profile={"D": 60, "C": 80},
+        decision_making_style="data-driven", relationship_orientation="task", risk_tolerance="low",
+        information_processing="detailed", motivational_drivers=["ROI"], personality_based_recommendations=["Facts"],
+        optimal_communication_approach={"tone": "formal"}, objection_handling_style="Evidence")
+
+
+class TestViewModels(unittest.TestCase):
+    """Test cases for view conversion and caching"""
+
+    def test_strategy_view_from_model_and_dict(self):
+        from_dict = strategy_view(STRATEGY)
+        from_model = strategy_view(StrategyAnalysis(conversation_id="c1", **STRATEGY))
+        self.assertEqual(from_dict, from_model)
+        self.assertEqual(from_dict.methodology_score, 6)
+        self.assertEqual(from_dict.positioning_score, 0)
+        self.assertEqual(from_dict.methodology, (("Approach", "SPIN"),))
+        self.assertEqual(from_dict.objection_handling, (("Budget", "Handled"), ("Timing", "Deferred")))
+        self.assertIsNone(strategy_view(None))
+        hash(from_dict)
+
+    def test_views_are_built_once_per_object(self):
+        analysis = dict(STRATEGY)
+        self.assertIs(strategy_view(analysis), strategy_view(analysis))
+        self.assertIsNot(strategy_view(analysis), strategy_view(dict(STRATEGY)))
+
+    def test_personality_layouts(self):
+        view = personality_view(make_personality())
+        # Models without a profile classification use the older layout
+        self.assertEqual(view.profile, "Unknown")
+        self.assertEqual(view.communication_approach, ())
+        self.assertEqual(view.disc[0], ("D", "Dominance", 60))
+
+        classified = personality_view({**make_personality().model_dump(), "personality_profile": "Cost-Conscious Pragmatist",
+                                       "profile_confidence": "high"})
+        self.assertEqual(classified.profile_icon, "💰")
+        self.assertEqual(classified.communication_approach, (("Tone", "formal"),))
+
+    def test_conversation_html_is_cached(self):
+        messages = list(MESSAGES)
+        first = conversation_html(message_views(messages))
+        hits = conversation_html.cache_info().hits
+        self.assertEqual(conversation_html(message_views(messages)), first)
+        self.assertEqual(conversation_html.cache_info().hits, hits + 1)
+        self.assertIn("TALAN - Exchange 1</strong> (opening - EMAIL)", first)
+        self.assertIn("CLIENT - Exchange 2</strong> (response)", first)
+
+        messages.append({"sender": "company", "content": "Relance", "message_type": "follow_up"})
+        self.assertIn("Relance", conversation_html(message_views(messages)))
+
+    def test_conversation_html_escapes_content(self):
+        rendered = conversation_html(message_views([
+            {"sender": "customer", "content": "<img src=x onerror=alert(1)>\nMerci & à bientôt", "message_type": "response"}
+        ]))
+        self.assertNotIn("<img", rendered)
+        self.assertIn("&lt;img src=x onerror=alert(1)&gt;<br>Merci &amp; à bientôt", rendered)
+
+    def test_dashboard_renders_views_without_debug_dumps(self):
+        try:
+            from streamlit.testing.v1 import AppTest
+        except ImportError:
+            self.skipTest("streamlit testing API not available")
+        from config.settings import Config
+        saved_key = Config.GROQ_API_KEY
+        Config.GROQ_API_KEY = saved_key or "test-key"
+        self.addCleanup(setattr, Config, "GROQ_API_KEY", saved_key)
+        app_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "enhanced_app_styled.py")
+        at = AppTest.from_file(app_path, default_timeout=60)
+        at.session_state["customer_info"] = {"company_name": "Acme", "industry": "Retail"}
+        at.session_state["conversation_messages"] = list(MESSAGES)
+        at.session_state["personality_analysis"] = make_personality()
+        at.session_state["strategy_analysis"] = STRATEGY
+        at.run()
+        self.assertEqual(len(at.exception), 0)
+        text = " ".join(element.value for element in at.markdown)
+        self.assertIn("Bonjour, Talan vous propose", text)
+        self.assertIn("Quantify ROI", text)
+        self.assertNotIn("DEBUG", text)
+
+        at.button(key="clear_analysis_btn_main").click().run()
+        self.assertEqual(len(at.exception), 0)
+        self.assertIsNone(at.session_state["strategy_analysis"])
+
+
+if __name__ == "__main__":
+    unittest.main()
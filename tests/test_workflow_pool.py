@@ -0,0 +1,97 @@
+"""
+Test suite for the workflow process pool and the state codec
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.models import ConversationParams, CustomerAnalysis, WorkflowState
+from utils.state_codec import ensure_state, pack_state, unpack_state
+from workflow_pool import WorkflowProcessPool
+
+
+class FakeWorkflow:
+    """Offline stand-in built once per worker process"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.calls = 0
+
+    def run_document_analysis_only(self, customer_json_path=None, customer_data=None):
+        self.calls += 1
+        return WorkflowState(
+            customer_json_path=customer_json_path,
+            status="document_analysis_complete",
+            intermediate_results={"worker_pid": self.pid, "calls": self.calls}
+        )
+
+    def run_conversation_generation(self, state, conversation_params):
+        state.conversation_params = conversation_params
+        state.status = "conversation_complete"
+        return state
+
+    def execute_complete_workflow(self, customer_json_path=None, conversation_params=None, config=None,
+                                  customer_data=None):
+        # LangGraph returns a plain dict; the pool must hand back a WorkflowState
+        return {"customer_json_path": customer_json_path, "status": "completed", "config": config or {}}
+
+
+def make_state():
+    return WorkflowState(
+        customer_analysis=CustomerAnalysis(customer_name="Acme", industry="Retail", company_size="Medium",
+                                           pain_points=[{"description": "Legacy ERP"}], needs=[]),
+        status="document_analysis_complete"
+    )
+
+
+class TestStateCodec(unittest.TestCase):
+    """Test cases for compact state serialization"""
+
+    def test_round_trip(self):
+        state = make_state()
+        blob = pack_state(state)
+        self.assertLess(len(blob), len(state.model_dump_json()))
+        restored = unpack_state(blob)
+        self.assertEqual(restored.model_dump(), state.model_dump())
+
+    def test_ensure_state_from_dict(self):
+        state = ensure_state({"status": "completed", "not_a_field": 1})
+        self.assertEqual(state.status, "completed")
+
+
+class TestWorkflowProcessPool(unittest.TestCase):
+    """Test cases for warm worker processes"""
+
+    @classmethod
+    def setUpClass(cls):
+        # Spawned workers import the fake factory from this tests directory
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        cls.pool = WorkflowProcessPool(max_workers=2, factory="test_workflow_pool:FakeWorkflow")
+        cls.pids = cls.pool.warmup()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def test_runs_in_worker_processes(self):
+        results = self.pool.map_document_analysis([f"customer_{i}.json" for i in range(6)])
+        self.assertEqual([r.customer_json_path for r in results], [f"customer_{i}.json" for i in range(6)])
+        pids = {r.intermediate_results["worker_pid"] for r in results}
+        self.assertNotIn(os.getpid(), pids)
+        self.assertTrue(self.pids)
+
+    def test_workflow_interface(self):
+        params = ConversationParams(goal="Discovery", tone="professional")
+        state = self.pool.run_conversation_generation(make_state(), params)
+        self.assertEqual(state.status, "conversation_complete")
+        self.assertEqual(state.customer_analysis.customer_name, "Acme")
+        complete = self.pool.execute_complete_workflow("customer.json", config={"mode": "batch"})
+        self.assertIsInstance(complete, WorkflowState)
+        self.assertEqual(complete.config, {"mode": "batch"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,230 @@
+"""
+Workflow output analytics
+Loads historical workflow results into pandas and computes vectorized aggregates
+"""
+import glob
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+DISC_TRAITS = ["D", "I", "S", "C"]
+STRATEGY_COMPONENTS = ["methodology_assessment", "competitive_positioning",
+                       "objection_handling", "value_proposition_delivery"]
+LEGACY_PATTERN = "b2b_sales_workflow_*_complete_results.json"
+
+
+def _score(component: Any) -> Optional[float]:
+    if isinstance(component, dict):
+        value = component.get("score")
+        if isinstance(value, (int, float)):
+            return float(value)
+    return None
+
+
+def flatten_output(output: Dict[str, Any], source: str = "") -> Dict[str, Any]:
+    """Flatten one complete-results document into a single analytics row"""
+    metadata = output.get("execution_metadata") or {}
+    results = output.get("analysis_results") or {}
+    details = output.get("execution_details") or {}
+    customer = results.get("customer_analysis") or {}
+    strategy = results.get("strategy_analysis") or {}
+    personality = results.get("personality_analysis") or {}
+    conversation = results.get("conversation") or {}
+
+    row: Dict[str, Any] = {
+        "execution_id": metadata.get("execution_id"),
+        "started_at": metadata.get("started_at"),
+        "completed_at": metadata.get("completed_at"),
+        "total_duration": metadata.get("total_duration"),
+        "status": metadata.get("status"),
+        "customer_name": customer.get("customer_name"),
+        "industry": customer.get("industry"),
+        "company_size": customer.get("company_size"),
+        "message_count": len(conversation.get("messages") or []),
+        "overall_effectiveness": strategy.get("overall_effectiveness"),
+        "recommendation_count": len(strategy.get("recommendations") or []),
+        "communication_style": personality.get("communication_style"),
+        "decision_making_style": personality.get("decision_making_style"),
+        "risk_tolerance": personality.get("risk_tolerance"),
+        "error_count": len(details.get("errors") or []),
+        "warning_count": len(details.get("warnings") or []),
+        "source": source,
+    }
+
+    for component in STRATEGY_COMPONENTS:
+        row[f"{component}_score"] = _score(strategy.get(component))
+
+    disc_profile = personality.get("disc_profile") or {}
+    for trait in DISC_TRAITS:
+        value = disc_profile.get(trait)
+        row[f"disc_{trait}"] = float(value) if isinstance(value, (int, float)) else None
+
+    for step, duration in (details.get("step_durations") or {}).items():
+        row[f"step_{step}"] = duration
+
+    return row
+
+
+class OutputAnalytics:
+    """
+    DataFrame view over saved workflow outputs
+
+    Reads the legacy per-run JSON files in ``Config.OUTPUT_DIR`` and the JSONL partitions of
+    the results store. ``refresh()`` is incremental: unchanged legacy files are skipped and
+    store partitions are read from the byte offset reached by the previous refresh.
+    """
+
+    def __init__(self, output_dir: Optional[str] = None, store_dir: Optional[str] = None):
+        self.output_dir = output_dir or Config.OUTPUT_DIR
+        self.store_dir = store_dir or Config.RESULTS_STORE_DIR
+        self._file_state: Dict[str, Tuple[float, int]] = {}
+        self._partition_offsets: Dict[str, int] = {}
+        self._frame = pd.DataFrame()
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        if self._frame.empty and not self._file_state and not self._partition_offsets:
+            self.refresh()
+        return self._frame
+
+    def refresh(self) -> int:
+        """Ingest outputs written since the last refresh, returns the number of new rows"""
+        rows = list(self._read_legacy_files()) + list(self._read_store_partitions())
+        if not rows:
+            return 0
+
+        new_frame = self._prepare(pd.DataFrame(rows))
+        if self._frame.empty:
+            self._frame = new_frame
+        else:
+            # A rewritten legacy file replaces its earlier row
+            combined = pd.concat([self._frame, new_frame], ignore_index=True)
+            self._frame = combined.drop_duplicates(subset=["source", "execution_id"], keep="last").reset_index(drop=True)
+
+        logger.info(f"Analytics ingested {len(rows)} new workflow outputs ({len(self._frame)} total)")
+        return len(rows)
+
+    def _read_legacy_files(self) -> Iterable[Dict[str, Any]]:
+        for path in sorted(glob.glob(os.path.join(self.output_dir, LEGACY_PATTERN))):
+            stat = os.stat(path)
+            state = (stat.st_mtime, stat.st_size)
+            if self._file_state.get(path) == state:
+                continue
+            self._file_state[path] = state
+            try:
+                with open(path, encoding="utf-8") as f:
+                    yield flatten_output(json.load(f), source=os.path.basename(path))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable output {path}: {e}")
+
+    def _read_store_partitions(self) -> Iterable[Dict[str, Any]]:
+        if not os.path.isdir(self.store_dir):
+            return
+        for path in sorted(glob.glob(os.path.join(self.store_dir, "results-*.jsonl"))):
+            offset = self._partition_offsets.get(path, 0)
+            if os.path.getsize(path) <= offset:
+                continue
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            # Only consume complete lines; a partial tail is picked up next time
+            complete = data[:data.rfind(b"\n") + 1]
+            self._partition_offsets[path] = offset + len(complete)
+            for line in complete.splitlines():
+                if not line.strip():
+                    continue
+                stored = json.loads(line)
+                row = flatten_output(stored.get("record") or {}, source=stored.get("result_id", ""))
+                row["execution_id"] = row["execution_id"] or stored.get("execution_id")
+                yield row
+
+    @staticmethod
+    def _prepare(frame: pd.DataFrame) -> pd.DataFrame:
+        for column in ("started_at", "completed_at"):
+            frame[column] = pd.to_datetime(frame[column], errors="coerce")
+        numeric = [c for c in frame.columns
+                   if c.startswith(("disc_", "step_")) or c.endswith("_score")
+                   or c in ("overall_effectiveness", "total_duration")]
+        if numeric:
+            frame[numeric] = frame[numeric].apply(pd.to_numeric, errors="coerce")
+        frame["has_errors"] = frame["error_count"] > 0
+        return frame
+
+    # ------------------------------------------------------------------ aggregates
+
+    @property
+    def step_columns(self) -> List[str]:
+        return [c for c in self.frame.columns if c.startswith("step_")]
+
+    def effectiveness_percentiles(self, percentiles=(0.1, 0.25, 0.5, 0.75, 0.9, 0.95)) -> pd.Series:
+        """Percentiles of the overall effectiveness score"""
+        return self.frame["overall_effectiveness"].quantile(list(percentiles))
+
+    def disc_distribution(self) -> pd.DataFrame:
+        """Share of runs per dominant DISC trait and the mean score of each trait"""
+        disc = self.frame[[f"disc_{trait}" for trait in DISC_TRAITS]].dropna(how="all")
+        if disc.empty:
+            return pd.DataFrame(columns=["share", "mean_score"])
+        dominant = disc.idxmax(axis=1).str.replace("disc_", "", regex=False)
+        share = dominant.value_counts(normalize=True).reindex(DISC_TRAITS, fill_value=0.0)
+        mean_score = disc.mean().set_axis(DISC_TRAITS)
+        return pd.DataFrame({"share": share, "mean_score": mean_score})
+
+    def step_duration_stats(self) -> pd.DataFrame:
+        """Mean, median and p95 duration per workflow step"""
+        steps = self.frame[self.step_columns]
+        stats = pd.DataFrame({
+            "mean": steps.mean(),
+            "p50": steps.quantile(0.5),
+            "p95": steps.quantile(0.95),
+            "runs": steps.count(),
+        })
+        stats.index = [c[len("step_"):] for c in stats.index]
+        return stats
+
+    def trend(self, freq: str = "D") -> pd.DataFrame:
+        """Runs, mean effectiveness, error rate and mean duration per period"""
+        frame = self.frame.dropna(subset=["started_at"])
+        grouped = frame.groupby(pd.Grouper(key="started_at", freq=freq))
+        return grouped.agg(
+            runs=("execution_id", "count"),
+            mean_effectiveness=("overall_effectiveness", "mean"),
+            error_rate=("has_errors", "mean"),
+            mean_duration=("total_duration", "mean"),
+        ).dropna(subset=["mean_effectiveness", "error_rate"], how="all")
+
+    def industry_breakdown(self) -> pd.DataFrame:
+        """Per-industry run counts, effectiveness, error rate and duration"""
+        frame = self.frame.assign(industry=self.frame["industry"].fillna("Unknown"))
+        return frame.groupby("industry").agg(
+            runs=("execution_id", "count"),
+            mean_effectiveness=("overall_effectiveness", "mean"),
+            p90_effectiveness=("overall_effectiveness", lambda s: s.quantile(0.9)),
+            error_rate=("has_errors", "mean"),
+            mean_duration=("total_duration", "mean"),
+        ).sort_values("runs", ascending=False)
+
+    def error_rate(self) -> float:
+        """Share of runs that recorded at least one error"""
+        return float(self.frame["has_errors"].mean()) if not self.frame.empty else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Headline numbers for dashboards"""
+        frame = self.frame
+        if frame.empty:
+            return {"runs": 0}
+        return {
+            "runs": int(len(frame)),
+            "mean_effectiveness": float(frame["overall_effectiveness"].mean()),
+            "median_effectiveness": float(frame["overall_effectiveness"].median()),
+            "error_rate": self.error_rate(),
+            "mean_duration": float(frame["total_duration"].mean()),
+            "industries": int(frame["industry"].nunique()),
+        }
@@ -0,0 +1,188 @@
+"""
+Compact workflow state
+Slots-backed message records, cheap branch copies and size measurement
+
+- CompactMessage stores a message as a ``__slots__`` record whose sender, type and channel
+  strings are interned (one shared str per distinct value) and whose timestamp is a float.
+  It reads like the UI message dicts (``msg['sender']``, ``msg.get('channel')``), so the
+  Streamlit session keeps its transcript as CompactMessage records, and it packs into the
+  small payload the delta checkpoint saver stores for every message (utils.delta_checkpoint).
+- branch_copy() gives a parallel branch, background job or scenario its own mutable tracking
+  fields and conversation list while the analyses and profile are shared by reference.
+
+Run ``python -m utils.compact_state`` to print bytes per conversation before and after.
+"""
+import json
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from utils.models import Conversation, Message, WorkflowState
+
+# Small mutable containers every branch must own
+BRANCH_CONTAINERS = ("completed_steps", "errors", "warnings", "config", "intermediate_results",
+                     "personality_components", "personality_recommendations", "step_durations")
+# Timestamp layout of the UI message dicts
+SESSION_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class CompactMessage(Mapping):
+    """One conversation message as a slots record, readable as a UI message dict"""
+
+    __slots__ = ("sender", "content", "message_type", "channel", "timestamp")
+
+    def __init__(self, sender: str, content: str, message_type: str = "text", channel: Optional[str] = None,
+                 timestamp: Optional[float] = None):
+        self.sender = _intern(sender)
+        self.content = content
+        self.message_type = _intern(message_type)
+        self.channel = _intern(channel)
+        self.timestamp = datetime.now().timestamp() if timestamp is None else timestamp
+
+    @classmethod
+    def from_dict(cls, message: Mapping) -> "CompactMessage":
+        if isinstance(message, CompactMessage):
+            return message
+        timestamp = message.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.strptime(timestamp, SESSION_TIMESTAMP_FORMAT)
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        return cls(message["sender"], message["content"], message.get("message_type", "text"),
+                   message.get("channel"), timestamp)
+
+    @classmethod
+    def from_model(cls, message: Message) -> "CompactMessage":
+        return cls(message.sender, message.content, message.message_type, timestamp=message.timestamp.timestamp())
+
+    def to_model(self) -> Message:
+        return Message(sender=self.sender, content=self.content, message_type=self.message_type,
+                       timestamp=datetime.fromtimestamp(self.timestamp))
+
+    def pack(self) -> bytes:
+        """Checkpoint payload: a JSON array, no field names or type information"""
+        return json.dumps([self.sender, self.message_type, self.timestamp, self.content],
+                          ensure_ascii=False).encode("utf-8")
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "CompactMessage":
+        sender, message_type, timestamp, content = json.loads(data)
+        return cls(sender, content, message_type, timestamp=timestamp)
+
+    # --- read-only dict interface ----------------------------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "timestamp":
+            return datetime.fromtimestamp(self.timestamp).strftime(SESSION_TIMESTAMP_FORMAT)
+        if key not in self.__slots__ or getattr(self, key) is None:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return (name for name in self.__slots__ if getattr(self, name) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"CompactMessage({self.sender!r}, {self.content[:30]!r}, {self.message_type!r})"
+
+
+def branch_copy(state: WorkflowState) -> WorkflowState:
+    """
+    Copy of ``state`` for a parallel branch or background job
+
+    Analyses and profiles are shared by reference; tracking containers, conversation parameters
+    and the conversation (with its message list, not the messages) are copied so the branch can
+    mutate them without affecting the original.
+    """
+    update: Dict[str, Any] = {name: getattr(state, name).copy() for name in BRANCH_CONTAINERS}
+    if state.conversation_params is not None:
+        update["conversation_params"] = state.conversation_params.model_copy()
+    if state.conversation is not None:
+        update["conversation"] = state.conversation.model_copy(update={
+            "messages": list(state.conversation.messages),
+            "metadata": dict(state.conversation.metadata)
+        })
+    return state.model_copy(update=update)
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Bytes retained by ``obj`` and everything it references (shared objects counted once)"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None), datetime)):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(deep_sizeof(item, seen) for item in obj)
+    if isinstance(obj, BaseModel):
+        size += deep_sizeof(obj.__dict__, seen)
+        return size + deep_sizeof(getattr(obj, "__pydantic_fields_set__", None), seen)
+    if hasattr(obj, "__slots__"):
+        return size + sum(deep_sizeof(getattr(obj, name, None), seen) for name in obj.__slots__)
+    if hasattr(obj, "__dict__"):
+        return size + deep_sizeof(obj.__dict__, seen)
+    return size
+
+
+def _session_messages(states: List[WorkflowState]) -> List[List[Dict[str, Any]]]:
+    # The transcripts as the UI used to keep them: one dict per message
+    return [[{"sender": msg.sender, "content": msg.content, "message_type": msg.message_type, "channel": "email",
+              "timestamp": msg.timestamp.strftime(SESSION_TIMESTAMP_FORMAT)}
+             for msg in state.conversation.messages] for state in states]
+
+
+def measure_sessions(states: List[WorkflowState]) -> Dict[str, float]:
+    """Bytes per conversation of the session transcript and of the checkpointed state, before and after"""
+    from utils.delta_checkpoint import DeltaCheckpointSaver
+
+    count = max(len(states), 1)
+    dicts = _session_messages(states)
+    records = [[CompactMessage.from_dict(msg) for msg in messages] for messages in dicts]
+    # Conversation copy each node input gets (revalidation): only objects it does not share count
+    node_copy_bytes = sum(deep_sizeof(Conversation.model_validate(state.conversation),
+                                      {id(value) for value in [*vars(state.conversation).values(),
+                                                               *state.conversation.messages]})
+                          for state in states)
+    checkpoint_bytes = {}
+    for compact in (False, True):
+        saver = DeltaCheckpointSaver(compact_messages=compact)
+        for index, state in enumerate(states):
+            saver._store(f"conversation_{index}", state)
+        checkpoint_bytes[compact] = saver.content.stored_bytes()
+    return {
+        "conversations": len(states),
+        "session_dict_bytes": deep_sizeof(dicts) / count,
+        "session_compact_bytes": deep_sizeof(records) / count,
+        "checkpoint_model_bytes": checkpoint_bytes[False] / count,
+        "checkpoint_compact_bytes": checkpoint_bytes[True] / count,
+        "node_copy_bytes": node_copy_bytes / count,
+    }
+
+
+def run_benchmark(sessions: int = 50, turns: int = 12) -> Dict[str, float]:
+    from utils.delta_checkpoint import _sample_states
+
+    return measure_sessions(_sample_states(sessions, turns))
+
+
+if __name__ == "__main__":
+    result = run_benchmark()
+    print(f"{result['conversations']} conversations, bytes per conversation")
+    print(f"Session transcript : {result['session_dict_bytes']:>8,.0f} as dicts   "
+          f"{result['session_compact_bytes']:>8,.0f} as CompactMessage")
+    print(f"Checkpoint store   : {result['checkpoint_model_bytes']:>8,.0f} as models  "
+          f"{result['checkpoint_compact_bytes']:>8,.0f} as CompactMessage")
+    print(f"Conversation copy per node input: {result['node_copy_bytes']:,.0f}")
@@ -0,0 +1,215 @@
+"""
+Conversation tasks
+Self-contained units of LLM work used by the UI, safe to run on background worker threads
+
+The functions here never touch Streamlit session state: callers pass plain snapshots
+(message dicts or CompactMessage records, customer info, a copy of the workflow state)
+and get plain results back.
+"""
+import hashlib
+import json
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from utils.incremental_analysis import make_snapshot, message_features, pending_turns, summarize_features
+from utils.jobs import JobStatus
+from utils.models import Conversation, ConversationChannel, CustomerAnalysis, Message, WorkflowState
+
+
+def _json_default(value: Any) -> Any:
+    # Session transcripts hold CompactMessage records: hash them as the dicts they stand for
+    return dict(value) if isinstance(value, Mapping) else str(value)
+
+
+def task_key(session_id: str, kind: str, payload: Any) -> str:
+    """De-duplication key: identical work for the same session maps to the same in-flight job"""
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=_json_default).encode("utf-8")).hexdigest()
+    return f"{session_id}:{kind}:{digest}"
+
+
+def to_messages(conversation_messages: List[Dict[str, Any]]) -> List[Message]:
+    """Convert UI message dicts to Message objects"""
+    return [
+        Message(
+            sender=msg['sender'],
+            content=msg['content'],
+            message_type=msg.get('message_type', 'unknown'),
+            timestamp=datetime.now()
+        )
+        for msg in conversation_messages
+    ]
+
+
+def customer_analysis_from_info(customer_info: Dict[str, Any]) -> CustomerAnalysis:
+    """Build a CustomerAnalysis from the customer info shown in the UI"""
+    return CustomerAnalysis(
+        customer_name=customer_info['company_name'],
+        industry=customer_info['industry'],
+        company_size=customer_info['company_size'],
+        pain_points=customer_info.get('pain_points', []),
+        needs=customer_info.get('business_needs', []),
+        communication_style=customer_info.get('communication_style', 'professional'),
+        decision_makers=customer_info.get('decision_makers', [])
+    )
+
+
+def build_analysis_state(conversation_messages: List[Dict[str, Any]], customer_info: Dict[str, Any]) -> WorkflowState:
+    """Workflow state holding the finished conversation for strategy/personality analysis"""
+    messages = to_messages(conversation_messages)
+    workflow_state = WorkflowState()
+    workflow_state.conversation = Conversation(
+        messages=messages,
+        conversation_id=f"analysis_conv_{len(messages)}",
+        goal="Analysis",
+        participants={"company": "Talan Tunisie", "customer": customer_info['company_name']},
+        status="completed"
+    )
+    workflow_state.customer_analysis = customer_analysis_from_info(customer_info)
+    return workflow_state
+
+
+def run_personality_task(conversation_messages: List[Dict[str, Any]], customer_info: Dict[str, Any]):
+    """Personality analysis of the conversation, returns PersonalityAnalysis or None"""
+    from agents.personality_classifier_agent_pure import PersonalityClassifierAgentPure
+
+    result_state = PersonalityClassifierAgentPure().execute(build_analysis_state(conversation_messages, customer_info))
+    return result_state.personality_analysis
+
+
+def run_strategy_task(conversation_messages: List[Dict[str, Any]], customer_info: Dict[str, Any]):
+    """Strategy analysis of the conversation, returns StrategyAnalysis or None"""
+    from agents.strategy_agent_pure import StrategyAgentPure
+
+    result_state = StrategyAgentPure().execute(build_analysis_state(conversation_messages, customer_info))
+    return result_state.strategy_analysis
+
+
+def _update_analysis_snapshot(full_task, agent_factory, conversation_messages: List[Dict[str, Any]],
+                              customer_info: Dict[str, Any], snapshot: Optional[Dict[str, Any]],
+                              counts_customer_only: bool) -> Dict[str, Any]:
+    context = task_key("analysis", "customer", customer_info)
+    new_turns = pending_turns(snapshot, conversation_messages, context)
+    if new_turns == []:
+        return snapshot
+    if new_turns is None:
+        analysis = full_task(conversation_messages, customer_info)
+        features = [message_features(msg) for msg in conversation_messages]
+        return make_snapshot(analysis, conversation_messages, features, context=context)
+
+    new_features = [message_features(msg) for msg in new_turns]
+    previous_features = snapshot["features"]
+    if counts_customer_only:
+        analyzed = sum(1 for feature in previous_features if feature["sender"] != "company")
+    else:
+        analyzed = len(previous_features)
+    analysis = agent_factory().update_analysis(
+        snapshot["analysis"], customer_analysis_from_info(customer_info), to_messages(new_turns),
+        summarize_features(new_features), analyzed
+    )
+    if analysis is None:
+        # Failed update: the new turns stay pending for the next call
+        return snapshot
+    return make_snapshot(analysis, conversation_messages, previous_features + new_features,
+                         updates=snapshot.get("updates", 0) + 1, context=context)
+
+
+def update_personality_task(conversation_messages: List[Dict[str, Any]], customer_info: Dict[str, Any],
+                            snapshot: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Personality analysis that only sends turns added since ``snapshot`` to the LLM
+
+    Returns a new snapshot (see utils.incremental_analysis); its ``analysis`` may be None on failure.
+    """
+    from agents.personality_classifier_agent_pure import PersonalityClassifierAgentPure
+
+    return _update_analysis_snapshot(run_personality_task, PersonalityClassifierAgentPure, conversation_messages,
+                                     customer_info, snapshot, counts_customer_only=True)
+
+
+def update_strategy_task(conversation_messages: List[Dict[str, Any]], customer_info: Dict[str, Any],
+                         snapshot: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Strategy analysis that only sends turns added since ``snapshot`` to the LLM, returns a new snapshot"""
+    from agents.strategy_agent_pure import StrategyAgentPure
+
+    return _update_analysis_snapshot(run_strategy_task, StrategyAgentPure, conversation_messages,
+                                     customer_info, snapshot, counts_customer_only=False)
+
+
+def _prepare_talan_state(workflow_state: WorkflowState, conversation_messages: List[Dict[str, Any]],
+                         customer_name: str, goal: str, channel: str) -> WorkflowState:
+    if conversation_messages:
+        existing_messages = to_messages(conversation_messages)
+        workflow_state.conversation = Conversation(
+            messages=existing_messages,
+            conversation_id=f"talan_conv_{len(existing_messages)}",
+            goal=goal,
+            participants={"company": "Talan Tunisie", "customer": customer_name},
+            status="in_progress",
+            channel=getattr(ConversationChannel, channel)
+        )
+    if workflow_state.conversation_params:
+        # The prompt format (and candidate scoring) follow the channel picked in the UI
+        workflow_state.conversation_params.channel = getattr(ConversationChannel, channel)
+    return workflow_state
+
+
+def run_talan_message_task(workflow_state: WorkflowState, conversation_messages: List[Dict[str, Any]],
+                           customer_name: str, goal: str, channel: str) -> Optional[str]:
+    """Generate the next Talan message for review, returns its content or None"""
+    from agents.message_composer_agent_pure import MessageComposerAgentPure
+
+    workflow_state = _prepare_talan_state(workflow_state, conversation_messages, customer_name, goal, channel)
+    result = MessageComposerAgentPure(mode="talan_only").execute(workflow_state)
+    if result.conversation and result.conversation.messages:
+        talan_messages = [msg for msg in result.conversation.messages if msg.sender == "company"]
+        if talan_messages:
+            return talan_messages[-1].content
+    return None
+
+
+def run_talan_candidates_task(workflow_state: WorkflowState, conversation_messages: List[Dict[str, Any]],
+                              customer_name: str, goal: str, channel: str, count: int) -> List[Dict[str, Any]]:
+    """Generate ``count`` Talan drafts in parallel, returns them ranked best first (empty on failure)"""
+    from agents.message_composer_agent_pure import MessageComposerAgentPure
+
+    workflow_state = _prepare_talan_state(workflow_state, conversation_messages, customer_name, goal, channel)
+    workflow_state.config = {**workflow_state.config, "talan_candidates": count}
+    result = MessageComposerAgentPure(mode="talan_only").execute(workflow_state)
+    return list(result.intermediate_results.get("talan_candidates") or [])
+
+
+def run_customer_response_task(workflow_state: WorkflowState, conversation_messages: List[Dict[str, Any]],
+                               talan_message: Dict[str, Any], customer_name: str, goal: str) -> Optional[str]:
+    """Generate the customer's reply to an approved Talan message, returns its content or None"""
+    from agents.message_composer_agent_pure import MessageComposerAgentPure
+
+    messages = to_messages(list(conversation_messages) + [talan_message])
+    workflow_state.conversation = Conversation(
+        messages=messages,
+        conversation_id=f"response_conv_{len(messages)}",
+        goal=goal,
+        participants={"company": "Talan Tunisie", "customer": customer_name},
+        status="in_progress"
+    )
+
+    result = MessageComposerAgentPure(mode="customer_only").execute(workflow_state)
+    if result.conversation and result.conversation.messages:
+        customer_messages = [msg for msg in result.conversation.messages if msg.sender == "customer"]
+        if customer_messages:
+            return customer_messages[-1].content
+    return None
+
+
+def resolve_speculation(job, speculative_key: str, approved_key: str) -> str:
+    """
+    Decide what to do with a speculatively started customer reply once the user approves
+
+    Returns "reuse" (finished with a result for exactly the approved inputs), "adopt" (same
+    inputs, still running) or "discard" (the draft or goal changed, or the job failed).
+    """
+    if job is None or speculative_key != approved_key:
+        return "discard"
+    if not job.done:
+        return "discard" if job.cancel_requested else "adopt"
+    return "reuse" if job.status == JobStatus.SUCCEEDED and job.result else "discard"
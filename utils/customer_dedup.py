@@ -0,0 +1,189 @@
+"""
+Customer profile deduplication
+Canonical fingerprints and MinHash similarity to analyse each distinct company once per batch
+
+CRM exports list the same company many times with trivial differences: whitespace, casing,
+field order, export timestamps, a reworded pain point. Before document analysis, profiles are
+
+1. canonicalized - keys sorted, strings normalized (NFKC, casefolded, whitespace collapsed),
+   volatile fields (ids, timestamps) dropped, lists of strings sorted;
+2. fingerprinted - SHA-1 of the canonical JSON groups exact duplicates;
+3. compared with MinHash signatures over the word shingles of the pain points, needs and
+   challenges text, bucketed with LSH bands so only likely pairs are compared. Profiles of the
+   same (normalized, non-empty) company name whose estimated Jaccard similarity reaches the
+   threshold join the same group.
+
+The batch then analyses one representative per group and fans the analysis out to the others.
+"""
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config.settings import Config
+
+# Fields that change between exports of the same account
+VOLATILE_FIELDS = {"id", "_id", "uuid", "crm_id", "record_id", "export_id", "timestamp", "exported_at",
+                   "created_at", "updated_at", "last_modified", "last_updated", "modified_at", "synced_at"}
+VOLATILE_SUFFIXES = ("_at", "_timestamp")
+# Fields whose text identifies the profile content for near-duplicate detection
+TEXT_FIELDS = ("pain_points", "needs", "challenges", "objectives", "current_challenges", "business_needs")
+NAME_FIELDS = ("customer_name", "company_name", "name")
+
+_WORD = re.compile(r"\w+")
+_PRIME = (1 << 61) - 1
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def _is_volatile(key: str) -> bool:
+    key = key.lower()
+    return key in VOLATILE_FIELDS or key.endswith(VOLATILE_SUFFIXES)
+
+
+def canonicalize(value: Any) -> Any:
+    """Profile with sorted keys, normalized strings, sorted string lists and no volatile fields"""
+    if isinstance(value, dict):
+        return {key: canonicalize(item) for key, item in sorted(value.items()) if not _is_volatile(key)}
+    if isinstance(value, list):
+        items = [canonicalize(item) for item in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, ensure_ascii=False))
+    if isinstance(value, str):
+        return _normalize_text(value)
+    return value
+
+
+def fingerprint(profile: Dict[str, Any]) -> str:
+    """Digest shared by profiles that only differ in formatting, key order or volatile fields"""
+    canonical = json.dumps(canonicalize(profile), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def company_key(profile: Dict[str, Any]) -> str:
+    """Normalized company name (nested ``customer_profile`` layouts included); "" when unknown"""
+    for source in (profile, profile.get("customer_profile") or {}):
+        if isinstance(source, dict):
+            for field in NAME_FIELDS:
+                if isinstance(source.get(field), str) and source[field].strip():
+                    return " ".join(_WORD.findall(_normalize_text(source[field])))
+    return ""
+
+
+def _texts(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _texts(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _texts(item)
+
+
+def shingles(profile: Dict[str, Any], size: int = 3) -> List[str]:
+    """Word ``size``-grams of the pain point / needs text (whole words for short texts)"""
+    sources = [profile]
+    if isinstance(profile.get("customer_profile"), dict):
+        sources.append(profile["customer_profile"])
+    words = [word for source in sources for field in TEXT_FIELDS
+             for text in _texts(source.get(field)) for word in _WORD.findall(_normalize_text(text))]
+    if len(words) < size:
+        return words
+    return sorted({" ".join(words[i:i + size]) for i in range(len(words) - size + 1)})
+
+
+class MinHasher:
+    """MinHash signatures of shingle sets (NumPy, universal hashing modulo a Mersenne prime)"""
+
+    def __init__(self, num_perm: Optional[int] = None, seed: int = 1):
+        import numpy as np
+
+        self.num_perm = num_perm or Config.DEDUP_NUM_PERM
+        rng = np.random.default_rng(seed)
+        self._np = np
+        self._a = rng.integers(1, 1 << 32, self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, self.num_perm, dtype=np.uint64)
+
+    def signature(self, tokens: Iterable[str]):
+        np = self._np
+        hashes = np.fromiter((int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+                              for token in tokens), dtype=np.uint64)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        # a, b and the hashes are below 2**32, so a * h + b fits in 64 bits
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    @staticmethod
+    def similarity(left, right) -> float:
+        """Estimated Jaccard similarity of the two shingle sets"""
+        return float((left == right).mean())
+
+
+class CustomerDeduplicator:
+    """
+    Incremental grouping of customer profiles
+
+    ``add(profile)`` returns ``(group, is_new)``: the group of an earlier exact or near
+    duplicate, or a new group. Signatures are bucketed in ``bands`` LSH bands, so a profile is
+    only compared with earlier profiles sharing at least one band.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, num_perm: Optional[int] = None, bands: Optional[int] = None):
+        self.threshold = Config.DEDUP_SIMILARITY_THRESHOLD if threshold is None else threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands or Config.DEDUP_LSH_BANDS
+        self.rows = self.hasher.num_perm // self.bands
+        self._fingerprints: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        self._groups: List[Tuple[str, Any]] = []  # group -> (company key, signature)
+        self._lock = threading.Lock()
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+
+    def _bands(self, signature) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def add(self, profile: Dict[str, Any]) -> Tuple[int, bool]:
+        digest = fingerprint(profile)
+        company = company_key(profile)
+        tokens = shingles(profile)
+        with self._lock:
+            if digest in self._fingerprints:
+                self.exact_duplicates += 1
+                return self._fingerprints[digest], False
+            signature = self.hasher.signature(tokens)
+            bands = self._bands(signature)
+            # Near duplicates must at least name the same company
+            if tokens and company:
+                candidates = sorted({group for band in bands for group in self._buckets.get(band, ())})
+                for group in candidates:
+                    group_company, group_signature = self._groups[group]
+                    if group_company == company and self.hasher.similarity(signature, group_signature) >= self.threshold:
+                        self.near_duplicates += 1
+                        self._fingerprints[digest] = group
+                        return group, False
+            group = len(self._groups)
+            self._groups.append((company, signature))
+            self._fingerprints[digest] = group
+            if tokens:
+                for band in bands:
+                    self._buckets[band].append(group)
+            return group, True
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+
+def group_profiles(profiles: Iterable[Dict[str, Any]], threshold: Optional[float] = None) -> List[List[int]]:
+    """Indices of ``profiles`` grouped by duplicate; each group lists its representative first"""
+    deduplicator = CustomerDeduplicator(threshold)
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for index, profile in enumerate(profiles):
+        group, _ = deduplicator.add(profile)
+        groups[group].append(index)
+    return [groups[group] for group in sorted(groups)]
@@ -0,0 +1,225 @@
+"""
+Streaming customer exports
+Constant-memory reader yielding one customer profile at a time from a JSON array or NDJSON export
+
+CRM exports hold tens of thousands of accounts in a single file, either as one JSON array or
+as newline-delimited JSON. Loading such a file with ``json.load`` needs the whole export in
+memory before the first workflow starts. The reader reads the file in fixed-size chunks and
+only ever holds the current chunk and the current record:
+
+- NDJSON (and concatenated objects on one line each) is read line by line;
+- anything else (a JSON array, pretty-printed objects) goes through a small scanner that finds
+  where each top-level object ends by tracking strings and bracket depth, without parsing.
+
+Every record carries the byte offset right after it. Committing that offset to a checkpoint
+file lets a batch run stop at any point and resume from the first record it did not finish.
+"""
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from config.settings import Config
+from utils.helpers import parse_json_bytes, validate_customer_profile
+
+logger = logging.getLogger(__name__)
+
+FORMAT_ARRAY = "array"
+FORMAT_NDJSON = "ndjson"
+FORMAT_OBJECTS = "objects"  # concatenated (e.g. pretty-printed) objects
+
+_NOT_SEPARATOR = re.compile(rb"[^\s,]")
+_STRING_SPECIAL = re.compile(rb'["\\]')
+# A whole string (matched in one step; the closing quote is missing when the chunk ends inside it) or a bracket
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*("?)|[{}\[\]]', re.DOTALL)
+
+
+class CustomerRecord(NamedTuple):
+    index: int        # position of the record in the export, from 0
+    offset: int       # byte offset where the record starts
+    end: int          # byte offset right after the record: resume point once it is processed
+    data: Dict[str, Any]
+
+
+def detect_format(path: str) -> str:
+    """FORMAT_ARRAY, FORMAT_NDJSON or FORMAT_OBJECTS from the first record of the export"""
+    with open(path, "rb") as f:
+        head = f.read(Config.EXPORT_CHUNK_BYTES)
+        match = _NOT_SEPARATOR.search(head)
+        if match is None:
+            return FORMAT_NDJSON
+        if head[match.start():match.start() + 1] == b"[":
+            return FORMAT_ARRAY
+        f.seek(match.start())
+        first_line = f.readline(Config.MAX_FILE_SIZE_MB * 1024 * 1024)
+    try:
+        parse_json_bytes(first_line)
+        return FORMAT_NDJSON
+    except ValueError:
+        return FORMAT_OBJECTS
+
+
+def _scan_objects(f, offset: int, in_array: bool) -> Iterator[Tuple[int, int, bytes]]:
+    """(start, end, raw bytes) of each top-level object from ``offset``; stops at ']' or EOF"""
+    max_record = Config.MAX_FILE_SIZE_MB * 1024 * 1024
+    depth, in_string, skip = 0, False, 0
+    start, record = None, bytearray()
+    base = offset
+    f.seek(offset)
+    while True:
+        chunk = f.read(Config.EXPORT_CHUNK_BYTES)
+        if not chunk:
+            break
+        pos, segment = skip, 0
+        skip = 0
+        while pos < len(chunk):
+            if depth == 0:
+                match = _NOT_SEPARATOR.search(chunk, pos)
+                if match is None:
+                    break
+                byte = chunk[match.start():match.start() + 1]
+                if byte == b"]" and in_array:
+                    return
+                if byte != b"{":
+                    raise ValueError(f"Expected a customer object at byte {base + match.start()}, got {byte!r}")
+                start, segment, depth = base + match.start(), match.start(), 1
+                pos = match.start() + 1
+            elif in_string:
+                match = _STRING_SPECIAL.search(chunk, pos)
+                if match is None:
+                    break
+                if chunk[match.start()] == 0x5C:  # backslash: the next byte is escaped
+                    pos = match.start() + 2
+                else:
+                    in_string = False
+                    pos = match.start() + 1
+            else:
+                match = _TOKEN.search(chunk, pos)
+                if match is None:
+                    break
+                byte = chunk[match.start()]
+                pos = match.end()
+                if byte == 0x22:  # quote
+                    in_string = not match.group(1)
+                elif byte in (0x7B, 0x5B):  # { [
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        record += chunk[segment:pos]
+                        yield start, base + pos, bytes(record)
+                        start, record = None, bytearray()
+        if pos > len(chunk):
+            # An escape at the very end of the chunk also covers the first byte of the next one
+            skip = pos - len(chunk)
+        if start is not None:
+            record += chunk[segment:]
+            if len(record) > max_record:
+                raise ValueError(f"Customer record at byte {start} exceeds {Config.MAX_FILE_SIZE_MB}MB")
+        base += len(chunk)
+    if start is not None:
+        raise ValueError(f"Truncated customer record at byte {start}")
+    if in_array:
+        raise ValueError("Unterminated JSON array")
+
+
+def _scan_lines(f, offset: int) -> Iterator[Tuple[int, int, bytes]]:
+    f.seek(offset)
+    position = offset
+    for line in f:
+        start, position = position, position + len(line)
+        if line.strip():
+            yield start, position, line
+
+
+class CustomerExportReader:
+    """
+    Iterate the customers of an export, optionally resuming from a checkpoint file
+
+    Records that are not valid JSON or not a customer profile are logged and skipped
+    (``skipped`` counts them); a broken array structure raises ValueError. Call
+    ``commit(record)`` once a record has been processed: the checkpoint is written every
+    ``checkpoint_every`` commits and by ``flush()``/``close()``.
+    """
+
+    def __init__(self, path: str, checkpoint_path: Optional[str] = None, checkpoint_every: Optional[int] = None):
+        self.path = path
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every or Config.EXPORT_CHECKPOINT_EVERY
+        self.format = detect_format(path)
+        self.offset = 0
+        self.records = 0  # records committed so far (across resumed runs)
+        self.skipped = 0
+        self._uncommitted = 0
+        self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("path") != os.path.abspath(self.path) or checkpoint.get("format") != self.format:
+            logger.warning(f"Ignoring checkpoint {self.checkpoint_path}: it belongs to another export")
+            return
+        self.offset, self.records = checkpoint["offset"], checkpoint["records"]
+        logger.info(f"Resuming {self.path} at byte {self.offset} after {self.records} records")
+
+    def __iter__(self) -> Iterator[CustomerRecord]:
+        index = self.records
+        with open(self.path, "rb") as f:
+            if self.format == FORMAT_NDJSON:
+                raw_records = _scan_lines(f, self.offset)
+            elif self.format == FORMAT_ARRAY and self.offset == 0:
+                # Start right after the opening bracket
+                head = f.read(Config.EXPORT_CHUNK_BYTES)
+                raw_records = _scan_objects(f, _NOT_SEPARATOR.search(head).start() + 1, in_array=True)
+            else:
+                raw_records = _scan_objects(f, self.offset, in_array=self.format == FORMAT_ARRAY)
+            for start, end, raw in raw_records:
+                try:
+                    data = validate_customer_profile(parse_json_bytes(raw))
+                except ValueError as e:
+                    self.skipped += 1
+                    logger.warning(f"Skipping customer record at byte {start} of {self.path}: {str(e)}")
+                    continue
+                yield CustomerRecord(index, start, end, data)
+                index += 1
+
+    def commit(self, record: CustomerRecord):
+        """Mark ``record`` (and everything before it) as processed"""
+        self.offset = record.end
+        self.records = record.index + 1
+        self._uncommitted += 1
+        if self._uncommitted >= self.checkpoint_every:
+            self.flush()
+
+    def flush(self):
+        """Write the checkpoint file (atomically) if there is one"""
+        self._uncommitted = 0
+        if not self.checkpoint_path:
+            return
+        checkpoint = {"path": os.path.abspath(self.path), "format": self.format,
+                      "offset": self.offset, "records": self.records}
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_customers(path: str) -> Iterator[Dict[str, Any]]:
+    """Customer profiles of an export, one at a time (no checkpointing)"""
+    for record in CustomerExportReader(path):
+        yield record.data
@@ -0,0 +1,518 @@
+"""
+Delta checkpoint saver
+In-memory LangGraph checkpointer that stores each distinct channel value once and references it from every step
+
+Each node returns the whole WorkflowState, so a plain MemorySaver serializes and stores every
+field three times per super-step (channel blobs, pending writes, metadata "writes") even when
+only ``status`` or the message list changed. DeltaCheckpointSaver keeps the MemorySaver layout
+but routes values through a content-addressed store:
+
+- a value whose serialized bytes were already stored becomes a 20-byte reference, so a step
+  only adds the fields that actually changed;
+- a conversation is stored as its metadata plus references to individually stored messages,
+  so appending a message adds one message, not another copy of the transcript; each message
+  is packed as a CompactMessage record (utils.compact_state) rather than a serialized model;
+- metadata "writes" are split per channel and stored the same way;
+- messages (frozen models) seen again as the same object are not re-serialized at all, except
+  on every ``full_snapshot_every``-th checkpoint of a thread, where every value is serialized
+  from scratch.
+
+LangGraph calls ``put`` on a background thread while the next node already runs, so the saver
+cannot snapshot its input itself: the values it receives must not change afterwards. Nodes get
+fresh top-level containers from LangGraph and their own ``Conversation`` copy (see
+utils.models), so agents appending messages or errors in place never reach a checkpoint being
+written. Analyses are mutable models and always go through the content digest.
+
+Any step can be reconstructed with the regular ``get_tuple``/``list``/``get_state`` APIs.
+
+With ``Config.CHECKPOINT_DIR`` set, both savers also write every checkpoint, pending write and
+stored value through to a SQLite journal (one file per graph) in the same transaction as the
+step, and load a thread back from it the first time it is read. A run that failed or was
+interrupted can then be resumed by another process, e.g. after a restart.
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from config.settings import Config
+from utils.compact_state import CompactMessage
+from utils.models import Conversation, CustomerAnalysis, Message, WorkflowState
+
+REF_TYPE = "delta-ref"
+CONVERSATION_TYPE = "delta-conversation"
+MESSAGE_TYPE = "delta-message"
+STATE_TYPE = "delta-state"
+# Scalars this short are cheaper to keep inline than to hash and reference
+INLINE_TYPES = (str, int, float, bool, type(None))
+INLINE_LIMIT = 64
+METADATA_REFS = "__delta_refs__"
+
+# Frozen models: safe to recognise by identity
+IMMUTABLE_TYPES = (Message,)
+
+
+class ContentStore:
+    """Serialized values keyed by digest, reference-counted per checkpoint thread"""
+
+    def __init__(self, on_add: Optional[Callable[[str, bytes, Tuple[str, bytes]], None]] = None):
+        self.values: Dict[bytes, Tuple[str, bytes]] = {}
+        self.owners: Dict[str, Set[bytes]] = defaultdict(set)
+        self.refcounts: Dict[bytes, int] = defaultdict(int)
+        self.lock = threading.Lock()
+        # Called for every value newly referenced by an owner (journaling)
+        self.on_add = on_add
+
+    def put(self, owner: str, typed: Tuple[str, bytes], digest: Optional[bytes] = None) -> bytes:
+        digest = digest or hashlib.sha1(typed[0].encode("utf-8") + b"\0" + typed[1]).digest()
+        with self.lock:
+            if digest not in self.values:
+                self.values[digest] = typed
+            if digest not in self.owners[owner]:
+                self.owners[owner].add(digest)
+                self.refcounts[digest] += 1
+                added = True
+            else:
+                added = False
+        if added and self.on_add is not None:
+            self.on_add(owner, digest, typed)
+        return digest
+
+    def add_owner(self, owner: str, digest: bytes) -> bool:
+        """Reference an already stored value from ``owner``; False if it is gone"""
+        with self.lock:
+            if digest not in self.values:
+                return False
+            if digest in self.owners[owner]:
+                return True
+            self.owners[owner].add(digest)
+            self.refcounts[digest] += 1
+            typed = self.values[digest]
+        if self.on_add is not None:
+            self.on_add(owner, digest, typed)
+        return True
+
+    def release(self, owner: str):
+        with self.lock:
+            for digest in self.owners.pop(owner, ()):
+                self.refcounts[digest] -= 1
+                if self.refcounts[digest] <= 0:
+                    del self.refcounts[digest]
+                    self.values.pop(digest, None)
+
+    def stored_bytes(self) -> int:
+        return sum(len(typed[1]) for typed in self.values.values())
+
+
+class _DeltaSerializer(SerializerProtocol):
+    """Serializer used by the saver: values become references into the ContentStore"""
+
+    def __init__(self, saver: "DeltaCheckpointSaver", inner: SerializerProtocol):
+        self.saver = saver
+        self.inner = inner
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        owner = getattr(self.saver._context, "owner", None)
+        if owner is None or (isinstance(obj, INLINE_TYPES) and len(str(obj)) <= INLINE_LIMIT):
+            return self.inner.dumps_typed(obj)
+        return REF_TYPE, self.saver._store(owner, obj)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        if data[0] == REF_TYPE:
+            return self.saver._load(data[1])
+        return self.inner.loads_typed(data)
+
+
+class CheckpointJournal:
+    """SQLite file holding a saver's entries per thread, written in one transaction per step"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS entries (thread TEXT NOT NULL, kind TEXT NOT NULL, "
+                                    "key BLOB NOT NULL, value BLOB NOT NULL, PRIMARY KEY (kind, key))")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS entries_thread ON entries (thread)")
+
+    def record(self, thread_id: str, rows: List[Tuple[str, Any, Any]]):
+        """Persist ``(kind, key, value)`` rows of ``thread_id``, replacing earlier values of the same keys"""
+        if not rows:
+            return
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO entries (thread, kind, key, value) VALUES (?, ?, ?, ?)",
+                [(thread_id, kind, pickle.dumps(key), pickle.dumps(value)) for kind, key, value in rows])
+
+    def load(self, thread_id: str) -> List[Tuple[str, Any, Any]]:
+        with self.lock:
+            rows = self.connection.execute("SELECT kind, key, value FROM entries WHERE thread = ?",
+                                           (thread_id,)).fetchall()
+        return [(kind, pickle.loads(key), pickle.loads(value)) for kind, key, value in rows]
+
+    def threads(self) -> List[str]:
+        with self.lock:
+            return [row[0] for row in self.connection.execute("SELECT DISTINCT thread FROM entries")]
+
+    def delete_thread(self, thread_id: str):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM entries WHERE thread = ?", (thread_id,))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class JournaledMemorySaver(MemorySaver):
+    """MemorySaver that can write through to a CheckpointJournal and read threads back from it"""
+
+    def __init__(self, path: Optional[str] = None, serde: Optional[SerializerProtocol] = None):
+        super().__init__(serde=serde)
+        self.journal = CheckpointJournal(path) if path else None
+        self._journaled: Set[str] = set()
+        self._journal_lock = threading.Lock()
+
+    def _load_thread(self, thread_id: str):
+        """Bring a thread persisted by an earlier process into memory (once)"""
+        if self.journal is None or thread_id in self._journaled:
+            return
+        with self._journal_lock:
+            if thread_id in self._journaled:
+                return
+            rows = self.journal.load(thread_id)
+            for kind, key, value in rows:
+                self._replay(thread_id, kind, key, value)
+            if rows:
+                self._journaled.add(thread_id)
+
+    def _replay(self, thread_id: str, kind: str, key: Any, value: Any):
+        if kind == "checkpoint":
+            self.storage[thread_id][key[1]][key[2]] = value
+        elif kind == "writes":
+            self.writes[key] = value
+        elif kind == "blob":
+            self.blobs[key] = value
+
+    def _pending_rows(self) -> List[Tuple[str, Any, Any]]:
+        """Extra rows to persist with the current step (subclass hook)"""
+        return []
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        self._load_thread(thread_id)
+        result = super().put(config, checkpoint, metadata, new_versions)
+        if self.journal is not None:
+            checkpoint_ns = config["configurable"]["checkpoint_ns"]
+            rows = self._pending_rows()
+            rows.extend(("blob", (thread_id, checkpoint_ns, channel, version),
+                         self.blobs[(thread_id, checkpoint_ns, channel, version)])
+                        for channel, version in new_versions.items())
+            rows.append(("checkpoint", (thread_id, checkpoint_ns, checkpoint["id"]),
+                         self.storage[thread_id][checkpoint_ns][checkpoint["id"]]))
+            self.journal.record(thread_id, rows)
+            self._journaled.add(thread_id)
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        thread_id = config["configurable"]["thread_id"]
+        self._load_thread(thread_id)
+        super().put_writes(config, writes, task_id, task_path)
+        if self.journal is not None:
+            key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+            rows = self._pending_rows()
+            rows.append(("writes", key, dict(self.writes.get(key, {}))))
+            self.journal.record(thread_id, rows)
+            self._journaled.add(thread_id)
+
+    def get_tuple(self, config) -> Optional[CheckpointTuple]:
+        self._load_thread(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None) -> Iterator[CheckpointTuple]:
+        if self.journal is not None:
+            for thread_id in ([config["configurable"]["thread_id"]] if config else self.journal.threads()):
+                self._load_thread(thread_id)
+        return super().list(config, filter=filter, before=before, limit=limit)
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        if self.journal is not None:
+            self.journal.delete_thread(thread_id)
+            self._journaled.discard(thread_id)
+
+
+class DeltaCheckpointSaver(JournaledMemorySaver):
+    """MemorySaver with content-addressed, structurally shared checkpoint storage"""
+
+    def __init__(self, full_snapshot_every: Optional[int] = None, identity_cache_size: int = 1024,
+                 serde: Optional[SerializerProtocol] = None, path: Optional[str] = None,
+                 compact_messages: bool = True):
+        super().__init__(path=path)
+        self.compact_messages = compact_messages
+        self.serde = _DeltaSerializer(self, serde or JsonPlusSerializer())
+        self.full_snapshot_every = full_snapshot_every or Config.CHECKPOINT_FULL_SNAPSHOT_EVERY
+        self.content = ContentStore(on_add=self._content_added if self.journal is not None else None)
+        self._context = threading.local()
+        self._identity: "OrderedDict[int, Tuple[Any, bytes]]" = OrderedDict()
+        self._identity_size = identity_cache_size
+        self._identity_lock = threading.Lock()
+        self._put_counts: Dict[str, int] = defaultdict(int)
+        self._stats = {"values": 0, "serialized": 0, "identity_hits": 0, "logical_bytes": 0}
+
+    # --- storage -----------------------------------------------------------------------
+
+    def _store(self, owner: str, obj: Any) -> bytes:
+        """Digest of ``obj`` in the content store, serializing it only when needed"""
+        self._stats["values"] += 1
+        immutable = isinstance(obj, IMMUTABLE_TYPES)
+        if immutable and not getattr(self._context, "full", False):
+            with self._identity_lock:
+                cached = self._identity.get(id(obj))
+            if cached is not None and cached[0] is obj and self.content.add_owner(owner, cached[1]):
+                self._stats["identity_hits"] += 1
+                self._stats["logical_bytes"] += len(self.content.values.get(cached[1], ("", b""))[1])
+                return cached[1]
+
+        if isinstance(obj, Conversation):
+            # Messages are stored (and identity-cached) one by one, the conversation keeps references
+            shell = self.serde.inner.dumps_typed(obj.model_copy(update={"messages": []}))
+            layout = {
+                "shell": self.content.put(owner, shell).hex(),
+                "messages": [self._store(owner, message).hex() for message in obj.messages],
+            }
+            typed = (CONVERSATION_TYPE, json.dumps(layout).encode("utf-8"))
+            self._stats["logical_bytes"] += len(shell[1])
+        elif isinstance(obj, Message) and self.compact_messages:
+            typed = (MESSAGE_TYPE, CompactMessage.from_model(obj).pack())
+            self._stats["logical_bytes"] += len(typed[1])
+        elif isinstance(obj, WorkflowState):
+            # Whole states (graph input, node results) are stored field by field
+            layout = {name: self._store(owner, getattr(obj, name)).hex() for name in WorkflowState.model_fields}
+            typed = (STATE_TYPE, json.dumps(layout).encode("utf-8"))
+        else:
+            typed = self.serde.inner.dumps_typed(obj)
+            self._stats["logical_bytes"] += len(typed[1])
+        self._stats["serialized"] += 1
+        digest = self.content.put(owner, typed)
+        if immutable:
+            with self._identity_lock:
+                # Holding the object keeps its id from being reused while cached
+                self._identity[id(obj)] = (obj, digest)
+                self._identity.move_to_end(id(obj))
+                while len(self._identity) > self._identity_size:
+                    self._identity.popitem(last=False)
+        return digest
+
+    def _content_added(self, owner: str, digest: bytes, typed: Tuple[str, bytes]):
+        pending = getattr(self._context, "pending", None)
+        if pending is not None:
+            pending.append(("content", (owner, digest), typed))
+
+    def _pending_rows(self) -> List[Tuple[str, Any, Any]]:
+        rows, self._context.pending = getattr(self._context, "pending", None) or [], []
+        return rows
+
+    def _replay(self, thread_id: str, kind: str, key: Any, value: Any):
+        if kind == "content":
+            self.content.put(key[0], value, digest=key[1])
+        else:
+            super()._replay(thread_id, kind, key, value)
+
+    def _load(self, digest: bytes) -> Any:
+        typed = self.content.values[digest]
+        if typed[0] == CONVERSATION_TYPE:
+            layout = json.loads(typed[1])
+            shell = self._load(bytes.fromhex(layout["shell"]))
+            messages = [self._load(bytes.fromhex(ref)) for ref in layout["messages"]]
+            return shell.model_copy(update={"messages": messages})
+        if typed[0] == MESSAGE_TYPE:
+            return CompactMessage.unpack(typed[1]).to_model()
+        if typed[0] == STATE_TYPE:
+            layout = json.loads(typed[1])
+            return WorkflowState.model_construct(**{name: self._load(bytes.fromhex(ref)) for name, ref in layout.items()})
+        return self.serde.inner.loads_typed(typed)
+
+    def _split_metadata(self, owner: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        writes = metadata.get("writes")
+        if not isinstance(writes, dict):
+            return metadata
+        split = {}
+        for node, values in writes.items():
+            if isinstance(values, dict):
+                split[node] = {METADATA_REFS: {channel: self._store(owner, value).hex()
+                                               for channel, value in values.items()}}
+            else:
+                split[node] = values
+        return {**metadata, "writes": split}
+
+    def _join_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        writes = metadata.get("writes")
+        if not isinstance(writes, dict):
+            return metadata
+        joined = {}
+        for node, values in writes.items():
+            if isinstance(values, dict) and METADATA_REFS in values:
+                joined[node] = {channel: self._load(bytes.fromhex(digest))
+                                for channel, digest in values[METADATA_REFS].items()}
+            else:
+                joined[node] = values
+        return {**metadata, "writes": joined}
+
+    def _restore(self, checkpoint_tuple: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        if checkpoint_tuple is None or not checkpoint_tuple.metadata:
+            return checkpoint_tuple
+        return checkpoint_tuple._replace(metadata=self._join_metadata(checkpoint_tuple.metadata))
+
+    # --- BaseCheckpointSaver API -------------------------------------------------------
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        self._put_counts[thread_id] += 1
+        self._load_thread(thread_id)
+        self._context.owner = thread_id
+        self._context.full = (self._put_counts[thread_id] - 1) % self.full_snapshot_every == 0
+        self._context.pending = []
+        try:
+            metadata = self._split_metadata(thread_id, metadata)
+            return super().put(config, checkpoint, metadata, new_versions)
+        finally:
+            self._context.owner = None
+            self._context.full = False
+            self._context.pending = None
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        self._load_thread(config["configurable"]["thread_id"])
+        self._context.owner = config["configurable"]["thread_id"]
+        self._context.pending = []
+        try:
+            return super().put_writes(config, writes, task_id, task_path)
+        finally:
+            self._context.owner = None
+            self._context.pending = None
+
+    def get_tuple(self, config) -> Optional[CheckpointTuple]:
+        return self._restore(super().get_tuple(config))
+
+    def list(self, config, *, filter=None, before=None, limit=None) -> Iterator[CheckpointTuple]:
+        for checkpoint_tuple in super().list(config, filter=filter, before=before, limit=limit):
+            yield self._restore(checkpoint_tuple)
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self._put_counts.pop(thread_id, None)
+        self.content.release(thread_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Values checkpointed, how many were serialized, and logical vs stored bytes"""
+        stored = self.content.stored_bytes()
+        return {
+            **self._stats,
+            "stored_bytes": stored,
+            "distinct_values": len(self.content.values),
+            "compression": (self._stats["logical_bytes"] / stored) if stored else 0.0,
+        }
+
+
+def create_checkpoint_saver(name: str = "workflow") -> MemorySaver:
+    """
+    Checkpoint saver of the graph ``name`` (Config.CHECKPOINT_FORMAT: "delta" or "full")
+
+    Checkpoints are journaled to ``Config.CHECKPOINT_DIR/<name>.sqlite`` when the directory is set.
+    """
+    path = None
+    if Config.CHECKPOINT_DIR:
+        path = os.path.join(Config.CHECKPOINT_DIR, re.sub(r"[^\w.-]", "_", name) + ".sqlite")
+    if Config.CHECKPOINT_FORMAT == "full":
+        return JournaledMemorySaver(path=path)
+    return DeltaCheckpointSaver(path=path)
+
+
+def _saver_bytes(saver: MemorySaver) -> int:
+    if isinstance(saver, DeltaCheckpointSaver):
+        return saver.content.stored_bytes()
+    blobs = sum(len(typed[1]) for typed in saver.blobs.values())
+    writes = sum(len(write[2][1]) for task_writes in saver.writes.values() for write in task_writes.values())
+    checkpoints = sum(len(checkpoint[1]) + len(metadata[1])
+                      for namespaces in saver.storage.values() for entries in namespaces.values()
+                      for checkpoint, metadata, _ in entries.values())
+    return blobs + writes + checkpoints
+
+
+def _sample_states(sessions: int, turns: int) -> List[WorkflowState]:
+    states = []
+    for session in range(sessions):
+        # Each session loads the same customer file, as the UI and API do for a shared customer
+        customer = CustomerAnalysis(
+            customer_name="Acme Retail", industry="Retail", company_size="Medium",
+            pain_points=[{"description": f"Pain point {i}", "impact": "high"} for i in range(8)],
+            needs=[{"requirement": f"Need {i}", "priority": "medium"} for i in range(8)],
+            decision_makers=[{"name": f"Person {i}", "role": "Director"} for i in range(3)]
+        )
+        messages = [
+            Message(sender="company" if i % 2 == 0 else "customer", content=f"Message {i} " + "contenu " * 60,
+                    message_type="follow_up" if i % 2 == 0 else "response")
+            for i in range(turns)
+        ]
+        states.append(WorkflowState(
+            customer_analysis=customer,
+            conversation=Conversation(conversation_id=f"conv_{session}", messages=messages),
+            completed_steps=["document_analysis", "message_composition"]
+        ))
+    return states
+
+
+def run_benchmark(threads: int = 10, nodes: int = 7, turns: int = 12, words: int = 250) -> Dict[str, Any]:
+    """Checkpoint bytes and time of a ``nodes``-step graph over ``threads`` conversations, full vs delta"""
+    import time
+    from langgraph.graph import END, StateGraph
+
+    def make_node(index: int):
+        def node(state: WorkflowState) -> WorkflowState:
+            state.conversation.messages.append(Message(sender="company", content=f"Étape {index} " + "mot " * words))
+            state.mark_step_completed(f"step_{index}", 0.1)
+            return state
+        return node
+
+    graph = StateGraph(WorkflowState)
+    for index in range(nodes):
+        graph.add_node(f"step_{index}", make_node(index))
+        if index:
+            graph.add_edge(f"step_{index - 1}", f"step_{index}")
+    graph.set_entry_point("step_0")
+    graph.add_edge(f"step_{nodes - 1}", END)
+
+    results = {}
+    for label, saver in (("full", MemorySaver()), ("delta", DeltaCheckpointSaver())):
+        app = graph.compile(checkpointer=saver)
+        states = _sample_states(threads, turns)
+        started = time.perf_counter()
+        for index, state in enumerate(states):
+            app.invoke(state, {"configurable": {"thread_id": f"benchmark_{index}"}})
+        results[label] = {"bytes": _saver_bytes(saver), "seconds": round(time.perf_counter() - started, 3)}
+    results["reduction"] = results["full"]["bytes"] / max(results["delta"]["bytes"], 1)
+    return results
+
+
+if __name__ == "__main__":
+    result = run_benchmark()
+    for label in ("full", "delta"):
+        print(f"{label:5}: {result[label]['bytes']:>10,} bytes  {result[label]['seconds']:.3f}s")
+    print(f"Checkpoint memory reduced {result['reduction']:.1f}x")
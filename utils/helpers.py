@@ -4,35 +4,111 @@ Utility functions for file processing, logging, and data handling
 import json
 import os
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union, IO
 from pathlib import Path
-import PyPDF2
-import pdfplumber
 from datetime import datetime
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/app.log'),
-        logging.StreamHandler()
-    ]
-)
+from config.settings import Config
+from utils.log_pipeline import configure_logging
+
+try:
+    import orjson
+except ImportError:  # optional faster parser, the standard library is used without it
+    orjson = None
 
 def setup_logging():
-    """Setup logging directories and configuration"""
-    os.makedirs('logs', exist_ok=True)
+    """Setup logging directories and the asynchronous logging pipeline"""
+    configure_logging()
     return logging.getLogger(__name__)
 
 logger = setup_logging()
 
+# Customer profile fields checked when present: field -> accepted JSON types
+# Profiles vary a lot between sources, unknown fields are accepted as they are
+CUSTOMER_PROFILE_SCHEMA = {
+    "customer_name": (str,),
+    "company_name": (str,),
+    "name": (str,),
+    "industry": (str,),
+    "company_size": (str, int),
+    "budget_range": (str, dict),
+    "timeline": (str, dict),
+    "communication_style": (str,),
+    "customer_profile": (dict,),
+    "pain_points": (list, dict),
+    "needs": (list, dict),
+    "challenges": (list, dict),
+    "objectives": (list, dict),
+    "decision_makers": (list, dict),
+    "decision_criteria": (list, dict),
+}
+
+CustomerSource = Union[str, os.PathLike, bytes, bytearray, IO]
+
+def parse_json_bytes(data: Union[bytes, bytearray, str]) -> Any:
+    """Parse JSON with orjson when available (``Config.JSON_BACKEND``), else the standard library"""
+    if orjson is not None and Config.JSON_BACKEND in ("auto", "orjson"):
+        return orjson.loads(data)
+    return json.loads(data)
+
+def validate_customer_profile(data: Any) -> Dict[str, Any]:
+    """Check a parsed customer profile against CUSTOMER_PROFILE_SCHEMA and return it"""
+    if not isinstance(data, dict):
+        raise ValueError(f"Customer profile must be a JSON object, got {type(data).__name__}")
+    if not data:
+        raise ValueError("Customer profile is empty")
+    for field, types in CUSTOMER_PROFILE_SCHEMA.items():
+        value = data.get(field)
+        if value is not None and not isinstance(value, types):
+            expected = " or ".join(t.__name__ for t in types)
+            raise ValueError(f"Customer profile field '{field}' must be {expected}, got {type(value).__name__}")
+    return data
+
+def load_customer_json(source: CustomerSource) -> Dict[str, Any]:
+    """
+    Read, parse and validate a customer profile in a single pass
+
+    ``source`` is a path, the raw bytes, or a binary/text stream such as a Streamlit upload.
+    The content is read once and parsed once; nothing is written to disk. Raises
+    FileNotFoundError for a missing path and ValueError for anything that is not a valid
+    customer profile.
+    """
+    max_bytes = Config.MAX_FILE_SIZE_MB * 1024 * 1024
+    if isinstance(source, (str, os.PathLike)):
+        file_path = os.fspath(source)
+        if Path(file_path).suffix.lower() not in Config.ALLOWED_JSON_EXTENSIONS:
+            raise ValueError("File must be a JSON")
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size > max_bytes:
+                raise ValueError(f"JSON file too large (max {Config.MAX_FILE_SIZE_MB}MB)")
+            data = file.read()
+    elif isinstance(source, (bytes, bytearray)):
+        data = source
+    else:
+        # UploadedFile/BytesIO expose their buffer without a copy through getvalue()
+        data = source.getvalue() if hasattr(source, 'getvalue') else source.read()
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    if len(data) > max_bytes:
+        raise ValueError(f"JSON file too large (max {Config.MAX_FILE_SIZE_MB}MB)")
+    
+    try:
+        parsed = parse_json_bytes(data)
+    except ValueError as e:
+        # json.JSONDecodeError and orjson.JSONDecodeError are both ValueErrors
+        raise ValueError(f"Invalid JSON format: {str(e)}")
+    return validate_customer_profile(parsed)
+
 class FileProcessor:
     """Handles file processing operations for PDFs and JSON files"""
     
     @staticmethod
     def extract_text_from_pdf(file_path: str) -> str:
         """Extract text content from PDF file"""
+        # PDF libraries are heavy, only load them when a PDF is actually read
+        import pdfplumber
+        import PyPDF2
+        
         try:
             text_content = ""
             
@@ -104,18 +180,13 @@ class FileProcessor:
             return False
     
     def read_json_file(self, file_path: str) -> Optional[Dict[str, Any]]:
-        """Read and parse JSON file"""
+        """Read, parse and validate a customer JSON file; None when it is missing or invalid"""
         try:
-            if not self.validate_file(file_path, ['.json']):
-                return None
-            
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                logger.info(f"Successfully read JSON file: {file_path}")
-                return data
-                
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in file {file_path}: {str(e)}")
+            data = load_customer_json(file_path)
+            logger.info(f"Successfully read JSON file: {file_path}")
+            return data
+        except FileNotFoundError:
+            logger.error(f"File does not exist: {file_path}")
             return None
         except Exception as e:
             logger.error(f"Error reading JSON file {file_path}: {str(e)}")
@@ -142,19 +213,11 @@ class DataValidator:
     
     @staticmethod
     def validate_json_file(file_path: str) -> bool:
-        """Validate JSON file exists and is parseable"""
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"JSON file not found: {file_path}")
-        
-        if not file_path.lower().endswith('.json'):
-            raise ValueError("File must be a JSON")
-        
+        """Validate JSON file exists and holds a customer profile (use load_customer_json to keep the data)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                json.load(file)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON format: {str(e)}")
-        
+            load_customer_json(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"JSON file not found: {file_path}")
         return True
     
     @staticmethod
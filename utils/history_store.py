@@ -0,0 +1,152 @@
+"""
+Conversation history store
+Bounded in-memory window of recent exchanges; older ones spill to a results store
+
+Every exchange of a Streamlit session used to stay in ``st.session_state`` with its full
+personality and strategy analysis objects, and the history view rendered all of them on each
+rerun. The history keeps only the last ``window`` exchanges in memory. Older exchanges are
+written (analyses serialized to JSON) to a results store of their own, outside the partitions
+read by the analytics, and are reloaded on demand. A small summary of every exchange stays
+in memory so the history can be listed page by page without reading the store.
+"""
+import atexit
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from config.settings import Config
+from utils.results_store import ResultsStore
+
+EXCERPT_CHARS = 120
+
+
+@dataclass(frozen=True)
+class HistorySummary:
+    index: int
+    timestamp: str
+    message_type: str
+    channel: str
+    goal: str
+    company_excerpt: str
+    customer_excerpt: str
+    has_analysis: bool
+
+
+def _excerpt(text: Any) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= EXCERPT_CHARS else text[:EXCERPT_CHARS - 1].rstrip() + "…"
+
+
+def _serializable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, dict):
+        return {key: _serializable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_serializable(item) for item in value]
+    return value
+
+
+class ConversationHistory:
+    """
+    Exchanges of one session, numbered from 1
+
+    ``get`` returns the entry as appended while it is in the window, and a dict copy with
+    analyses as plain dicts once it was spilled. The last reloaded entry is kept so that a
+    rerun rendering the same exchange does not read it again.
+    """
+
+    def __init__(self, session_id: str, store: Optional[ResultsStore] = None,
+                 window: Optional[int] = None, page_size: Optional[int] = None):
+        self.session_id = session_id
+        self.window = window or Config.HISTORY_WINDOW
+        self.page_size = page_size or Config.HISTORY_PAGE_SIZE
+        self._store = store
+        self._summaries: List[HistorySummary] = []
+        self._recent: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._spilled: Dict[int, str] = {}  # index -> result_id
+        self._loaded: Optional[tuple] = None  # (index, entry)
+
+    @property
+    def store(self) -> ResultsStore:
+        if self._store is None:
+            self._store = get_history_store()
+        return self._store
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """Add an exchange and return its number"""
+        index = len(self._summaries) + 1
+        self._summaries.append(HistorySummary(
+            index=index,
+            timestamp=str(entry.get('timestamp', '')),
+            message_type=str(entry.get('message_type', 'Unknown')),
+            channel=str(entry.get('channel', 'Unknown')),
+            goal=str(entry.get('goal', '')),
+            company_excerpt=_excerpt(entry.get('company_message')),
+            customer_excerpt=_excerpt(entry.get('customer_response')),
+            has_analysis=bool(entry.get('personality_analysis') or entry.get('strategy_analysis')),
+        ))
+        self._recent[index] = entry
+        while len(self._recent) > self.window:
+            self._spill(*self._recent.popitem(last=False))
+        return index
+
+    def _spill(self, index: int, entry: Dict[str, Any]):
+        record = {"session_id": self.session_id, "index": index, "entry": _serializable(entry)}
+        self._spilled[index] = self.store.append(record, execution_id=self.session_id)
+
+    def get(self, index: int) -> Optional[Dict[str, Any]]:
+        """Full entry of exchange ``index``, reloaded from the store when spilled"""
+        if index in self._recent:
+            return self._recent[index]
+        if self._loaded is not None and self._loaded[0] == index:
+            return self._loaded[1]
+        result_id = self._spilled.get(index)
+        if result_id is None:
+            return None
+        row = self.store.get(result_id)
+        if row is None:
+            return None
+        entry = row["record"]["entry"]
+        self._loaded = (index, entry)
+        return entry
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-len(self._summaries) // self.page_size))
+
+    def page(self, number: int) -> List[HistorySummary]:
+        """Summaries on page ``number`` (1-based), newest exchange first"""
+        number = min(max(1, number), self.page_count)
+        newest_first = self._summaries[::-1]
+        return newest_first[(number - 1) * self.page_size:number * self.page_size]
+
+    def in_memory(self) -> int:
+        """Number of full entries currently held in memory"""
+        return len(self._recent) + (self._loaded is not None)
+
+    def clear(self):
+        """Forget every exchange (spilled records stay in the append-only store)"""
+        self._summaries.clear()
+        self._recent.clear()
+        self._spilled.clear()
+        self._loaded = None
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+
+_default_store: Optional[ResultsStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_history_store() -> ResultsStore:
+    """Process-wide store of spilled history entries, flushed at interpreter exit"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = ResultsStore(root_dir=Config.HISTORY_STORE_DIR)
+                atexit.register(_default_store.close)
+    return _default_store
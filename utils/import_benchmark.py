@@ -0,0 +1,84 @@
+"""
+Import-time benchmark
+Measures cold-start import cost of the workflow modules in fresh interpreters
+
+Usage: python -m utils.import_benchmark [module ...] [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGETS = [
+    "config",
+    "utils.models",
+    "utils.helpers",
+    "agents",
+    "pure_langgraph_workflow",
+    "agents.document_analysis_agent",
+]
+
+# Dependencies that should only load when a feature actually needs them
+HEAVY_MODULES = [
+    "langgraph",
+    "langchain",
+    "langchain_groq",
+    "pdfplumber",
+    "PyPDF2",
+    "config.prompts",
+    "agents.base_agent",
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, heavy_modules: Optional[List[str]] = None) -> Dict:
+    """Import ``module`` in a fresh interpreter and report elapsed time and heavy modules loaded"""
+    heavy_modules = HEAVY_MODULES if heavy_modules is None else heavy_modules
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=heavy_modules)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(targets: Optional[List[str]] = None, runs: int = 3) -> List[Dict]:
+    """Median cold import time per target over ``runs`` fresh interpreters"""
+    report = []
+    for module in targets or DEFAULT_TARGETS:
+        samples = [measure_import(module) for _ in range(runs)]
+        report.append({
+            "module": module,
+            "median_ms": round(statistics.median(s["seconds"] for s in samples) * 1000, 1),
+            "heavy_loaded": samples[-1]["loaded"],
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of workflow modules")
+    parser.add_argument("modules", nargs="*", help="Modules to import (default: workflow modules)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module")
+    args = parser.parse_args()
+
+    for row in run_benchmark(args.modules, args.runs):
+        heavy = ", ".join(row["heavy_loaded"]) or "-"
+        print(f"{row['module']:<40} {row['median_ms']:>9.1f} ms   heavy: {heavy}")
+
+
+if __name__ == "__main__":
+    main()
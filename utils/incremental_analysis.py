@@ -0,0 +1,121 @@
+"""
+Incremental conversation analysis
+Snapshots of a finished strategy/personality analysis, per-message features and the delta turns still to analyze
+
+A snapshot records how many messages an analysis covered and a digest of them. When the
+conversation grows, only the new turns are sent to the agents together with the previous
+analysis; if earlier messages changed (edited or cleared conversation) the analysis starts over.
+"""
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from config.settings import Config
+from utils.service_matcher import get_service_matcher, normalize_text
+
+# Matched on accent-stripped lowercase text
+OBJECTION_CUES = tuple(normalize_text(cue) for cue in (
+    "prix", "coût", "budget", "cher", "risque", "concurrent", "délai", "hésit", "pas sûr",
+    "price", "cost", "expensive", "risk", "competitor", "not sure", "concern",
+))
+POSITIVE_CUES = tuple(normalize_text(cue) for cue in (
+    "intéress", "merci", "d'accord", "parfait", "volontiers", "excellent",
+    "interested", "great", "sounds good", "agreed",
+))
+
+
+def conversation_digest(messages: List[Dict[str, Any]]) -> str:
+    """Digest of message senders and contents, used to detect edits to already analyzed turns"""
+    digest = hashlib.sha1()
+    for msg in messages:
+        digest.update(f"{msg.get('sender')}\x1f{msg.get('content')}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def message_features(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Cheap local signals for one message"""
+    content = message.get("content", "")
+    text = normalize_text(content)
+    return {
+        "sender": message.get("sender"),
+        "words": len(content.split()),
+        "questions": content.count("?"),
+        "objections": sum(text.count(cue) for cue in OBJECTION_CUES),
+        "positive": sum(text.count(cue) for cue in POSITIVE_CUES),
+        "services": [service for service, _ in get_service_matcher().score_text(content)],
+    }
+
+
+def summarize_features(features: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate per-message features into the totals sent to the LLM"""
+    summary = {"company_messages": 0, "customer_messages": 0, "questions": 0, "objections": 0,
+               "positive_signals": 0, "customer_words": 0, "services_mentioned": []}
+    for feature in features:
+        summary[f"{'company' if feature['sender'] == 'company' else 'customer'}_messages"] += 1
+        summary["questions"] += feature["questions"]
+        summary["objections"] += feature["objections"]
+        summary["positive_signals"] += feature["positive"]
+        if feature["sender"] != "company":
+            summary["customer_words"] += feature["words"]
+        for service in feature["services"]:
+            if service not in summary["services_mentioned"]:
+                summary["services_mentioned"].append(service)
+    return summary
+
+
+def make_snapshot(analysis, messages: List[Dict[str, Any]], features: List[Dict[str, Any]],
+                  updates: int = 0, context: str = "") -> Dict[str, Any]:
+    """Snapshot of ``analysis`` covering ``messages`` (``context`` identifies the customer profile used)"""
+    return {
+        "analysis": analysis,
+        "context": context,
+        "message_count": len(messages),
+        "digest": conversation_digest(messages),
+        "features": features,
+        "updates": updates,
+    }
+
+
+def pending_turns(snapshot: Optional[Dict[str, Any]], messages: List[Dict[str, Any]],
+                  context: str = "") -> Optional[List[Dict[str, Any]]]:
+    """
+    Messages the snapshot has not analyzed yet
+
+    Returns None when a full analysis is needed (no usable snapshot, another customer context,
+    earlier turns changed or too many incremental updates in a row) and an empty list when
+    nothing is new.
+    """
+    if not Config.INCREMENTAL_ANALYSIS or not snapshot or snapshot.get("analysis") is None:
+        return None
+    if snapshot.get("context", "") != context:
+        return None
+    count = snapshot["message_count"]
+    if count == 0 or count > len(messages) or conversation_digest(messages[:count]) != snapshot["digest"]:
+        return None
+    if count < len(messages) and snapshot.get("updates", 0) >= Config.INCREMENTAL_ANALYSIS_MAX_UPDATES:
+        return None
+    return messages[count:]
+
+
+def blend_score(previous: Optional[float], previous_weight: int, update: Any, update_weight: int,
+                low: float = 0.0, high: float = 10.0) -> Optional[float]:
+    """Turn-weighted average of the previous score and the score of the new turns"""
+    try:
+        update = min(high, max(low, float(update)))
+    except (TypeError, ValueError):
+        return previous
+    if previous is None or previous_weight <= 0:
+        return round(update, 2)
+    total = previous_weight + update_weight
+    return round((previous * previous_weight + update * update_weight) / total, 2)
+
+
+def merge_list(update: Any, previous: List[str], limit: int = 6) -> List[str]:
+    """New items first, then the previous ones, without duplicates"""
+    if isinstance(update, str):
+        update = [update]
+    merged: List[str] = []
+    for item in list(update or []) + list(previous or []):
+        text = item.get("recommendation", str(item)) if isinstance(item, dict) else str(item)
+        if text and text not in merged:
+            merged.append(text)
+    return merged[:limit]
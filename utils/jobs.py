@@ -0,0 +1,298 @@
+"""
+In-process job manager
+Bounded job queue served by a worker thread pool, with de-duplication, status polling and event streams
+"""
+import itertools
+import logging
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    TERMINAL = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is saturated"""
+
+
+_current = threading.local()
+
+
+def current_job() -> Optional["Job"]:
+    """Job executed by the calling worker thread, if any (used to emit progress events)"""
+    return getattr(_current, "job", None)
+
+
+class Job:
+    """A unit of work tracked by the JobManager"""
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: Dict[str, Any],
+                 kind: str = "", key: Optional[str] = None):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+        self.status = JobStatus.QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.cancel_requested = False
+
+        self.events: List[Dict[str, Any]] = []
+        self._condition = threading.Condition()
+        self.emit("queued")
+
+    @property
+    def done(self) -> bool:
+        return self.status in JobStatus.TERMINAL
+
+    def emit(self, event: str, data: Any = None):
+        """Append an event to the job stream and wake up waiting readers"""
+        with self._condition:
+            self.events.append({
+                "seq": len(self.events),
+                "event": event,
+                "data": data,
+                "timestamp": datetime.now().isoformat()
+            })
+            self._condition.notify_all()
+
+    def _finish(self, status: str, result: Any = None, error: Optional[str] = None):
+        with self._condition:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = datetime.now()
+        self.emit(status, {"error": error} if error else None)
+
+    def start(self) -> bool:
+        """Move a queued job to RUNNING; False when it was cancelled first"""
+        with self._condition:
+            # Same lock as cancel(): a job is either cancelled before it starts or runs
+            if self.status != JobStatus.QUEUED:
+                return False
+            self.status = JobStatus.RUNNING
+            self.started_at = datetime.now()
+        self.emit("started")
+        return True
+
+    def cancel(self) -> bool:
+        """Cancel a queued job; a running job is only flagged (workers check ``cancel_requested``)"""
+        with self._condition:
+            self.cancel_requested = True
+            if self.status != JobStatus.QUEUED:
+                return False
+            self._finish(JobStatus.CANCELLED)
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job reaches a terminal state, returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while not self.done:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def iter_events(self, since: int = 0, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Yield events from ``since`` onwards until the job finishes (or ``timeout`` passes without news)"""
+        position = since
+        while True:
+            with self._condition:
+                if position >= len(self.events) and not self.done:
+                    self._condition.wait(timeout)
+                pending = self.events[position:]
+                finished = self.done
+            for event in pending:
+                yield event
+            position += len(pending)
+            if finished and position >= len(self.events):
+                return
+            if not pending and timeout is not None:
+                return
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "events": len(self.events),
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """
+    Bounded job queue with a fixed pool of worker threads
+
+    When the queue is full, ``overflow_policy="reject"`` raises QueueFullError immediately and
+    ``"queue"`` waits up to ``submit_timeout`` seconds for a free slot. Jobs submitted with a
+    ``key`` are de-duplicated: while a job with the same key is queued or running it is returned
+    instead of starting a new one.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 overflow_policy: Optional[str] = None, submit_timeout: Optional[float] = None,
+                 retention: Optional[int] = None, name: str = "jobs"):
+        self.max_workers = max_workers or Config.JOB_MAX_WORKERS
+        self.max_queue = max_queue or Config.JOB_QUEUE_SIZE
+        self.overflow_policy = overflow_policy or Config.JOB_OVERFLOW_POLICY
+        self.submit_timeout = Config.JOB_SUBMIT_TIMEOUT if submit_timeout is None else submit_timeout
+        self.retention = retention or Config.JOB_RETENTION
+        self.name = name
+
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=self.max_queue)
+        self._jobs: Dict[str, Job] = {}
+        self._active_keys: Dict[str, Job] = {}
+        self._finished: List[str] = []
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+        self._running = 0
+        self._counter = itertools.count(1)
+        self._shutdown = False
+
+    def _ensure_workers(self):
+        if self._workers:
+            return
+        for _ in range(self.max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"{self.name}-worker-{next(self._counter)}",
+                                      daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"JobManager '{self.name}' started {self.max_workers} workers (queue size {self.max_queue})")
+
+    def submit(self, fn: Callable, *args, kind: str = "", key: Optional[str] = None, **kwargs) -> Job:
+        """Queue ``fn(*args, **kwargs)`` and return its Job"""
+        if self._shutdown:
+            raise RuntimeError("JobManager is shut down")
+
+        with self._lock:
+            self._ensure_workers()
+            if key is not None:
+                existing = self._active_keys.get(key)
+                if existing is not None and not existing.done and not existing.cancel_requested:
+                    return existing
+            job = Job(fn, args, kwargs, kind=kind, key=key)
+            self._jobs[job.job_id] = job
+            if key is not None:
+                self._active_keys[key] = job
+
+        try:
+            if self.overflow_policy == "queue":
+                self._queue.put(job, timeout=self.submit_timeout)
+            else:
+                self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.job_id, None)
+                if key is not None and self._active_keys.get(key) is job:
+                    del self._active_keys[key]
+            raise QueueFullError(f"Job queue is full ({self.max_queue} pending jobs)")
+
+        return job
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            try:
+                if not job.start():
+                    continue
+                self._run(job)
+            finally:
+                self._retire(job)
+                self._queue.task_done()
+
+    def _run(self, job: Job):
+        with self._lock:
+            self._running += 1
+        _current.job = job
+        try:
+            result = job.fn(*job.args, **job.kwargs)
+            if job.cancel_requested:
+                job._finish(JobStatus.CANCELLED)
+            else:
+                job._finish(JobStatus.SUCCEEDED, result=result)
+        except Exception as e:
+            logger.error(f"Job {job.job_id} ({job.kind}) failed: {e}")
+            job._finish(JobStatus.FAILED, error=str(e))
+        finally:
+            _current.job = None
+            with self._lock:
+                self._running -= 1
+
+    def _retire(self, job: Job):
+        with self._lock:
+            if job.key is not None and self._active_keys.get(job.key) is job:
+                del self._active_keys[job.key]
+            self._finished.append(job.job_id)
+            # Keep only the most recent finished jobs around for polling
+            while len(self._finished) > self.retention:
+                self._jobs.pop(self._finished.pop(0), None)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def find_by_key(self, key: str) -> Optional[Job]:
+        """Queued or running job submitted with ``key``"""
+        with self._lock:
+            return self._active_keys.get(key)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        return job.cancel() if job else False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses: Dict[str, int] = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+            return {
+                "workers": self.max_workers,
+                "running": self._running,
+                "queued": self._queue.qsize(),
+                "queue_capacity": self.max_queue,
+                "overflow_policy": self.overflow_policy,
+                "jobs": statuses,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and stop the workers once the queue drains"""
+        self._shutdown = True
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        self._workers = []
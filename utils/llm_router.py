@@ -0,0 +1,361 @@
+"""
+LLM router
+Routes an agent's (or node's) LLM calls over several backends with hedged requests
+
+Backends are declared in ``Config.LLM_BACKENDS`` (Groq, any OpenAI-compatible endpoint, a local
+server) and routed per agent or per ``"agent.node"`` in ``Config.LLM_ROUTES``. A route with a
+single backend is a plain client, exactly as before; with several, an ``LLMRouter``
+
+- keeps rolling p50/p95 latencies per backend (``Config.LLM_LATENCY_WINDOW`` calls, shared by
+  every route using the backend) and sends each call to the fastest healthy one,
+- sends a hedged duplicate to the next backend when the first has not answered after
+  ``Config.LLM_HEDGE_AFTER_SECONDS`` (0: the primary's own p95) and returns the first response,
+- fails over to the next backend at once when a call errors; a backend failing
+  ``Config.LLM_BACKEND_MAX_FAILURES`` times in a row is ranked last until it answers again.
+
+Hedges run on their own pool of ``Config.LLM_HEDGE_WORKERS`` threads with the shorter
+``Config.LLM_HEDGE_TIMEOUT``, so they never queue ahead of primary calls nor hold a thread
+for a full backend timeout.
+
+Routers are wrapped by the scheduler like any client: a call and its hedge share one slot.
+The OpenAI-compatible client only needs the standard library, so routes can be exercised
+offline against local stub servers.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_GROQ = "groq"
+PROVIDER_OPENAI = "openai"  # any OpenAI-compatible chat completions endpoint, local servers included
+
+_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+def _message_payload(message: Any) -> Dict[str, str]:
+    if isinstance(message, dict):
+        return {"role": message.get("role", "user"), "content": message.get("content", "")}
+    if isinstance(message, str):
+        return {"role": "user", "content": message}
+    return {"role": _ROLES.get(getattr(message, "type", "human"), "user"), "content": message.content}
+
+
+class OpenAICompatibleChat:
+    """Minimal chat client for ``POST {base_url}/chat/completions``, returning LangChain messages"""
+
+    def __init__(self, model: str, base_url: str, api_key: Optional[str] = None,
+                 temperature: Optional[float] = None, max_tokens: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self.model_name = model
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.temperature = Config.TEMPERATURE if temperature is None else temperature
+        self.max_tokens = max_tokens or Config.MAX_TOKENS
+        self.timeout = timeout or Config.LLM_BACKEND_TIMEOUT
+
+    def invoke(self, messages, config: Optional[Dict[str, Any]] = None, **kwargs):
+        from langchain_core.messages import AIMessage
+
+        if isinstance(messages, str):
+            messages = [messages]
+        body = {"model": self.model_name, "messages": [_message_payload(m) for m in messages],
+                "temperature": self.temperature, "max_tokens": self.max_tokens, **kwargs}
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(f"{self.base_url}/chat/completions",
+                                         data=json.dumps(body).encode("utf-8"), headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = json.loads(response.read().decode("utf-8"))
+        choice = data["choices"][0]
+        return AIMessage(content=choice["message"].get("content") or "",
+                         response_metadata={"model_name": data.get("model", self.model_name),
+                                            "finish_reason": choice.get("finish_reason"),
+                                            "token_usage": data.get("usage", {})})
+
+    async def ainvoke(self, messages, config: Optional[Dict[str, Any]] = None, **kwargs):
+        return await asyncio.to_thread(self.invoke, messages, config, **kwargs)
+
+    def bind(self, **kwargs) -> "OpenAICompatibleChat":
+        return OpenAICompatibleChat(kwargs.get("model", self.model_name), self.base_url, self.api_key,
+                                    kwargs.get("temperature", self.temperature),
+                                    kwargs.get("max_tokens", self.max_tokens), kwargs.get("timeout", self.timeout))
+
+
+def create_client(spec: Dict[str, Any], temperature: Optional[float] = None, max_retries: Optional[int] = None):
+    """LLM client for one ``Config.LLM_BACKENDS`` entry"""
+    provider = spec.get("provider", PROVIDER_GROQ)
+    model = spec.get("model", Config.MODEL_NAME)
+    temperature = Config.TEMPERATURE if temperature is None else temperature
+    api_key = os.getenv(spec["api_key_env"]) if spec.get("api_key_env") else spec.get("api_key")
+    if provider == PROVIDER_GROQ:
+        from langchain_groq import ChatGroq
+
+        options = {"base_url": spec["base_url"]} if spec.get("base_url") else {}
+        if max_retries is not None:
+            options["max_retries"] = max_retries
+            options["timeout"] = spec.get("timeout", Config.LLM_BACKEND_TIMEOUT)
+        return ChatGroq(model=model, groq_api_key=api_key or Config.GROQ_API_KEY, temperature=temperature, **options)
+    if provider == PROVIDER_OPENAI:
+        return OpenAICompatibleChat(model, spec["base_url"], api_key, temperature, spec.get("max_tokens"),
+                                    spec.get("timeout"))
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+class BackendStats:
+    """Rolling latencies and failure counts of one backend"""
+
+    def __init__(self, window: Optional[int] = None):
+        self._latencies = deque(maxlen=window or Config.LLM_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.hedges = 0  # hedged duplicates sent to this backend
+        self.wins = 0  # calls this backend answered first
+
+    def record(self, seconds: float, ok: bool = True):
+        with self._lock:
+            self.requests += 1
+            if ok:
+                self._latencies.append(seconds)
+                self.consecutive_failures = 0
+            else:
+                self.errors += 1
+                self.consecutive_failures += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile (q in 0..100) of the recent latencies, None without samples"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        rank = min(max(1, math.ceil(q / 100.0 * len(latencies))), len(latencies))
+        return latencies[rank - 1]
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    @property
+    def healthy(self) -> bool:
+        return self.consecutive_failures < Config.LLM_BACKEND_MAX_FAILURES
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "samples": self.samples,
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p95": round(p95, 3) if p95 is not None else None,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "healthy": self.healthy,
+        }
+
+
+class Backend:
+    def __init__(self, name: str, client, stats: Optional[BackendStats] = None):
+        self.name = name
+        self.client = client
+        self.stats = stats or BackendStats()
+
+
+_executors: Dict[bool, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(hedge: bool = False) -> ThreadPoolExecutor:
+    # Calls outlive the caller that lost the race; hedges get their own small pool
+    if hedge not in _executors:
+        with _executors_lock:
+            if hedge not in _executors:
+                _executors[hedge] = ThreadPoolExecutor(
+                    max_workers=Config.LLM_HEDGE_WORKERS if hedge else Config.LLM_MAX_CONCURRENCY,
+                    thread_name_prefix="llm-hedge" if hedge else "llm-router")
+    return _executors[hedge]
+
+
+class LLMRouter:
+    """Client calling the fastest healthy backend, hedging slow calls and failing over on errors"""
+
+    def __init__(self, backends: Sequence[Backend], hedge_after: Optional[float] = None,
+                 bound: Optional[Dict[str, Any]] = None):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.backends = list(backends)
+        self.hedge_after = Config.LLM_HEDGE_AFTER_SECONDS if hedge_after is None else hedge_after
+        self.bound = bound or {}
+        self._clients = {backend.name: backend.client.bind(**self.bound) if self.bound else backend.client
+                         for backend in self.backends}
+        self._hedge_clients = {backend.name: backend.client.bind(**self.bound, timeout=Config.LLM_HEDGE_TIMEOUT)
+                               for backend in self.backends}
+        # Read by the scheduler's single-flight keys
+        self.model_name = "+".join(backend.name for backend in self.backends)
+        self.temperature = self.bound.get("temperature", Config.TEMPERATURE)
+
+    def ranked(self) -> List[Backend]:
+        """Healthy backends first, measured ones by p50, unmeasured ones in configured order"""
+        def key(item):
+            index, backend = item
+            p50 = backend.stats.percentile(50) if backend.stats.samples >= Config.LLM_LATENCY_MIN_SAMPLES else None
+            return not backend.stats.healthy, p50 is None, p50 or 0.0, index
+
+        return [backend for _, backend in sorted(enumerate(self.backends), key=key)]
+
+    def hedge_delay(self, backend: Backend) -> float:
+        if self.hedge_after > 0:
+            return self.hedge_after
+        if backend.stats.samples >= Config.LLM_LATENCY_MIN_SAMPLES:
+            return max(backend.stats.percentile(95), Config.LLM_HEDGE_MIN_SECONDS)
+        return Config.LLM_HEDGE_INITIAL_SECONDS
+
+    def _call(self, backend: Backend, args, kwargs, hedge: bool = False):
+        client = (self._hedge_clients if hedge else self._clients)[backend.name]
+        started = time.monotonic()
+        try:
+            result = client.invoke(*args, **kwargs)
+        except Exception:
+            backend.stats.record(time.monotonic() - started, ok=False)
+            raise
+        backend.stats.record(time.monotonic() - started)
+        return result
+
+    async def _acall(self, backend: Backend, args, kwargs, hedge: bool = False):
+        client = (self._hedge_clients if hedge else self._clients)[backend.name]
+        started = time.monotonic()
+        try:
+            result = await client.ainvoke(*args, **kwargs)
+        except Exception:
+            backend.stats.record(time.monotonic() - started, ok=False)
+            raise
+        backend.stats.record(time.monotonic() - started)
+        return result
+
+    def _next(self, order: List[Backend], launched: int, hedge: bool) -> Backend:
+        backend = order[launched]
+        if hedge:
+            backend.stats.hedges += 1
+            logger.debug(f"Hedging LLM call to {backend.name}")
+        else:
+            logger.warning(f"LLM backend {order[launched - 1].name} failed, trying {backend.name}")
+        return backend
+
+    def _submit(self, backend: Backend, args, kwargs, hedge: bool = False):
+        return _get_executor(hedge).submit(self._call, backend, args, kwargs, hedge)
+
+    def invoke(self, *args, **kwargs):
+        order = self.ranked()
+        if len(order) == 1:
+            return self._call(order[0], args, kwargs)
+        pending = {self._submit(order[0], args, kwargs): order[0]}
+        launched, hedges, error = 1, 0, None
+        while pending:
+            can_hedge = launched < len(order) and hedges < Config.LLM_MAX_HEDGES
+            done, _ = wait(pending, timeout=self.hedge_delay(order[0]) if can_hedge else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                backend = self._next(order, launched, hedge=True)
+                pending[self._submit(backend, args, kwargs, hedge=True)] = backend
+                launched, hedges = launched + 1, hedges + 1
+                continue
+            for future in done:
+                backend = pending.pop(future)
+                if future.exception() is None:
+                    backend.stats.wins += 1
+                    return future.result()
+                error = future.exception()
+            if not pending and launched < len(order):
+                backend = self._next(order, launched, hedge=False)
+                pending[self._submit(backend, args, kwargs)] = backend
+                launched += 1
+        raise error
+
+    async def ainvoke(self, *args, **kwargs):
+        order = self.ranked()
+        if len(order) == 1:
+            return await self._acall(order[0], args, kwargs)
+        pending = {asyncio.ensure_future(self._acall(order[0], args, kwargs)): order[0]}
+        launched, hedges, error = 1, 0, None
+        try:
+            while pending:
+                can_hedge = launched < len(order) and hedges < Config.LLM_MAX_HEDGES
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_delay(order[0]) if can_hedge else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    backend = self._next(order, launched, hedge=True)
+                    pending[asyncio.ensure_future(self._acall(backend, args, kwargs, hedge=True))] = backend
+                    launched, hedges = launched + 1, hedges + 1
+                    continue
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is None:
+                        backend.stats.wins += 1
+                        return task.result()
+                    error = task.exception()
+                if not pending and launched < len(order):
+                    backend = self._next(order, launched, hedge=False)
+                    pending[asyncio.ensure_future(self._acall(backend, args, kwargs))] = backend
+                    launched += 1
+        finally:
+            # Unlike threads, losing coroutines can be cancelled
+            for task in pending:
+                task.cancel()
+        raise error
+
+    def bind(self, **kwargs) -> "LLMRouter":
+        # Bound variants keep the backends, hence the latency statistics
+        return LLMRouter(self.backends, self.hedge_after, {**self.bound, **kwargs})
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {backend.name: backend.stats.snapshot() for backend in self.backends}
+
+
+_backend_stats: Dict[str, BackendStats] = {}
+_backend_stats_lock = threading.Lock()
+
+
+def get_backend_stats(name: str) -> BackendStats:
+    """Process-wide statistics of a backend, shared by every route using it"""
+    with _backend_stats_lock:
+        if name not in _backend_stats:
+            _backend_stats[name] = BackendStats()
+        return _backend_stats[name]
+
+
+def backend_stats() -> Dict[str, Dict[str, Any]]:
+    with _backend_stats_lock:
+        stats = dict(_backend_stats)
+    return {name: backend.snapshot() for name, backend in stats.items()}
+
+
+def route_backends(agent_name: str, node: Optional[str] = None) -> Optional[List[str]]:
+    """Backend names routed for ``agent.node``, else ``agent``, else the default route (None: no node route)"""
+    routes = Config.LLM_ROUTES
+    if node is not None:
+        return routes.get(f"{agent_name}.{node}")
+    return routes.get(agent_name) or routes.get("default") or [PROVIDER_GROQ]
+
+
+def create_llm(backend_names: Sequence[str]):
+    """Plain client for a single backend, ``LLMRouter`` over several"""
+    unknown = [name for name in backend_names if name not in Config.LLM_BACKENDS]
+    if unknown:
+        raise ValueError(f"Unknown LLM backends: {', '.join(unknown)}")
+    if len(backend_names) == 1:
+        return create_client(Config.LLM_BACKENDS[backend_names[0]])
+    # The router handles retries by failing over, so backends fail fast
+    return LLMRouter([Backend(name, create_client(Config.LLM_BACKENDS[name], max_retries=0), get_backend_stats(name))
+                      for name in backend_names])
@@ -0,0 +1,174 @@
+"""
+LLM call scheduler
+Process-wide rate limit and concurrency cap shared by every agent's LLM client
+
+Each agent holds its own ChatGroq client, but they all draw on the same provider quota. Agents
+wrap their client with ``get_llm_scheduler().wrap(llm)``: every call (sync or async, bound
+variants included) then waits for a slot. A slot needs
+
+- a token from a bucket refilled at ``Config.LLM_REQUESTS_PER_MINUTE`` (holding at most
+  ``Config.LLM_RATE_BURST`` tokens; no rate limit when the rate is 0), and
+- fewer than ``Config.LLM_MAX_CONCURRENCY`` calls in flight.
+
+Fan-out features (scenario matrices, batches, candidate drafts) can then run many workflows
+concurrently without each one pacing itself. With ``Config.LLM_COALESCING``, identical
+concurrent requests are coalesced first (utils.single_flight): only the leader takes a slot.
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+from config.settings import Config
+from utils.single_flight import SingleFlight, get_single_flight, request_key
+
+
+class LLMScheduler:
+    """Token bucket plus in-flight cap, usable from threads and event loops"""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, max_concurrency: Optional[int] = None,
+                 burst: Optional[int] = None):
+        self.requests_per_minute = Config.LLM_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.burst = burst or Config.LLM_RATE_BURST
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self.calls = 0
+        self.waited = 0.0  # seconds spent waiting for a slot, summed over calls
+        self.peak_in_flight = 0
+
+    def _try_acquire(self) -> Optional[float]:
+        """Take a slot (returns 0), or return how long to wait (None: until a call finishes)"""
+        if self._in_flight >= self.max_concurrency:
+            return None
+        if self.requests_per_minute > 0:
+            now = time.monotonic()
+            rate = self.requests_per_minute / 60.0
+            self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) * rate)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / rate
+            self._tokens -= 1
+        self._in_flight += 1
+        self.calls += 1
+        self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+        return 0.0
+
+    def acquire(self):
+        started = time.monotonic()
+        with self._condition:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    break
+                self._condition.wait(wait)
+            self.waited += time.monotonic() - started
+
+    async def acquire_async(self):
+        started = time.monotonic()
+        while True:
+            with self._condition:
+                wait = self._try_acquire()
+                if wait == 0:
+                    self.waited += time.monotonic() - started
+                    return
+            # The event loop must not block on the condition: poll instead
+            await asyncio.sleep(wait if wait is not None else 0.01)
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def slot_async(self):
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def wrap(self, llm) -> "ScheduledLLM":
+        if isinstance(llm, ScheduledLLM):
+            return llm
+        return ScheduledLLM(llm, self, get_single_flight() if Config.LLM_COALESCING else None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "requests_per_minute": self.requests_per_minute,
+                "max_concurrency": self.max_concurrency,
+                "calls": self.calls,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "waited_seconds": round(self.waited, 3),
+            }
+
+
+class ScheduledLLM:
+    """LLM client whose calls go through a scheduler (and single-flight group); other attributes pass through"""
+
+    def __init__(self, llm, scheduler: LLMScheduler, single_flight: Optional[SingleFlight] = None,
+                 model: Optional[Dict[str, Any]] = None):
+        self.llm = llm
+        self.scheduler = scheduler
+        self.single_flight = single_flight
+        # Requests only coalesce for the same model settings (bound overrides included)
+        self.model = model or {"client": type(llm).__name__, "model": getattr(llm, "model_name", None),
+                               "temperature": getattr(llm, "temperature", None)}
+
+    def _invoke(self, args, kwargs):
+        with self.scheduler.slot():
+            return self.llm.invoke(*args, **kwargs)
+
+    async def _ainvoke(self, args, kwargs):
+        async with self.scheduler.slot_async():
+            return await self.llm.ainvoke(*args, **kwargs)
+
+    def invoke(self, *args, **kwargs):
+        if self.single_flight is None:
+            return self._invoke(args, kwargs)
+        return self.single_flight.do(request_key(self.model, args, kwargs), lambda: self._invoke(args, kwargs))
+
+    async def ainvoke(self, *args, **kwargs):
+        if self.single_flight is None:
+            return await self._ainvoke(args, kwargs)
+        return await self.single_flight.do_async(request_key(self.model, args, kwargs),
+                                                 lambda: self._ainvoke(args, kwargs))
+
+    def bind(self, **kwargs) -> "ScheduledLLM":
+        return ScheduledLLM(self.llm.bind(**kwargs), self.scheduler, self.single_flight, {**self.model, **kwargs})
+
+    def without_coalescing(self) -> "ScheduledLLM":
+        """Same client for requests that must be sampled independently even when identical"""
+        return ScheduledLLM(self.llm, self.scheduler, None, self.model)
+
+    def __getattr__(self, name):
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+
+_default_scheduler: Optional[LLMScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Process-wide scheduler shared by every agent"""
+    global _default_scheduler
+    if _default_scheduler is None:
+        with _default_scheduler_lock:
+            if _default_scheduler is None:
+                _default_scheduler = LLMScheduler()
+    return _default_scheduler
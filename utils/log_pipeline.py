@@ -0,0 +1,173 @@
+"""
+Asynchronous logging pipeline
+Queue-based handlers with structured JSON records, size-based rotation and payload sampling
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Optional
+
+from config.settings import Config
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Standard LogRecord attributes, everything else passed through ``extra`` is exported as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Render log records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+            "process": record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller; records are dropped when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Like QueueHandler.prepare, render the message and traceback in the caller thread: the
+        # args may change once the call returns. Unlike it, keep the message without the handler
+        # format and the traceback in exc_text, so the listener's JSON/text formatters apply
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_lock = threading.Lock()
+
+
+def configure_logging(force: bool = False) -> QueueListener:
+    """
+    Install the queue-based logging pipeline on the root logger (idempotent)
+
+    Callers only pay for rendering the message and putting the record on an in-memory
+    queue; formatting for the rotating JSON file and the console and writing happen on
+    the listener thread.
+    """
+    global _listener, _queue_handler
+
+    with _lock:
+        if _listener is not None and not force:
+            return _listener
+        if _listener is not None:
+            _stop_listener()
+
+        os.makedirs(os.path.dirname(Config.LOG_FILE) or ".", exist_ok=True)
+
+        file_handler = RotatingFileHandler(
+            Config.LOG_FILE,
+            maxBytes=Config.LOG_MAX_BYTES,
+            backupCount=Config.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+            delay=True
+        )
+        file_handler.setFormatter(JsonFormatter() if Config.LOG_JSON else logging.Formatter(TEXT_FORMAT))
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, NonBlockingQueueHandler):
+                root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(Config.LOG_LEVEL)
+
+        _listener.start()
+        return _listener
+
+
+def _stop_listener():
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
+
+
+def shutdown_logging():
+    """Flush pending records and stop the listener thread"""
+    with _lock:
+        _stop_listener()
+
+
+def dropped_records() -> int:
+    """Number of records dropped because the log queue was full"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def payload_logging_enabled() -> bool:
+    """Decide whether the next payload record is logged, before anything gets formatted"""
+    mode = str(Config.LOG_PAYLOADS).lower()
+    if mode == "full":
+        return True
+    if mode == "sampled":
+        return random.random() < Config.LOG_PAYLOAD_SAMPLE_RATE
+    return False
+
+
+def log_payload(logger: logging.Logger, label: str, payload: Any, level: int = logging.INFO):
+    """
+    Log a high-volume payload (prompt, raw LLM response, model dump)
+
+    With LOG_PAYLOADS="off" the payload is never converted to text, so it stays out of
+    the request path entirely; "sampled" keeps LOG_PAYLOAD_SAMPLE_RATE of the records.
+    """
+    if not logger.isEnabledFor(level) or not payload_logging_enabled():
+        return
+    logger.log(level, "%s %s", label, payload, extra={"payload": True})
+
+
+atexit.register(shutdown_logging)
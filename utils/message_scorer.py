@@ -0,0 +1,117 @@
+"""
+Talan message scorer
+Cheap local ranking of candidate messages: channel length fit, service coverage and pain point inclusion
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import Config
+from config.talan_config import MESSAGE_FORMATS
+from utils.service_matcher import get_service_matcher, normalize_text
+
+_RANGE_PATTERN = re.compile(r"(\d+)\s*-\s*(\d+)")
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Common French/English words that say nothing about a pain point
+_STOPWORDS = {
+    "avec", "dans", "pour", "sans", "leur", "leurs", "nous", "vous", "sont", "être", "etre", "plus",
+    "moins", "tres", "cette", "ces", "des", "les", "une", "un", "sur", "par", "entre", "aussi",
+    "the", "and", "for", "with", "from", "that", "this", "their", "have", "more", "less", "into",
+}
+
+
+def channel_key(channel: Any) -> str:
+    """MESSAGE_FORMATS key for a channel given as enum, enum string or plain name"""
+    value = getattr(channel, "value", channel)
+    return str(value).split(".")[-1].lower()
+
+
+def length_range(channel: Any) -> Optional[Tuple[int, int]]:
+    """Target word range parsed from MESSAGE_FORMATS[channel]["length"], e.g. "(300-500 mots)" -> (300, 500)"""
+    spec = MESSAGE_FORMATS.get(channel_key(channel), {}).get("length", "")
+    match = _RANGE_PATTERN.search(spec)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _content_words(text: str) -> List[str]:
+    return [word for word in _WORD_PATTERN.findall(normalize_text(text))
+            if len(word) >= 4 and word not in _STOPWORDS]
+
+
+def _pain_point_texts(customer_analysis) -> List[str]:
+    texts = []
+    for pain_point in getattr(customer_analysis, "pain_points", None) or []:
+        if isinstance(pain_point, dict):
+            texts.append(" ".join(str(v) for v in pain_point.values() if isinstance(v, str)))
+        else:
+            texts.append(str(pain_point))
+    return [text for text in texts if text.strip()]
+
+
+class MessageScorer:
+    """Score a draft Talan message against the channel format and the customer profile"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, max_services: int = 3):
+        self.weights = weights or Config.CANDIDATE_SCORE_WEIGHTS
+        self.max_services = max_services
+        self.matcher = get_service_matcher()
+
+    def length_score(self, content: str, channel: Any) -> float:
+        """1.0 inside the channel's word range, decaying linearly with the relative distance outside it"""
+        target = length_range(channel)
+        if not target:
+            return 1.0
+        low, high = target
+        words = len(content.split())
+        if low <= words <= high:
+            return 1.0
+        distance = (low - words) / low if words < low else (words - high) / high
+        return max(0.0, 1.0 - distance)
+
+    def service_score(self, content: str, services: List[str]) -> float:
+        """Share of the customer's top matched services the message actually talks about"""
+        relevant = services[:self.max_services]
+        if not relevant:
+            return 1.0
+        mentioned = {service for service, _ in self.matcher.score_text(content)}
+        return len(mentioned.intersection(relevant)) / len(relevant)
+
+    def pain_point_score(self, content: str, customer_analysis) -> float:
+        """Share of pain points echoed by the message (enough of their content words present)"""
+        pain_points = _pain_point_texts(customer_analysis)
+        if not pain_points:
+            return 1.0
+        message_words = set(_content_words(content))
+        covered = 0
+        for text in pain_points:
+            words = set(_content_words(text))
+            if not words:
+                continue
+            hits = len(words & message_words)
+            if hits >= 2 or hits / len(words) >= 0.3:
+                covered += 1
+        return covered / len(pain_points)
+
+    def score(self, content: str, customer_analysis, channel: Any,
+              services: Optional[List[str]] = None) -> Dict[str, float]:
+        """Component scores and their weighted total, all in [0, 1]"""
+        if services is None:
+            services = self.matcher.match_services(customer_analysis)
+        scores = {
+            "length": self.length_score(content, channel),
+            "services": self.service_score(content, services),
+            "pain_points": self.pain_point_score(content, customer_analysis),
+        }
+        total_weight = sum(self.weights.get(name, 0.0) for name in scores) or 1.0
+        scores["total"] = round(sum(self.weights.get(name, 0.0) * value for name, value in scores.items())
+                                / total_weight, 4)
+        return scores
+
+    def rank(self, candidates: List[Dict[str, Any]], customer_analysis, channel: Any,
+             services: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Attach a ``score`` breakdown to each candidate (dicts with ``content``) and sort best first"""
+        if services is None:
+            services = self.matcher.match_services(customer_analysis)
+        for candidate in candidates:
+            candidate["score"] = self.score(candidate["content"], customer_analysis, channel, services)
+        return sorted(candidates, key=lambda candidate: candidate["score"]["total"], reverse=True)
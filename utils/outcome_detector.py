@@ -0,0 +1,178 @@
+"""
+Conversation outcome detector
+Local lexical classifier telling whether the latest customer message booked a meeting or closed the door
+
+The composer loop runs until the target number of exchanges. Once the customer has confirmed a
+meeting or clearly declined, every further turn is two LLM calls nobody reads. The detector
+looks for explicit French/English confirmation and rejection phrases in the customer's last
+message (accents and case ignored):
+
+- sentences are split into clauses at contrast words (mais, cependant, but, however...); a
+  clause followed by a contrast counts half, the customer's position is in what comes after
+  ("I cannot make Monday but Tuesday 10:00 works for me");
+- meeting phrases in a negated clause ("je ne confirme pas le rendez-vous") or about an
+  internal meeting are ignored, and count half in a question ("pouvons-nous confirmer la
+  reunion ?"); a meeting only counts as booked by the customer or with the sender ("je vous
+  confirme", "your demo is booked", "the call with you is scheduled"), not "our demo is
+  scheduled";
+- a rejection phrase under another negation ("je ne dis pas que nous ne sommes pas
+  interesses") is ignored;
+- overlapping phrases of the same outcome count once, with the strongest weight;
+- a scoped objection ("pas interesse par le cloud", "not interested in a call right now") is
+  about one offer or moment, not the relationship, and only counts as a weak rejection;
+- when both outcomes are signalled, the confidence is the difference of the two scores.
+
+Signals below ``Config.OUTCOME_MIN_CONFIDENCE`` leave the conversation open, unless an LLM is
+given (``Config.OUTCOME_LLM_CHECK``): weak or conflicting signals, and only those, are then
+settled with one short classification call.
+"""
+import logging
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from config.settings import Config
+from utils.service_matcher import normalize_text
+
+logger = logging.getLogger(__name__)
+
+OUTCOME_MEETING_BOOKED = "meeting_booked"
+OUTCOME_REJECTED = "rejected"
+OUTCOME_OPEN = "open"
+
+_MEETING = r"(?:rendez-vous|rdv|reunion|rencontre|entretien|appel|visio\w*|demo|demonstration|creneau|atelier)"
+_BOOKED_FR = r"(?:confirme|fixe|planifie|cale|reserve|bloque)e?s?\b"
+_DAY = r"(?:lundi|mardi|mercredi|jeudi|vendredi|demain|monday|tuesday|wednesday|thursday|friday|tomorrow|\d{1,2} ?h\d{0,2}|\d{1,2}:\d{2})"
+
+# (pattern, weight) over normalized text; a score of 1.0 or more is a certain outcome
+MEETING_PATTERNS: List[Tuple[str, float]] = [
+    (rf"\b(?:je|nous) (?:vous )?confirm\w* (?:\w+ ){{0,2}}{_MEETING}", 1.0),
+    (rf"\b(?:j'ai|nous avons) (?:bien )?(?:confirme|fixe|planifie|cale|reserve|bloque) (?:\w+ ){{0,2}}{_MEETING}", 0.9),
+    (rf"\b(?:votre|vos) {_MEETING}\b[^.!?]{{0,40}}\b(?:est |sont )?{_BOOKED_FR}|\b{_MEETING} avec (?:vous|nous)\b[^.!?]{{0,40}}\b(?:est |sont )?{_BOOKED_FR}", 0.9),
+    (rf"\b(?:ok|d'accord|volontiers|avec plaisir|parfait|entendu|c'est note|va pour)\b[^.!?]{{0,40}}\b{_DAY}", 0.8),
+    (r"\b(?:j'ai|nous avons) (?:bien )?(?:recu|accepte) (?:l'|votre )?invitation", 0.8),
+    (r"\b(?:i|we)(?:'ve| have)? (?:confirmed|booked|scheduled) (?:the |a |our |your |this )?(?:meeting|call|demo|appointment)", 0.9),
+    (r"\byour (?:meeting|call|demo|appointment)\b[^.!?]{0,40}\b(?:is |are )?(?:confirmed|booked|scheduled)\b"
+     r"|\b(?:meeting|call|demo|appointment) with (?:you|us)\b[^.!?]{0,40}\b(?:is |are )?(?:confirmed|booked|scheduled)\b", 0.9),
+    (r"\b(?:(?:i|we)(?:'ll| will) )?see you (?:on|at|next|then)\b", 0.9),
+    (r"\b(?:i|we)(?:'ve| have)? ?(?:accepted|booked) (?:the|your|a) (?:calendar )?(?:invite|invitation|slot)", 0.9),
+    (rf"\b(?:works|suits) (?:for )?(?:me|us)\b[^.!?]{{0,30}}\b{_DAY}|\b{_DAY}\b[^.!?]{{0,30}}\b(?:works|suits) (?:for )?(?:me|us)\b", 0.8),
+    (rf"\b(?:me|nous) (?:convient|conviennent|va|vont)\b[^.!?]{{0,30}}\b{_DAY}|\b{_DAY}\b[^.!?]{{0,30}}\b(?:me|nous) (?:convient|conviennent|va|vont)\b", 0.8),
+    (rf"\b(?:disponible|available)\b[^.!?]{{0,30}}\b{_DAY}", 0.4),
+]
+REJECTION_PATTERNS: List[Tuple[str, float]] = [
+    (r"\b(?:ne|n') ?(?:sommes|suis) (?:pas|plus) interesse", 1.0),
+    (r"\bpas interesse", 0.9),
+    (r"\bne (?:donnerons|pouvons|pourrons|souhaitons) pas (?:donner )?suite", 1.0),
+    (r"\b(?:avons|ai) (?:deja )?(?:choisi|retenu|selectionne|signe avec) (?:un autre|une autre|un concurrent|un prestataire)", 1.0),
+    (r"\bretirez[- ](?:moi|nous)\b|\bne (?:plus )?nous (?:re)?contactez plus\b|\bmerci de ne plus\b", 1.0),
+    (r"\bpas (?:pour le moment|d'actualite|une priorite|prioritaire)\b|\bpas de budget\b", 0.6),
+    (r"\bnot interested\b", 1.0),
+    (r"\b(?:remove (?:me|us) from|unsubscribe)\b|\b(?:do not|don't) contact (?:me|us)\b", 1.0),
+    (r"\b(?:decided|chosen|chose) to (?:go|work|move forward) with (?:another|a different|someone else|a competitor)", 1.0),
+    (r"\bnot (?:a priority|the right time)\b|\bno budget\b", 0.6),
+]
+
+# Strongest first, so overlapping weaker phrases are the ones skipped
+_MEETING_RES = sorted(((re.compile(pattern), weight) for pattern, weight in MEETING_PATTERNS), key=lambda item: -item[1])
+_REJECTION_RES = sorted(((re.compile(pattern), weight) for pattern, weight in REJECTION_PATTERNS),
+                        key=lambda item: -item[1])
+_SENTENCE = re.compile(r"[^.!?\n]+[.!?]*")
+# Contrast words starting a new clause inside a sentence
+_CONTRAST = re.compile(r"[,;]?\s*\b(?:mais|cependant|toutefois|pourtant|par contre|en revanche|but|however|though|although)\b")
+# Right after "interested": the objection is limited to one offer or moment
+_SCOPED = re.compile(r"\w*\s+(?:par|pour|dans|in|by|with)\b")
+_INTERNAL = re.compile(r"\b(?:internal|internally|interne|en interne)\b")
+_PHRASE_BREAK = re.compile(r"[,;:]")
+CONTRAST_FACTOR = 0.5
+SCOPED_FACTOR = 0.3
+# "n'hesitez pas" is a courtesy, not a negation
+_NEGATION = re.compile(r"\b(?:ne|n')\b(?!hesit)[^.!?]{0,30}\b(?:pas|plus|jamais)\b|\b(?:not|never|cannot|can't|won't)\b")
+
+
+class Outcome(NamedTuple):
+    label: str         # OUTCOME_MEETING_BOOKED, OUTCOME_REJECTED or OUTCOME_OPEN
+    confidence: float  # 0..1
+    reason: str        # matched phrases, or what decided the outcome
+    source: str        # "lexical" or "llm"
+
+    @property
+    def terminal(self) -> bool:
+        return self.label != OUTCOME_OPEN
+
+
+def _negated(clause: str, start: int) -> bool:
+    # Rejection phrases carry their own negation: only one earlier in the same phrase reverses them
+    return bool(_NEGATION.search(_PHRASE_BREAK.split(clause[:start])[-1]))
+
+
+def classify_outcome(text: str) -> Outcome:
+    """Lexical outcome of a customer message, with the confidence of the strongest signal"""
+    scores = {OUTCOME_MEETING_BOOKED: 0.0, OUTCOME_REJECTED: 0.0}
+    evidence = {OUTCOME_MEETING_BOOKED: [], OUTCOME_REJECTED: []}
+    for sentence in _SENTENCE.findall(normalize_text(text)):
+        question = sentence.rstrip().endswith("?")
+        clauses = _CONTRAST.split(sentence)
+        for position, clause in enumerate(clauses):
+            contrasted = CONTRAST_FACTOR if position < len(clauses) - 1 else 1.0
+            for label, patterns in ((OUTCOME_MEETING_BOOKED, _MEETING_RES), (OUTCOME_REJECTED, _REJECTION_RES)):
+                if label == OUTCOME_MEETING_BOOKED and (_NEGATION.search(clause) or _INTERNAL.search(clause)):
+                    continue
+                factor = contrasted * (0.5 if label == OUTCOME_MEETING_BOOKED and question else 1.0)
+                spans = []
+                for pattern, weight in patterns:
+                    match = pattern.search(clause)
+                    if not match or any(match.start() < end and start < match.end() for start, end in spans):
+                        continue
+                    spans.append(match.span())
+                    if label == OUTCOME_REJECTED and _negated(clause, match.start()):
+                        continue
+                    scoped = label == OUTCOME_REJECTED and _SCOPED.match(clause, match.end())
+                    scores[label] += weight * factor * (SCOPED_FACTOR if scoped else 1.0)
+                    evidence[label].append(match.group(0).strip())
+    label = max(scores, key=scores.get)
+    other = min(scores, key=scores.get)
+    confidence = round(min(1.0, scores[label]) - min(1.0, scores[other]), 3)
+    if confidence <= 0:
+        label, phrases = OUTCOME_OPEN, evidence[label] + evidence[other]
+    else:
+        phrases = evidence[label]
+    return Outcome(label, max(confidence, 0.0), "; ".join(f"'{phrase}'" for phrase in phrases), "lexical")
+
+
+def _ask_llm(text: str, llm) -> Optional[str]:
+    from langchain.schema import HumanMessage
+
+    prompt = (
+        "Dernier message du client dans une conversation commerciale B2B :\n"
+        f"\"\"\"{text}\"\"\"\n"
+        f"Réponds par un seul mot : {OUTCOME_MEETING_BOOKED} si le client confirme un rendez-vous, "
+        f"{OUTCOME_REJECTED} s'il refuse clairement de poursuivre, {OUTCOME_OPEN} sinon."
+    )
+    answer = normalize_text(llm.invoke([HumanMessage(content=prompt)]).content)
+    for label in (OUTCOME_MEETING_BOOKED, OUTCOME_REJECTED, OUTCOME_OPEN):
+        if label in answer:
+            return label
+    return None
+
+
+def detect_outcome(text: str, llm=None, min_confidence: Optional[float] = None) -> Outcome:
+    """
+    Outcome of the latest customer message
+
+    Lexical signals reaching ``min_confidence`` decide alone. Weaker or conflicting signals are
+    checked with ``llm`` when one is given; messages without any signal never reach the LLM.
+    """
+    min_confidence = Config.OUTCOME_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    lexical = classify_outcome(text)
+    if lexical.confidence >= min_confidence:
+        return lexical
+    if llm is not None and lexical.reason:
+        try:
+            label = _ask_llm(text, llm)
+        except Exception as e:
+            logger.warning(f"Outcome LLM check failed: {str(e)}")
+            label = None
+        if label is not None:
+            return Outcome(label, min_confidence if label != OUTCOME_OPEN else 0.0,
+                           f"LLM check of weak signals: {lexical.reason}", "llm")
+    return Outcome(OUTCOME_OPEN, lexical.confidence, lexical.reason, lexical.source)
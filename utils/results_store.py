@@ -0,0 +1,238 @@
+"""
+Append-only results store
+Buffered JSONL partitions with collision-free result IDs and a small lookup index
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.jsonl"
+
+
+def new_result_id(now: Optional[datetime] = None) -> str:
+    """Time-sortable, collision-free result identifier"""
+    now = now or datetime.now()
+    return f"{now.strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:12]}"
+
+
+class ResultsStore:
+    """
+    Append-only store for workflow results
+
+    Records are buffered in memory and appended to one JSONL file per day and process
+    (``results-YYYYMMDD-<pid>.jsonl``), so a flush costs one write per partition no matter
+    how many records it holds. Each record gets an index entry (result_id, execution_id,
+    customer, date, file, offset, length) for direct lookups without scanning partitions.
+    """
+
+    def __init__(self, root_dir: Optional[str] = None, buffer_size: Optional[int] = None):
+        self.root_dir = root_dir or Config.RESULTS_STORE_DIR
+        self.buffer_size = buffer_size or Config.RESULTS_BUFFER_SIZE
+        self.index_path = os.path.join(self.root_dir, INDEX_FILENAME)
+
+        self._pending: List[Dict[str, Any]] = []
+        self._batch_depth = 0
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------ writes
+
+    def append(self, record: Dict[str, Any], execution_id: Optional[str] = None,
+               customer: Optional[str] = None, result_id: Optional[str] = None) -> str:
+        """Queue a record for writing and return its result ID"""
+        now = datetime.now()
+        result_id = result_id or new_result_id(now)
+        entry = {
+            "result_id": result_id,
+            "execution_id": execution_id,
+            "customer": customer,
+            "date": now.strftime("%Y-%m-%d"),
+            "stored_at": now.isoformat(),
+            "record": record,
+        }
+        with self._lock:
+            self._pending.append(entry)
+            if self._batch_depth == 0 and len(self._pending) >= self.buffer_size:
+                self._flush_locked()
+        return result_id
+
+    @contextmanager
+    def batch(self):
+        """Hold every append made inside the block in memory and write it in one flush"""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._flush_locked()
+
+    @property
+    def in_batch(self) -> bool:
+        """True while a ``batch()`` block is open"""
+        return self._batch_depth > 0
+
+    def flush(self) -> int:
+        """Write buffered records to disk, returns the number of records written"""
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> int:
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, []
+        by_partition: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in pending:
+            by_partition.setdefault(self._partition_name(entry["date"]), []).append(entry)
+
+        index_lines = []
+        for filename, entries in by_partition.items():
+            chunks = []
+            for entry in entries:
+                line = json.dumps(
+                    {key: entry[key] for key in ("result_id", "execution_id", "customer", "stored_at", "record")},
+                    ensure_ascii=False, default=str
+                ).encode("utf-8") + b"\n"
+                chunks.append((entry, line))
+
+            path = os.path.join(self.root_dir, filename)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(b"".join(line for _, line in chunks))
+
+            for entry, line in chunks:
+                index_entry = {
+                    "result_id": entry["result_id"],
+                    "execution_id": entry["execution_id"],
+                    "customer": entry["customer"],
+                    "date": entry["date"],
+                    "file": filename,
+                    "offset": offset,
+                    "length": len(line),
+                }
+                offset += len(line)
+                index_lines.append(json.dumps(index_entry, ensure_ascii=False))
+                if self._index is not None:
+                    self._index[entry["result_id"]] = index_entry
+
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(index_lines) + "\n")
+
+        logger.debug(f"Flushed {len(pending)} results to {len(by_partition)} partition(s)")
+        return len(pending)
+
+    @staticmethod
+    def _partition_name(date: str) -> str:
+        return f"results-{date.replace('-', '')}-{os.getpid()}.jsonl"
+
+    # ------------------------------------------------------------------ reads
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            index: Dict[str, Dict[str, Any]] = {}
+            if os.path.exists(self.index_path):
+                with open(self.index_path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            index[entry["result_id"]] = entry
+            self._index = index
+        return self._index
+
+    def refresh_index(self):
+        """Drop the cached index so entries written by other processes become visible"""
+        with self._lock:
+            self._index = None
+
+    def find(self, execution_id: Optional[str] = None, customer: Optional[str] = None,
+             date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Index entries matching every given filter, oldest first"""
+        with self._lock:
+            self._flush_locked()
+            entries = list(self._load_index().values())
+        return [
+            entry for entry in entries
+            if (execution_id is None or entry["execution_id"] == execution_id)
+            and (customer is None or entry["customer"] == customer)
+            and (date is None or entry["date"] == date)
+        ]
+
+    def read_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Read one stored record using its index entry (a single seek + read)"""
+        with open(os.path.join(self.root_dir, entry["file"]), "rb") as f:
+            f.seek(entry["offset"])
+            return json.loads(f.read(entry["length"]))
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """Stored row (metadata plus ``record``) for a result ID"""
+        with self._lock:
+            self._flush_locked()
+            entry = self._load_index().get(result_id)
+        return self.read_entry(entry) if entry else None
+
+    def iter_records(self, date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream stored rows partition by partition, optionally for a single day"""
+        self.flush()
+        prefix = f"results-{date.replace('-', '')}-" if date else "results-"
+        for filename in sorted(os.listdir(self.root_dir)):
+            if filename.startswith(prefix) and filename.endswith(".jsonl"):
+                with open(os.path.join(self.root_dir, filename), encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+
+    def export_parquet(self, output_path: str, date: Optional[str] = None) -> str:
+        """
+        Export stored rows to a Parquet file through pandas
+
+        Requires a Parquet engine (pyarrow or fastparquet). Nested results are kept as
+        JSON strings next to the flat metadata columns.
+        """
+        import pandas as pd
+
+        rows = [
+            {
+                "result_id": row["result_id"],
+                "execution_id": row.get("execution_id"),
+                "customer": row.get("customer"),
+                "stored_at": row.get("stored_at"),
+                "record": json.dumps(row.get("record"), ensure_ascii=False, default=str),
+            }
+            for row in self.iter_records(date)
+        ]
+        frame = pd.DataFrame(rows, columns=["result_id", "execution_id", "customer", "stored_at", "record"])
+        frame.to_parquet(output_path, index=False)
+        return output_path
+
+    def close(self):
+        self.flush()
+
+
+_default_store: Optional[ResultsStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    """Process-wide results store, flushed at interpreter exit"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = ResultsStore()
+                atexit.register(_default_store.close)
+    return _default_store
@@ -0,0 +1,88 @@
+"""
+Scenario matrix
+One analysed customer, several conversation scenarios (channel x tone x ...) and their side-by-side scores
+
+Each scenario branches off the analysed state with ``branch_copy``: the customer and company
+analyses are shared by reference, the conversation, analyses and per-run tracking are reset.
+The workflow generates the branches concurrently (``Config.SCENARIO_MAX_WORKERS``); they share
+the workflow's agents, the stage memo and similarity cache, and their LLM calls all go through
+the process-wide scheduler (utils.llm_scheduler), so the matrix never exceeds the provider rate.
+"""
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.compact_state import branch_copy
+from utils.models import ConversationParams, WorkflowState
+
+# Per-conversation bookkeeping of the composer loop, not carried over from the analysed state
+CONVERSATION_RESULTS = ("current_message_type", "talan_candidates", "iteration_count", "conversation_complete",
+                        "completion_reason", "conversation_outcome")
+
+
+def _value(value: Any) -> str:
+    return str(getattr(value, "value", value))
+
+
+def scenario_label(params: ConversationParams) -> str:
+    return f"{_value(params.channel)} / {_value(params.tone)} / {params.exchanges} exchanges"
+
+
+def scenario_state(state: WorkflowState, params: ConversationParams, index: int) -> WorkflowState:
+    """Branch of the analysed ``state`` ready to generate the conversation of one scenario"""
+    branch = branch_copy(state)
+    for key in CONVERSATION_RESULTS:
+        branch.intermediate_results.pop(key, None)
+    branch.intermediate_results["scenario"] = {"index": index, "label": scenario_label(params)}
+    return branch.model_copy(update={
+        "conversation": None,
+        "strategy_analysis": None,
+        "personality_analysis": None,
+        "conversation_params": params,
+        "execution_id": str(uuid.uuid4()),
+        # Own checkpoint threads: scenarios must not resume each other's agent runs
+        "thread_id": f"{state.thread_id or state.execution_id}_scenario_{index}",
+    })
+
+
+def _score(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def comparison_row(index: int, params: ConversationParams, result: WorkflowState) -> Dict[str, Any]:
+    strategy = result.strategy_analysis
+    conversation = result.conversation
+    return {
+        "scenario": index,
+        "label": scenario_label(params),
+        "channel": _value(params.channel),
+        "tone": _value(params.tone),
+        "exchanges": params.exchanges,
+        "messages": len(conversation.messages) if conversation else 0,
+        "completion_reason": result.intermediate_results.get("completion_reason"),
+        "overall_effectiveness": _score(getattr(strategy, "overall_effectiveness", None)),
+        "methodology_score": _score(getattr(strategy, "methodology_score", None)),
+        "positioning_score": _score(getattr(strategy, "positioning_score", None)),
+        "value_prop_score": _score(getattr(strategy, "value_prop_score", None)),
+        "errors": len(result.errors),
+    }
+
+
+def comparison_table(scenarios: Sequence[ConversationParams], results: Sequence[WorkflowState]) -> List[Dict[str, Any]]:
+    """One row per scenario, best overall effectiveness first (unscored scenarios last)"""
+    rows = [comparison_row(index, params, result) for index, (params, result) in enumerate(zip(scenarios, results))]
+    return sorted(rows, key=lambda row: (row["overall_effectiveness"] is None, -(row["overall_effectiveness"] or 0)))
+
+
+@dataclass
+class ScenarioMatrixResult:
+    scenarios: List[ConversationParams]
+    states: List[WorkflowState]  # in scenario order
+    table: List[Dict[str, Any]] = field(default_factory=list)  # ranked comparison rows
+
+    def best(self) -> Optional[WorkflowState]:
+        """State of the highest-scoring scenario"""
+        for row in self.table:
+            if row["overall_effectiveness"] is not None:
+                return self.states[row["scenario"]]
+        return None
@@ -0,0 +1,194 @@
+"""
+Talan service matcher
+Precompiled Aho-Corasick multi-pattern matcher mapping customer pain points and needs to Talan services
+"""
+import hashlib
+import json
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+from config.talan_config import TALAN_COMPANY_INFO, SERVICE_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVICE = "transformation_digitale"
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and strip accents so that 'Sécurité' and 'securite' match the same keyword"""
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+class ServiceMatcher:
+    """Word-boundary aware Aho-Corasick matcher built once from the Talan service catalogue"""
+
+    def __init__(self, services: Optional[Dict[str, Dict]] = None,
+                 keywords: Optional[Dict[str, Dict[str, float]]] = None,
+                 cache_size: int = 256):
+        services = TALAN_COMPANY_INFO.get("services", {}) if services is None else services
+        keywords = SERVICE_KEYWORDS if keywords is None else keywords
+
+        # pattern -> list of (service, weight); a keyword may feed several services
+        self.patterns: List[str] = []
+        self.pattern_targets: List[List[Tuple[str, float]]] = []
+        index: Dict[str, int] = {}
+
+        def add_pattern(raw: str, service: str, weight: float):
+            pattern = normalize_text(raw).strip()
+            if not pattern:
+                return
+            if pattern not in index:
+                index[pattern] = len(self.patterns)
+                self.patterns.append(pattern)
+                self.pattern_targets.append([])
+            self.pattern_targets[index[pattern]].append((service, weight))
+
+        for service_key, service_keywords in keywords.items():
+            for keyword, weight in service_keywords.items():
+                add_pattern(keyword, service_key, float(weight))
+
+        # Service titles from the company profile are matched too, unless already catalogued
+        for service_key, service in services.items():
+            title = service.get("title")
+            if title and normalize_text(title) not in index:
+                add_pattern(title, service_key, 1.0)
+
+        self._pattern_index = index
+        self.services = list(dict.fromkeys(list(keywords.keys()) + list(services.keys())))
+        self._build_automaton()
+
+        self._cache: "OrderedDict[str, List[Tuple[str, float]]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+        logger.info(f"ServiceMatcher compiled {len(self.patterns)} patterns for {len(self.services)} services")
+
+    def _build_automaton(self):
+        """Build goto/fail/output tables for the keyword automaton"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(pattern_id)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._output[child].extend(self._output[self._fail[child]])
+
+    def find_keywords(self, text: str) -> Dict[str, int]:
+        """Return whole-word keyword hits with their occurrence counts"""
+        normalized = normalize_text(text)
+        hits: Dict[str, int] = {}
+        node = 0
+        for position, char in enumerate(normalized):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for pattern_id in self._output[node]:
+                pattern = self.patterns[pattern_id]
+                start = position - len(pattern) + 1
+                # Word boundaries: "ai" must not match inside "maintenance"
+                if start > 0 and normalized[start - 1].isalnum():
+                    continue
+                if position + 1 < len(normalized) and normalized[position + 1].isalnum():
+                    continue
+                hits[pattern] = hits.get(pattern, 0) + 1
+        return hits
+
+    def score_text(self, text: str) -> List[Tuple[str, float]]:
+        """Score every service against free text, best match first"""
+        scores: Dict[str, float] = {}
+        for pattern, count in self.find_keywords(text).items():
+            for service, weight in self.pattern_targets[self._pattern_index[pattern]]:
+                # Repeated mentions add a little, distinct keywords dominate
+                scores[service] = scores.get(service, 0.0) + weight * (1.0 + 0.25 * min(count - 1, 4))
+        order = {service: position for position, service in enumerate(self.services)}
+        return sorted(
+            ((service, round(score, 3)) for service, score in scores.items() if score > 0),
+            key=lambda item: (-item[1], order.get(item[0], len(order)))
+        )
+
+    def score_customer(self, customer_analysis) -> List[Tuple[str, float]]:
+        """Score services for a CustomerAnalysis, memoised on its pain points, needs and industry"""
+        key = self.customer_fingerprint(customer_analysis)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        scores = self.score_text(customer_text(customer_analysis))
+
+        with self._lock:
+            self._cache[key] = scores
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return scores
+
+    def match_services(self, customer_analysis) -> List[str]:
+        """Relevant service keys for a customer, ranked by relevance"""
+        services = [service for service, _ in self.score_customer(customer_analysis)]
+        return services or [DEFAULT_SERVICE]
+
+    @staticmethod
+    def customer_fingerprint(customer_analysis) -> str:
+        """Stable hash of the customer fields that drive service selection"""
+        payload = json.dumps(
+            {
+                "pain_points": getattr(customer_analysis, "pain_points", []),
+                "needs": getattr(customer_analysis, "needs", []),
+                "industry": getattr(customer_analysis, "industry", ""),
+            },
+            sort_keys=True, default=str, ensure_ascii=False
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def customer_text(customer_analysis) -> str:
+    """Flatten pain points, needs and industry into one searchable string"""
+    parts = []
+    for item in list(getattr(customer_analysis, "pain_points", []) or []) + list(getattr(customer_analysis, "needs", []) or []):
+        if isinstance(item, dict):
+            parts.extend(str(value) for value in item.values() if isinstance(value, (str, int, float)))
+        else:
+            parts.append(str(item))
+    parts.append(str(getattr(customer_analysis, "industry", "") or ""))
+    return " . ".join(parts)
+
+
+_default_matcher: Optional[ServiceMatcher] = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_service_matcher() -> ServiceMatcher:
+    """Process-wide matcher, compiled on first use"""
+    global _default_matcher
+    if _default_matcher is None:
+        with _default_matcher_lock:
+            if _default_matcher is None:
+                _default_matcher = ServiceMatcher()
+    return _default_matcher
@@ -0,0 +1,216 @@
+"""
+Similarity cache
+Results computed for one customer, reused for customers whose analysis is nearly the same
+
+Prospects of one industry often share almost the same pain point and needs list. Customer
+analyses are turned into TF-IDF vectors over the words of their pain points and needs (NumPy,
+built on lookup over the stored entries) and compared by cosine similarity with the customers
+of the same industry. When the nearest one reaches ``Config.SIMILARITY_THRESHOLD``, its result
+is offered for reuse:
+
+- the strategy agent reuses the strategic recommendations, next steps and alternative approaches
+  of the neighbour (scores, strengths and gaps still come from this conversation's analysis);
+- the message composer warm-starts service selection from the neighbour when keyword matching
+  finds nothing specific.
+
+Entries are partitioned (e.g. by conversation goal, channel and message types) so results are
+only shared in the same context. With verification on, a hit is still recomputed and the
+agreement between the cached and fresh result is recorded; the fresh result is used.
+"""
+import hashlib
+import json
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from config.settings import Config
+from utils.service_matcher import normalize_text
+
+_WORD = re.compile(r"[a-z0-9]{3,}")
+
+
+class SimilarityHit(NamedTuple):
+    payload: Any
+    similarity: float
+    key: str
+
+
+def _field(customer_analysis, name):
+    if isinstance(customer_analysis, dict):
+        return customer_analysis.get(name)
+    return getattr(customer_analysis, name, None)
+
+
+def customer_industry(customer_analysis) -> str:
+    return " ".join(normalize_text(_field(customer_analysis, "industry") or "").split())
+
+
+def customer_terms(customer_analysis) -> Counter:
+    """Word counts of the pain points and needs of a CustomerAnalysis (model or dict)"""
+    texts = []
+    for item in list(_field(customer_analysis, "pain_points") or []) + list(_field(customer_analysis, "needs") or []):
+        if isinstance(item, dict):
+            texts.extend(str(value) for value in item.values() if isinstance(value, (str, int, float)))
+        else:
+            texts.append(str(item))
+    return Counter(word for text in texts for word in _WORD.findall(normalize_text(text)))
+
+
+def _terms_key(terms: Counter) -> str:
+    return hashlib.sha1(json.dumps(sorted(terms.items())).encode("utf-8")).hexdigest()
+
+
+class _Partition:
+    """Entries of one (kind, partition, industry) with a TF-IDF matrix rebuilt after changes"""
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, Tuple[Counter, Any]]" = OrderedDict()
+        self._matrix = None  # (keys, vocabulary, idf, row-normalized matrix)
+
+    def add(self, key: str, terms: Counter, payload: Any, max_entries: int):
+        self.entries[key] = (terms, payload)
+        self.entries.move_to_end(key)
+        while len(self.entries) > max_entries:
+            self.entries.popitem(last=False)
+        self._matrix = None
+
+    def matrix(self):
+        import numpy as np
+
+        if self._matrix is None:
+            keys = list(self.entries)
+            vocabulary = {term: index for index, term in enumerate(
+                sorted({term for terms, _ in self.entries.values() for term in terms}))}
+            counts = np.zeros((len(keys), len(vocabulary)))
+            for row, key in enumerate(keys):
+                for term, count in self.entries[key][0].items():
+                    counts[row, vocabulary[term]] = count
+            document_frequency = (counts > 0).sum(axis=0)
+            idf = np.log((1 + len(keys)) / (1 + document_frequency)) + 1
+            weights = np.where(counts > 0, 1 + np.log(np.maximum(counts, 1)), 0) * idf
+            norms = np.linalg.norm(weights, axis=1, keepdims=True)
+            self._matrix = (keys, vocabulary, idf, weights / np.where(norms == 0, 1, norms))
+        return self._matrix
+
+    def nearest(self, terms: Counter) -> Optional[Tuple[str, float]]:
+        import numpy as np
+
+        keys, vocabulary, idf, matrix = self.matrix()
+        if not keys or not terms:
+            return None
+        # Terms unknown to the index weigh with the highest idf and can only lower the similarity
+        unseen_idf = math.log(1 + len(keys)) + 1
+        query = np.zeros(len(vocabulary))
+        norm = 0.0
+        for term, count in terms.items():
+            weight = 1 + math.log(count)
+            if term in vocabulary:
+                query[vocabulary[term]] = weight * idf[vocabulary[term]]
+                norm += query[vocabulary[term]] ** 2
+            else:
+                norm += (weight * unseen_idf) ** 2
+        if norm == 0:
+            return None
+        scores = matrix @ (query / math.sqrt(norm))
+        best = int(scores.argmax())
+        return keys[best], float(scores[best])
+
+
+class SimilarityIndex:
+    """Bounded similarity cache of per-customer results, with hit-rate and verification statistics"""
+
+    def __init__(self, threshold: Optional[float] = None, max_entries: Optional[int] = None,
+                 verify: Optional[bool] = None):
+        self.threshold = Config.SIMILARITY_THRESHOLD if threshold is None else threshold
+        self.max_entries = max_entries or Config.SIMILARITY_CACHE_MAX_ENTRIES
+        self.verify = Config.SIMILARITY_CACHE_VERIFY if verify is None else verify
+        self._partitions: Dict[Tuple[str, str, str], _Partition] = defaultdict(_Partition)
+        self._stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {
+            "lookups": 0, "hits": 0, "verified": 0, "agreement": 0.0})
+        self._lock = threading.Lock()
+
+    def verifying(self, state=None) -> bool:
+        """Whether hits are recomputed; ``state.config["verify_similarity_cache"]`` overrides the default"""
+        override = (getattr(state, "config", None) or {}).get("verify_similarity_cache")
+        return self.verify if override is None else bool(override)
+
+    def lookup(self, kind: str, partition: str, customer_analysis) -> Optional[SimilarityHit]:
+        """Payload of the most similar stored customer, if similar enough"""
+        if not Config.SIMILARITY_CACHE or customer_analysis is None:
+            return None
+        terms = customer_terms(customer_analysis)
+        key = _terms_key(terms)
+        with self._lock:
+            self._stats[kind]["lookups"] += 1
+            entries = self._partitions.get((kind, partition, customer_industry(customer_analysis)))
+            if entries is None or not entries.entries:
+                return None
+            if key in entries.entries:
+                nearest = (key, 1.0)
+            else:
+                nearest = entries.nearest(terms)
+            if nearest is None or nearest[1] < self.threshold:
+                return None
+            self._stats[kind]["hits"] += 1
+            entries.entries.move_to_end(nearest[0])
+            return SimilarityHit(entries.entries[nearest[0]][1], round(nearest[1], 4), nearest[0])
+
+    def add(self, kind: str, partition: str, customer_analysis, payload: Any):
+        if not Config.SIMILARITY_CACHE or customer_analysis is None:
+            return
+        terms = customer_terms(customer_analysis)
+        if not terms:
+            return
+        with self._lock:
+            self._partitions[(kind, partition, customer_industry(customer_analysis))].add(
+                _terms_key(terms), terms, payload, self.max_entries)
+
+    def record_verification(self, kind: str, agreement: float):
+        """Agreement (0..1) between a cached result and the fresh one computed to verify it"""
+        with self._lock:
+            self._stats[kind]["verified"] += 1
+            self._stats[kind]["agreement"] += agreement
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per kind: lookups, hits, hit_rate and, when verifying, mean agreement with fresh runs"""
+        with self._lock:
+            return {
+                kind: {
+                    "lookups": values["lookups"],
+                    "hits": values["hits"],
+                    "hit_rate": values["hits"] / values["lookups"] if values["lookups"] else 0.0,
+                    "verified": values["verified"],
+                    "agreement": values["agreement"] / values["verified"] if values["verified"] else None,
+                }
+                for kind, values in self._stats.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._partitions.clear()
+            self._stats.clear()
+
+
+def text_agreement(cached: Any, fresh: Any) -> float:
+    """Jaccard similarity of the words of two results (lists, dicts or strings)"""
+    def words(value):
+        return set(_WORD.findall(normalize_text(json.dumps(value, ensure_ascii=False, default=str))))
+
+    left, right = words(cached), words(fresh)
+    return len(left & right) / len(left | right) if left | right else 1.0
+
+
+_default_index: Optional[SimilarityIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Process-wide similarity cache shared by every agent"""
+    global _default_index
+    if _default_index is None:
+        with _default_index_lock:
+            if _default_index is None:
+                _default_index = SimilarityIndex()
+    return _default_index
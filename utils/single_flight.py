@@ -0,0 +1,141 @@
+"""
+Single-flight request coalescing
+Concurrent identical LLM requests share one in-flight call and all receive its result
+
+Several Streamlit sessions or batch workers analysing the same popular account send the very
+same prompt at the same moment. The first caller for a request key becomes the leader and
+makes the call; callers arriving while it is in flight wait for the leader's result (or
+exception) instead of sending their own request. Nothing is cached: once the call returns, the
+next identical request goes to the provider again.
+
+Leaders and followers may mix threads and event loops - the shared result is a
+``concurrent.futures.Future`` awaited through ``asyncio.wrap_future`` on the async path.
+Followers receive a copy of the leader's result, so a caller editing its response does not
+change the others'. A leader that is cancelled (or interrupted) does not pass that on: its
+followers join again and one of them makes the call. A cancelled follower leaves the shared
+call running for the others.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+def _payload(value: Any) -> Any:
+    # LangChain messages: role and content are what the provider sees
+    if hasattr(value, "type") and hasattr(value, "content"):
+        return [value.type, value.content]
+    if isinstance(value, (list, tuple)):
+        return [_payload(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _payload(item) for key, item in value.items()}
+    return value
+
+
+def request_key(model: Dict[str, Any], args: tuple, kwargs: Dict[str, Any]) -> str:
+    """Digest of the model settings and the request (``config``, i.e. callbacks and tags, excluded)"""
+    request = {key: value for key, value in kwargs.items() if key != "config"}
+    payload = json.dumps([model, _payload(list(args)), _payload(request)], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class _LeaderGone(Exception):
+    """Set on the shared future when the leader was cancelled: followers retry"""
+
+
+def _copy(result: Any) -> Any:
+    if hasattr(result, "model_copy"):
+        return result.model_copy(deep=True)
+    return copy.deepcopy(result)
+
+
+class SingleFlight:
+    """In-flight calls by key; followers wait for the leader's outcome"""
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.followers += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, call: Callable[[], Any]) -> Any:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return _copy(future.result())
+            except _LeaderGone:
+                continue
+        try:
+            result = call()
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            self._finish(key, future, error=_LeaderGone())
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # Shielded: cancelling this follower must not cancel the call shared with the others
+                return _copy(await asyncio.shield(asyncio.wrap_future(future)))
+            except _LeaderGone:
+                continue
+        try:
+            result = await call()
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            # CancelledError: followers elect a new leader instead of being cancelled too
+            self._finish(key, future, error=_LeaderGone())
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._calls)}
+
+
+_default_single_flight: Optional[SingleFlight] = None
+_default_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide single-flight group shared by every agent's LLM client"""
+    global _default_single_flight
+    if _default_single_flight is None:
+        with _default_single_flight_lock:
+            if _default_single_flight is None:
+                _default_single_flight = SingleFlight()
+    return _default_single_flight
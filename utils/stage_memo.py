@@ -0,0 +1,185 @@
+"""
+Stage memoization
+Workflow stage outputs keyed on digests of exactly the inputs each stage consumes
+
+Document analysis and the strategy and personality analyses are memoized: changing only the
+tone or channel of ConversationParams reruns message composition, and the analyses run again
+only when the new conversation differs. Message composition samples the LLM, so asking again
+with the same parameters is expected to return a new draft: it is memoized only when the run
+opts in with ``state.config["memoize_composition"]`` (e.g. replaying a scenario after a failed
+save).
+
+Each stage lists the state fields it reads and the fields it produces. Before a stage runs,
+its inputs are hashed; on a hit the stored outputs are copied into the state and the agent is
+not called. Outputs are stored only when the stage finished without new errors.
+"""
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import Config
+from utils.models import WorkflowState
+
+# stage -> (inputs read from the state, outputs written to it)
+# "file:<field>" hashes the content of the file at that path, "config:<key>" an entry of state.config
+# and "intermediate:<key>" an entry of state.intermediate_results (raw_customer_data is an input when
+# the profile was handed over already parsed instead of as a file)
+STAGES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "document_analysis": (
+        ("file:customer_json_path", "file:company_pdf_path", "intermediate:raw_customer_data"),
+        ("customer_analysis", "company_analysis", "intermediate:raw_customer_data"),
+    ),
+    "message_composition": (
+        ("customer_analysis", "company_analysis", "conversation_params", "config:talan_candidates",
+         "config:early_termination"),
+        ("conversation", "intermediate:current_message_type", "intermediate:talan_candidates",
+         "intermediate:iteration_count", "intermediate:conversation_complete", "intermediate:completion_reason",
+         "intermediate:conversation_outcome"),
+    ),
+    "strategy_analysis": (
+        ("conversation", "customer_analysis", "company_analysis"),
+        ("strategy_analysis",),
+    ),
+    "personality_analysis": (
+        ("conversation", "customer_analysis"),
+        ("personality_analysis", "personality_components", "personality_recommendations"),
+    ),
+}
+
+# Stages whose output is not a function of their inputs: memoized only when this state.config key is set
+OPT_IN = {
+    "message_composition": "memoize_composition",
+}
+
+# Produced by the stage; a result without it is not worth remembering
+REQUIRED_OUTPUT = {
+    "document_analysis": "customer_analysis",
+    "message_composition": "conversation",
+    "strategy_analysis": "strategy_analysis",
+    "personality_analysis": "personality_analysis",
+}
+
+
+def _file_digest(path: Optional[str]) -> Optional[str]:
+    if not path:
+        return ""
+    try:
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def _value_digest(value: Any) -> str:
+    if value is None:
+        return ""
+    if hasattr(value, "messages") and hasattr(value, "conversation_id"):
+        # Timestamps and status do not change what the analyses see
+        value = [value.conversation_id] + [[m.sender, m.content, m.message_type] for m in value.messages]
+    elif hasattr(value, "model_dump"):
+        value = value.model_dump(mode="json")
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _read(state: WorkflowState, name: str) -> Any:
+    if name.startswith("config:"):
+        return state.config.get(name[7:])
+    if name.startswith("intermediate:"):
+        return state.intermediate_results.get(name[13:])
+    return getattr(state, name)
+
+
+def _write(state: WorkflowState, name: str, value: Any):
+    if name.startswith("intermediate:"):
+        if value is not None:
+            state.intermediate_results[name[13:]] = value
+    else:
+        setattr(state, name, value)
+
+
+def _copy(value: Any) -> Any:
+    # Analyses are never mutated once built and are shared; conversations and dicts get copies
+    if hasattr(value, "messages") or isinstance(value, (dict, list)):
+        return value.model_copy(deep=True) if hasattr(value, "model_copy") else copy.deepcopy(value)
+    return value
+
+
+class StageMemo:
+    """Bounded LRU of stage outputs keyed on input digests"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or Config.STAGE_MEMO_MAX_ENTRIES
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, stage: str, state: WorkflowState) -> Optional[str]:
+        """Digest of the inputs ``stage`` consumes, or None when it cannot be memoized"""
+        if not Config.STAGE_MEMOIZATION or stage not in STAGES:
+            return None
+        if stage in OPT_IN and not state.config.get(OPT_IN[stage]):
+            return None
+        parts = [stage, Config.MODEL_NAME, str(Config.TEMPERATURE)]
+        for name in STAGES[stage][0]:
+            if name.startswith("file:"):
+                digest = _file_digest(getattr(state, name[5:]))
+                if digest is None:
+                    return None
+            else:
+                digest = _value_digest(_read(state, name))
+            parts.append(f"{name}={digest}")
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def restore(self, stage: str, key: Optional[str], state: WorkflowState) -> bool:
+        """Copy the outputs remembered for ``key`` into ``state``; False on a miss"""
+        if key is None or stage in (state.config.get("refresh_stages") or ()):
+            return False
+        with self._lock:
+            outputs = self._entries.get(key)
+            if outputs is None:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self.hits += 1
+        for name, value in outputs.items():
+            _write(state, name, _copy(value))
+        return True
+
+    def store(self, stage: str, key: Optional[str], result: WorkflowState, errors_before: int = 0):
+        """Remember the outputs of ``stage`` unless it failed"""
+        if key is None or len(result.errors) > errors_before or _read(result, REQUIRED_OUTPUT[stage]) is None:
+            return
+        outputs = {name: _copy(_read(result, name)) for name in STAGES[stage][1]}
+        with self._lock:
+            self._entries[key] = outputs
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_default_memo: Optional[StageMemo] = None
+_default_memo_lock = threading.Lock()
+
+
+def get_stage_memo() -> StageMemo:
+    """Process-wide stage memo shared by every workflow instance"""
+    global _default_memo
+    if _default_memo is None:
+        with _default_memo_lock:
+            if _default_memo is None:
+                _default_memo = StageMemo()
+    return _default_memo
@@ -0,0 +1,31 @@
+"""
+Workflow state codec
+Compact serialized form of WorkflowState for crossing process boundaries
+"""
+import zlib
+from typing import Any
+
+from utils.models import WorkflowState
+
+# Level 1 keeps compression cheap; states are mostly repetitive JSON text
+COMPRESSION_LEVEL = 1
+
+
+def ensure_state(result: Any) -> WorkflowState:
+    """Coerce a workflow result (WorkflowState or the dict LangGraph returns) into a WorkflowState"""
+    if isinstance(result, WorkflowState):
+        return result
+    if isinstance(result, dict):
+        valid_fields = set(WorkflowState.model_fields.keys())
+        return WorkflowState(**{key: value for key, value in result.items() if key in valid_fields})
+    raise TypeError(f"Cannot convert {type(result).__name__} to WorkflowState")
+
+
+def pack_state(state: Any) -> bytes:
+    """Serialize a state to zlib-compressed JSON bytes"""
+    return zlib.compress(ensure_state(state).model_dump_json().encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def unpack_state(blob: bytes) -> WorkflowState:
+    """Inverse of ``pack_state``"""
+    return WorkflowState.model_validate_json(zlib.decompress(blob))
@@ -0,0 +1,86 @@
+"""
+Step-level resume
+Locates the last successful step of a checkpointed LangGraph run so that only the failed step and what follows it are rerun
+
+Workflow and agent nodes catch their own exceptions and record them in ``state.errors`` instead
+of raising, so a run "finishes" even when an LLM call failed. Walking the checkpoints of the
+latest run, the first step whose state gained errors is the failed one; invoking the graph with
+no input on the checkpoint taken before it reruns that node (and the nodes after it) on the
+persisted outputs of every step that succeeded. A run interrupted by an exception or a timeout
+simply resumes at its pending nodes.
+"""
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from utils.models import WorkflowState
+
+logger = logging.getLogger(__name__)
+
+# ResumePoint.action values
+RESUME_MISSING = "missing"     # no checkpoint for the thread: run from scratch
+RESUME_COMPLETE = "complete"   # last run finished without failed steps: nothing to rerun
+RESUME_FROM = "resume"         # invoke(None, config) reruns from the failed step
+
+
+class ResumePoint(NamedTuple):
+    action: str
+    config: Optional[Dict[str, Any]] = None
+    values: Optional[Dict[str, Any]] = None
+    completed: List[str] = []
+    failed: List[str] = []
+
+
+def _latest_run(app, config: Dict[str, Any]) -> List[Any]:
+    """Checkpoints of the most recent run on the thread, oldest first"""
+    chain = []
+    snapshot = app.get_state(config)
+    # An unknown thread yields an empty snapshot without metadata
+    while snapshot is not None and snapshot.metadata is not None:
+        chain.append(snapshot)
+        if (snapshot.metadata or {}).get("source") == "input" or not snapshot.parent_config:
+            break
+        snapshot = app.get_state(snapshot.parent_config)
+    chain.reverse()
+    return chain
+
+
+def _written_nodes(snapshot) -> List[str]:
+    writes = (snapshot.metadata or {}).get("writes") or {}
+    return [node for node in writes if not node.startswith("__")]
+
+
+def find_resume_point(app, config: Dict[str, Any]) -> ResumePoint:
+    """Where to resume the compiled graph ``app`` on the thread of ``config``"""
+    chain = [snapshot for snapshot in _latest_run(app, config)
+             if (snapshot.metadata or {}).get("source") != "input"]
+    if not chain:
+        return ResumePoint(RESUME_MISSING)
+
+    completed: List[str] = []
+    for previous, snapshot in zip(chain, chain[1:]):
+        nodes = _written_nodes(snapshot)
+        if len(snapshot.values.get("errors") or []) > len(previous.values.get("errors") or []):
+            return ResumePoint(RESUME_FROM, previous.config, previous.values, completed, nodes)
+        completed.extend(nodes)
+
+    latest = chain[-1]
+    if latest.next:
+        # Interrupted by an exception or timeout: the pending nodes never wrote their outputs
+        return ResumePoint(RESUME_FROM, latest.config, latest.values, completed, list(latest.next))
+    return ResumePoint(RESUME_COMPLETE, latest.config, latest.values, completed)
+
+
+def resume_config(point: ResumePoint) -> Dict[str, Any]:
+    """Config invoking the graph from ``point``; nodes see ``configurable["resume"]`` set"""
+    return {"configurable": {**point.config["configurable"], "resume": True}}
+
+
+def is_resuming(config: Optional[Dict[str, Any]]) -> bool:
+    return bool((config or {}).get("configurable", {}).get("resume"))
+
+
+def state_from_values(values: Any) -> WorkflowState:
+    """WorkflowState from graph output or checkpoint values"""
+    if isinstance(values, WorkflowState):
+        return values
+    return WorkflowState(**{key: value for key, value in dict(values).items() if key in WorkflowState.model_fields})
@@ -0,0 +1,214 @@
+"""
+Dashboard view models
+Analysis results and conversation messages converted once into hashable display structures
+
+The Streamlit script reruns top to bottom on every interaction. Instead of re-walking the
+strategy/personality objects (model, dict or legacy layout) and re-formatting every message on
+each run, the dashboard asks for a view here: views are frozen dataclasses built once per
+source object and cached by identity, and the conversation transcript is rendered to a single
+HTML block cached on the (hashable) tuple of message views.
+"""
+import html
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Pairs = Tuple[Tuple[str, str], ...]
+
+PROFILE_ICONS = {
+    "Tech-Savvy Innovator": "🔧",
+    "Business-Oriented Decision Maker": "📊",
+    "Cost-Conscious Pragmatist": "💰",
+    "Early Adopter Innovator": "🚀",
+    "Relationship-Driven Connector": "🤝",
+}
+DISC_TRAITS = (("D", "Dominance"), ("I", "Influence"), ("S", "Steadiness"), ("C", "Compliance"))
+
+
+@dataclass(frozen=True)
+class StrategyView:
+    overall_effectiveness: float
+    methodology_score: float
+    positioning_score: float
+    value_prop_score: float
+    strengths: Tuple[str, ...]
+    improvement_areas: Tuple[str, ...]
+    recommendations: Tuple[str, ...]
+    next_steps: Tuple[str, ...]
+    methodology: Pairs
+    positioning: Pairs
+    objection_handling: Pairs
+    value_delivery: Pairs
+    raw_details_json: str
+
+
+@dataclass(frozen=True)
+class PersonalityView:
+    profile: str
+    profile_icon: str
+    confidence: str
+    relationship_orientation: str
+    communication_style: str
+    decision_making_style: str
+    risk_tolerance: str
+    information_processing: str
+    disc: Tuple[Tuple[str, str, Any], ...]
+    motivational_drivers: Tuple[str, ...]
+    recommendations: Tuple[str, ...]
+    communication_approach: Pairs
+    objection_handling_style: str
+
+
+@dataclass(frozen=True)
+class MessageView:
+    index: int
+    is_company: bool
+    message_type: str
+    channel: str
+    content: str
+
+
+class _IdentityCache:
+    """Views keyed by the identity of their source object (sources are replaced, not mutated)"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, source: Any, build: Callable[[Any], Any]) -> Any:
+        key = (kind, id(source))
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] is source:
+                self._entries.move_to_end(key)
+                return cached[1]
+        view = build(source)
+        with self._lock:
+            # Holding the source keeps its id from being reused while cached
+            self._entries[key] = (source, view)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return view
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_views = _IdentityCache()
+
+
+def _get(source: Any, name: str, default: Any) -> Any:
+    if isinstance(source, dict):
+        return source.get(name, default)
+    return getattr(source, name, default)
+
+
+def _pairs(section: Any) -> Pairs:
+    """``(Title, value)`` rows of an assessment dict, without its score"""
+    if not isinstance(section, dict):
+        return ()
+    return tuple((key.replace('_', ' ').title(), str(value)) for key, value in section.items() if key != 'score')
+
+
+def _score(section: Any) -> float:
+    return section.get('score', 0) if isinstance(section, dict) else 0
+
+
+def _build_strategy(analysis: Any) -> StrategyView:
+    methodology = _get(analysis, 'methodology_assessment', {})
+    positioning = _get(analysis, 'competitive_positioning', {})
+    objections = _get(analysis, 'objection_handling', {})
+    value_delivery = _get(analysis, 'value_proposition_delivery', {})
+    raw_details = _get(analysis, 'raw_details', {})
+    return StrategyView(
+        overall_effectiveness=_get(analysis, 'overall_effectiveness', 0) or 0,
+        methodology_score=_score(methodology),
+        positioning_score=_score(positioning),
+        value_prop_score=_score(value_delivery),
+        strengths=tuple(map(str, _get(analysis, 'strengths', []) or [])),
+        improvement_areas=tuple(map(str, _get(analysis, 'improvement_areas', []) or [])),
+        recommendations=tuple(map(str, _get(analysis, 'recommendations', []) or [])),
+        next_steps=tuple(map(str, _get(analysis, 'next_steps', []) or [])),
+        methodology=_pairs(methodology),
+        positioning=_pairs(positioning),
+        objection_handling=_pairs(objections),
+        value_delivery=_pairs(value_delivery),
+        raw_details_json=json.dumps(raw_details, indent=2, ensure_ascii=False, default=str) if raw_details else "",
+    )
+
+
+def _build_personality(analysis: Any) -> PersonalityView:
+    if hasattr(analysis, 'personality_profile') or isinstance(analysis, dict):
+        profile = _get(analysis, 'personality_profile', 'Unknown')
+        confidence = _get(analysis, 'profile_confidence', 'N/A')
+        approach = _get(analysis, 'optimal_communication_approach', {})
+        objection_style = _get(analysis, 'objection_handling_style', 'N/A')
+    else:
+        # Older analyses carry no profile classification nor communication strategy
+        profile, confidence, approach, objection_style = "Unknown", "N/A", {}, "N/A"
+    disc_profile = _get(analysis, 'disc_profile', {}) or {}
+    approach = approach if isinstance(approach, dict) else {}
+    return PersonalityView(
+        profile=str(profile),
+        profile_icon=PROFILE_ICONS.get(profile, "🎯"),
+        confidence=str(confidence),
+        relationship_orientation=str(_get(analysis, 'relationship_orientation', 'N/A')),
+        communication_style=str(_get(analysis, 'communication_style', 'Unknown')),
+        decision_making_style=str(_get(analysis, 'decision_making_style', 'Unknown')),
+        risk_tolerance=str(_get(analysis, 'risk_tolerance', 'Unknown')),
+        information_processing=str(_get(analysis, 'information_processing', 'Unknown')),
+        disc=tuple((trait, name, disc_profile.get(trait, 0)) for trait, name in DISC_TRAITS) if disc_profile else (),
+        motivational_drivers=tuple(map(str, _get(analysis, 'motivational_drivers', []) or [])),
+        recommendations=tuple(map(str, _get(analysis, 'personality_based_recommendations', []) or [])),
+        communication_approach=tuple((key.replace('_', ' ').title(), str(value)) for key, value in approach.items()),
+        objection_handling_style=str(objection_style),
+    )
+
+
+def strategy_view(analysis: Any) -> Optional[StrategyView]:
+    """Display structure of a strategy analysis (model or dict), built once per object"""
+    return _views.get("strategy", analysis, _build_strategy) if analysis else None
+
+
+def personality_view(analysis: Any) -> Optional[PersonalityView]:
+    """Display structure of a personality analysis (model, dict or older layout), built once per object"""
+    return _views.get("personality", analysis, _build_personality) if analysis else None
+
+
+def message_views(messages: List[Dict[str, Any]]) -> Tuple[MessageView, ...]:
+    """Views of the UI message dicts; each message is converted once"""
+    return tuple(
+        _views.get(f"message:{index}", message, lambda msg, index=index: MessageView(
+            index=index,
+            is_company=msg['sender'] == "company",
+            message_type=str(msg.get('message_type', 'N/A')),
+            channel=str(msg.get('channel', 'N/A')),
+            content=str(msg['content']),
+        ))
+        for index, message in enumerate(messages, 1)
+    )
+
+
+@lru_cache(maxsize=64)
+def conversation_html(views: Tuple[MessageView, ...]) -> str:
+    """The whole transcript as one HTML block (one Streamlit element instead of two per message)"""
+    # LLM and customer text is rendered with unsafe_allow_html: escape it, keep its line breaks
+    blocks = []
+    for view in views:
+        if view.is_company:
+            title = f"🏢 TALAN - Exchange {view.index}</strong> ({html.escape(view.message_type)} - {html.escape(view.channel)})"
+            style = "background: #e8f4f8; border-left: 4px solid #4258dc;"
+        else:
+            title = f"👤 CLIENT - Exchange {view.index}</strong> ({html.escape(view.message_type)})"
+            style = "background: #f0f8f0; border-left: 4px solid #28a745;"
+        content = html.escape(view.content).replace("\n", "<br>")
+        blocks.append(
+            f'<p style="margin: 1rem 0 0 0;"><strong>{title}</p>'
+            f'<div style="{style} padding: 1rem; border-radius: 8px; margin: 0.5rem 0;">{content}</div>'
+        )
+    return "\n".join(blocks)
@@ -0,0 +1,166 @@
+"""
+Process pool execution mode for the B2B Sales Workflow
+Runs workflows in warm worker processes so CPU-side work (JSON repair, result transformation,
+pydantic validation, PDF parsing) does not contend on one interpreter's GIL
+"""
+import importlib
+import logging
+import os
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.settings import Config
+from utils.models import ConversationParams, WorkflowState
+from utils.state_codec import pack_state, unpack_state
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FACTORY = "pure_langgraph_workflow:PureLangGraphB2BWorkflow"
+AGENT_ATTRIBUTES = ("document_agent", "message_composer_agent", "strategy_agent", "personality_agent")
+
+# Per-process workflow, built once by the pool initializer
+_worker_workflow = None
+
+
+def _load_factory(path: str):
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _init_worker(factory_path: str, warm_agents: bool):
+    """Build the workflow (and optionally every agent) once per worker process"""
+    global _worker_workflow
+    _worker_workflow = _load_factory(factory_path)()
+    if warm_agents:
+        for attribute in AGENT_ATTRIBUTES:
+            getattr(_worker_workflow, attribute, None)
+        getattr(_worker_workflow, "workflow", None)
+    logger.info(f"Workflow worker {os.getpid()} ready")
+
+
+def _worker_ping(hold: float = 0.0) -> int:
+    # Holding the worker briefly makes concurrent pings land on different processes
+    time.sleep(hold)
+    return os.getpid()
+
+
+def _worker_run(operation: str, payload: Dict[str, Any]) -> bytes:
+    """Execute one operation in the worker; states travel as packed bytes"""
+    params = payload.get("conversation_params")
+    conversation_params = ConversationParams(**params) if params else None
+
+    if operation == "document_analysis":
+        result = _worker_workflow.run_document_analysis_only(payload.get("customer_json_path"),
+                                                             customer_data=payload.get("customer_data"))
+    elif operation == "conversation":
+        result = _worker_workflow.run_conversation_generation(unpack_state(payload["state"]), conversation_params)
+    elif operation == "complete":
+        result = _worker_workflow.execute_complete_workflow(
+            payload.get("customer_json_path"), conversation_params, payload.get("config"),
+            customer_data=payload.get("customer_data")
+        )
+    else:
+        raise ValueError(f"Unknown operation '{operation}'")
+    return pack_state(result)
+
+
+class WorkflowProcessPool:
+    """
+    Pool of warm worker processes, each holding its own PureLangGraphB2BWorkflow
+
+    Exposes the same entry points as the workflow (``run_document_analysis_only``,
+    ``run_conversation_generation``, ``execute_complete_workflow``) so it can replace the
+    in-process workflow, plus ``submit_*`` variants returning futures of WorkflowState.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, warm_agents: bool = True,
+                 factory: str = DEFAULT_FACTORY, start_method: Optional[str] = None,
+                 max_tasks_per_child: Optional[int] = None):
+        self.max_workers = max_workers or Config.WORKFLOW_POOL_WORKERS or os.cpu_count() or 1
+        context = multiprocessing.get_context(start_method or Config.WORKFLOW_POOL_START_METHOD)
+        options = {}
+        max_tasks = max_tasks_per_child or Config.WORKFLOW_POOL_MAX_TASKS_PER_CHILD
+        if max_tasks:
+            options["max_tasks_per_child"] = max_tasks
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(factory, warm_agents),
+            **options
+        )
+        logger.info(f"Workflow process pool created with {self.max_workers} workers")
+
+    def warmup(self) -> List[int]:
+        """Start every worker now instead of on the first request, returns the worker PIDs"""
+        futures = [self._executor.submit(_worker_ping, 0.2) for _ in range(self.max_workers)]
+        return sorted({future.result() for future in futures})
+
+    def _submit(self, operation: str, payload: Dict[str, Any]) -> "Future[WorkflowState]":
+        raw = self._executor.submit(_worker_run, operation, payload)
+        result: "Future[WorkflowState]" = Future()
+
+        def _unpack(done: Future):
+            try:
+                result.set_result(unpack_state(done.result()))
+            except Exception as e:
+                result.set_exception(e)
+
+        raw.add_done_callback(_unpack)
+        return result
+
+    @staticmethod
+    def _params(conversation_params: Optional[ConversationParams]) -> Optional[Dict[str, Any]]:
+        return conversation_params.model_dump(mode="json") if conversation_params else None
+
+    # ------------------------------------------------------------------ futures
+
+    def submit_document_analysis(self, customer_json_path: Optional[str] = None,
+                                 customer_data: Optional[Dict[str, Any]] = None) -> "Future[WorkflowState]":
+        return self._submit("document_analysis", {"customer_json_path": customer_json_path,
+                                                  "customer_data": customer_data})
+
+    def submit_conversation_generation(self, state: WorkflowState,
+                                       conversation_params: ConversationParams) -> "Future[WorkflowState]":
+        return self._submit("conversation", {"state": pack_state(state),
+                                             "conversation_params": self._params(conversation_params)})
+
+    def submit_complete_workflow(self, customer_json_path: Optional[str] = None,
+                                 conversation_params: Optional[ConversationParams] = None,
+                                 config: Optional[Dict[str, Any]] = None,
+                                 customer_data: Optional[Dict[str, Any]] = None) -> "Future[WorkflowState]":
+        return self._submit("complete", {"customer_json_path": customer_json_path,
+                                         "conversation_params": self._params(conversation_params),
+                                         "config": config, "customer_data": customer_data})
+
+    def map_document_analysis(self, customer_json_paths: Iterable[str]) -> List[WorkflowState]:
+        """Analyse many customer files across all workers, results in input order"""
+        futures = [self.submit_document_analysis(path) for path in customer_json_paths]
+        return [future.result() for future in futures]
+
+    # ------------------------------------------------------------------ workflow interface
+
+    def run_document_analysis_only(self, customer_json_path: Optional[str] = None,
+                                   customer_data: Optional[Dict[str, Any]] = None) -> WorkflowState:
+        return self.submit_document_analysis(customer_json_path, customer_data).result()
+
+    def run_conversation_generation(self, state: WorkflowState,
+                                    conversation_params: ConversationParams) -> WorkflowState:
+        return self.submit_conversation_generation(state, conversation_params).result()
+
+    def execute_complete_workflow(self, customer_json_path: Optional[str] = None,
+                                  conversation_params: Optional[ConversationParams] = None,
+                                  config: Optional[Dict[str, Any]] = None,
+                                  customer_data: Optional[Dict[str, Any]] = None) -> WorkflowState:
+        return self.submit_complete_workflow(customer_json_path, conversation_params, config, customer_data).result()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()